@@ -0,0 +1,150 @@
+from contextvars import ContextVar
+from typing import Optional, Dict, Any, Callable, Tuple
+
+from google.adk.tools.agent_tool import AgentTool
+
+from config import settings
+from logging_config import logger
+from src.llm.context_window import ContextWindow
+from src.telemetry.tracer import Span, Tracer
+
+
+def chain_callback(existing: Any, callback: Callable) -> Callable:
+    """
+    Runs the callbacks already set on an agent before `callback`; the first non-None result wins,
+    as with ADK's own callback lists.
+    """
+    previous = existing if isinstance(existing, list) else [existing] if existing else []
+
+    def chained(*args, **kwargs):
+        for earlier in previous:
+            result = earlier(*args, **kwargs)
+            if result is not None:
+                return result
+        return callback(*args, **kwargs)
+
+    return chained
+
+
+# The AgentTool call span a sub-agent is running under. The sub-agent runs inside the tool call's
+# context, so concurrent sessions delegating to the same sub-agent each see their own span.
+_delegating_span: ContextVar[Optional[Span]] = ContextVar("delegating_span", default=None)
+
+
+class TracingCallbacks:
+    """
+    Records agent turns, model calls and tool calls of an agent tree as nested spans on `tracer`.
+    A sub-agent's turn is nested under the AgentTool call that delegated to it.
+    """
+
+    def __init__(self, tracer: Tracer):
+        self.tracer = tracer
+        self._agent_spans: Dict[Tuple[str, str], Span] = {}
+        self._model_spans: Dict[Tuple[str, str], Span] = {}
+        self._tool_spans: Dict[str, Span] = {}
+
+    def attach(self, agent) -> None:
+        agent.before_agent_callback = chain_callback(agent.before_agent_callback, self.before_agent)
+        agent.after_agent_callback = chain_callback(agent.after_agent_callback, self.after_agent)
+        agent.before_model_callback = chain_callback(agent.before_model_callback, self.before_model)
+        agent.after_model_callback = chain_callback(agent.after_model_callback, self.after_model)
+        agent.before_tool_callback = chain_callback(agent.before_tool_callback, self.before_tool)
+        agent.after_tool_callback = chain_callback(agent.after_tool_callback, self.after_tool)
+        for tool in agent.tools:
+            if isinstance(tool, AgentTool):
+                self.attach(tool.agent)
+
+    @staticmethod
+    def _key(context) -> Tuple[str, str]:
+        return context.invocation_id, context.agent_name
+
+    def before_agent(self, callback_context) -> None:
+        parent = _delegating_span.get()
+        # Consumed here, so agent turns started later in this context are not nested under the same call.
+        _delegating_span.set(None)
+        self._agent_spans[self._key(callback_context)] = self.tracer.start_span(callback_context.agent_name, "agent", parent)
+        return None
+
+    def after_agent(self, callback_context) -> None:
+        key = self._key(callback_context)
+        model_span = self._model_spans.pop(key, None)
+        if model_span is not None:
+            # The model call raised, so after_model never ran for it.
+            self.tracer.end_span(model_span, error=True)
+        span = self._agent_spans.pop(key, None)
+        if span is not None:
+            self.tracer.end_span(span)
+        return None
+
+    def before_model(self, callback_context, llm_request) -> None:
+        key = self._key(callback_context)
+        self._model_spans[key] = self.tracer.start_span(callback_context.agent_name, "model", self._agent_spans.get(key))
+        return None
+
+    def after_model(self, callback_context, llm_response) -> None:
+        span = self._model_spans.pop(self._key(callback_context), None)
+        if span is not None:
+            usage = getattr(llm_response, "usage_metadata", None)
+            self.tracer.end_span(span, tokens=getattr(usage, "total_token_count", None) if usage else None)
+        return None
+
+    def before_tool(self, tool, args, tool_context) -> Optional[Dict]:
+        span = self.tracer.start_span(tool.name, "tool", self._agent_spans.get(self._key(tool_context)))
+        self._tool_spans[tool_context.function_call_id] = span
+        if isinstance(tool, AgentTool):
+            _delegating_span.set(span)
+        return None
+
+    def after_tool(self, tool, args, tool_context, tool_response) -> Optional[Dict]:
+        if isinstance(tool, AgentTool):
+            _delegating_span.set(None)
+        span = self._tool_spans.pop(tool_context.function_call_id, None)
+        if span is not None:
+            status = tool_response.get("status") if isinstance(tool_response, dict) else None
+            self.tracer.end_span(span, status=status)
+        return None
+
+
+class ContextWindowCallbacks:
+    """
+    Applies a ContextWindow to every model call of the agents it is attached to and logs each
+    turn's prompt size; the prompt token count the model reports is added to the turn afterwards.
+    """
+
+    def __init__(self, window: ContextWindow):
+        self.window = window
+        self._turns: Dict[Tuple[str, str], Dict[str, Any]] = {}
+
+    def attach(self, agent) -> None:
+        agent.before_model_callback = chain_callback(agent.before_model_callback, self.before_model)
+        agent.after_model_callback = chain_callback(agent.after_model_callback, self.after_model)
+
+    def before_model(self, callback_context, llm_request) -> None:
+        turn = self.window.apply(llm_request, callback_context.agent_name)
+        self._turns[TracingCallbacks._key(callback_context)] = turn
+        logger.info(
+            f"{turn['agent']} turn: {turn['contents_before']} -> {turn['contents_after']} contents "
+            f"({turn['collapsed_contents']} collapsed), ~{turn['estimated_tokens_before']} -> "
+            f"~{turn['estimated_tokens_after']} prompt tokens"
+        )
+        return None
+
+    def after_model(self, callback_context, llm_response) -> None:
+        turn = self._turns.pop(TracingCallbacks._key(callback_context), None)
+        usage = getattr(llm_response, "usage_metadata", None)
+        if turn is not None and usage is not None and usage.prompt_token_count is not None:
+            turn["prompt_tokens"] = usage.prompt_token_count
+            logger.info(f"{turn['agent']} turn used {usage.prompt_token_count} prompt tokens.")
+        return None
+
+
+# Shared by the Coordinator, Gatherer and Crafter agents, which attach it when settings.context_window_enabled.
+context_window_callbacks = ContextWindowCallbacks(ContextWindow(max_contents=settings.context_window_max_contents))
+
+
+__all__ = [
+    "chain_callback",
+    "TracingCallbacks",
+    "ContextWindowCallbacks",
+    "context_window_callbacks",
+]
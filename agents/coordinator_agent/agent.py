@@ -1,19 +1,26 @@
+from typing import Optional, Union
+
 from google.adk.agents import LlmAgent
+from google.adk.models import BaseLlm
 from google.adk.tools.agent_tool import AgentTool
-from .prompts import COORDINATOR_AGENT_INSTRUCTION_PICKAXE_MVP
+from .prompts import COORDINATOR_AGENT_INSTRUCTION
 from agents.gatherer_agent import GathererAgent
 from agents.crafter_agent import CrafterAgent
+from tools.planning_tools import plan_crafting_goal_tool
+from tools.plan_execution_tools import execute_crafting_plan_tool
+from agents.callbacks import context_window_callbacks
 from config import settings
+from src.llm.response_cache import cached_model
 
 class CoordinatorAgent(LlmAgent):
     """
     A coordinator agent that manages sub-agents (Gatherer, Crafter)
     to achieve complex goals like crafting a wooden pickaxe.
     """
-    def __init__(self):
+    def __init__(self, model: Optional[Union[str, BaseLlm]] = None):
         # Instantiate sub-agents
-        gatherer_instance = GathererAgent()
-        crafter_instance = CrafterAgent()
+        gatherer_instance = GathererAgent(model=model)
+        crafter_instance = CrafterAgent(model=model)
 
         # Wrap them as AgentTools
         gatherer_tool = AgentTool(
@@ -24,16 +31,20 @@ class CoordinatorAgent(LlmAgent):
         )
 
         super().__init__(
-            model=settings.gemini_model_name,
+            model=cached_model(model or settings.gemini_model_name, settings),
             name="CoordinatorAgent",
             description="Coordinates Gatherer and Crafter agents to achieve high-level goals.",
-            instruction=COORDINATOR_AGENT_INSTRUCTION_PICKAXE_MVP,
+            instruction=COORDINATOR_AGENT_INSTRUCTION,
             tools=[
+                plan_crafting_goal_tool,
+                execute_crafting_plan_tool,
                 gatherer_tool,
                 crafter_tool
             ],
             output_key="coordinator_status" # Or a more descriptive key like "pickaxe_crafting_status"
         )
+        if settings.context_window_enabled:
+            context_window_callbacks.attach(self)
 
 # Example for easy import:
 # from agents.coordinator_agent import coordinator_agent_instance
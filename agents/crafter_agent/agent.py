@@ -1,32 +1,44 @@
+from typing import Optional, Union
+
 from google.adk.agents import LlmAgent
+from google.adk.models import BaseLlm
 # from google.adk.tools import google_search
 from .prompts import CRAFTER_AGENT_INSTRUCTION
 from tools.mineflayer_bridge_tools import (
     craft_target_item_tool,
+    craft_chain_tool,
     view_bot_inventory_tool,
     memorize_recipe_tool
 )
+from tools.recipe_tools import lookup_recipe_tool, find_recipes_using_tool
+from agents.callbacks import context_window_callbacks
 from config import settings
+from src.llm.response_cache import cached_model
 
 class CrafterAgent(LlmAgent):
     """
     An agent responsible for crafting items in Minecraft, using known recipes
     or searching for them online if necessary. It can also memorize new recipes.
     """
-    def __init__(self):
+    def __init__(self, model: Optional[Union[str, BaseLlm]] = None):
         super().__init__(
-            model=settings.gemini_model_name,
+            model=cached_model(model or settings.gemini_model_name, settings),
             name="CrafterAgent",
-            description="Crafts items in Minecraft. Can search for and memorize recipes.",
+            description="Crafts items in Minecraft. Can look up and memorize recipes.",
             instruction=CRAFTER_AGENT_INSTRUCTION,
             tools=[
                 craft_target_item_tool,
+                craft_chain_tool,
                 view_bot_inventory_tool,
+                lookup_recipe_tool,
+                find_recipes_using_tool,
                 # google_search, # Raising "Tool use with function calling is unsupported" error with status code 400
                 memorize_recipe_tool
             ],
             output_key="crafter_status"
         )
+        if settings.context_window_enabled:
+            context_window_callbacks.attach(self)
 
 # Example for easy import if needed:
 # from agents.crafter_agent import crafter_agent_instance
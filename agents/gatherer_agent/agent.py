@@ -1,34 +1,53 @@
+from typing import Optional, Union
+
 from google.adk.agents import LlmAgent
+from google.adk.models import BaseLlm
 from .prompts import GATHERER_AGENT_INSTRUCTION
 from tools.mineflayer_bridge_tools import (
     find_nearest_block_tool,
+    survey_resources_tool,
+    scan_blocks_tool,
     move_to_xyz_tool,
+    get_navigation_progress_tool,
+    cancel_navigation_tool,
+    cancel_operation_tool,
     mine_target_block_tool,
     view_bot_inventory_tool,
     place_item_block_tool
 )
+from tools.collection_tools import collect_blocks_tool
+from agents.callbacks import context_window_callbacks
 from config import settings
+from src.llm.response_cache import cached_model
 
 class GathererAgent(LlmAgent):
     """
     An agent responsible for gathering specified resources in the Minecraft world
     using Mineflayer tools. It can also place blocks.
     """
-    def __init__(self):
+    def __init__(self, model: Optional[Union[str, BaseLlm]] = None):
         super().__init__(
-            model=settings.gemini_model_name,
+            model=cached_model(model or settings.gemini_model_name, settings),
             name="GathererAgent",
             description="Collects resources like wood, stone, etc., and can mine and place blocks in Minecraft.",
             instruction=GATHERER_AGENT_INSTRUCTION,
             tools=[
+                collect_blocks_tool,
                 find_nearest_block_tool,
+                survey_resources_tool,
+                scan_blocks_tool,
                 move_to_xyz_tool,
+                get_navigation_progress_tool,
+                cancel_navigation_tool,
+                cancel_operation_tool,
                 mine_target_block_tool,
                 view_bot_inventory_tool,
                 place_item_block_tool
             ],
             output_key="gatherer_status"
         )
+        if settings.context_window_enabled:
+            context_window_callbacks.attach(self)
 
 # To make the agent easily importable, for example:
 # from agents.gatherer_agent import gatherer_agent_instance
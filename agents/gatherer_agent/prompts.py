@@ -4,11 +4,20 @@ Your primary goal is to collect a specified quantity of a target item. You can a
 
 **Resource Collection Task (e.g., "Collect N X"):**
 1.  **Parse the Task**: Identify the quantity (N) and the item name (X) to collect.
+    *   **Preferred**: Use `collect_blocks_tool` with `block_type` X and `quantity` N. It finds, walks to and mines all N blocks in a single long-running operation.
+        It first returns a "pending" status; wait for the final result, which reports `quantity_collected`. If it collected all N, report success.
+        If it reports an error with fewer than N collected, you may fall back to the step-by-step procedure below for the remainder.
+    *   Any long-running operation that is no longer needed can be stopped with `cancel_operation_tool` and its `operationId`; it then completes with status "cancelled".
+        An operation that gets no result in time completes with an error saying it timed out.
 2.  **Locate Resource**: Use the `find_nearest_block_tool` to find the nearest block of type X.
     *   If the block is found, its location will be returned.
     *   If not found, report failure to find the resource.
+    *   When you need several block types (e.g. oak_log and stone) or also the inventory, use `survey_resources_tool` with all of them instead of several separate calls.
+    *   To choose where to harvest, use `scan_blocks_tool` with the block types and a radius: it counts every matching block and lists the nearest clusters (trees, ore veins) with their size, so you do not have to locate blocks one by one.
 3.  **Navigate to Resource**: If the resource is found, use the `move_to_xyz_tool` with the coordinates from the `find_nearest_block_tool` to move to the resource.
-    *   Assume navigation is successful if the tool doesn't report an error.
+    *   Navigation is long-running: the tool first returns a "pending" status with an `operationId`. Wait for the final "success" or "error" status before mining.
+    *   While waiting, you may use `get_navigation_progress_tool` with the `operationId` to see the remaining distance, replans and ETA.
+    *   Starting a new navigation preempts the current one. Use `cancel_navigation_tool` to stop a walk that is no longer needed.
 4.  **Mine Resource**: Once at the location (or if already there), use the `mine_target_block_tool` to mine the block of type X at its specific coordinates.
     *   The tool should confirm if mining was successful and what item was collected.
 5.  **Track Collection**: Keep an internal count of how many items of type X you have successfully collected based on the `mine_target_block_tool`'s output.
@@ -33,8 +42,14 @@ Your primary goal is to collect a specified quantity of a target item. You can a
 5.  **Report Outcome for Placement**: Report success or failure. If the `place_item_block_tool` is successful, it will return a `placed_location` field in its result (e.g., `{"status": "success", ..., "placed_location": {"x": 10, "y": 64, "z": 20}}`). You **MUST** include this `placed_location` in your final success message or observation. For example: "Successfully placed crafting_table at x:10, y:64, z:20." This allows the Coordinator to save this location to `session.state['placed_crafting_table_location']`.
 
 Tool Naming:
+- To collect N blocks in one operation: `collect_blocks_tool` (takes `block_type` string, `quantity` integer, long-running)
 - To find a block: `find_nearest_block_tool` (takes `block_type` string)
-- To move: `move_to_xyz_tool` (takes `x`, `y`, `z` integers)
+- To find several block types and view the inventory at once: `survey_resources_tool` (takes `block_types` list of strings)
+- To scan all blocks of several types and their clusters: `scan_blocks_tool` (takes `block_types` list of strings, `radius` integer)
+- To move: `move_to_xyz_tool` (takes `x`, `y`, `z` integers, long-running)
+- To check navigation progress: `get_navigation_progress_tool` (takes `operation_id` string)
+- To cancel navigation: `cancel_navigation_tool` (takes no arguments)
+- To cancel any long-running operation: `cancel_operation_tool` (takes `operation_id` string)
 - To mine: `mine_target_block_tool` (takes `block_type` string, `x`, `y`, `z` integers)
 - To view inventory: `view_bot_inventory_tool` (takes no arguments)
 - To place a block: `place_item_block_tool` (takes `item_name`, `ref_block_x`, `ref_block_y`, `ref_block_z`, `face_vector_x`, `face_vector_y`, `face_vector_z`)
@@ -0,0 +1,266 @@
+"""
+End-to-end benchmark of the pickaxe pipeline (Coordinator -> Gatherer/Crafter) on the simulated
+backend with a scripted model, so runs are deterministic and need no server or API key.
+
+    python -m benchmarks.pickaxe_benchmark --runs 5 --output benchmarks/results/latest.json
+    python -m benchmarks.pickaxe_benchmark --runs 5 --baseline benchmarks/results/baseline.json
+    python -m benchmarks.pickaxe_benchmark --runs 5 --coordinator-policy delegate
+
+Each run executes in a fresh subprocess (clean bridge globals, per-run peak RSS). The report is
+JSON; with `--baseline` the run fails (exit code 1) if a tracked metric regressed beyond the tolerance.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+from typing import Optional, Dict, List, Any
+
+DEFAULT_GOAL = "craft 1 wooden_pickaxe"
+DEFAULT_QUERY = "Craft one wooden pickaxe for me."
+# Metrics compared against the baseline; all of them are "lower is better".
+COMPARED_METRICS = [
+    "wall_clock_s.p50",
+    "llm_calls.mean",
+    "bridge_round_trips.mean",
+    "peak_rss_mb.max",
+]
+
+
+def percentiles(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {}
+    ordered = sorted(values)
+
+    def at(fraction: float) -> float:
+        index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+        return round(ordered[index], 6)
+
+    return {
+        "count": len(ordered),
+        "mean": round(sum(ordered) / len(ordered), 6),
+        "p50": at(0.5),
+        "p90": at(0.9),
+        "p99": at(0.99),
+        "max": round(ordered[-1], 6),
+    }
+
+
+class ToolLatencyRecorder:
+    """Times every tool call of an agent tree through before/after tool callbacks."""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = {}
+        self._started: Dict[str, float] = {}
+
+    def before_tool(self, tool, args, tool_context) -> Optional[Dict]:
+        self._started[tool_context.function_call_id] = time.perf_counter()
+        return None
+
+    def after_tool(self, tool, args, tool_context, tool_response) -> Optional[Dict]:
+        started = self._started.pop(tool_context.function_call_id, None)
+        if started is not None:
+            self.latencies.setdefault(tool.name, []).append(time.perf_counter() - started)
+        return None
+
+    def attach(self, agent) -> None:
+        from google.adk.tools.agent_tool import AgentTool
+
+        agent.before_tool_callback = self.before_tool
+        agent.after_tool_callback = self.after_tool
+        for tool in agent.tools:
+            if isinstance(tool, AgentTool):
+                self.attach(tool.agent)
+
+
+async def _single_run(goal: str, query: str, fleet_size: int, coordinator_policy: str) -> Dict[str, Any]:
+    import main
+    from agents.callbacks import context_window_callbacks
+    from agents.coordinator_agent import CoordinatorAgent
+    from benchmarks.scripted_agents import build_scripted_llm
+    from tools import mineflayer_bridge_tools
+    from tools.fleet import fleet
+    from tools.tracing import tracer
+
+    model = build_scripted_llm(goal, coordinator_policy)
+    recorder = ToolLatencyRecorder()
+    coordinator = CoordinatorAgent(model=model)
+    recorder.attach(coordinator)
+
+    started = time.perf_counter()
+    summary = await main.run_pickaxe_crafting_task(
+        model=model, goal=goal, goal_query_text=query, fleet_size=fleet_size, coordinator_agent=coordinator
+    )
+    wall_clock = time.perf_counter() - started
+
+    bridges = [bot.bridge for bot in fleet.bots] or [mineflayer_bridge_tools.mineflayer_bridge]
+    operation_latencies: Dict[str, List[float]] = {}
+    for bridge in bridges:
+        if bridge is None:
+            continue
+        for name, values in bridge.operation_latencies.items():
+            operation_latencies.setdefault(name, []).extend(values)
+
+    return {
+        "success": summary["success"],
+        "final_response": summary["final_response"],
+        "macro_replayed": summary.get("macro_replayed", False),
+        "wall_clock_s": wall_clock,
+        "llm_calls": model.total_calls,
+        "llm_calls_by_agent": model.call_counts,
+        "bridge_round_trips": sum(bridge.round_trips for bridge in bridges if bridge is not None),
+        "tool_latencies_s": recorder.latencies,
+        "operation_latencies_s": operation_latencies,
+        # Per agent: turns and estimated prompt tokens before and after context windowing.
+        "context_window": context_window_callbacks.window.summary(),
+        # Navigations observed by the travel time model: learned speed, routes, trips and failures.
+        "travel_times": mineflayer_bridge_tools.travel_times.summary(),
+        # Total seconds per traced span kind ("model.CoordinatorAgent", "tool.x") and per operation phase ("operation.execute").
+        "time_breakdown_s": {key: round(histogram.total, 4) for key, histogram in tracer.histograms.items() if key.count(".") == 1},
+        # ru_maxrss is in kilobytes on Linux.
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def run_in_subprocess(args: argparse.Namespace) -> Dict[str, Any]:
+    command = [
+        sys.executable, "-m", "benchmarks.pickaxe_benchmark", "--single-run",
+        "--goal", args.goal, "--query", args.query,
+        "--fleet-size", str(args.fleet_size), "--time-scale", str(args.time_scale),
+        "--coordinator-policy", args.coordinator_policy,
+    ]
+    env = {
+        **os.environ,
+        "MINEFLAYER_BACKEND": "simulated",
+        "SIM_TIME_SCALE": str(args.time_scale),
+        "LLM_CACHE_MODE": args.llm_cache_mode,
+        "PLAN_MACROS_ENABLED": str(args.plan_macros).lower(),
+        "BRIDGE_TRANSPORT": args.bridge_transport,
+        # Every run starts from a fresh session, as a cold start.
+        "SESSION_BACKEND": "memory",
+    }
+    completed = subprocess.run(command, capture_output=True, text=True, env=env, cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    if completed.returncode != 0:
+        raise RuntimeError(f"Benchmark run failed:\n{completed.stderr[-4000:]}")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def build_report(runs: List[Dict[str, Any]], args: argparse.Namespace) -> Dict[str, Any]:
+    def merged(key: str) -> Dict[str, Dict[str, float]]:
+        values: Dict[str, List[float]] = {}
+        for run in runs:
+            for name, samples in run[key].items():
+                values.setdefault(name, []).extend(samples)
+        return {name: percentiles(samples) for name, samples in sorted(values.items())}
+
+    return {
+        "benchmark": "pickaxe_pipeline",
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "environment": {"python": platform.python_version(), "platform": platform.platform()},
+        "parameters": {
+            "goal": args.goal,
+            "runs": args.runs,
+            "fleet_size": args.fleet_size,
+            "coordinator_policy": args.coordinator_policy,
+            "time_scale": args.time_scale,
+            "llm_cache_mode": args.llm_cache_mode,
+            "plan_macros": args.plan_macros,
+            "bridge_transport": args.bridge_transport,
+        },
+        "success_rate": sum(1 for run in runs if run["success"]) / len(runs),
+        "wall_clock_s": percentiles([run["wall_clock_s"] for run in runs]),
+        "llm_calls": percentiles([run["llm_calls"] for run in runs]),
+        "bridge_round_trips": percentiles([run["bridge_round_trips"] for run in runs]),
+        "peak_rss_mb": percentiles([run["peak_rss_mb"] for run in runs]),
+        "tool_latency_s": merged("tool_latencies_s"),
+        "operation_latency_s": merged("operation_latencies_s"),
+        "runs": [{key: value for key, value in run.items() if not key.endswith("latencies_s")} for run in runs],
+    }
+
+
+def _metric(report: Dict[str, Any], path: str) -> Optional[float]:
+    value: Any = report
+    for key in path.split("."):
+        if not isinstance(value, dict) or key not in value:
+            return None
+        value = value[key]
+    return value
+
+
+def compare_to_baseline(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[Dict[str, Any]]:
+    """
+    Compares the tracked metrics; a metric regresses if it exceeds the baseline by more than `tolerance`
+    (a fraction). A drop in success rate is always a regression.
+    """
+    comparison = []
+    for path in COMPARED_METRICS:
+        current, previous = _metric(report, path), _metric(baseline, path)
+        if current is None or previous is None:
+            continue
+        change = (current - previous) / previous if previous else 0.0
+        comparison.append({
+            "metric": path,
+            "baseline": previous,
+            "current": current,
+            "change": round(change, 4),
+            "regressed": change > tolerance,
+        })
+    if report["success_rate"] < baseline.get("success_rate", 0):
+        comparison.append({"metric": "success_rate", "baseline": baseline["success_rate"], "current": report["success_rate"], "regressed": True})
+    return comparison
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the pickaxe pipeline on the simulated backend.")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--goal", default=DEFAULT_GOAL)
+    parser.add_argument("--query", default=DEFAULT_QUERY)
+    parser.add_argument("--fleet-size", type=int, default=1)
+    parser.add_argument("--time-scale", type=float, default=0.05, help="Scale of simulated latencies (0 = instant).")
+    parser.add_argument("--llm-cache-mode", choices=["record", "replay", "bypass"], default="bypass",
+                        help="Model response cache mode; 'replay' runs from a previously recorded cache only.")
+    parser.add_argument("--plan-macros", action="store_true",
+                        help="Record the first successful run as a plan macro and replay it in later runs.")
+    parser.add_argument("--bridge-transport", choices=["jspybridge", "batch"], default="jspybridge",
+                        help="Bridge transport: one call per round trip, or batched frames over a socket.")
+    parser.add_argument("--coordinator-policy", choices=["plan-executor", "delegate"], default="plan-executor",
+                        help="Scripted coordinator: hand the plan to execute_crafting_plan, or delegate every step to the sub-agents.")
+    parser.add_argument("--output", default=os.path.join("benchmarks", "results", "latest.json"))
+    parser.add_argument("--baseline", help="Report to compare against; exits with 1 on regression.")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Allowed relative increase per metric.")
+    parser.add_argument("--single-run", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.single_run:
+        # Keep stdout for the JSON result; the pipeline logs to stderr and logs/app.log.
+        logging.getLogger("MinecraftCrafterGathererGuild").setLevel(logging.WARNING)
+        result = asyncio.run(_single_run(args.goal, args.query, args.fleet_size, args.coordinator_policy))
+        print(json.dumps(result))
+        return 0
+
+    runs = [run_in_subprocess(args) for _ in range(args.runs)]
+    report = build_report(runs, args)
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as baseline_file:
+            report["comparison"] = compare_to_baseline(report, json.load(baseline_file), args.tolerance)
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as output_file:
+        json.dump(report, output_file, indent=2)
+
+    print(f"success rate {report['success_rate']:.0%}, wall clock p50 {report['wall_clock_s']['p50']:.2f}s, "
+          f"{report['llm_calls']['mean']:.1f} LLM calls, {report['bridge_round_trips']['mean']:.1f} bridge round trips, "
+          f"peak RSS {report['peak_rss_mb']['max']:.0f} MB -> {args.output}")
+    regressions = [entry for entry in report.get("comparison", []) if entry["regressed"]]
+    for entry in regressions:
+        print(f"REGRESSION {entry['metric']}: {entry['baseline']} -> {entry['current']}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
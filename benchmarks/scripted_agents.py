@@ -0,0 +1,147 @@
+import json
+import re
+from typing import Optional, Dict, List, Any
+
+from google.adk.models import LlmRequest, LlmResponse
+
+from src.llm.scripted_llm import (
+    ScriptedLlm,
+    function_call_response,
+    text_response,
+    first_user_text,
+    last_function_response,
+    response_payload,
+)
+
+FINAL_STATUSES = {"success", "error", "cancelled"}
+SUB_AGENTS = {"GathererAgent", "CrafterAgent"}
+EXECUTE_PLAN_TOOL = "execute_crafting_plan"
+
+_TASK_RESULT_PATTERN = re.compile(r"^\[(\w+) result\] (\{.*\})\s*$", re.DOTALL)
+_COLLECT_PATTERN = re.compile(r"collect (\d+) ([a-z0-9_]+)")
+_CRAFT_PATTERN = re.compile(r"craft (\d+) ([a-z0-9_]+)")
+_PLACE_PATTERN = re.compile(r"place (\d+) ([a-z0-9_]+)")
+
+
+def coordinator_policy(goal: str, mode: str = "plan-executor"):
+    """
+    Plays the coordinator the way the prompt asks: compile the plan and hand it to `execute_crafting_plan`.
+    If the execution fails, re-plan once and delegate the new steps' tasks in order, waiting on pending
+    results, and report once every step has succeeded.
+    In "delegate" mode every step of the first plan is delegated to the sub-agents instead, which
+    exercises the agent-to-agent path the plan executor skips.
+    """
+    def policy(llm_request: LlmRequest) -> LlmResponse:
+        steps: Optional[List[Dict[str, Any]]] = None
+        plan_count = 0
+        execution: Optional[Dict[str, Any]] = None
+        outcomes: List[str] = []
+        # A resumed session carries earlier runs; only the turns since the latest goal message count.
+        goal_index = max(
+            (index for index, content in enumerate(llm_request.contents)
+             if content.role == "user" and any(part.text and not _TASK_RESULT_PATTERN.match(part.text.strip()) for part in content.parts or [])),
+            default=0,
+        )
+        for content in llm_request.contents[goal_index:]:
+            for part in content.parts or []:
+                function_response = part.function_response
+                if function_response is not None and function_response.name == "plan_crafting_goal":
+                    steps = response_payload(function_response).get("steps")
+                    plan_count += 1
+                    execution = None
+                    outcomes = []
+                elif function_response is not None and function_response.name == EXECUTE_PLAN_TOOL:
+                    execution = response_payload(function_response)
+                elif function_response is not None and function_response.name in SUB_AGENTS and steps is not None:
+                    status = response_payload(function_response).get("status")
+                    if status in FINAL_STATUSES:
+                        outcomes.append(status)
+                elif part.text and content.role == "user" and steps is not None:
+                    match = _TASK_RESULT_PATTERN.match(part.text.strip())
+                    if match:
+                        outcomes.append(json.loads(match.group(2)).get("status"))
+
+        if steps is None:
+            return function_call_response("plan_crafting_goal", {"goal": goal})
+        if plan_count == 1 and mode != "delegate":
+            if execution is None:
+                return function_call_response(EXECUTE_PLAN_TOOL, {"goal": goal})
+            if execution.get("status") == "pending":
+                return text_response("")
+            if execution.get("status") == "success":
+                return text_response(f"Successfully crafted {goal.split(' ', 1)[-1]}.")
+            return function_call_response("plan_crafting_goal", {"goal": goal})
+
+        if outcomes and outcomes[-1] != "success":
+            return text_response(f"Failed at step {len(outcomes)} of {len(steps)}: {steps[len(outcomes) - 1]['task']}.")
+        if len(outcomes) >= len(steps):
+            return text_response(f"Successfully crafted {goal.split(' ', 1)[-1]}.")
+
+        last = last_function_response(llm_request)
+        if last is not None and last.name in SUB_AGENTS and response_payload(last).get("status") not in FINAL_STATUSES:
+            return text_response("")
+
+        step = steps[len(outcomes)]
+        if step["action"] == "craft":
+            task = step["task"] + (" (requires a crafting table)" if step.get("crafting_table_needed") else "")
+            return function_call_response("CrafterAgent", {"request": task})
+        return function_call_response("GathererAgent", {"request": step["task"]})
+
+    return policy
+
+
+def gatherer_policy(llm_request: LlmRequest) -> LlmResponse:
+    """
+    Collects with one `collect_blocks` call; places on top of the nearest ground block.
+    Replies with the tool result as JSON, so the coordinator sees pending and final statuses.
+    """
+    last = last_function_response(llm_request)
+    if last is not None:
+        payload = response_payload(last)
+        if last.name == "find_nearest_block_via_js" and payload.get("status") == "success":
+            location = payload["location"]
+            item_name = _PLACE_PATTERN.search(first_user_text(llm_request)).group(2)
+            return function_call_response("place_item_block_via_js_long_running", {
+                "item_name": item_name,
+                "ref_block_x": location["x"], "ref_block_y": location["y"], "ref_block_z": location["z"],
+                "face_vector_x": 0, "face_vector_y": 1, "face_vector_z": 0,
+            })
+        return text_response(json.dumps(payload))
+
+    task = first_user_text(llm_request)
+    collect = _COLLECT_PATTERN.search(task)
+    if collect:
+        return function_call_response("collect_blocks_via_js_long_running", {
+            "block_type": collect.group(2), "quantity": int(collect.group(1)),
+        })
+    if _PLACE_PATTERN.search(task):
+        return function_call_response("find_nearest_block_via_js", {"block_type": "grass_block"})
+    return text_response(json.dumps({"status": "error", "message": f"Unsupported task: {task}"}))
+
+
+def crafter_policy(llm_request: LlmRequest) -> LlmResponse:
+    """Issues one craft call for the requested item and replies with the tool result as JSON."""
+    last = last_function_response(llm_request)
+    if last is not None:
+        return text_response(json.dumps(response_payload(last)))
+
+    task = first_user_text(llm_request)
+    craft = _CRAFT_PATTERN.search(task)
+    if not craft:
+        return text_response(json.dumps({"status": "error", "message": f"Unsupported task: {task}"}))
+    return function_call_response("craft_target_item_via_js_long_running", {
+        "item_name": craft.group(2),
+        "quantity": int(craft.group(1)),
+        "recipe_shape": None,
+        "ingredients": None,
+        "crafting_table_needed": "crafting table" in task,
+    })
+
+
+def build_scripted_llm(goal: str, coordinator_mode: str = "plan-executor") -> ScriptedLlm:
+    """A scripted model serving the Coordinator, Gatherer and Crafter agents for `goal`."""
+    return ScriptedLlm(policies={
+        "CoordinatorAgent": coordinator_policy(goal, coordinator_mode),
+        "GathererAgent": gatherer_policy,
+        "CrafterAgent": crafter_policy,
+    })
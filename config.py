@@ -1,7 +1,8 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import field_validator
-from typing import Optional, Tuple, Any
+from typing import Optional, Tuple, Any, List, Literal
 import ast
+import os
 
 class Settings(BaseSettings):
     google_api_key: str = "YOUR_GEMINI_API_KEY_DEFAULT_IF_NOT_IN_ENV"
@@ -12,6 +13,87 @@ class Settings(BaseSettings):
     minecraft_version: str = "1.21"
     gemini_model_name: str = "gemini-2.5-flash-preview-04-17"
     initial_teleport_coords: Optional[Tuple[int, int, int]] = None
+    bridge_max_workers: int = 8
+    bridge_call_timeout_s: float = 30.0
+    # "batch" sends bridge calls as batched JSON-lines frames over a local socket (one round trip for the
+    # calls of a loop iteration) and receives events on it; "jspybridge" makes one JSPyBridge call per function.
+    bridge_transport: Literal["jspybridge", "batch"] = "jspybridge"
+    bridge_socket_dir: Optional[str] = None
+    # Socket of a bot daemon (`python -m tools.bot_daemon`) holding the logged-in bot; runs attach to it instead
+    # of starting their own bot, and fall back to that if no daemon listens there.
+    bot_daemon_socket: Optional[str] = None
+    pending_operations_timeout_s: float = 600.0
+    # Long-running JS operations without a result after this long are completed with an error by the sweeper.
+    operation_timeout_s: float = 300.0
+    operation_sweep_interval_s: float = 1.0
+    tracked_block_types: List[str] = [
+        "oak_log", "birch_log", "spruce_log", "stone", "coal_ore", "iron_ore", "crafting_table", "furnace"
+    ]
+    block_index_max_chunks: int = 1024
+    block_index_keep_radius_chunks: int = 8
+    # Full block-id snapshots of every loaded chunk, kept in a memory-mapped store in chunk_store_dir
+    # and updated on chunk loads and block changes. Untracked block types are then searched there.
+    chunk_store_enabled: bool = False
+    chunk_store_dir: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache", "chunks")
+    fleet_size: int = 1
+    fleet_min_gather_share: int = 2
+    # Job server (`python job_server.py`): every job runs in its own session with its own bot; at most
+    # job_max_concurrent run at once, up to job_max_queued wait, and the last job_max_finished are kept for polling.
+    job_server_host: str = "127.0.0.1"
+    job_server_port: int = 8765
+    job_max_concurrent: int = 4
+    job_max_queued: int = 32
+    job_max_finished: int = 256
+    job_timeout_s: float = 900.0
+    # "javascript" drives real bots through mineflayer_interface.js; "simulated" runs the in-process simulator.
+    mineflayer_backend: Literal["javascript", "simulated"] = "javascript"
+    sim_world_file: Optional[str] = None
+    sim_world_seed: int = 0
+    sim_world_radius: int = 48
+    sim_tree_count: int = 40
+    sim_walk_speed: float = 4.3
+    sim_dig_seconds: float = 0.5
+    sim_craft_seconds: float = 0.25
+    sim_place_seconds: float = 0.25
+    sim_time_scale: float = 1.0
+    # "record" serves cached model responses and stores misses, "replay" only serves cached ones, "bypass" disables the cache.
+    llm_cache_mode: Literal["record", "replay", "bypass"] = "bypass"
+    llm_cache_dir: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache", "llm")
+    llm_cache_max_bytes: int = 64 * 1024 * 1024
+    llm_cache_history_window: int = 12
+    # Tool responses in model requests are projected down to the fields agents act on, and turns older
+    # than the last context_window_max_contents contents are collapsed into a summary (0 keeps them all).
+    context_window_enabled: bool = True
+    context_window_max_contents: int = 16
+    # Successful coordinator runs are recorded as plan macros and replayed directly for later goals with the same plan.
+    plan_macros_enabled: bool = False
+    plan_macro_dir: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache", "macros")
+    # Recipe index for minecraft_version built by `python -m tools.build_recipe_index`; defaults to
+    # cache/recipes/recipes-<minecraft_version>.idx. Planning falls back to the built-in recipes without it.
+    recipe_index_path: Optional[str] = None
+    log_level: str = "INFO"
+    # Log files rotate at log_max_bytes, or on a schedule if log_rotate_when is set (e.g. "midnight", "H").
+    log_max_bytes: int = 10 * 1024 * 1024
+    log_backup_count: int = 5
+    log_rotate_when: Optional[str] = None
+    log_json_lines: bool = False
+    # Longer messages are truncated; event and state dumps are kept at log_payload_sample_rate (0..1).
+    log_max_message_chars: int = 4000
+    log_payload_sample_rate: float = 1.0
+    # "sqlite" keeps sessions (state and event history) in session_db_path across restarts; "memory" forgets them.
+    session_backend: Literal["memory", "sqlite"] = "sqlite"
+    session_db_path: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache", "sessions.sqlite3")
+    # Spans and latency histograms of agent turns, model calls, tool calls and operations; written per run to metrics_dir.
+    tracing_enabled: bool = True
+    metrics_dir: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), "logs", "metrics")
+    # Serves the live histograms on http://127.0.0.1:<port>/metrics when set.
+    metrics_port: Optional[int] = None
+
+    @property
+    def resolved_recipe_index_path(self) -> str:
+        return self.recipe_index_path or os.path.join(
+            os.path.dirname(os.path.abspath(__file__)), "cache", "recipes", f"recipes-{self.minecraft_version}.idx"
+        )
 
     @field_validator("initial_teleport_coords", mode="before")
     @classmethod
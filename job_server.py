@@ -0,0 +1,509 @@
+"""
+Long-lived job server: keeps the bridge, the bots, the runner and the model client warm and runs
+submitted goals concurrently, each as a job with its own ADK session and its own bot.
+
+    python job_server.py --host 127.0.0.1 --port 8765
+
+HTTP API (JSON bodies and responses):
+
+    POST   /jobs              {"goal": "craft 1 wooden_pickaxe", "query": optional message to the coordinator}
+    GET    /jobs              all retained jobs
+    GET    /jobs/{id}         status, final response and success of one job
+    GET    /jobs/{id}/events  the job's events as newline-delimited JSON, streamed until it finishes (?after=<seq>)
+    DELETE /jobs/{id}         cancels a queued or running job
+    GET    /health            bots, running and queued jobs
+
+At most `job_max_concurrent` jobs run at once, one bot each; up to `job_max_queued` more wait for a
+slot and further submissions are rejected with 429. Plan macros are not used by the server.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import time
+import uuid
+from collections import deque
+from typing import Optional, Dict, List, Any, Deque, Set, Tuple, Union
+from urllib.parse import urlsplit, parse_qs
+
+from google.adk.agents import LlmAgent
+from google.adk.artifacts import InMemoryArtifactService
+from google.adk.events import Event
+from google.adk.models import BaseLlm
+from google.adk.runners import Runner
+from google.genai import types
+
+import main
+from agents.callbacks import TracingCallbacks
+from agents.coordinator_agent import CoordinatorAgent
+from config import settings
+from logging_config import logger
+from src.models.mineflayer_bridge.responses import BotInitializationResponse
+from src.planning.crafting_planner import parse_goal, PlanningError
+from src.state.inventory_mirror import inventory_from_state
+from src.state.sqlite_session_service import SqliteSessionService
+from tools import mineflayer_bridge_tools
+from tools.fleet import BotFleet, BotHandle, fleet, spawn_bot, use_fleet
+from tools.tracing import tracer, write_run_report, start_metrics_server, stop_metrics_server
+
+JOB_USER_ID = "job_server"
+JOB_STATUSES_FINISHED = ("succeeded", "failed", "cancelled")
+# Events kept per job for polling and late subscribers; older ones are dropped.
+JOB_MAX_EVENTS = 1000
+# Longest text of an agent event copied into a job event.
+EVENT_TEXT_MAX_CHARS = 2000
+MAX_REQUEST_BODY_BYTES = 64 * 1024
+
+
+class JobRejected(Exception):
+    """Raised when a job is not admitted; `status_code` is the HTTP status reported for it."""
+
+    def __init__(self, message: str, status_code: int = 429):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class Job:
+    """
+    One submitted goal: its status (queued, running, succeeded, failed or cancelled), the bot and
+    session it ran in, the coordinator's final response and a bounded, sequenced event log that
+    subscribers receive as it grows.
+    """
+
+    def __init__(self, job_id: str, goal: str, query: str):
+        self.job_id = job_id
+        self.goal = goal
+        self.query = query
+        self.status = "queued"
+        self.bot_name: Optional[str] = None
+        self.final_response: Optional[str] = None
+        self.success: Optional[bool] = None
+        self.error: Optional[str] = None
+        self.submitted_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.events: Deque[Dict[str, Any]] = deque(maxlen=JOB_MAX_EVENTS)
+        self.task: Optional[asyncio.Task] = None
+        self._next_seq = itertools.count(1)
+        self._subscribers: Set[asyncio.Queue] = set()
+
+    @property
+    def session_id(self) -> str:
+        return f"job-{self.job_id}"
+
+    @property
+    def finished(self) -> bool:
+        return self.status in JOB_STATUSES_FINISHED
+
+    def emit(self, event_type: str, **data: Any) -> None:
+        event = {"seq": next(self._next_seq), "time": round(time.time(), 3), "type": event_type, **data}
+        self.events.append(event)
+        for subscriber in self._subscribers:
+            subscriber.put_nowait(event)
+
+    def set_status(self, status: str, **data: Any) -> None:
+        self.status = status
+        if status == "running":
+            self.started_at = time.time()
+        elif status in JOB_STATUSES_FINISHED:
+            self.finished_at = time.time()
+        self.emit("status", status=status, **data)
+        if self.finished:
+            for subscriber in self._subscribers:
+                subscriber.put_nowait(None)
+
+    def subscribe(self, after_seq: int = 0) -> Tuple[List[Dict[str, Any]], asyncio.Queue]:
+        """
+        Returns the retained events after `after_seq` and a queue receiving every later event,
+        then None once the job has finished. Call `unsubscribe` with the queue when done.
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        if self.finished:
+            queue.put_nowait(None)
+        else:
+            self._subscribers.add(queue)
+        return [event for event in self.events if event["seq"] > after_seq], queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        self._subscribers.discard(queue)
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "goal": self.goal,
+            "status": self.status,
+            "bot": self.bot_name,
+            "session_id": self.session_id,
+            "success": self.success,
+            "final_response": self.final_response,
+            "error": self.error,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "events": self.events[-1]["seq"] if self.events else 0,
+        }
+
+
+def _summarize_event(event: Event) -> Dict[str, Any]:
+    """The parts of a runner event worth streaming: author, finality, text and the tools called or answered."""
+    parts = event.content.parts if event.content and event.content.parts else []
+    text = " ".join(part.text.strip() for part in parts if part.text).strip()
+    summary: Dict[str, Any] = {"author": event.author, "final": event.is_final_response()}
+    if text:
+        summary["text"] = text[:EVENT_TEXT_MAX_CHARS]
+    function_calls = [call.name for call in event.get_function_calls()]
+    if function_calls:
+        summary["function_calls"] = function_calls
+    function_responses = [response.name for response in event.get_function_responses()]
+    if function_responses:
+        summary["function_responses"] = function_responses
+    if event.error_message:
+        summary["error"] = event.error_message
+    return summary
+
+
+class JobServer:
+    """
+    Runs jobs against one shared runner (and thus one model client), one session service and
+    one bridge process. Each running job leases a bot from a pool that grows up to
+    `max_concurrent` bots (the primary bot first, then bots spawned on demand) and drives it
+    through the fleet context of its task, so the tools of concurrent sessions never share a bot,
+    an inventory or a results queue.
+    """
+
+    def __init__(
+        self,
+        model: Optional[Union[str, BaseLlm]] = None,
+        coordinator_agent: Optional[LlmAgent] = None,
+        max_concurrent: int = settings.job_max_concurrent,
+        max_queued: int = settings.job_max_queued,
+        max_finished: int = settings.job_max_finished,
+        job_timeout_s: float = settings.job_timeout_s,
+    ):
+        self.model = model
+        self.coordinator_agent = coordinator_agent
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+        self.max_finished = max_finished
+        self.job_timeout_s = job_timeout_s
+        self.jobs: Dict[str, Job] = {}
+        self.session_service = None
+        self.runner: Optional[Runner] = None
+        self._slots = asyncio.Semaphore(max_concurrent)
+        self._finished_order: Deque[str] = deque()
+        self._idle_bots: List[BotHandle] = []
+        self._bots: List[BotHandle] = []
+        self._bot_fleets: Dict[str, BotFleet] = {}
+        self._spawned = 0
+        self._closing = False
+
+    async def start(self) -> None:
+        """Initializes the bridge and the primary bot, and builds the shared runner. Raises RuntimeError if the bot cannot join."""
+        self.session_service = main.create_session_service()
+        coordinator_agent = self.coordinator_agent or CoordinatorAgent(model=self.model)
+        tracer.reset()
+        if tracer.enabled:
+            TracingCallbacks(tracer).attach(coordinator_agent)
+            await start_metrics_server()
+        self.runner = Runner(
+            agent=coordinator_agent,
+            app_name=main.APP_NAME,
+            session_service=self.session_service,
+            artifact_service=InMemoryArtifactService(),
+        )
+
+        init_result = BotInitializationResponse.model_validate(
+            await mineflayer_bridge_tools.initialize_mineflayer_bridge(asyncio.Queue())
+        )
+        if init_result.status not in ["success", "already_initialized"]:
+            raise RuntimeError(f"Mineflayer bridge initialization failed: {init_result.message}")
+        primary = fleet.adopt_primary()
+        self._add_bot(primary)
+        logger.info(f"Job server started: up to {self.max_concurrent} concurrent job(s), {self.max_queued} queued.")
+
+    def _add_bot(self, bot: BotHandle) -> None:
+        bot_fleet = BotFleet()
+        bot_fleet.bots = [bot]
+        self._bot_fleets[bot.name] = bot_fleet
+        self._bots.append(bot)
+        self._idle_bots.append(bot)
+
+    async def _lease_bot(self) -> BotHandle:
+        """An idle bot, or a newly spawned one; a job only leases a bot while it holds a slot, so the pool stays within `max_concurrent`."""
+        if not self._idle_bots:
+            self._spawned += 1
+            name = f"job-bot-{self._spawned}"
+            bot = await spawn_bot(name, f"{settings.minecraft_bot_username}_j{self._spawned}", asyncio.Queue())
+            if bot is None:
+                raise RuntimeError(f"Bot {name} could not join.")
+            self._add_bot(bot)
+        return self._idle_bots.pop()
+
+    async def _release_bot(self, bot: BotHandle) -> None:
+        """Closes what a finished or cancelled job left in flight on `bot` and returns it to the pool."""
+        for operation in mineflayer_bridge_tools.operation_registry.operations():
+            if operation.bot_name == bot.name:
+                await mineflayer_bridge_tools.cancel_operation(operation.operation_id, "The job that started it has ended.")
+        while not bot.results_queue.empty():
+            bot.results_queue.get_nowait()
+            bot.results_queue.task_done()
+        bot.busy = False
+        self._idle_bots.append(bot)
+
+    def queued_jobs(self) -> int:
+        return sum(1 for job in self.jobs.values() if job.status == "queued")
+
+    def running_jobs(self) -> int:
+        return sum(1 for job in self.jobs.values() if job.status == "running")
+
+    def submit(self, goal: str, query: Optional[str] = None) -> Job:
+        """
+        Admits a job for `goal` (e.g. "craft 1 wooden_pickaxe") and schedules it.
+        Raises JobRejected if the goal cannot be parsed (400), the queue is full (429) or the server is closing (503).
+        """
+        if self._closing:
+            raise JobRejected("The job server is shutting down.", status_code=503)
+        try:
+            item_name, quantity = parse_goal(goal)
+        except PlanningError as e:
+            raise JobRejected(str(e), status_code=400)
+        if self.queued_jobs() >= self.max_queued:
+            raise JobRejected(f"{self.max_queued} jobs are already queued; try again later.")
+        job = Job(uuid.uuid4().hex[:12], goal, query or f"Craft {quantity} {item_name} for me.")
+        self.jobs[job.job_id] = job
+        job.emit("status", status="queued")
+        job.task = asyncio.create_task(self._run_job(job))
+        logger.info(f"Job {job.job_id} admitted for '{goal}' ({self.queued_jobs()} queued).")
+        return job
+
+    async def cancel(self, job_id: str) -> bool:
+        """Cancels a queued or running job. Returns False if it does not exist or already finished."""
+        job = self.jobs.get(job_id)
+        if job is None or job.finished:
+            return False
+        job.task.cancel()
+        return True
+
+    async def _run_job(self, job: Job) -> None:
+        try:
+            async with self._slots:
+                bot = await self._lease_bot()
+                bot.busy = True
+                job.bot_name = bot.name
+                job.set_status("running", bot=bot.name)
+                try:
+                    use_fleet(self._bot_fleets[bot.name])
+                    await asyncio.wait_for(self._run_session(job, bot), timeout=self.job_timeout_s)
+                finally:
+                    await self._release_bot(bot)
+            job.set_status("succeeded" if job.success else "failed")
+        except asyncio.CancelledError:
+            job.set_status("cancelled")
+        except asyncio.TimeoutError:
+            job.error = f"Job timed out after {self.job_timeout_s:.0f}s."
+            job.set_status("failed", error=job.error)
+        except Exception as e:
+            logger.error(f"Job {job.job_id} failed: {e}", exc_info=True)
+            job.error = str(e)
+            job.set_status("failed", error=job.error)
+        logger.info(f"Job {job.job_id} ({job.goal}) {job.status} on {job.bot_name}.")
+        await self._retire(job)
+
+    async def _run_session(self, job: Job, bot: BotHandle) -> None:
+        """Runs the job's goal in its own session, with the results of its bot's operations fed back to the same session."""
+        await main._maybe_await(self.session_service.create_session(
+            app_name=main.APP_NAME, user_id=JOB_USER_ID, session_id=job.session_id, state=main.initial_session_state(job.goal)
+        ))
+        await main.sync_inventory_to_session(self.session_service, job.session_id, JOB_USER_ID)
+        item_name, quantity = parse_goal(job.goal)
+        # Bots keep their inventory between jobs, so only the items gained during this job count towards its goal.
+        held_before = (await self._inventory(job)).get(item_name, 0)
+        coordinator_name = self.runner.agent.name
+
+        def on_event(event: Event) -> None:
+            job.emit("agent_event", **_summarize_event(event))
+            if event.is_final_response() and event.author == coordinator_name and event.content and event.content.parts and event.content.parts[0].text:
+                job.final_response = event.content.parts[0].text.strip()
+
+        results_processor_task = asyncio.create_task(main.process_mineflayer_results(
+            self.runner, job.session_id, JOB_USER_ID, bot.results_queue, on_event=on_event
+        ))
+        try:
+            content = types.Content(role='user', parts=[types.Part(text=job.query)])
+            async for event in self.runner.run_async(user_id=JOB_USER_ID, session_id=job.session_id, new_message=content):
+                on_event(event)
+            await main.wait_for_pending_operations(bot.results_queue, settings.pending_operations_timeout_s, bot_name=bot.name)
+            await bot.results_queue.put(None)
+            await results_processor_task
+        finally:
+            results_processor_task.cancel()
+            await asyncio.gather(results_processor_task, return_exceptions=True)
+
+        await main.sync_inventory_to_session(self.session_service, job.session_id, JOB_USER_ID)
+        inventory = await self._inventory(job)
+        gained = inventory.get(item_name, 0) - held_before
+        job.success = gained >= quantity
+        job.emit("result", success=job.success, final_response=job.final_response, inventory=inventory, gained=gained)
+
+    async def _inventory(self, job: Job) -> Dict[str, int]:
+        """The inventory of the job's bot as last synced into the job's session."""
+        session = await main._maybe_await(self.session_service.get_session(
+            app_name=main.APP_NAME, user_id=JOB_USER_ID, session_id=job.session_id
+        ))
+        return inventory_from_state(session.state) if session else {}
+
+    async def _retire(self, job: Job) -> None:
+        """Keeps the last `max_finished` finished jobs; in-memory sessions of older ones are deleted with them."""
+        self._finished_order.append(job.job_id)
+        while len(self._finished_order) > self.max_finished:
+            evicted = self.jobs.pop(self._finished_order.popleft(), None)
+            if evicted is not None and settings.session_backend == "memory":
+                await main._maybe_await(self.session_service.delete_session(
+                    app_name=main.APP_NAME, user_id=JOB_USER_ID, session_id=evicted.session_id
+                ))
+
+    def health(self) -> Dict[str, Any]:
+        return {
+            "status": "closing" if self._closing else "ok",
+            "bots": len(self._bots),
+            "idle_bots": len(self._idle_bots),
+            "running": self.running_jobs(),
+            "queued": self.queued_jobs(),
+            "max_concurrent": self.max_concurrent,
+            "max_queued": self.max_queued,
+            "in_flight_operations": mineflayer_bridge_tools.operation_registry.in_flight_counts(),
+        }
+
+    async def close(self) -> None:
+        """Cancels unfinished jobs, then shuts down the bots, the bridge and the session service."""
+        self._closing = True
+        tasks = [job.task for job in self.jobs.values() if job.task is not None and not job.finished]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await mineflayer_bridge_tools.operation_registry.stop_sweeper()
+        write_run_report(summary={"jobs": len(self.jobs), "succeeded": sum(1 for job in self.jobs.values() if job.status == "succeeded")})
+        await stop_metrics_server()
+        for bot in self._bots:
+            if bot.name != mineflayer_bridge_tools.PRIMARY_BOT_NAME:
+                bot.bridge.shutdown()
+        if isinstance(self.session_service, SqliteSessionService):
+            self.session_service.close()
+        main.shutdown_mineflayer()
+
+    async def handle_http(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serves one HTTP/1.1 request of the API and closes the connection."""
+        try:
+            request_line = (await reader.readline()).decode("latin-1").split()
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+            if len(request_line) < 2:
+                await self._respond(writer, 400, {"error": "Malformed request."})
+                return
+            method, target = request_line[0].upper(), urlsplit(request_line[1])
+            length = int(headers.get("content-length") or 0)
+            if length > MAX_REQUEST_BODY_BYTES:
+                await self._respond(writer, 413, {"error": "Request body too large."})
+                return
+            body = await reader.readexactly(length) if length else b""
+            await self._route(writer, method, target.path.rstrip("/") or "/", parse_qs(target.query), body)
+        except Exception as e:
+            logger.warning(f"Error serving job server request: {e}")
+        finally:
+            writer.close()
+
+    async def _route(self, writer: asyncio.StreamWriter, method: str, path: str, query: Dict[str, List[str]], body: bytes) -> None:
+        segments = path.strip("/").split("/")
+        if path == "/health" and method == "GET":
+            await self._respond(writer, 200, self.health())
+        elif path == "/jobs" and method == "GET":
+            await self._respond(writer, 200, {"jobs": [job.describe() for job in self.jobs.values()]})
+        elif path == "/jobs" and method == "POST":
+            try:
+                request = json.loads(body or b"{}")
+                if not isinstance(request, dict) or not isinstance(request.get("goal"), str):
+                    raise ValueError("Expected a JSON object with a 'goal' string.")
+                job = self.submit(request["goal"], request.get("query"))
+            except ValueError as e:
+                await self._respond(writer, 400, {"error": str(e)})
+            except JobRejected as e:
+                await self._respond(writer, e.status_code, {"error": str(e)})
+            else:
+                await self._respond(writer, 202, job.describe())
+        elif len(segments) in (2, 3) and segments[0] == "jobs":
+            job = self.jobs.get(segments[1])
+            if job is None:
+                await self._respond(writer, 404, {"error": f"No job {segments[1]}."})
+            elif len(segments) == 3 and segments[2] == "events" and method == "GET":
+                await self._stream_events(writer, job, int((query.get("after") or ["0"])[0]))
+            elif len(segments) == 2 and method == "GET":
+                await self._respond(writer, 200, job.describe())
+            elif len(segments) == 2 and method == "DELETE":
+                cancelled = await self.cancel(job.job_id)
+                await self._respond(writer, 202 if cancelled else 409, job.describe() if cancelled else {"error": f"Job already {job.status}."})
+            else:
+                await self._respond(writer, 405, {"error": f"{method} not allowed on {path}."})
+        else:
+            await self._respond(writer, 404, {"error": f"No route {method} {path}."})
+
+    @staticmethod
+    async def _respond(writer: asyncio.StreamWriter, status_code: int, payload: Dict[str, Any]) -> None:
+        body = json.dumps(payload, default=str).encode("utf-8")
+        writer.write(
+            f"HTTP/1.1 {status_code} {_REASONS.get(status_code, 'OK')}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode("latin-1") + body
+        )
+        await writer.drain()
+
+    @staticmethod
+    async def _stream_events(writer: asyncio.StreamWriter, job: Job, after_seq: int) -> None:
+        """Writes the job's events as NDJSON, then every new one as it happens, until the job finishes or the client leaves."""
+        backlog, queue = job.subscribe(after_seq)
+        try:
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/x-ndjson\r\nConnection: close\r\n\r\n")
+            for event in backlog:
+                writer.write(json.dumps(event, default=str).encode("utf-8") + b"\n")
+            await writer.drain()
+            while (event := await queue.get()) is not None:
+                writer.write(json.dumps(event, default=str).encode("utf-8") + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            job.unsubscribe(queue)
+
+
+_REASONS = {
+    200: "OK", 202: "Accepted", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+    409: "Conflict", 413: "Payload Too Large", 429: "Too Many Requests", 503: "Service Unavailable",
+}
+
+
+async def serve(host: str = settings.job_server_host, port: int = settings.job_server_port, server: Optional[JobServer] = None) -> None:
+    """Starts `server` (default: a new JobServer) and serves its API on host:port until cancelled."""
+    server = server or JobServer()
+    await server.start()
+    http_server = await asyncio.start_server(server.handle_http, host, port)
+    logger.info(f"Job server listening on http://{host}:{port}")
+    try:
+        async with http_server:
+            await http_server.serve_forever()
+    finally:
+        await server.close()
+        logger.info("Job server stopped.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve crafting goals as concurrent jobs over HTTP.")
+    parser.add_argument("--host", default=settings.job_server_host)
+    parser.add_argument("--port", type=int, default=settings.job_server_port)
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port))
+    except KeyboardInterrupt:
+        logger.info("Job server interrupted by user.")
@@ -1,18 +1,80 @@
+import atexit
+import json
 import logging
 import os
-from logging.handlers import RotatingFileHandler
+import queue
+import random
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler, TimedRotatingFileHandler
+
+from config import settings
 
 LOGS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'logs')
 if not os.path.exists(LOGS_DIR):
     os.makedirs(LOGS_DIR)
 
 LOG_FILE = os.path.join(LOGS_DIR, 'app.log')
+JSON_LOG_FILE = os.path.join(LOGS_DIR, 'app.jsonl')
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """One JSON object per record, for log shippers and jq."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "file": record.filename,
+            "line": record.lineno,
+            "message": record.getMessage(),
+        }
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class SamplingQueueHandler(QueueHandler):
+    """
+    Hands records to the background listener. Only the message itself is rendered here (the
+    listener thread does the formatting and the file I/O), truncated to `max_chars`.
+    Records logged with `extra={"payload": True}` (full event and state dumps) are kept at `payload_sample_rate`.
+    """
+
+    def __init__(self, log_queue: queue.Queue, max_chars: int, payload_sample_rate: float):
+        super().__init__(log_queue)
+        self.max_chars = max_chars
+        self.payload_sample_rate = payload_sample_rate
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if getattr(record, "payload", False) and self.payload_sample_rate < 1.0 and random.random() >= self.payload_sample_rate:
+            return
+        super().emit(record)
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        message = record.getMessage()
+        if self.max_chars and len(message) > self.max_chars:
+            message = f"{message[:self.max_chars]}... [{len(message) - self.max_chars} chars truncated]"
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = message
+        record.args = None
+        record.exc_info = None
+        return record
+
+
+def _file_handler(path: str) -> logging.Handler:
+    if settings.log_rotate_when:
+        return TimedRotatingFileHandler(path, when=settings.log_rotate_when, backupCount=settings.log_backup_count, encoding='utf-8')
+    return RotatingFileHandler(path, maxBytes=settings.log_max_bytes, backupCount=settings.log_backup_count, encoding='utf-8')
+
 
 logger = logging.getLogger('MinecraftCrafterGathererGuild')
-logger.setLevel(logging.INFO)
+logger.setLevel(settings.log_level)
+logger.propagate = False
 
 console_handler = logging.StreamHandler()
-file_handler = RotatingFileHandler(LOG_FILE, encoding='utf-8')
+file_handler = _file_handler(LOG_FILE)
 
 console_handler.setLevel(logging.INFO)
 file_handler.setLevel(logging.DEBUG)
@@ -21,5 +83,18 @@ log_format = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(filen
 console_handler.setFormatter(log_format)
 file_handler.setFormatter(log_format)
 
-logger.addHandler(console_handler)
-logger.addHandler(file_handler)
+output_handlers = [console_handler, file_handler]
+if settings.log_json_lines:
+    json_handler = _file_handler(JSON_LOG_FILE)
+    json_handler.setLevel(logging.DEBUG)
+    json_handler.setFormatter(JsonLinesFormatter())
+    output_handlers.append(json_handler)
+
+# Records go through an unbounded queue to a listener thread, so the event loop never waits on file I/O.
+log_queue: queue.Queue = queue.Queue()
+queue_handler = SamplingQueueHandler(log_queue, settings.log_max_message_chars, settings.log_payload_sample_rate)
+logger.addHandler(queue_handler)
+
+log_listener = QueueListener(log_queue, *output_handlers, respect_handler_level=True)
+log_listener.start()
+atexit.register(log_listener.stop)
@@ -1,31 +1,195 @@
 import asyncio
+import inspect
+import json
+import logging
+import os
+from typing import Optional, Dict, Any, Union, Callable
+
+from google.adk.agents import LlmAgent
+from google.adk.models import BaseLlm
 from google.adk.runners import Runner
 from google.adk.sessions import InMemorySessionService
 from google.adk.artifacts import InMemoryArtifactService
+from google.adk.events import Event, EventActions
 from google.genai import types
 
 from config import settings
 from logging_config import logger
 
+from agents.callbacks import TracingCallbacks
 from agents.coordinator_agent import CoordinatorAgent
 from src.models.mineflayer_bridge.responses import BotInitializationResponse
+from src.planning.plan_macros import MacroStore
+from src.state.inventory_mirror import inventory_from_state, inventory_state_delta
+from src.state.sqlite_session_service import SqliteSessionService
 from tools import mineflayer_bridge_tools
+from tools.fleet import initialize_fleet, fleet
+from tools.plan_macros import MacroRecorder, replay_plan_macro
+from tools.tracing import tracer, write_run_report, start_metrics_server, stop_metrics_server
 
 APP_NAME = "CrafterGathererGuildApp"
 USER_ID = "test_user_001"
 SESSION_ID_MAIN = "main_pickaxe_session_001"
+# Prefix of the message that delivers a long-running result to the coordinator when the call
+# was made inside a sub-agent (AgentTool) session rather than the root session.
+TASK_RESULT_MESSAGE_FORMAT = "[{tool_name} result] {payload}"
 
 
-async def process_mineflayer_results(runner: Runner, session_id: str, user_id: str, queue: asyncio.Queue):
+async def _maybe_await(value: Any) -> Any:
+    """
+    Session service methods are synchronous in google-adk 0.5 and coroutines in later releases;
+    this accepts both.
+    """
+    return await value if inspect.isawaitable(value) else value
+
+
+async def sync_inventory_to_session(session_service, session_id: str, user_id: str) -> None:
+    """
+    Writes the inventory items that changed since the session was last updated into their
+    `inventory:<item>` state keys, as a state-delta event built from the inventory mirror.
+    """
+    session = await _maybe_await(session_service.get_session(app_name=APP_NAME, user_id=user_id, session_id=session_id))
+    if not session:
+        return
+    delta = mineflayer_bridge_tools.sync_inventory_state(dict(session.state))
+    if not delta:
+        return
+    await _maybe_await(session_service.append_event(
+        session,
+        Event(author="system", actions=EventActions(state_delta=inventory_state_delta(delta))),
+    ))
+    logger.info("Inventory synced to session '%s': %s", session_id, delta)
+
+
+async def record_placed_crafting_table(session_service, session_id: str, user_id: str, location: Dict[str, Any]) -> None:
+    """Writes a crafting table placed by an operation into `session.state['placed_crafting_table_location']`."""
+    session = await _maybe_await(session_service.get_session(app_name=APP_NAME, user_id=user_id, session_id=session_id))
+    if not session:
+        return
+    await _maybe_await(session_service.append_event(
+        session,
+        Event(author="system", actions=EventActions(state_delta={"placed_crafting_table_location": location})),
+    ))
+    logger.info("Crafting table location recorded in session '%s': %s", session_id, location)
+
+
+# Tools whose results report a crafting table they placed as `placed_location`.
+CRAFTING_TABLE_PLACING_TOOLS = ("craft_chain_via_js_long_running", "execute_crafting_plan")
+
+# Session state keys that describe the current run; they are reset when a persisted session is resumed,
+# together with the `inventory:<item>` keys.
+RUN_STATE_KEYS = ("coordinator_plan_steps", "current_plan_step_index", "last_sub_task_result", "current_high_level_goal")
+
+
+def initial_session_state(goal: str) -> Dict[str, Any]:
+    return {
+        "known_recipes": {},
+        "placed_crafting_table_location": None,
+        "placed_furnace_location": None,
+        "resource_locations_memory": {},
+        "coordinator_plan_steps": [],
+        "current_plan_step_index": 0,
+        "last_sub_task_result": None,
+        "current_high_level_goal": goal
+    }
+
+
+def create_session_service():
+    """Session service of `settings.session_backend`."""
+    if settings.session_backend == "sqlite":
+        os.makedirs(os.path.dirname(os.path.abspath(settings.session_db_path)), exist_ok=True)
+        return SqliteSessionService(settings.session_db_path)
+    return InMemorySessionService()
+
+# Marks full event and state dumps, which the log handler samples at `log_payload_sample_rate`.
+PAYLOAD_LOG = {"payload": True}
+
+
+def _log_event_details(event: Event) -> None:
+    """
+    Logs the parts and actions of an event at DEBUG level. Formatting is lazy and the whole dump
+    is skipped when DEBUG is disabled, so large arguments and responses cost nothing by default.
+    """
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
+    if event.content and event.content.parts:
+        for i, part in enumerate(event.content.parts):
+            if part.text:
+                logger.debug("Part %d (Text): %s", i, part.text.strip(), extra=PAYLOAD_LOG)
+            elif part.function_call:
+                logger.debug("Part %d (FunctionCall): ID=%s, Name=%s, Args=%s", i, part.function_call.id, part.function_call.name, part.function_call.args, extra=PAYLOAD_LOG)
+            elif part.function_response:
+                logger.debug("Part %d (FunctionResponse): ID=%s, Name=%s, Response=%s", i, part.function_response.id, part.function_response.name, part.function_response.response, extra=PAYLOAD_LOG)
+            elif part.inline_data:
+                logger.debug("Part %d (InlineData): MIME_TYPE=%s, Size=%d bytes", i, part.inline_data.mime_type, len(part.inline_data.data))
+            else:
+                logger.debug("Part %d: (Other type, raw: %s)", i, part, extra=PAYLOAD_LOG)
+    if event.actions:
+        if event.actions.state_delta:
+            logger.debug("State Delta: %s", event.actions.state_delta, extra=PAYLOAD_LOG)
+        if event.actions.artifact_delta:
+            logger.debug("Artifact Delta: %s", event.actions.artifact_delta, extra=PAYLOAD_LOG)
+        if event.actions.transfer_to_agent:
+            logger.debug("Transfer to Agent: -> %s", event.actions.transfer_to_agent)
+        if event.actions.escalate:
+            logger.debug("Escalate: True")
+        if event.actions.skip_summarization:
+            logger.debug("Skip Summarization: True")
+
+
+def _has_function_call(session, function_call_id: str) -> bool:
+    return any(
+        call.id == function_call_id
+        for event in session.events
+        for call in event.get_function_calls()
+    )
+
+
+async def wait_for_pending_operations(queue: asyncio.Queue, timeout_s: float, bot_name: Optional[str] = None) -> bool:
+    """
+    Waits until every long-running operation (only those of `bot_name`, if given) has completed
+    and its result was fed back to the runner.
+    Feeding a result can start new operations, so this repeats until both are drained.
+    Returns False on timeout.
+    """
+    def pending() -> int:
+        counts = mineflayer_bridge_tools.operation_registry.in_flight_counts()
+        return counts["total"] if bot_name is None else counts["by_bot"].get(bot_name, 0)
+
+    async def drained() -> None:
+        while True:
+            await queue.join()
+            if not pending():
+                return
+            await asyncio.sleep(0.1)
+
+    try:
+        await asyncio.wait_for(drained(), timeout=timeout_s)
+        return True
+    except asyncio.TimeoutError:
+        counts = mineflayer_bridge_tools.operation_registry.in_flight_counts()
+        logger.warning(f"{pending()} operation(s) still pending after {timeout_s}s: {counts}")
+        return False
+
+
+async def process_mineflayer_results(
+    runner: Runner,
+    session_id: str,
+    user_id: str,
+    queue: asyncio.Queue,
+    on_event: Optional[Callable[[Event], None]] = None,
+):
     """
     Continuously processes results from the Mineflayer JS tasks queue
     and feeds them back to the ADK Runner.
 
     The processing includes consuming the generator from `runner.run_async`
-    to ensure the feedback message is sent and processed.
+    to ensure the feedback message is sent and processed; `on_event` is called with each of its events.
     """
     logger.info("Mineflayer results processor task started.")
     while True:
+        # Reset first, so a cancellation while waiting does not mark the previous result done again.
+        js_result = None
         try:
             js_result = await queue.get()
             
@@ -34,21 +198,22 @@ async def process_mineflayer_results(runner: Runner, session_id: str, user_id: s
                 queue.task_done()
                 break
             
-            logger.info(f"Received JS task result: {js_result}")
+            logger.info("Received JS task result: %s", js_result)
 
             operation_id = js_result.get("operationId")
             if not operation_id:
                 logger.error(f"JS task result missing operationId: {js_result}")
-                queue.task_done()
                 continue
 
-            pending_op_data = mineflayer_bridge_tools._pending_operations.pop(operation_id, None)
-            if not pending_op_data:
-                logger.error(f"No pending ADK operation found for JS operationId {operation_id}. Result: {js_result}")
-                queue.task_done()
+            pending_operation = mineflayer_bridge_tools.operation_registry.pop(operation_id)
+            if not pending_operation:
+                # Typically the late result of an operation that already timed out or was cancelled.
+                logger.warning(f"No pending ADK operation found for JS operationId {operation_id}. Result: {js_result}")
                 continue
+            tracer.operation_point(operation_id, "dequeued")
             
-            original_function_call_id, original_tool_name = pending_op_data
+            original_function_call_id, original_tool_name = pending_operation.function_call_id, pending_operation.tool_name
+            await sync_inventory_to_session(runner.session_service, session_id, user_id)
 
             tool_response_payload = {
                 "status": js_result.get("status"),
@@ -56,38 +221,51 @@ async def process_mineflayer_results(runner: Runner, session_id: str, user_id: s
             }
             if "collected_item" in js_result:
                 tool_response_payload["collected_item"] = js_result["collected_item"]
+            if "quantity_collected" in js_result:
+                tool_response_payload["quantity_collected"] = js_result["quantity_collected"]
             if "quantity_crafted" in js_result:
                 tool_response_payload["quantity_crafted"] = js_result["quantity_crafted"]
             if "crafted_item" in js_result:
                  tool_response_payload["crafted_item"] = js_result["crafted_item"]
             if "placed_location" in js_result:
                  tool_response_payload["placed_location"] = js_result["placed_location"]
-
-            completion_content = types.Content(
-                role='user',
-                parts=[
-                    types.Part(
-                        function_response=types.FunctionResponse(
-                            id=original_function_call_id,
-                            name=original_tool_name,
-                            response=tool_response_payload
-                        )
+            if "completed_steps" in js_result:
+                tool_response_payload["completed_steps"] = js_result["completed_steps"]
+            if "failed_step" in js_result:
+                tool_response_payload["failed_step"] = js_result["failed_step"]
+            if "steps_completed" in js_result:
+                tool_response_payload["steps_completed"] = js_result["steps_completed"]
+            if "crafted" in js_result:
+                tool_response_payload["crafted"] = js_result["crafted"]
+            if js_result.get("placed_location") and original_tool_name in CRAFTING_TABLE_PLACING_TOOLS:
+                await record_placed_crafting_table(runner.session_service, session_id, user_id, js_result["placed_location"])
+
+            session = await _maybe_await(runner.session_service.get_session(app_name=APP_NAME, user_id=user_id, session_id=session_id))
+            if session and _has_function_call(session, original_function_call_id):
+                completion_part = types.Part(
+                    function_response=types.FunctionResponse(
+                        id=original_function_call_id,
+                        name=original_tool_name,
+                        response=tool_response_payload
                     )
-                ]
-            )
-
-            logger.info(f"Feeding JS task result back to ADK Runner for call_id {original_function_call_id} (tool: {original_tool_name}): {completion_content}")
+                )
+            else:
+                # Issued by a sub-agent inside its own AgentTool session: the root session has no
+                # matching function call, so the result is reported to the coordinator as text.
+                completion_part = types.Part(text=TASK_RESULT_MESSAGE_FORMAT.format(
+                    tool_name=original_tool_name, payload=json.dumps(tool_response_payload)
+                ))
+            completion_content = types.Content(role='user', parts=[completion_part])
+
+            logger.info("Feeding JS task result back to ADK Runner for call_id %s (tool: %s)", original_function_call_id, original_tool_name)
+            logger.debug("Feedback content: %s", completion_content, extra=PAYLOAD_LOG)
             async for _event_from_feedback in runner.run_async(user_id=user_id, session_id=session_id, new_message=completion_content):
-                logger.info(f"Event from feedback processing: {_event_from_feedback.author} - Final: {_event_from_feedback.is_final_response()}")
-                if _event_from_feedback.content and _event_from_feedback.content.parts:
-                     for i, part in enumerate(_event_from_feedback.content.parts):
-                        if part.text:
-                            logger.info(f"Part {i} (Text): {part.text.strip()}")
-                        elif part.function_call:
-                            logger.info(f"Part {i} (FunctionCall): ID={part.function_call.id}, Name={part.function_call.name}, Args={part.function_call.args}")
-                        elif part.function_response:
-                            logger.info(f"Part {i} (FunctionResponse): ID={part.function_response.id}, Name={part.function_response.name}, Response={part.function_response.response}")
+                logger.info("Event from feedback processing: %s - Final: %s", _event_from_feedback.author, _event_from_feedback.is_final_response())
+                _log_event_details(_event_from_feedback)
+                if on_event is not None:
+                    on_event(_event_from_feedback)
 
+            tracer.operation_point(operation_id, "fed_back")
             logger.info(f"Fed back result for operationId {operation_id} / call_id {original_function_call_id}")
 
         except Exception as e:
@@ -97,7 +275,13 @@ async def process_mineflayer_results(runner: Runner, session_id: str, user_id: s
                  queue.task_done()
 
 
-async def run_pickaxe_crafting_task():
+async def run_pickaxe_crafting_task(
+    model: Optional[Union[str, BaseLlm]] = None,
+    goal: str = "craft 1 wooden_pickaxe",
+    goal_query_text: str = "Craft one wooden pickaxe for me.",
+    fleet_size: int = settings.fleet_size,
+    coordinator_agent: Optional[LlmAgent] = None,
+) -> Dict[str, Any]:
     """
     Main asynchronous function to run the "craft wooden pickaxe" task.
     Refactored to handle long-running Mineflayer operations.
@@ -105,43 +289,64 @@ async def run_pickaxe_crafting_task():
     The main agent loop might appear to finish its plan based on 'pending'
     tool responses; however, actual task completion, especially for long-running
     operations, is handled by the `process_mineflayer_results` task.
-    Therefore, the loop does not break prematurely after the main agent's
-    final response to allow the results processor to continue.
+    Therefore, the results processor is only stopped once no operation is pending.
+
+    `model` overrides the Gemini model for every agent (e.g. a scripted model for benchmarks);
+    a prebuilt `coordinator_agent` (e.g. one with instrumentation callbacks) can be passed instead.
+    Returns a summary with the coordinator's final report, the final session state and
+    whether the goal item ended up in the inventory.
     """
+    goal_item = goal.split()[-1]
+    run_summary: Dict[str, Any] = {"success": False, "final_response": None, "final_state": None, "event_count": 0}
     logger.info(f"--- Starting '{APP_NAME}' ---")
     logger.info(f"Using Google API Key: {'Set' if settings.google_api_key else 'Not Set'}")
     logger.info(f"Mineflayer Bot Config: Host={settings.minecraft_host}, Port={settings.minecraft_port}, User={settings.minecraft_bot_username}, Version={settings.minecraft_version}")
 
-    session_service = InMemorySessionService()
+    session_service = create_session_service()
     artifact_service = InMemoryArtifactService()
     
     operation_results_queue = asyncio.Queue()
 
-    initial_session_state = {
-        "inventory": {},
-        "known_recipes": {},
-        "placed_crafting_table_location": None,
-        "placed_furnace_location": None,
-        "resource_locations_memory": {},
-        "coordinator_plan_steps": [],
-        "current_plan_step_index": 0,
-        "last_sub_task_result": None,
-        "current_high_level_goal": "craft 1 wooden_pickaxe"
-    }
-    _session = session_service.create_session(
-        app_name=APP_NAME,
-        user_id=USER_ID,
-        session_id=SESSION_ID_MAIN,
-        state=initial_session_state
-    )
-    logger.info(f"Session '{SESSION_ID_MAIN}' created for user '{USER_ID}' with initial state.")
+    initial_state = initial_session_state(goal)
+    _session = await _maybe_await(session_service.get_session(app_name=APP_NAME, user_id=USER_ID, session_id=SESSION_ID_MAIN))
+    if _session is None:
+        _session = await _maybe_await(session_service.create_session(
+            app_name=APP_NAME,
+            user_id=USER_ID,
+            session_id=SESSION_ID_MAIN,
+            state=initial_state
+        ))
+        logger.info(f"Session '{SESSION_ID_MAIN}' created for user '{USER_ID}' with initial state.")
+    else:
+        # Resumed from the persistent store: keep what was learned (recipes, placed blocks, resource memory), start a new run.
+        await _maybe_await(session_service.append_event(_session, Event(
+            author="system",
+            actions=EventActions(state_delta={
+                **{key: initial_state[key] for key in RUN_STATE_KEYS},
+                **inventory_state_delta({name: 0 for name in inventory_from_state(_session.state)}),
+            }),
+        )))
+        logger.info(
+            f"Session '{SESSION_ID_MAIN}' resumed for user '{USER_ID}' with {len(_session.events)} events and "
+            f"{len(_session.state.get('known_recipes') or {})} known recipes."
+        )
 
     try:
-        coordinator_agent = CoordinatorAgent()
+        coordinator_agent = coordinator_agent or CoordinatorAgent(model=model)
         logger.info(f"Root agent '{coordinator_agent.name}' instantiated.")
     except Exception as e:
         logger.error(f"Failed to instantiate CoordinatorAgent: {e}", exc_info=True)
-        return
+        return run_summary
+
+    tracer.reset()
+    if tracer.enabled:
+        TracingCallbacks(tracer).attach(coordinator_agent)
+        await start_metrics_server()
+
+    macro_store = MacroStore(settings.plan_macro_dir) if settings.plan_macros_enabled else None
+    macro_recorder = MacroRecorder() if macro_store else None
+    if macro_recorder:
+        macro_recorder.attach(coordinator_agent)
 
     runner = Runner(
         agent=coordinator_agent,
@@ -161,76 +366,69 @@ async def run_pickaxe_crafting_task():
         else:
             logger.error(f"Mineflayer bridge initialization failed: {init_result.message}")
             logger.error("Cannot proceed without Mineflayer bridge. Exiting.")
-            return
+            return run_summary
     except Exception as e:
         logger.error(f"Critical error during Mineflayer bridge direct initialization: {e}", exc_info=True)
         logger.error("Cannot proceed. Exiting.")
-        return
+        return run_summary
+
+    await initialize_fleet(fleet_size)
+
+    final_response_text = "Coordinator did not provide a final report."
+
+    def capture_final_report(event: Event) -> None:
+        # The report usually follows a fed-back result, so events of the results processor count too.
+        nonlocal final_response_text
+        if event.is_final_response() and event.author == coordinator_agent.name:
+            if event.content and event.content.parts and event.content.parts[0].text:
+                final_response_text = event.content.parts[0].text.strip()
 
     results_processor_task = asyncio.create_task(
-        process_mineflayer_results(runner, SESSION_ID_MAIN, USER_ID, operation_results_queue)
+        process_mineflayer_results(runner, SESSION_ID_MAIN, USER_ID, operation_results_queue, on_event=capture_final_report)
     )
 
-    main_goal_query_text = "Craft one wooden pickaxe for me."
+    main_goal_query_text = goal_query_text
     logger.info(f"Sending main goal to Coordinator: '{main_goal_query_text}'")
     main_goal_content = types.Content(role='user', parts=[types.Part(text=main_goal_query_text)])
 
-    final_response_text = "Coordinator did not provide a final report."
     event_count = 0
+    macro_result: Optional[Dict[str, Any]] = None
+    if macro_store:
+        session = await _maybe_await(session_service.get_session(app_name=APP_NAME, user_id=USER_ID, session_id=SESSION_ID_MAIN))
+        state = dict(session.state)
+        mineflayer_bridge_tools.sync_inventory_state(state)
+        macro_result = await replay_plan_macro(goal, state, macro_store)
+        if macro_result:
+            await sync_inventory_to_session(session_service, SESSION_ID_MAIN, USER_ID)
     try:
-        async for event in runner.run_async(
-            user_id=USER_ID, session_id=SESSION_ID_MAIN, new_message=main_goal_content
-        ):
-            event_count += 1
-            logger.info(f"\n--- Event {event_count} ---")
-            logger.info(f"ID: {event.id}")
-            logger.info(f"Author: {event.author}")
-            logger.info(f"Is Final: {event.is_final_response()}")
-            logger.info(f"Timestamp: {event.timestamp}")
-
-            if event.content:
-                logger.info(f"Content (Role: {event.content.role}):")
-                for i, part in enumerate(event.content.parts):
-                    if part.text:
-                        logger.info(f"Part {i} (Text): {part.text.strip()}")
-                    elif part.function_call:
-                        logger.info(f"Part {i} (FunctionCall): ID={part.function_call.id}, Name={part.function_call.name}, Args={part.function_call.args}")
-                    elif part.function_response:
-                        logger.info(f"Part {i} (FunctionResponse): ID={part.function_response.id}, Name={part.function_response.name}, Response={part.function_response.response}")
-                    elif part.inline_data:
-                        logger.info(f"Part {i} (InlineData): MIME_TYPE={part.inline_data.mime_type}, Size={len(part.inline_data.data)} bytes")
-                    else:
-                        logger.info(f"Part {i}: (Other type, raw: {part})")
-            else:
-                logger.info("Content: None")
-
-            if event.actions:
-                logger.info("Actions:")
-                if event.actions.state_delta:
-                    logger.info(f"State Delta: {event.actions.state_delta}")
-                if event.actions.artifact_delta:
-                    logger.info(f"Artifact Delta: {event.actions.artifact_delta}")
-                if event.actions.transfer_to_agent:
-                     logger.info(f"Transfer to Agent: -> {event.actions.transfer_to_agent}")
-                if event.actions.escalate:
-                    logger.info("Escalate: True")
-                if event.actions.skip_summarization:
-                    logger.info("Skip Summarization: True")
-            else:
-                logger.info("Actions: None")
-            
-            if event.error_code or event.error_message:
-                logger.error(f"  Error: Code={event.error_code}, Message={event.error_message}")
-
-            if event.is_final_response() and event.author == coordinator_agent.name:
-                if event.content and event.content.parts and event.content.parts[0].text:
-                    final_response_text = event.content.parts[0].text.strip()
+        if macro_result and macro_result["status"] == "success":
+            final_response_text = macro_result["message"]
+            logger.info(f"Goal completed by plan macro; the coordinator is not consulted. {final_response_text}")
+        else:
+            if macro_result:
+                main_goal_content = types.Content(role='user', parts=[types.Part(text=(
+                    f"{main_goal_query_text}\n(A recorded plan for this goal stopped early: {macro_result['message']} "
+                    f"Plan again from the current inventory.)"
+                ))])
+            async for event in runner.run_async(
+                user_id=USER_ID, session_id=SESSION_ID_MAIN, new_message=main_goal_content
+            ):
+                event_count += 1
+                logger.info("Event %d: id=%s author=%s final=%s", event_count, event.id, event.author, event.is_final_response())
+                _log_event_details(event)
+
+                if event.error_code or event.error_message:
+                    logger.error("  Error: Code=%s, Message=%s", event.error_code, event.error_message)
+
+                capture_final_report(event)
 
     except Exception as e:
         logger.error(f"An error occurred during the agent run: {e}", exc_info=True)
     finally:
         logger.info("\n--- Main agent run loop finished or errored ---")
-        
+
+        logger.info("Waiting for pending operations to complete...")
+        await wait_for_pending_operations(operation_results_queue, settings.pending_operations_timeout_s)
         logger.info("Signaling results processor to stop...")
         await operation_results_queue.put(None)
         await results_processor_task
@@ -239,22 +437,57 @@ async def run_pickaxe_crafting_task():
         logger.info("\n--- Task Execution Ended (all events processed) ---")
         logger.info(f"Coordinator's Final Report: {final_response_text}")
 
-        final_session = session_service.get_session(
+        await sync_inventory_to_session(session_service, SESSION_ID_MAIN, USER_ID)
+
+        final_session = await _maybe_await(session_service.get_session(
             app_name=APP_NAME, user_id=USER_ID, session_id=SESSION_ID_MAIN
-        )
+        ))
         if final_session:
-            logger.info("\n--- Final Session State ---")
-            for key, value in final_session.state.items():
-                logger.info(f"  {key}: {value}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("\n--- Final Session State ---")
+                for key, value in final_session.state.items():
+                    logger.debug("  %s: %s", key, value, extra=PAYLOAD_LOG)
             
-            inventory = final_session.state.get("inventory", {})
-            if inventory.get("wooden_pickaxe", 0) >= 1:
-                logger.info("SUCCESS: Wooden pickaxe found in final inventory!")
+            inventory = inventory_from_state(final_session.state)
+            run_summary["final_state"] = dict(final_session.state)
+            run_summary["success"] = inventory.get(goal_item, 0) >= 1
+            if run_summary["success"]:
+                logger.info(f"SUCCESS: {goal_item} found in final inventory!")
             else:
-                logger.warning("FAILURE: Wooden pickaxe NOT found in final inventory.")
+                logger.warning(f"FAILURE: {goal_item} NOT found in final inventory.")
         else:
             logger.error("Could not retrieve final session state.")
+
+        macro_replayed = bool(macro_result and macro_result["status"] == "success")
+        if macro_recorder and run_summary["success"] and not macro_replayed:
+            macro = macro_recorder.build()
+            if macro:
+                macro_store.put(macro)
+                logger.info(f"Recorded plan macro for '{macro.recorded_goal}' ({len(macro.steps)} steps, signature {macro.signature}).")
+        run_summary["macro_replayed"] = macro_replayed
         
+        await mineflayer_bridge_tools.operation_registry.stop_sweeper()
+        write_run_report(summary={"goal": goal, "success": run_summary["success"], "macro_replayed": macro_replayed})
+        await stop_metrics_server()
+        if isinstance(session_service, SqliteSessionService):
+            session_service.close()
+        shutdown_mineflayer()
+
+        run_summary["final_response"] = final_response_text
+        run_summary["event_count"] = event_count
+    return run_summary
+
+
+def shutdown_mineflayer() -> None:
+    """Shuts down the fleet's bridges, the primary bridge and the chunk store, and terminates JSPyBridge."""
+    fleet.shutdown()
+    if mineflayer_bridge_tools.mineflayer_bridge is not None:
+        mineflayer_bridge_tools.mineflayer_bridge.shutdown()
+    if mineflayer_bridge_tools.chunk_store is not None:
+        mineflayer_bridge_tools.chunk_store.close()
+
+    # Attached to a bot daemon, no JSPyBridge was started; the daemon keeps its bot running.
+    if settings.mineflayer_backend == "javascript" and mineflayer_bridge_tools.mineflayer_js_interface is not None:
         try:
             from javascript import terminate
             terminate()
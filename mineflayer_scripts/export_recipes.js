@@ -0,0 +1,55 @@
+// Prints every crafting recipe of a Minecraft version as JSON lines for tools/build_recipe_index.py:
+// {"item", "ingredients": {name: count}, "quantity_produced", "shape", "crafting_table_needed"}
+// Usage: node export_recipes.js <minecraft_version>
+const minecraftData = require('minecraft-data');
+
+const version = process.argv[2];
+if (!version) {
+    console.error('Usage: node export_recipes.js <minecraft_version>');
+    process.exit(2);
+}
+const mcData = minecraftData(version);
+if (!mcData) {
+    console.error(`Unsupported Minecraft version: ${version}`);
+    process.exit(2);
+}
+
+function itemName(ingredient) {
+    if (ingredient === null || ingredient === undefined) return null;
+    const id = typeof ingredient === 'object' ? ingredient.id : ingredient;
+    if (id === null || id === undefined || id < 0) return null;
+    const item = mcData.items[id];
+    return item ? item.name : null;
+}
+
+let exported = 0;
+for (const variants of Object.values(mcData.recipes)) {
+    for (const recipe of variants) {
+        const item = itemName(recipe.result);
+        if (!item) continue;
+        const ingredients = {};
+        const countIngredient = (name) => { if (name) ingredients[name] = (ingredients[name] || 0) + 1; };
+        let shape = null;
+        let cellCount;
+        if (recipe.inShape) {
+            shape = recipe.inShape.map(row => row.map(itemName));
+            shape.flat().forEach(countIngredient);
+        } else {
+            (recipe.ingredients || []).map(itemName).forEach(countIngredient);
+        }
+        cellCount = Object.values(ingredients).reduce((sum, count) => sum + count, 0);
+        if (cellCount === 0) continue;
+        const craftingTableNeeded = shape
+            ? shape.length > 2 || shape.some(row => row.length > 2)
+            : cellCount > 4;
+        process.stdout.write(JSON.stringify({
+            item,
+            ingredients,
+            quantity_produced: (recipe.result && recipe.result.count) || 1,
+            shape,
+            crafting_table_needed: craftingTableNeeded,
+        }) + '\n');
+        exported++;
+    }
+}
+console.error(`Exported ${exported} recipes for Minecraft ${version}`);
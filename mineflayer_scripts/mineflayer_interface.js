@@ -1,375 +1,1164 @@
 const mineflayer = require('mineflayer');
 const mineflayerPathfinder = require('mineflayer-pathfinder');
 var Vec3 = require('vec3').Vec3;
+const { EventEmitter } = require('events');
+const fs = require('fs');
+const net = require('net');
 
-let bot = null;
-let mcData = null;
+// Each interface instance owns one bot and its own event emitter, so several bots can be
+// driven from one Node process. The module itself exposes a default instance.
+function createInterface() {
+  let bot = null;
+  let mcData = null;
 
-async function initializeBot(options) {
-  if (bot && bot.username && bot.entity) {
-    console.log('Mineflayer Bot already initialized and spawned.');
-    return { status: "already_initialized", username: bot.username };
+  // Task completions are emitted as JSON strings so the Python listener never has to
+  // call back into JS (valueOf) from the bridge's event thread.
+  const taskEvents = new EventEmitter();
+
+  // Connections of the batch transport (see startBatchServer). Every event is pushed to them as
+  // well; the payload is already JSON, so it is spliced into the frame without re-encoding.
+  const batchClients = new Set();
+  const emitToListeners = taskEvents.emit.bind(taskEvents);
+  taskEvents.emit = (eventName, payload) => {
+    if (batchClients.size > 0) {
+      const frame = `{"event":${JSON.stringify(eventName)},"payload":${payload}}\n`;
+      for (const client of batchClients) client.write(frame);
+    }
+    return emitToListeners(eventName, payload);
+  };
+
+  // Long-running operations that can still be cancelled, by operationId. Each entry knows how to
+  // stop its own work; operations are removed from the map when they complete.
+  const activeOperations = new Map();
+  // Cancelled operations whose late completion (e.g. the rejected dig) must not be reported again.
+  const cancelledOperations = new Set();
+  const MAX_REMEMBERED_CANCELLATIONS = 1000;
+
+  function trackOperation(operationId, kind, cancel) {
+    activeOperations.set(operationId, { kind, cancel });
   }
 
-  if (bot) {
-    console.log('Cleaning up existing bot instance before re-initialization.');
+  function emitTaskComplete(result) {
+    if (activeOperations.has(result.operationId)) {
+      activeOperations.delete(result.operationId);
+    } else if (cancelledOperations.delete(result.operationId)) {
+      return;
+    }
+    taskEvents.emit('mineflayerTaskComplete', JSON.stringify(result));
+  }
+
+  function cancelOperation(operationId) {
+    const operation = activeOperations.get(operationId);
+    if (!operation) {
+      return { status: "error", operationId, message: `Operation ${operationId} is not active.` };
+    }
+    console.log(`JS: Cancelling ${operation.kind} operation ${operationId}`);
+    activeOperations.delete(operationId);
+    cancelledOperations.add(operationId);
+    if (cancelledOperations.size > MAX_REMEMBERED_CANCELLATIONS) {
+      cancelledOperations.delete(cancelledOperations.values().next().value);
+    }
     try {
-      bot.quit('Re-initializing');
-    } catch (e) {
-      console.warn('Error quitting existing bot instance:', e.message);
+      operation.cancel();
+    } catch (err) {
+      console.warn(`JS: Error while cancelling ${operationId}: ${err.message}`);
     }
-    bot = null;
-    mcData = null;
+    taskEvents.emit('mineflayerTaskComplete', JSON.stringify({ operationId, status: "cancelled", message: `${operation.kind} cancelled.` }));
+    return { status: "success", operationId, message: `${operation.kind} ${operationId} cancelled.` };
   }
 
-  console.log('Creating new Mineflayer bot instance with options:', options);
-  bot = mineflayer.createBot(options);
-  bot.loadPlugin(mineflayerPathfinder.pathfinder);
+  // Block types reported to Python's spatial index on chunk load and block update.
+  let trackedBlockNames = new Set();
+  let trackedStateIds = new Set();
+  let lastReportedPosition = null;
+  // Whether full chunk snapshots and every block change are streamed to Python's chunk store.
+  let chunkSnapshotsEnabled = false;
+
+  async function initializeBot(options) {
+    if (bot && bot.username && bot.entity) {
+      console.log('Mineflayer Bot already initialized and spawned.');
+      return { status: "already_initialized", username: bot.username };
+    }
+
+    if (bot) {
+      console.log('Cleaning up existing bot instance before re-initialization.');
+      try {
+        bot.quit('Re-initializing');
+      } catch (e) {
+        console.warn('Error quitting existing bot instance:', e.message);
+      }
+      bot = null;
+      mcData = null;
+    }
+
+    console.log('Creating new Mineflayer bot instance with options:', options);
+    bot = mineflayer.createBot(options);
+    if (Array.isArray(options.tracked_block_types)) {
+      trackedBlockNames = new Set(options.tracked_block_types);
+    }
+    bot.loadPlugin(mineflayerPathfinder.pathfinder);
 
-  try {
-    await new Promise((resolve, reject) => {
-      let spawned = false;
+    try {
+      await new Promise((resolve, reject) => {
+        let spawned = false;
       
-      const listeners = {
-        loginListener: () => {
-          try {
-            mcData = require('minecraft-data')(bot.version);
-            console.log(`Mineflayer Bot logged in. mcData version: ${bot.version}. Username: ${bot.username}`);
-          } catch (mcDataError) {
-            console.error('Failed to load minecraft-data:', mcDataError);
-            if (!spawned) reject(new Error(`Failed to load minecraft-data: ${mcDataError.message}`));
-          }
-        },
-        spawnListener: () => {
-          spawned = true;
-          console.log(`Mineflayer Bot '${bot.username}' spawned in ADK project.`);
-          bot.removeListener('error', listeners.errorListener);
-          bot.removeListener('kicked', listeners.kickListener);
-          bot.removeListener('login', listeners.loginListener);
+        const listeners = {
+          loginListener: () => {
+            try {
+              mcData = require('minecraft-data')(bot.version);
+              console.log(`Mineflayer Bot logged in. mcData version: ${bot.version}. Username: ${bot.username}`);
+            } catch (mcDataError) {
+              console.error('Failed to load minecraft-data:', mcDataError);
+              if (!spawned) reject(new Error(`Failed to load minecraft-data: ${mcDataError.message}`));
+            }
+          },
+          spawnListener: () => {
+            spawned = true;
+            console.log(`Mineflayer Bot '${bot.username}' spawned in ADK project.`);
+            bot.removeListener('error', listeners.errorListener);
+            bot.removeListener('kicked', listeners.kickListener);
+            bot.removeListener('login', listeners.loginListener);
           
-          bot.on('error', (err) => console.error('Mineflayer Bot Error (post-spawn):', err));
-          bot.on('kicked', (reason) => console.log('Mineflayer Bot Kicked (post-spawn):', reason));
+            bot.on('error', (err) => console.error('Mineflayer Bot Error (post-spawn):', err));
+            bot.on('kicked', (reason) => console.log('Mineflayer Bot Kicked (post-spawn):', reason));
+            attachWorldListeners();
           
-          resolve();
+            resolve();
 
-          // Optional initial teleport
-          if (options.initial_teleport_coords &&
-              Array.isArray(options.initial_teleport_coords) &&
-              options.initial_teleport_coords.length === 3 &&
-              options.initial_teleport_coords.every(coord => typeof coord === 'number')) {
+            // Optional initial teleport
+            if (options.initial_teleport_coords &&
+                Array.isArray(options.initial_teleport_coords) &&
+                options.initial_teleport_coords.length === 3 &&
+                options.initial_teleport_coords.every(coord => typeof coord === 'number')) {
             
-            const [tpX, tpY, tpZ] = options.initial_teleport_coords;
-            console.log(`Teleporting the bot '${bot.username}' to ${tpX} ${tpY} ${tpZ}`);
-            bot.chat(`/tp ${bot.username} ${tpX} ${tpY} ${tpZ}`);
+              const [tpX, tpY, tpZ] = options.initial_teleport_coords;
+              console.log(`Teleporting the bot '${bot.username}' to ${tpX} ${tpY} ${tpZ}`);
+              bot.chat(`/tp ${bot.username} ${tpX} ${tpY} ${tpZ}`);
+            }
+          },
+          errorListener: (err) => {
+            if (!spawned) {
+              console.error('Mineflayer Bot Error (pre-spawn):', err);
+              bot.removeListener('login', listeners.loginListener);
+              bot.removeListener('spawn', listeners.spawnListener);
+              bot.removeListener('kicked', listeners.kickListener);
+              reject(err);
+            }
+          },
+          kickListener: (reason) => {
+            if (!spawned) {
+              console.log('Mineflayer Bot Kicked (pre-spawn):', reason);
+              bot.removeListener('login', listeners.loginListener);
+              bot.removeListener('spawn', listeners.spawnListener);
+              bot.removeListener('error', listeners.errorListener);
+              reject(new Error(String(reason)));
+            }
           }
-        },
-        errorListener: (err) => {
-          if (!spawned) {
-            console.error('Mineflayer Bot Error (pre-spawn):', err);
-            bot.removeListener('login', listeners.loginListener);
-            bot.removeListener('spawn', listeners.spawnListener);
-            bot.removeListener('kicked', listeners.kickListener);
-            reject(err);
+        };
+      
+        bot.once('login', listeners.loginListener);
+        bot.once('spawn', listeners.spawnListener);
+        bot.once('error', listeners.errorListener);
+        bot.once('kicked', listeners.kickListener);
+      });
+
+      return { status: "success", username: bot.username, message: "Mineflayer bot initialized and spawned." };
+
+    } catch (error) {
+      console.error('Failed to initialize Mineflayer bot (outer promise catch):', error);
+      if (bot) {
+          try { bot.quit('Initialization failed'); } catch (e) { /* ignore */ }
+          bot = null;
+          mcData = null;
+      }
+      const errorMessage = error && error.message ? error.message : "Unknown error during initialization.";
+      return { status: "error", message: errorMessage };
+    }
+  }
+
+  function refreshTrackedStateIds() {
+    trackedStateIds = new Set();
+    if (!bot || !bot.registry) return;
+    for (const name of trackedBlockNames) {
+      const blockType = bot.registry.blocksByName[name];
+      if (!blockType) continue;
+      for (let stateId = blockType.minStateId; stateId <= blockType.maxStateId; stateId++) {
+        trackedStateIds.add(stateId);
+      }
+    }
+  }
+
+  // Whether a chunk section may contain a tracked block, judged from its palette without reading
+  // blocks: the legacy section palette, the indirect palette of a 1.18+ section, or the single value of
+  // a uniform section. Missing sections are empty; sections without a palette have to be scanned.
+  function sectionMayHoldTracked(column, sectionIndex) {
+    if (!Array.isArray(column.sections)) return true;
+    const section = column.sections[sectionIndex];
+    if (!section) return false;
+    let palette = null;
+    if (Array.isArray(section.palette)) palette = section.palette;
+    else if (section.data && Array.isArray(section.data.palette)) palette = section.data.palette;
+    else if (section.data && typeof section.data.value === 'number') palette = [section.data.value];
+    return palette === null || palette.some(stateId => trackedStateIds.has(stateId));
+  }
+
+  function scanChunkColumn(chunkX, chunkZ) {
+    const column = bot.world.getColumn(chunkX, chunkZ);
+    if (!column) return null;
+    const minY = bot.game.minY ?? 0;
+    const maxY = minY + (bot.game.height ?? 256);
+    const columnMinY = column.minY ?? minY;
+    const blocks = [];
+    const pos = new Vec3(0, 0, 0);
+    for (let sectionY = minY; sectionY < maxY; sectionY += 16) {
+      if (!sectionMayHoldTracked(column, (sectionY - columnMinY) >> 4)) continue;
+      for (let y = sectionY; y < Math.min(sectionY + 16, maxY); y++) {
+        pos.y = y;
+        for (let lz = 0; lz < 16; lz++) {
+          pos.z = lz;
+          for (let lx = 0; lx < 16; lx++) {
+            pos.x = lx;
+            const stateId = column.getBlockStateId(pos);
+            if (trackedStateIds.has(stateId)) {
+              blocks.push([bot.registry.blocksByStateId[stateId].name, chunkX * 16 + lx, y, chunkZ * 16 + lz]);
+            }
           }
-        },
-        kickListener: (reason) => {
-          if (!spawned) {
-            console.log('Mineflayer Bot Kicked (pre-spawn):', reason);
-            bot.removeListener('login', listeners.loginListener);
-            bot.removeListener('spawn', listeners.spawnListener);
-            bot.removeListener('error', listeners.errorListener);
-            reject(new Error(String(reason)));
+        }
+      }
+    }
+    return blocks;
+  }
+
+  function emitChunkBlocks(chunkX, chunkZ) {
+    if (trackedStateIds.size === 0) return;
+    const blocks = scanChunkColumn(chunkX, chunkZ);
+    if (blocks === null) return;
+    taskEvents.emit('mineflayerChunkBlocks', JSON.stringify({ chunkX, chunkZ, blocks }));
+  }
+
+  // Snapshot of a whole chunk column: a palette of block names and one uint16 palette index per
+  // block in (y, z, x) order, little-endian and base64-encoded.
+  function emitChunkSnapshot(chunkX, chunkZ) {
+    const column = bot.world.getColumn(chunkX, chunkZ);
+    if (!column) return false;
+    const minY = bot.game.minY ?? 0;
+    const height = bot.game.height ?? 256;
+    const indices = new Uint16Array(height * 256);
+    const palette = [];
+    const paletteIndexByStateId = new Map();
+    const pos = new Vec3(0, 0, 0);
+    let offset = 0;
+    for (let y = minY; y < minY + height; y++) {
+      pos.y = y;
+      for (let lz = 0; lz < 16; lz++) {
+        pos.z = lz;
+        for (let lx = 0; lx < 16; lx++) {
+          pos.x = lx;
+          const stateId = column.getBlockStateId(pos);
+          let index = paletteIndexByStateId.get(stateId);
+          if (index === undefined) {
+            const name = bot.registry.blocksByStateId[stateId]?.name ?? 'air';
+            index = palette.indexOf(name);
+            if (index === -1) {
+              index = palette.length;
+              palette.push(name);
+            }
+            paletteIndexByStateId.set(stateId, index);
           }
+          indices[offset++] = index;
         }
-      };
-      
-      bot.once('login', listeners.loginListener);
-      bot.once('spawn', listeners.spawnListener);
-      bot.once('error', listeners.errorListener);
-      bot.once('kicked', listeners.kickListener);
+      }
+    }
+    const data = Buffer.from(indices.buffer, indices.byteOffset, indices.byteLength).toString('base64');
+    taskEvents.emit('mineflayerChunkSnapshot', JSON.stringify({ chunkX, chunkZ, minY, height, palette, data }));
+    return true;
+  }
+
+  function emitBotPosition(force = false) {
+    if (!bot || !bot.entity) return;
+    const position = bot.entity.position;
+    if (!force && lastReportedPosition && lastReportedPosition.distanceTo(position) < 1) return;
+    lastReportedPosition = position.clone();
+    taskEvents.emit('mineflayerBotPosition', JSON.stringify({ x: position.x, y: position.y, z: position.z }));
+  }
+
+  function isMainInventorySlot(slot) {
+    return slot >= bot.inventory.inventoryStart && slot < bot.inventory.inventoryEnd;
+  }
+
+  function emitInventorySnapshot() {
+    const slots = bot.inventory.items().map(item => ({ slot: item.slot, name: item.name, count: item.count, type: item.type }));
+    taskEvents.emit('mineflayerInventorySnapshot', JSON.stringify({ slots }));
+  }
+
+  function attachWorldListeners() {
+    refreshTrackedStateIds();
+    bot.on('chunkColumnLoad', (point) => {
+      emitChunkBlocks(point.x >> 4, point.z >> 4);
+      if (chunkSnapshotsEnabled) emitChunkSnapshot(point.x >> 4, point.z >> 4);
+    });
+    bot.on('blockUpdate', (oldBlock, newBlock) => {
+      if (!oldBlock || !newBlock || oldBlock.stateId !== newBlock.stateId) {
+        invalidateRoutesAt((newBlock || oldBlock).position);
+      }
+      if (chunkSnapshotsEnabled) {
+        const changed = (newBlock || oldBlock).position;
+        taskEvents.emit('mineflayerChunkBlockChange', JSON.stringify({
+          x: changed.x, y: changed.y, z: changed.z, name: newBlock ? newBlock.name : 'air'
+        }));
+      }
+      const oldTracked = oldBlock && trackedStateIds.has(oldBlock.stateId);
+      const newTracked = newBlock && trackedStateIds.has(newBlock.stateId);
+      if (!oldTracked && !newTracked) return;
+      const position = (newBlock || oldBlock).position;
+      taskEvents.emit('mineflayerBlockUpdate', JSON.stringify({
+        x: position.x, y: position.y, z: position.z,
+        old_name: oldTracked ? oldBlock.name : null,
+        new_name: newTracked ? newBlock.name : null
+      }));
     });
+    bot.on('move', () => emitBotPosition());
+    bot.inventory.on('updateSlot', (slot, oldItem, newItem) => {
+      if (!isMainInventorySlot(slot)) return;
+      taskEvents.emit('mineflayerInventorySlot', JSON.stringify({
+        slot,
+        name: newItem ? newItem.name : null,
+        count: newItem ? newItem.count : 0,
+        type: newItem ? newItem.type : -1
+      }));
+    });
+    emitBotPosition(true);
+    emitInventorySnapshot();
+  }
+
+  function setTrackedBlockTypes(blockTypeNames) {
+    if (!bot || !bot.registry) return { status: "error", message: "Bot not initialized or registry not available." };
+    trackedBlockNames = new Set(blockTypeNames);
+    refreshTrackedStateIds();
+    let chunkCount = 0;
+    for (const { chunkX, chunkZ } of bot.world.getColumns()) {
+      emitChunkBlocks(chunkX, chunkZ);
+      chunkCount++;
+    }
+    return { status: "success", message: `Tracking ${trackedBlockNames.size} block types; rescanned ${chunkCount} loaded chunks.` };
+  }
 
-    return { status: "success", username: bot.username, message: "Mineflayer bot initialized and spawned." };
+  function setChunkSnapshots(enabled) {
+    if (!bot || !bot.registry) return { status: "error", message: "Bot not initialized or registry not available." };
+    chunkSnapshotsEnabled = Boolean(enabled);
+    if (!chunkSnapshotsEnabled) return { status: "success", message: "Chunk snapshots disabled." };
+    let chunkCount = 0;
+    for (const { chunkX, chunkZ } of bot.world.getColumns()) {
+      if (emitChunkSnapshot(chunkX, chunkZ)) chunkCount++;
+    }
+    return { status: "success", message: `Chunk snapshots enabled; sent ${chunkCount} loaded chunks.` };
+  }
 
-  } catch (error) {
-    console.error('Failed to initialize Mineflayer bot (outer promise catch):', error);
-    if (bot) {
-        try { bot.quit('Initialization failed'); } catch (e) { /* ignore */ }
-        bot = null;
-        mcData = null;
+  // Re-sends the world state a newly attached client mirrors (position, inventory, tracked blocks
+  // of the loaded chunks and, if enabled, chunk snapshots), e.g. after attaching to a bot daemon.
+  function resyncWorldState(blockTypeNames) {
+    if (!bot || !bot.registry) return { status: "error", message: "Bot not initialized or registry not available." };
+    if (Array.isArray(blockTypeNames)) {
+      trackedBlockNames = new Set(blockTypeNames);
+      refreshTrackedStateIds();
     }
-    const errorMessage = error && error.message ? error.message : "Unknown error during initialization.";
-    return { status: "error", message: errorMessage };
+    emitBotPosition(true);
+    emitInventorySnapshot();
+    let chunkCount = 0;
+    for (const { chunkX, chunkZ } of bot.world.getColumns()) {
+      emitChunkBlocks(chunkX, chunkZ);
+      if (chunkSnapshotsEnabled) emitChunkSnapshot(chunkX, chunkZ);
+      chunkCount++;
+    }
+    return { status: "success", message: `Resent position, inventory and ${chunkCount} loaded chunks.` };
   }
-}
 
-async function goToXYZ(x, y, z, operationId) {
-  if (!bot || !bot.pathfinder) {
-    return { operationId, status: "error", message: "Bot not initialized or pathfinder not loaded." };
+  // Only one navigation can drive the pathfinder at a time; a newer goal preempts the active one.
+  let activeNavigation = null;
+  const NAVIGATION_PROGRESS_INTERVAL_MS = 1000;
+  const DEFAULT_WALK_SPEED_BLOCKS_PER_S = 4.3;
+  const DEFAULT_NAVIGATION_TIMEOUT_MS = 120000; // Whole operation (path calc + travel) on an unknown route
+  const DEFAULT_THINK_TIMEOUT_MS = 60000; // A* path calculation on an unknown route
+
+  // Route cache: trips that succeeded before, keyed by the start (quantized to ROUTE_START_QUANTUM
+  // blocks) and the exact goal. A cached route is replayed as short hops between the waypoints the
+  // bot actually walked, each a local search with a small think timeout, instead of one full A*.
+  // A route is dropped as soon as a block it passed through changes. Travel times per key outlive
+  // their route and set the overall timeout of later trips, so a stuck bot fails fast.
+  const ROUTE_START_QUANTUM = 4;
+  const ROUTE_CACHE_MAX_ROUTES = 256;
+  const ROUTE_WAYPOINT_SPACING = 4;
+  const ROUTE_WAYPOINT_REACH = 1;
+  const CACHED_HOP_THINK_TIMEOUT_MS = 2000;
+  const ROUTE_TIMEOUT_FACTOR = 3;
+  const ROUTE_TIMEOUT_SLACK_MS = 5000;
+  const ROUTE_MIN_TIMEOUT_MS = 10000;
+  const TRAVEL_TIME_SMOOTHING = 0.3;
+  const routes = new Map(); // routeKey -> { waypoints: [{x, y, z}], cells: [cellKey] }
+  const routesByCell = new Map(); // cellKey -> Set of routeKeys passing through it
+  const travelTimes = new Map(); // routeKey -> { trips, meanMs, maxMs }
+
+  const cellKey = (x, y, z) => `${x},${y},${z}`;
+
+  function routeKey(start, goalKey) {
+    const q = (value) => Math.floor(value / ROUTE_START_QUANTUM);
+    return `${q(start.x)},${q(start.y)},${q(start.z)}>${goalKey}`;
+  }
+
+  function forgetRoute(key) {
+    const route = routes.get(key);
+    if (!route) return;
+    routes.delete(key);
+    for (const cell of route.cells) {
+      const keys = routesByCell.get(cell);
+      if (!keys) continue;
+      keys.delete(key);
+      if (keys.size === 0) routesByCell.delete(cell);
+    }
   }
-  if (!bot.registry) {
-    return { operationId, status: "error", message: "bot.registry not available (mcData not loaded)." };
+
+  function rememberRoute(key, waypoints, visited) {
+    forgetRoute(key);
+    if (routes.size >= ROUTE_CACHE_MAX_ROUTES) forgetRoute(routes.keys().next().value);
+    const cells = new Set();
+    for (const cell of visited) {
+      const [x, y, z] = cell.split(',').map(Number);
+      for (let dy = -1; dy <= 1; dy++) cells.add(cellKey(x, y + dy, z));
+    }
+    routes.set(key, { waypoints, cells: [...cells] });
+    for (const cell of cells) {
+      if (!routesByCell.has(cell)) routesByCell.set(cell, new Set());
+      routesByCell.get(cell).add(key);
+    }
   }
 
-  console.log(`JS: goToXYZ(${x}, ${y}, ${z}) called with operationId: ${operationId}`);
+  function invalidateRoutesAt(position) {
+    const keys = routesByCell.get(cellKey(position.x, position.y, position.z));
+    if (!keys) return;
+    for (const key of [...keys]) forgetRoute(key);
+  }
 
-  const goal = new mineflayerPathfinder.goals.GoalBlock(x, y, z);
+  function recordTravelTime(key, elapsedMs) {
+    const stats = travelTimes.get(key);
+    if (!stats) {
+      travelTimes.set(key, { trips: 1, meanMs: elapsedMs, maxMs: elapsedMs });
+      return;
+    }
+    stats.trips += 1;
+    stats.meanMs += TRAVEL_TIME_SMOOTHING * (elapsedMs - stats.meanMs);
+    stats.maxMs = Math.max(stats.maxMs, elapsedMs);
+  }
 
-  let originalThinkTimeout;
-  const overallNavigationTimeoutMs = 120000; // 2 minutes for the whole operation (path calc + travel)
-  const pathCalculationTimeoutToSet = 60000; // 60 seconds for A* path calculation
+  function navigationTimeoutMs(key) {
+    const stats = travelTimes.get(key);
+    if (!stats) return DEFAULT_NAVIGATION_TIMEOUT_MS;
+    const expectedMs = Math.max(stats.meanMs * ROUTE_TIMEOUT_FACTOR, stats.maxMs * 1.5) + ROUTE_TIMEOUT_SLACK_MS;
+    return Math.min(DEFAULT_NAVIGATION_TIMEOUT_MS, Math.max(ROUTE_MIN_TIMEOUT_MS, expectedMs));
+  }
 
-  return new Promise(async (resolve, reject) => {
-    const navigationTimeoutId = setTimeout(() => {
-      bot.pathfinder.stop();
-      console.error(`JS: Overall navigation timeout for operationId ${operationId} (goal ${x},${y},${z}) after ${overallNavigationTimeoutMs / 1000}s`);
-      const timeoutErrorResult = { operationId, status: "error", message: `Overall navigation timed out for goal ${x},${y},${z}` };
-      if (global.python) global.python.emit('mineflayerTaskComplete', timeoutErrorResult);
-      reject(timeoutErrorResult);
-    }, overallNavigationTimeoutMs);
+  function emitTaskProgress(progress) {
+    taskEvents.emit('mineflayerTaskProgress', JSON.stringify(progress));
+  }
 
-    try {
-      if (bot.pathfinder.thinkTimeout !== undefined) {
-        originalThinkTimeout = bot.pathfinder.thinkTimeout;
-        bot.pathfinder.thinkTimeout = pathCalculationTimeoutToSet;
-        console.log(`JS: Temporarily set pathfinder.thinkTimeout to ${pathCalculationTimeoutToSet}ms for operationId ${operationId}`);
+  function goToXYZ(x, y, z, operationId) {
+    if (!bot || !bot.pathfinder) {
+      const errorResult = { operationId, status: "error", message: "Bot not initialized or pathfinder not loaded." };
+      emitTaskComplete(errorResult);
+      return errorResult;
+    }
+    console.log(`JS: goToXYZ(${x}, ${y}, ${z}) called with operationId: ${operationId}`);
+    return startNavigation(new mineflayerPathfinder.goals.GoalBlock(x, y, z), `block:${x},${y},${z}`, x, y, z, operationId);
+  }
+
+  function goToNear(x, y, z, range, operationId) {
+    if (!bot || !bot.pathfinder) {
+      const errorResult = { operationId, status: "error", message: "Bot not initialized or pathfinder not loaded." };
+      emitTaskComplete(errorResult);
+      return errorResult;
+    }
+    console.log(`JS: goToNear(${x}, ${y}, ${z}, range ${range}) called with operationId: ${operationId}`);
+    return startNavigation(new mineflayerPathfinder.goals.GoalNear(x, y, z, range), `near:${x},${y},${z},${range}`, x, y, z, operationId);
+  }
+
+  async function followRoute(route, goal, isFinished) {
+    // Start at the waypoint nearest to the bot; the start was only matched to ROUTE_START_QUANTUM blocks.
+    const distanceFromBot = (waypoint) => bot.entity.position.distanceTo(new Vec3(waypoint.x, waypoint.y, waypoint.z));
+    let first = 0;
+    route.waypoints.forEach((waypoint, index) => {
+      if (distanceFromBot(waypoint) < distanceFromBot(route.waypoints[first])) first = index;
+    });
+    for (const waypoint of route.waypoints.slice(first)) {
+      if (isFinished()) return;
+      await bot.pathfinder.goto(new mineflayerPathfinder.goals.GoalNear(waypoint.x, waypoint.y, waypoint.z, ROUTE_WAYPOINT_REACH));
+    }
+    if (!isFinished()) await bot.pathfinder.goto(goal);
+  }
+
+  function startNavigation(goal, goalKey, x, y, z, operationId) {
+    if (!bot.registry) {
+      const errorResult = { operationId, status: "error", message: "bot.registry not available (mcData not loaded)." };
+      emitTaskComplete(errorResult);
+      return errorResult;
+    }
+
+    if (activeNavigation) {
+      console.log(`JS: Navigation ${activeNavigation.operationId} preempted by ${operationId}`);
+      activeNavigation.finish({
+        operationId: activeNavigation.operationId,
+        status: "error",
+        preempted: true,
+        message: `Navigation preempted by a newer goal (operationId ${operationId}).`
+      });
+    }
+
+    const target = new Vec3(x, y, z);
+    const startPosition = bot.entity.position.clone();
+    const key = routeKey(startPosition, goalKey);
+    const cachedRoute = routes.get(key);
+    const overallNavigationTimeoutMs = navigationTimeoutMs(key);
+    const pathCalculationTimeoutToSet = cachedRoute ? CACHED_HOP_THINK_TIMEOUT_MS : DEFAULT_THINK_TIMEOUT_MS;
+    const startedAt = Date.now();
+    const startDistance = startPosition.distanceTo(target);
+
+    let originalThinkTimeout;
+    let replans = 0;
+    let finished = false;
+    let routeCached = Boolean(cachedRoute);
+    // Blocks the bot passed through and waypoints every ROUTE_WAYPOINT_SPACING blocks, for the route cache.
+    const visited = new Set();
+    const waypoints = [];
+
+    const onPathUpdate = (results) => {
+      replans += 1;
+      if (results.status === 'noPath' || results.status === 'timeout') {
+        console.log(`JS: Path update for operationId ${operationId}: ${results.status}`);
       }
+    };
 
-      await bot.pathfinder.goto(goal);
+    const onMove = () => {
+      const position = bot.entity.position.floored();
+      visited.add(cellKey(position.x, position.y, position.z));
+      const last = waypoints[waypoints.length - 1];
+      if (!last || position.distanceTo(new Vec3(last.x, last.y, last.z)) >= ROUTE_WAYPOINT_SPACING) {
+        waypoints.push({ x: position.x, y: position.y, z: position.z });
+      }
+    };
 
-      clearTimeout(navigationTimeoutId);
-      console.log(`JS: Reached goal for operationId ${operationId}: ${x}, ${y}, ${z}`);
-      const successResult = { operationId, status: "success", message: `Reached goal: ${x}, ${y}, ${z}` };
-      if (global.python) global.python.emit('mineflayerTaskComplete', successResult);
-      resolve(successResult);
+    const emitProgress = () => {
+      const elapsedSeconds = (Date.now() - startedAt) / 1000;
+      const remainingDistance = bot.entity.position.distanceTo(target);
+      const covered = Math.max(0, startDistance - remainingDistance);
+      const speed = elapsedSeconds > 1 && covered > 0 ? covered / elapsedSeconds : DEFAULT_WALK_SPEED_BLOCKS_PER_S;
+      emitTaskProgress({
+        operationId,
+        remaining_distance: Number(remainingDistance.toFixed(2)),
+        replans: Math.max(0, replans - 1),
+        eta_seconds: Number((remainingDistance / speed).toFixed(1)),
+        elapsed_seconds: Number(elapsedSeconds.toFixed(1))
+      });
+    };
 
-    } catch (err) {
-      clearTimeout(navigationTimeoutId);
-      console.error(`JS: pathfinder.goto error for operationId ${operationId} (goal ${x},${y},${z}): ${err.message || String(err)}`);
-      const errorResult = { operationId, status: "error", message: `Pathfinding error: ${String(err.message || err)}` };
-      if (global.python) global.python.emit('mineflayerTaskComplete', errorResult);
-      reject(errorResult);
-
-    } finally {
-      if (originalThinkTimeout !== undefined) {
-        bot.pathfinder.thinkTimeout = originalThinkTimeout;
-        console.log(`JS: Restored pathfinder.thinkTimeout to ${originalThinkTimeout}ms for operationId ${operationId}`);
+    const navigation = {
+      operationId,
+      goal: { x, y, z },
+      finish: (result) => {
+        if (finished) return;
+        finished = true;
+        clearTimeout(navigationTimeoutId);
+        clearInterval(progressIntervalId);
+        bot.removeListener('path_update', onPathUpdate);
+        bot.removeListener('move', onMove);
+        if (originalThinkTimeout !== undefined) {
+          bot.pathfinder.thinkTimeout = originalThinkTimeout;
+        }
+        if (activeNavigation === navigation) {
+          activeNavigation = null;
+          bot.pathfinder.stop();
+        }
+        const elapsedMs = Date.now() - startedAt;
+        if (result.status === "success") {
+          recordTravelTime(key, elapsedMs);
+          if (!routeCached && waypoints.length > 0) rememberRoute(key, waypoints, visited);
+        }
+        emitTaskComplete({
+          ...result,
+          replans: Math.max(0, replans - 1),
+          elapsed_seconds: elapsedMs / 1000,
+          route_cached: routeCached,
+          start: { x: startPosition.x, y: startPosition.y, z: startPosition.z },
+          goal: { x, y, z }
+        });
       }
+    };
+
+    const navigationTimeoutId = setTimeout(() => {
+      console.error(`JS: Overall navigation timeout for operationId ${operationId} (goal ${x},${y},${z}) after ${overallNavigationTimeoutMs / 1000}s`);
+      if (routeCached) forgetRoute(key);
+      navigation.finish({ operationId, status: "error", message: `Overall navigation timed out for goal ${x},${y},${z} after ${overallNavigationTimeoutMs / 1000}s` });
+    }, overallNavigationTimeoutMs);
+    const progressIntervalId = setInterval(emitProgress, NAVIGATION_PROGRESS_INTERVAL_MS);
+
+    if (bot.pathfinder.thinkTimeout !== undefined) {
+      originalThinkTimeout = bot.pathfinder.thinkTimeout;
+      bot.pathfinder.thinkTimeout = pathCalculationTimeoutToSet;
     }
-  });
-}
+    bot.on('path_update', onPathUpdate);
+    bot.on('move', onMove);
+    activeNavigation = navigation;
+    trackOperation(operationId, "Navigation", () => navigation.finish({ operationId, status: "cancelled", message: "Navigation cancelled." }));
 
-function findBlock(blockTypeName, maxDistance = 64, count = 1) {
-  if (!bot || !bot.registry) return { status: "error", message: "Bot not initialized or registry not available." };
-  const block = bot.findBlock({
-    matching: bot.registry.blocksByName[blockTypeName]?.id,
-    maxDistance: maxDistance,
-    count: count
-  });
-  if (block) {
-    return { status: "success", location: { x: block.position.x, y: block.position.y, z: block.position.z } };
-  }
-  return { status: "error", message: `${blockTypeName} not found within ${maxDistance} blocks.` };
-}
+    const travel = cachedRoute
+      ? followRoute(cachedRoute, goal, () => finished).catch((err) => {
+          if (finished) throw err;
+          // The cached route no longer works: drop it and plan the rest of the way with a full search.
+          console.log(`JS: Cached route for operationId ${operationId} failed (${err.message || String(err)}); replanning.`);
+          forgetRoute(key);
+          routeCached = false;
+          if (originalThinkTimeout !== undefined) bot.pathfinder.thinkTimeout = DEFAULT_THINK_TIMEOUT_MS;
+          return bot.pathfinder.goto(goal);
+        })
+      : bot.pathfinder.goto(goal);
+
+    travel
+      .then(() => {
+        console.log(`JS: Reached goal for operationId ${operationId}: ${x}, ${y}, ${z}`);
+        navigation.finish({ operationId, status: "success", message: `Reached goal: ${x}, ${y}, ${z}` });
+      })
+      .catch((err) => {
+        if (finished) return; // Already cancelled, preempted or timed out.
+        console.error(`JS: pathfinder.goto error for operationId ${operationId} (goal ${x},${y},${z}): ${err.message || String(err)}`);
+        navigation.finish({ operationId, status: "error", message: `Pathfinding error: ${String(err.message || err)}` });
+      });
 
-async function mineBlock(blockTypeName, x, y, z, operationId) {
-  if (!bot) {
-    const errorResult = { operationId, status: "error", message: "Bot not initialized." };
-    if (global.python) global.python.emit('mineflayerTaskComplete', errorResult);
-    return errorResult;
+    const routeNote = cachedRoute ? ", following a cached route" : "";
+    return { status: "pending", operationId, message: `Navigation to (${x},${y},${z}) initiated, ${startDistance.toFixed(1)} blocks away${routeNote}.` };
   }
-  console.log(`JS: mineBlock(${blockTypeName}, ${x},${y},${z}) called with operationId: ${operationId}`);
 
-  if (bot.targetDigBlock) {
-    const busyMessage = `Bot is already digging ${bot.targetDigBlock.name}. Cannot start new dig operation.`;
-    console.log(`JS: ${busyMessage} for operationId ${operationId}`);
-    const errorResult = { operationId, status: "error", message: busyMessage };
-    if (global.python) global.python.emit('mineflayerTaskComplete', errorResult);
-    return errorResult;
+  function cancelNavigation(operationId = null) {
+    if (!activeNavigation || (operationId && activeNavigation.operationId !== operationId)) {
+      return { status: "error", message: operationId ? `Navigation ${operationId} is not active.` : "No active navigation." };
+    }
+    const cancelledId = activeNavigation.operationId;
+    console.log(`JS: Cancelling navigation ${cancelledId}`);
+    activeNavigation.finish({ operationId: cancelledId, status: "cancelled", message: "Navigation cancelled." });
+    return { status: "success", operationId: cancelledId, message: `Navigation ${cancelledId} cancelled.` };
   }
 
-  const targetBlock = bot.blockAt(new Vec3(x, y, z));
-  if (!targetBlock) {
-    const errorMsg = `No block found at ${x},${y},${z}.`;
-    console.log(`JS: ${errorMsg} for operationId ${operationId}`);
-    const errorResult = { operationId, status: "error", message: errorMsg };
-    if (global.python) global.python.emit('mineflayerTaskComplete', errorResult);
-    return errorResult;
+  function findBlock(blockTypeName, maxDistance = 64, count = 1) {
+    if (!bot || !bot.registry) return { status: "error", message: "Bot not initialized or registry not available." };
+    const block = bot.findBlock({
+      matching: bot.registry.blocksByName[blockTypeName]?.id,
+      maxDistance: maxDistance,
+      count: count
+    });
+    if (block) {
+      return { status: "success", location: { x: block.position.x, y: block.position.y, z: block.position.z } };
+    }
+    return { status: "error", message: `${blockTypeName} not found within ${maxDistance} blocks.` };
   }
-  
-  if (targetBlock.name !== blockTypeName) {
-    const errorMsg = `Block at ${x},${y},${z} is ${targetBlock.name}, not ${blockTypeName}.`;
-    console.log(`JS: ${errorMsg} for operationId ${operationId}`);
-    const errorResult = { operationId, status: "error", message: errorMsg };
-    if (global.python) global.python.emit('mineflayerTaskComplete', errorResult);
-    return errorResult;
+
+  function findBlocks(blockTypeName, maxDistance = 64, count = 16) {
+    if (!bot || !bot.registry || !bot.entity) return { status: "error", message: "Bot not initialized or registry not available." };
+    const blockType = bot.registry.blocksByName[blockTypeName];
+    if (!blockType) return { status: "error", message: `Unknown block type: ${blockTypeName}` };
+    const positions = bot.findBlocks({ matching: blockType.id, maxDistance: maxDistance, count: count });
+    const origin = bot.entity.position.floored();
+    return {
+      status: positions.length > 0 ? "success" : "error",
+      origin: { x: origin.x, y: origin.y, z: origin.z },
+      locations: positions.map(p => ({ x: p.x, y: p.y, z: p.z })),
+      message: positions.length > 0 ? undefined : `${blockTypeName} not found within ${maxDistance} blocks.`
+    };
   }
 
-  if (!bot.canDigBlock(targetBlock)) {
-    const errorMsg = `Cannot dig ${blockTypeName} at ${x},${y},${z}. Might need a better tool or allow break time.`;
-    console.log(`JS: ${errorMsg} for operationId ${operationId}`);
-    const errorResult = { operationId, status: "error", message: errorMsg };
-    if (global.python) global.python.emit('mineflayerTaskComplete', errorResult);
-    return errorResult;
+  // One scan for several block types. Matches are returned as a flat array of
+  // [typeIndex, x, y, z, ...] rows (typeIndex into `types`), at most countPerType per type.
+  function findBlocksMulti(blockTypeNames, maxDistance = 64, countPerType = 256) {
+    if (!bot || !bot.registry || !bot.entity) return { status: "error", message: "Bot not initialized or registry not available." };
+    const types = [];
+    const typeIndexById = new Map();
+    const unknown = [];
+    for (const name of blockTypeNames) {
+      const blockType = bot.registry.blocksByName[name];
+      if (!blockType) {
+        unknown.push(name);
+      } else if (!typeIndexById.has(blockType.id)) {
+        typeIndexById.set(blockType.id, types.length);
+        types.push(name);
+      }
+    }
+    const origin = bot.entity.position.floored();
+    const blocks = [];
+    if (types.length > 0) {
+      const positions = bot.findBlocks({
+        matching: [...typeIndexById.keys()],
+        maxDistance: maxDistance,
+        count: countPerType * types.length,
+      });
+      const perType = new Array(types.length).fill(0);
+      for (const position of positions) {
+        const block = bot.blockAt(position);
+        const typeIndex = block ? typeIndexById.get(block.type) : undefined;
+        if (typeIndex === undefined || perType[typeIndex] >= countPerType) continue;
+        perType[typeIndex]++;
+        blocks.push(typeIndex, position.x, position.y, position.z);
+      }
+    }
+    return {
+      status: types.length > 0 ? "success" : "error",
+      origin: { x: origin.x, y: origin.y, z: origin.z },
+      types,
+      blocks,
+      message: unknown.length > 0 ? `Unknown block types: ${unknown.join(', ')}` : undefined
+    };
   }
 
-  (async () => {
-    try {
-      console.log(`JS: Starting to dig ${targetBlock.name} at ${x},${y},${z} for operationId ${operationId}`);
-      await bot.dig(targetBlock);
-      console.log(`JS: Successfully mined ${targetBlock.name} at ${x},${y},${z} for operationId ${operationId}`);
-      if (global.python) {
-        global.python.emit('mineflayerTaskComplete', {
+  async function mineBlock(blockTypeName, x, y, z, operationId) {
+    if (!bot) {
+      const errorResult = { operationId, status: "error", message: "Bot not initialized." };
+      emitTaskComplete(errorResult);
+      return errorResult;
+    }
+    console.log(`JS: mineBlock(${blockTypeName}, ${x},${y},${z}) called with operationId: ${operationId}`);
+
+    if (bot.targetDigBlock) {
+      const busyMessage = `Bot is already digging ${bot.targetDigBlock.name}. Cannot start new dig operation.`;
+      console.log(`JS: ${busyMessage} for operationId ${operationId}`);
+      const errorResult = { operationId, status: "error", message: busyMessage };
+      emitTaskComplete(errorResult);
+      return errorResult;
+    }
+
+    const targetBlock = bot.blockAt(new Vec3(x, y, z));
+    if (!targetBlock) {
+      const errorMsg = `No block found at ${x},${y},${z}.`;
+      console.log(`JS: ${errorMsg} for operationId ${operationId}`);
+      const errorResult = { operationId, status: "error", message: errorMsg };
+      emitTaskComplete(errorResult);
+      return errorResult;
+    }
+  
+    if (targetBlock.name !== blockTypeName) {
+      const errorMsg = `Block at ${x},${y},${z} is ${targetBlock.name}, not ${blockTypeName}.`;
+      console.log(`JS: ${errorMsg} for operationId ${operationId}`);
+      const errorResult = { operationId, status: "error", message: errorMsg };
+      emitTaskComplete(errorResult);
+      return errorResult;
+    }
+
+    if (!bot.canDigBlock(targetBlock)) {
+      const errorMsg = `Cannot dig ${blockTypeName} at ${x},${y},${z}. Might need a better tool or allow break time.`;
+      console.log(`JS: ${errorMsg} for operationId ${operationId}`);
+      const errorResult = { operationId, status: "error", message: errorMsg };
+      emitTaskComplete(errorResult);
+      return errorResult;
+    }
+
+    // Stopping the dig rejects bot.dig(); that late completion is suppressed by cancelOperation.
+    trackOperation(operationId, "Mining", () => bot.stopDigging());
+    (async () => {
+      try {
+        console.log(`JS: Starting to dig ${targetBlock.name} at ${x},${y},${z} for operationId ${operationId}`);
+        await bot.dig(targetBlock);
+        console.log(`JS: Successfully mined ${targetBlock.name} at ${x},${y},${z} for operationId ${operationId}`);
+        emitTaskComplete({
           operationId,
           status: "success",
           collected_item: targetBlock.name,
           message: `Successfully mined ${targetBlock.name}`
         });
-      }
-    } catch (err) {
-      console.error(`JS: Mining failed for ${targetBlock.name} at ${x},${y},${z} for operationId ${operationId}: ${err.message}`);
-      console.error(err.stack);
-      if (global.python) {
-        global.python.emit('mineflayerTaskComplete', {
+      } catch (err) {
+        console.error(`JS: Mining failed for ${targetBlock.name} at ${x},${y},${z} for operationId ${operationId}: ${err.message}`);
+        console.error(err.stack);
+        emitTaskComplete({
           operationId,
           status: "error",
           message: `Mining failed: ${err.message}`
         });
       }
-    }
-  })();
+    })();
 
-  return { status: "pending", operationId: operationId, message: `Mining of ${blockTypeName} at (${x},${y},${z}) initiated.` };
-}
+    return { status: "pending", operationId: operationId, message: `Mining of ${blockTypeName} at (${x},${y},${z}) initiated.` };
+  }
 
-function getInventory() {
-    if (!bot || !bot.inventory) return { status: "error", message: "Bot not initialized or inventory not available." };
-    const items = bot.inventory.items().map(item => ({ name: item.name, count: item.count, type: item.type }));
-    return { status: "success", inventory: items };
-}
+  function getInventory() {
+      if (!bot || !bot.inventory) return { status: "error", message: "Bot not initialized or inventory not available." };
+      const items = bot.inventory.items().map(item => ({ name: item.name, count: item.count, type: item.type }));
+      return { status: "success", inventory: items };
+  }
 
-async function craftItem(itemName, quantity, recipeShape, ingredients, craftingTableNeeded, operationId) {
-    if (!bot || !bot.registry) {
-        const errorResult = { operationId, status: "error", message: "Bot not initialized or bot.registry not available." };
-        if (global.python) global.python.emit('mineflayerTaskComplete', errorResult);
-        return errorResult;
-    }
-    console.log(`JS: craftItem(${itemName}, ${quantity}) called with operationId: ${operationId}`);
+  async function craftItem(itemName, quantity, recipeShape, ingredients, craftingTableNeeded, operationId) {
+      if (!bot || !bot.registry) {
+          const errorResult = { operationId, status: "error", message: "Bot not initialized or bot.registry not available." };
+          emitTaskComplete(errorResult);
+          return errorResult;
+      }
+      console.log(`JS: craftItem(${itemName}, ${quantity}) called with operationId: ${operationId}`);
 
-    const item = bot.registry.itemsByName[itemName];
-    if (!item) {
-        const errorResult = { operationId, status: "error", message: `Unknown item: ${itemName}` };
-        if (global.python) global.python.emit('mineflayerTaskComplete', errorResult);
-        return errorResult;
-    }
+      const item = bot.registry.itemsByName[itemName];
+      if (!item) {
+          const errorResult = { operationId, status: "error", message: `Unknown item: ${itemName}` };
+          emitTaskComplete(errorResult);
+          return errorResult;
+      }
 
-    const craftingTableId = bot.registry.blocksByName.crafting_table ? bot.registry.blocksByName.crafting_table.id : null;
-    if (craftingTableNeeded && !craftingTableId) {
-        const errorResult = { operationId, status: "error", message: "Crafting table block ID not found in bot.registry." };
-        if (global.python) global.python.emit('mineflayerTaskComplete', errorResult);
-        return errorResult;
-    }
+      const craftingTableId = bot.registry.blocksByName.crafting_table ? bot.registry.blocksByName.crafting_table.id : null;
+      if (craftingTableNeeded && !craftingTableId) {
+          const errorResult = { operationId, status: "error", message: "Crafting table block ID not found in bot.registry." };
+          emitTaskComplete(errorResult);
+          return errorResult;
+      }
     
-    const craftingTableBlock = craftingTableNeeded ? bot.findBlock({ matching: craftingTableId, maxDistance: 64 }) : null;
-    if (craftingTableNeeded && !craftingTableBlock) {
-        const errorResult = { operationId, status: "error", message: "Crafting table not found nearby." };
-        if (global.python) global.python.emit('mineflayerTaskComplete', errorResult);
-        return errorResult;
-    }
+      const craftingTableBlock = craftingTableNeeded ? bot.findBlock({ matching: craftingTableId, maxDistance: 64 }) : null;
+      if (craftingTableNeeded && !craftingTableBlock) {
+          const errorResult = { operationId, status: "error", message: "Crafting table not found nearby." };
+          emitTaskComplete(errorResult);
+          return errorResult;
+      }
 
-    const recipes = bot.recipesFor(item.id, null, 1, craftingTableBlock);
-    if (!recipes || recipes.length === 0) {
-        const errorMsg = `No recipe found for ${itemName}` + (craftingTableNeeded ? " with a crafting table nearby." : " in inventory.");
-        const errorResult = { operationId, status: "error", message: errorMsg };
-        if (global.python) global.python.emit('mineflayerTaskComplete', errorResult);
-        return errorResult;
-    }
+      const recipes = bot.recipesFor(item.id, null, 1, craftingTableBlock);
+      if (!recipes || recipes.length === 0) {
+          const errorMsg = `No recipe found for ${itemName}` + (craftingTableNeeded ? " with a crafting table nearby." : " in inventory.");
+          const errorResult = { operationId, status: "error", message: errorMsg };
+          emitTaskComplete(errorResult);
+          return errorResult;
+      }
     
-    const recipeToUse = recipes;
+      // `quantity` counts items; bot.craft counts recipe executions, each yielding recipe.result.count items.
+      const recipeToUse = recipes[0];
+      const crafts = Math.max(1, Math.ceil(quantity / recipeToUse.result.count));
 
-    bot.craft(recipeToUse, quantity, craftingTableBlock)
-        .then(() => {
-            console.log(`JS: Successfully crafted ${quantity} of ${itemName} for operationId ${operationId}`);
-            if (global.python) {
-                global.python.emit('mineflayerTaskComplete', {
+      // A craft in progress cannot be interrupted; cancelling only drops its completion.
+      trackOperation(operationId, "Crafting", () => {});
+      bot.craft(recipeToUse, crafts, craftingTableBlock)
+          .then(() => {
+              console.log(`JS: Successfully crafted ${crafts * recipeToUse.result.count} of ${itemName} for operationId ${operationId}`);
+              emitTaskComplete({
                     operationId,
                     status: "success",
                     crafted_item: itemName,
-                    quantity_crafted: quantity
+                    quantity_crafted: crafts * recipeToUse.result.count
                 });
-            }
-        })
-        .catch((err) => {
-            console.error(`JS: Crafting failed for ${itemName} (operationId ${operationId}): ${err.message}`);
-            if (global.python) {
-                global.python.emit('mineflayerTaskComplete', {
+          })
+          .catch((err) => {
+              console.error(`JS: Crafting failed for ${itemName} (operationId ${operationId}): ${err.message}`);
+              emitTaskComplete({
                     operationId,
                     status: "error",
                     message: `Crafting failed: ${err.message}`
                 });
-            }
-        });
+          });
     
-    return { status: "pending", operationId: operationId, message: `Crafting of ${quantity} ${itemName}(s) initiated.` };
-}
+      return { status: "pending", operationId: operationId, message: `Crafting of ${quantity} ${itemName}(s) initiated.` };
+  }
 
-async function placeBlock(itemName, x, y, z, refBlockX, refBlockY, refBlockZ, faceVectorX, faceVectorY, faceVectorZ, operationId) {
-    if (!bot || !bot.registry) { 
-        const errorResult = { operationId, status: "error", message: "Bot not initialized or bot.registry not available." };
-        if (global.python) global.python.emit('mineflayerTaskComplete', errorResult);
-        return errorResult;
-    }
-    console.log(`JS: placeBlock(${itemName}) at ref (${refBlockX},${refBlockY},${refBlockZ}) face (${faceVectorX},${faceVectorY},${faceVectorZ}) called with operationId: ${operationId}`);
+  const CRAFTING_TABLE_SEARCH_DISTANCE = 64;
+  const CRAFTING_TABLE_REACH_DISTANCE = 4.5;
+  const PLACE_ON_GROUND_DISTANCE = 4;
 
-    const itemToPlace = bot.inventory.items().find(item => item.name === itemName);
-    if (!itemToPlace) {
-        const errorResult = { operationId, status: "error", message: `Item ${itemName} not in inventory.` };
-        if (global.python) global.python.emit('mineflayerTaskComplete', errorResult);
-        return errorResult;
-    }
+  function findCraftingTable(maxDistance = CRAFTING_TABLE_SEARCH_DISTANCE) {
+    const craftingTable = bot.registry.blocksByName.crafting_table;
+    return craftingTable ? bot.findBlock({ matching: craftingTable.id, maxDistance }) : null;
+  }
 
-    const referenceBlock = bot.blockAt(new Vec3(refBlockX, refBlockY, refBlockZ));
-    if (!referenceBlock) {
-        const errorResult = { operationId, status: "error", message: "Reference block not found." };
-        if (global.python) global.python.emit('mineflayerTaskComplete', errorResult);
-        return errorResult;
+  // Places `itemName` from the inventory on a solid block near the bot that has air above it and is
+  // not the block the bot stands on. Resolves to the placed block.
+  async function placeOnGround(itemName) {
+    const item = bot.inventory.items().find(candidate => candidate.name === itemName);
+    if (!item) throw new Error(`Item ${itemName} not in inventory.`);
+    const feet = bot.entity.position.floored();
+    const ground = bot.findBlock({
+      matching: (block) => block.boundingBox === 'block',
+      maxDistance: PLACE_ON_GROUND_DISTANCE,
+      useExtraInfo: (block) => {
+        const above = bot.blockAt(block.position.offset(0, 1, 0));
+        return above && above.name === 'air' && !(block.position.x === feet.x && block.position.z === feet.z);
+      }
+    });
+    if (!ground) throw new Error(`No free ground within ${PLACE_ON_GROUND_DISTANCE} blocks to place ${itemName} on.`);
+    await bot.equip(item, 'hand');
+    await bot.placeBlock(ground, new Vec3(0, 1, 0));
+    return bot.blockAt(ground.position.offset(0, 1, 0));
+  }
+
+  // Runs ordered steps ({ item, quantity, action: "craft" | "place", crafting_table_needed }) back to
+  // back as one operation with a single completion: the items crafted, or the step that failed.
+  // Quantities count items. A "place" step puts a crafting table down unless one is already within
+  // reach. Recipes and the crafting table are looked up once per chain.
+  function craftChain(steps, operationId) {
+    if (!bot || !bot.registry) {
+      const errorResult = { operationId, status: "error", message: "Bot not initialized or bot.registry not available." };
+      emitTaskComplete(errorResult);
+      return errorResult;
     }
-    const faceVec = new Vec3(faceVectorX, faceVectorY, faceVectorZ);
+    if (!Array.isArray(steps) || steps.length === 0) {
+      const errorResult = { operationId, status: "error", message: "No crafting steps given." };
+      emitTaskComplete(errorResult);
+      return errorResult;
+    }
+    console.log(`JS: craftChain(${steps.map(step => `${step.action || 'craft'} ${step.quantity || 1} ${step.item}`).join(', ')}) called with operationId: ${operationId}`);
 
-    bot.equip(itemToPlace, 'hand')
-      .then(() => bot.placeBlock(referenceBlock, faceVec))
-      .then(() => {
-        const placedLocation = {x: refBlockX + faceVectorX, y: refBlockY + faceVectorY, z: refBlockZ + faceVectorZ};
-        console.log(`JS: Successfully placed ${itemName} near (${refBlockX},${refBlockY},${refBlockZ}) for operationId ${operationId}. Placed at: ${JSON.stringify(placedLocation)}`);
-        if (global.python) {
-          global.python.emit('mineflayerTaskComplete', {
+    let cancelled = false;
+    // A craft in progress cannot be interrupted; cancelling stops the chain before its next step.
+    trackOperation(operationId, "Crafting chain", () => { cancelled = true; });
+    const startedAt = Date.now();
+    (async () => {
+      const recipes = new Map(); // `${item}:${table ? 'table' : 'inventory'}` -> recipe
+      const crafted = {};
+      let craftingTable = null;
+      let placedLocation = null;
+      for (const [index, step] of steps.entries()) {
+        if (cancelled) return;
+        const action = step.action || 'craft';
+        try {
+          if (action === 'place') {
+            craftingTable = craftingTable || findCraftingTable(CRAFTING_TABLE_REACH_DISTANCE);
+            if (!craftingTable) {
+              craftingTable = await placeOnGround(step.item);
+              placedLocation = { x: craftingTable.position.x, y: craftingTable.position.y, z: craftingTable.position.z };
+            }
+            continue;
+          }
+          const item = bot.registry.itemsByName[step.item];
+          if (!item) throw new Error(`Unknown item: ${step.item}`);
+          if (step.crafting_table_needed && !craftingTable) {
+            craftingTable = findCraftingTable();
+            if (!craftingTable) throw new Error("Crafting table not found nearby.");
+          }
+          const table = step.crafting_table_needed ? craftingTable : null;
+          const key = `${step.item}:${table ? 'table' : 'inventory'}`;
+          let recipe = recipes.get(key);
+          if (!recipe) {
+            recipe = bot.recipesFor(item.id, null, 1, table)[0];
+            if (!recipe) throw new Error(`No recipe found for ${step.item} with the current inventory.`);
+            recipes.set(key, recipe);
+          }
+          const crafts = Math.max(1, Math.ceil((step.quantity || 1) / recipe.result.count));
+          await bot.craft(recipe, crafts, table);
+          crafted[step.item] = (crafted[step.item] || 0) + crafts * recipe.result.count;
+        } catch (err) {
+          console.error(`JS: Crafting chain step ${index + 1} (${action} ${step.item}) failed for operationId ${operationId}: ${err.message}`);
+          emitTaskComplete({
+            operationId,
+            status: "error",
+            message: `Step ${index + 1} (${action} ${step.item}) failed: ${err.message}`,
+            failed_step: index,
+            steps_completed: index,
+            crafted,
+            placed_location: placedLocation,
+            elapsed_seconds: (Date.now() - startedAt) / 1000
+          });
+          return;
+        }
+      }
+      console.log(`JS: Crafting chain ${operationId} finished: ${JSON.stringify(crafted)}`);
+      emitTaskComplete({
+        operationId,
+        status: "success",
+        message: `Crafted ${Object.entries(crafted).map(([name, count]) => `${count} ${name}`).join(', ') || 'nothing'}.`,
+        steps_completed: steps.length,
+        crafted,
+        placed_location: placedLocation,
+        elapsed_seconds: (Date.now() - startedAt) / 1000
+      });
+    })();
+
+    return { status: "pending", operationId, message: `Crafting chain of ${steps.length} steps initiated.` };
+  }
+
+  async function placeBlock(itemName, x, y, z, refBlockX, refBlockY, refBlockZ, faceVectorX, faceVectorY, faceVectorZ, operationId) {
+      if (!bot || !bot.registry) { 
+          const errorResult = { operationId, status: "error", message: "Bot not initialized or bot.registry not available." };
+          emitTaskComplete(errorResult);
+          return errorResult;
+      }
+      console.log(`JS: placeBlock(${itemName}) at ref (${refBlockX},${refBlockY},${refBlockZ}) face (${faceVectorX},${faceVectorY},${faceVectorZ}) called with operationId: ${operationId}`);
+
+      const itemToPlace = bot.inventory.items().find(item => item.name === itemName);
+      if (!itemToPlace) {
+          const errorResult = { operationId, status: "error", message: `Item ${itemName} not in inventory.` };
+          emitTaskComplete(errorResult);
+          return errorResult;
+      }
+
+      const referenceBlock = bot.blockAt(new Vec3(refBlockX, refBlockY, refBlockZ));
+      if (!referenceBlock) {
+          const errorResult = { operationId, status: "error", message: "Reference block not found." };
+          emitTaskComplete(errorResult);
+          return errorResult;
+      }
+      const faceVec = new Vec3(faceVectorX, faceVectorY, faceVectorZ);
+
+      trackOperation(operationId, "Placing", () => {});
+      bot.equip(itemToPlace, 'hand')
+        .then(() => bot.placeBlock(referenceBlock, faceVec))
+        .then(() => {
+          const placedLocation = {x: refBlockX + faceVectorX, y: refBlockY + faceVectorY, z: refBlockZ + faceVectorZ};
+          console.log(`JS: Successfully placed ${itemName} near (${refBlockX},${refBlockY},${refBlockZ}) for operationId ${operationId}. Placed at: ${JSON.stringify(placedLocation)}`);
+          emitTaskComplete({
             operationId,
             status: "success",
             message: `Placed ${itemName}.`,
             placed_location: placedLocation
           });
-        }
-      })
-      .catch((err) => {
-        console.error(`JS: Placing block ${itemName} failed for operationId ${operationId}: ${err.message}`);
-        if (global.python) {
-          global.python.emit('mineflayerTaskComplete', {
+        })
+        .catch((err) => {
+          console.error(`JS: Placing block ${itemName} failed for operationId ${operationId}: ${err.message}`);
+          emitTaskComplete({
             operationId,
             status: "error",
             message: `Placing block failed: ${err.message}`
           });
+        });
+
+      return { status: "pending", operationId: operationId, message: `Placing of ${itemName} initiated.` };
+  }
+
+  // Walks up to another player (usually the primary bot of the fleet) and tosses it `count` items.
+  async function deliverItems(targetUsername, itemName, count, operationId) {
+    if (!bot || !bot.registry || !bot.pathfinder) {
+      const errorResult = { operationId, status: "error", message: "Bot not initialized or pathfinder not loaded." };
+      emitTaskComplete(errorResult);
+      return errorResult;
+    }
+    console.log(`JS: deliverItems(${targetUsername}, ${itemName}, ${count}) called with operationId: ${operationId}`);
+
+    const target = bot.players[targetUsername] && bot.players[targetUsername].entity;
+    if (!target) {
+      const errorResult = { operationId, status: "error", message: `Player ${targetUsername} is not in view.` };
+      emitTaskComplete(errorResult);
+      return errorResult;
+    }
+    const item = bot.registry.itemsByName[itemName];
+    const available = item ? bot.inventory.count(item.id, null) : 0;
+    if (available === 0) {
+      const errorResult = { operationId, status: "error", message: `No ${itemName} in inventory.` };
+      emitTaskComplete(errorResult);
+      return errorResult;
+    }
+    const toDeliver = Math.min(count, available);
+
+    trackOperation(operationId, "Delivery", () => bot.pathfinder.stop());
+    (async () => {
+      try {
+        await bot.pathfinder.goto(new mineflayerPathfinder.goals.GoalFollow(target, 2));
+        await bot.lookAt(target.position.offset(0, target.height, 0), true);
+        await bot.toss(item.id, null, toDeliver);
+        emitTaskComplete({
+          operationId,
+          status: "success",
+          delivered_item: itemName,
+          quantity_delivered: toDeliver,
+          message: `Delivered ${toDeliver} ${itemName} to ${targetUsername}.`
+        });
+      } catch (err) {
+        console.error(`JS: Delivering ${itemName} to ${targetUsername} failed for operationId ${operationId}: ${err.message}`);
+        emitTaskComplete({ operationId, status: "error", message: `Delivery failed: ${err.message}` });
+      }
+    })();
+
+    return { status: "pending", operationId, message: `Delivery of ${toDeliver} ${itemName} to ${targetUsername} initiated.` };
+  }
+
+  // Batched transport: JSON-lines frames over a local socket. A request frame {"id", "calls": [{"fn", "args"}]}
+  // runs its calls in order and is answered by one {"id", "results": [{"ok"} | {"error"}]} frame, so many
+  // calls cost one round trip instead of one JSPyBridge crossing each. Frames run concurrently.
+  let batchServer = null;
+
+  async function runBatchCalls(calls) {
+    const results = [];
+    for (const { fn, args } of calls) {
+      const target = batchFunctions[fn];
+      if (typeof target !== 'function') {
+        results.push({ error: `Unknown function: ${fn}` });
+        continue;
+      }
+      try {
+        results.push({ ok: await target(...(args || [])) });
+      } catch (err) {
+        results.push({ error: `${fn} failed: ${err.message}` });
+      }
+    }
+    return results;
+  }
+
+  function handleBatchConnection(socket) {
+    batchClients.add(socket);
+    let buffered = '';
+    socket.setEncoding('utf8');
+    socket.on('data', (chunk) => {
+      buffered += chunk;
+      let newline;
+      while ((newline = buffered.indexOf('\n')) >= 0) {
+        const line = buffered.slice(0, newline);
+        buffered = buffered.slice(newline + 1);
+        if (!line.trim()) continue;
+        let frame;
+        try {
+          frame = JSON.parse(line);
+        } catch (err) {
+          console.error(`JS: Dropping malformed batch frame: ${err.message}`);
+          continue;
         }
+        runBatchCalls(frame.calls || []).then((results) => {
+          if (!socket.destroyed) socket.write(JSON.stringify({ id: frame.id, results }) + '\n');
+        });
+      }
+    });
+    socket.on('close', () => batchClients.delete(socket));
+    socket.on('error', (err) => console.warn(`JS: Batch connection error: ${err.message}`));
+  }
+
+  function startBatchServer(socketPath) {
+    if (batchServer) {
+      return { status: "already_running", message: `Batch server already listening.` };
+    }
+    try {
+      fs.unlinkSync(socketPath);
+    } catch (err) {
+      // No stale socket file.
+    }
+    return new Promise((resolve) => {
+      const server = net.createServer(handleBatchConnection);
+      server.once('error', (err) => resolve({ status: "error", message: `Batch server failed: ${err.message}` }));
+      server.listen(socketPath, () => {
+        batchServer = server;
+        console.log(`JS: Batch server listening on ${socketPath}`);
+        resolve({ status: "success", message: `Batch server listening on ${socketPath}.` });
       });
+    });
+  }
+
+  const batchFunctions = {
+    initializeBot,
+    goToXYZ,
+    goToNear,
+    cancelNavigation,
+    cancelOperation,
+    findBlock,
+    findBlocks,
+    findBlocksMulti,
+    setTrackedBlockTypes,
+    setChunkSnapshots,
+    resyncWorldState,
+    mineBlock,
+    getInventory,
+    craftItem,
+    craftChain,
+    placeBlock,
+    deliverItems
+  };
 
-    return { status: "pending", operationId: operationId, message: `Placing of ${itemName} initiated.` };
+  return {
+    taskEvents,
+    startBatchServer,
+    ...batchFunctions
+  };
 }
 
+const defaultInterface = createInterface();
+
 module.exports = {
-  initializeBot,
-  goToXYZ,
-  findBlock,
-  mineBlock,
-  getInventory,
-  craftItem,
-  placeBlock
+  ...defaultInterface,
+  createInterface
 };
@@ -0,0 +1,91 @@
+import math
+from typing import Optional, Dict, List, Any, Sequence, Tuple
+
+from src.models.planning.entities import RecipeDetails, PlanStep
+from src.planning.crafting_planner import DEFAULT_RECIPES
+from src.spatial.block_index import squared_distance
+from src.spatial.travel_times import TravelTimeModel
+
+
+class TaskScheduler:
+    """
+    Assigns plan steps to idle bots of a fleet.
+
+    Bots are duck-typed: each needs `name`, `busy`, `position` (x, y, z or None),
+    `inventory_mirror` (with `count(item_name)`) and `block_index` (with `nearest(...)`).
+
+    * gather steps are split into shares across idle bots, closest to a known source block first
+      (by expected travel time if a TravelTimeModel is given), so large material lists are
+      collected in parallel;
+    * craft steps go to the idle bot already holding most of the ingredients;
+    * place steps go to an idle bot holding the item.
+    """
+
+    def __init__(
+        self,
+        recipes: Optional[Dict[str, Any]] = None,
+        min_gather_share: int = 2,
+        search_radius: float = 64,
+        travel_times: Optional[TravelTimeModel] = None,
+    ):
+        self.recipes = {**DEFAULT_RECIPES, **(recipes or {})}
+        self.min_gather_share = max(1, min_gather_share)
+        self.search_radius = search_radius
+        self.travel_times = travel_times
+
+    def assign(self, step: PlanStep, bots: Sequence[Any], max_shares: Optional[int] = None) -> List[Tuple[Any, PlanStep]]:
+        """
+        Returns (bot, step) pairs for `step`. Gather steps may be split into at most `max_shares` shares
+        whose quantities add up to the original one; other steps are assigned whole. Empty if no bot is idle.
+        """
+        idle = [bot for bot in bots if not bot.busy]
+        if not idle:
+            return []
+        if step.action == "gather":
+            return self._assign_gather(step, idle, max_shares)
+        if step.action == "craft":
+            return [(max(idle, key=lambda bot: self._craft_score(step, bot)), step)]
+        holders = [bot for bot in idle if bot.inventory_mirror.count(step.item_name) >= step.quantity]
+        return [(holders[0] if holders else idle[0], step)]
+
+    def _assign_gather(self, step: PlanStep, idle: Sequence[Any], max_shares: Optional[int] = None) -> List[Tuple[Any, PlanStep]]:
+        source = step.source_block or step.item_name
+        # Bots with no known source nearby come last; they search with findBlocks themselves.
+        ranked = sorted(idle, key=lambda bot: self._gather_cost(source, bot))
+        share_count = max(1, min(len(ranked), step.quantity // self.min_gather_share, max_shares or len(ranked)))
+        chosen = ranked[:share_count]
+
+        base, extra = divmod(step.quantity, share_count)
+        assignments = []
+        for index, bot in enumerate(chosen):
+            quantity = base + (1 if index < extra else 0)
+            share = step.model_copy(update={"step_id": f"{step.step_id}#{bot.name}", "quantity": quantity})
+            assignments.append((bot, share))
+        return assignments
+
+    def _gather_cost(self, source_block: str, bot: Any) -> float:
+        """
+        Expected seconds from the bot to the nearest known source block (squared distance without a
+        travel time model), or inf if none is known.
+        """
+        if bot.position is None:
+            return math.inf
+        location = bot.block_index.nearest(source_block, bot.position, max_distance=self.search_radius)
+        if location is None:
+            return math.inf
+        if self.travel_times is not None:
+            return self.travel_times.estimate_seconds(bot.position, location)
+        return squared_distance(bot.position, location)
+
+    def _craft_score(self, step: PlanStep, bot: Any) -> Tuple[int, int]:
+        """Ingredients already held (capped at what the step needs), then whole items held as a tie-break."""
+        recipe_data = self.recipes.get(step.item_name)
+        if recipe_data is None:
+            return 0, bot.inventory_mirror.count(step.item_name)
+        recipe = RecipeDetails.model_validate(recipe_data)
+        craft_count = step.craft_count or math.ceil(step.quantity / recipe.quantity_produced)
+        covered = sum(
+            min(bot.inventory_mirror.count(name), per_craft * craft_count)
+            for name, per_craft in recipe.ingredients.items()
+        )
+        return covered, bot.inventory_mirror.count(step.item_name)
@@ -0,0 +1,205 @@
+import json
+import re
+from collections import deque
+from typing import Optional, Dict, List, Any, Deque, Tuple
+
+from google.adk.models import LlmRequest
+from google.genai import types
+
+# A long-running result delivered as text (TASK_RESULT_MESSAGE_FORMAT in main.py).
+_TASK_RESULT_PATTERN = re.compile(r"^\[(\w+) result\] (\{.*\})\s*$", re.DOTALL)
+# Rough characters per token of JSON-heavy prompts, for estimates before the model reports real counts.
+CHARS_PER_TOKEN = 4
+# Longest text kept per line of the summary of collapsed turns.
+SUMMARY_LINE_MAX_CHARS = 240
+SUMMARY_HEADER = "[Summary of earlier turns in this session]"
+# Only the most recent summary lines are kept; older ones are counted as omitted so the summary stays bounded.
+SUMMARY_MAX_LINES = 24
+# Payload keys that only describe how a result came about, dropped from every tool response.
+DROPPED_KEYS = {"blocks", "step_results", "step_bots", "step_seconds"}
+# Ranked lists cut to their first entries.
+LIST_LIMITS = {"clusters": 3, "alternative_recipes": 2}
+
+
+def project_payload(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Projects a tool response (or a sub-agent's JSON reply) down to the fields agents act on:
+    None values and per-block timings or per-step details are dropped, inventory item lists become
+    {name: count}, ranked lists keep their first entries and pending responses keep status and operation ID.
+    """
+    if payload.get("status") == "pending":
+        return {key: payload[key] for key in ("status", "operationId") if payload.get(key) is not None}
+    projected: Dict[str, Any] = {}
+    for key, value in payload.items():
+        if value is None or key in DROPPED_KEYS:
+            continue
+        if key == "inventory" and isinstance(value, list):
+            counts: Dict[str, int] = {}
+            for item in value:
+                if isinstance(item, dict) and "name" in item:
+                    counts[item["name"]] = counts.get(item["name"], 0) + int(item.get("count", 0))
+            value = counts
+        elif key in LIST_LIMITS and isinstance(value, list):
+            value = value[:LIST_LIMITS[key]]
+        projected[key] = value
+    return projected
+
+
+def _project_response(response: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    if not response:
+        return response
+    result = response.get("result")
+    if isinstance(result, str) and len(response) == 1:
+        # An AgentTool reply: the sub-agent's final text, often a JSON tool result.
+        try:
+            decoded = json.loads(result)
+        except ValueError:
+            return response
+        return {"result": json.dumps(project_payload(decoded))} if isinstance(decoded, dict) else response
+    return project_payload(response)
+
+
+def _project_part(part: types.Part) -> types.Part:
+    if part.function_response is not None:
+        projected = _project_response(part.function_response.response)
+        if projected is part.function_response.response:
+            return part
+        return types.Part(function_response=part.function_response.model_copy(update={"response": projected}))
+    if part.text:
+        match = _TASK_RESULT_PATTERN.match(part.text.strip())
+        if match:
+            try:
+                payload = json.loads(match.group(2))
+            except ValueError:
+                return part
+            return types.Part(text=f"[{match.group(1)} result] {json.dumps(project_payload(payload))}")
+    return part
+
+
+def project_contents(contents: List[types.Content]) -> List[types.Content]:
+    """Copies of `contents` with every tool response projected by `project_payload`."""
+    return [
+        content.model_copy(update={"parts": [_project_part(part) for part in content.parts]}) if content.parts else content
+        for content in contents
+    ]
+
+
+def _is_request(content: types.Content) -> bool:
+    """A user message with text that is not a delivered task result, e.g. the goal or a delegated task."""
+    return content.role == "user" and any(
+        part.text and not _TASK_RESULT_PATTERN.match(part.text.strip()) for part in content.parts or []
+    )
+
+
+def _clip(text: str) -> str:
+    text = " ".join(text.split())
+    return text if len(text) <= SUMMARY_LINE_MAX_CHARS else text[:SUMMARY_LINE_MAX_CHARS - 3] + "..."
+
+
+def summarize_contents(contents: List[types.Content]) -> str:
+    """
+    One line per collapsed turn: each tool call with its arguments and projected result, and each
+    message. A call repeated with the same arguments keeps only its latest result, and only the last
+    SUMMARY_MAX_LINES lines are kept, so the summary does not grow with the session.
+    """
+    calls: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+    lines: Dict[Any, str] = {}
+
+    def add(key: Any, line: str) -> None:
+        lines.pop(key, None)
+        lines[key] = _clip(line)
+
+    for index, content in enumerate(contents):
+        for part in content.parts or []:
+            if part.function_call is not None:
+                calls[part.function_call.id] = (part.function_call.name, dict(part.function_call.args or {}))
+            elif part.function_response is not None:
+                name, args = calls.pop(part.function_response.id, (part.function_response.name, {}))
+                arguments = ", ".join(f"{key}={json.dumps(value, default=str)}" for key, value in args.items())
+                result = json.dumps(_project_response(part.function_response.response), default=str)
+                add((name, arguments), f"- {name}({arguments}) -> {result}")
+            elif part.text and part.text.strip():
+                add(index, f"- {content.role}: {part.text.strip()}")
+    for name, args in calls.values():
+        add((name, json.dumps(args, default=str)), f"- {name}({json.dumps(args, default=str)}) -> no result yet")
+    kept = list(lines.values())[-SUMMARY_MAX_LINES:]
+    omitted = len(lines) - len(kept)
+    header = [SUMMARY_HEADER] + ([f"({omitted} earlier turns omitted)"] if omitted else [])
+    return "\n".join(header + kept)
+
+
+def window_contents(contents: List[types.Content], max_contents: int) -> Tuple[List[types.Content], int]:
+    """
+    Keeps the last `max_contents` contents and collapses the ones before them into one summary
+    message. The latest request message stays verbatim even if it is older, and the window never
+    starts with a tool response whose call was collapsed. Returns the contents and how many were collapsed.
+    """
+    if max_contents <= 0 or len(contents) <= max_contents:
+        return contents, 0
+    start = len(contents) - max_contents
+    while start > 0 and any(part.function_response is not None for part in contents[start].parts or []):
+        start -= 1
+    request_index = next((index for index in range(len(contents) - 1, -1, -1) if _is_request(contents[index])), None)
+    pinned = [contents[request_index]] if request_index is not None and request_index < start else []
+    collapsed = [content for index, content in enumerate(contents[:start]) if index != request_index]
+    if not collapsed:
+        return contents, 0
+    summary = types.Content(role="user", parts=[types.Part(text=summarize_contents(collapsed))])
+    return [summary, *pinned, *contents[start:]], len(collapsed)
+
+
+def estimate_tokens(llm_request: LlmRequest) -> int:
+    """Approximate prompt tokens of the request: its contents and system instruction at CHARS_PER_TOKEN."""
+    characters = sum(len(content.model_dump_json(exclude_none=True)) for content in llm_request.contents)
+    instruction = llm_request.config.system_instruction if llm_request.config else None
+    if instruction is not None:
+        characters += len(instruction if isinstance(instruction, str) else instruction.model_dump_json(exclude_none=True))
+    return characters // CHARS_PER_TOKEN
+
+
+class ContextWindow:
+    """
+    Bounds what each model call resends of the session history: tool responses are projected down
+    to the fields agents act on, and beyond `max_contents` contents the older turns are collapsed
+    into a one-line-per-turn summary. Every turn is recorded with its content counts, estimated
+    prompt tokens before and after, and the prompt tokens the model reported.
+    """
+
+    def __init__(self, max_contents: int = 16, max_turns: int = 1000):
+        self.max_contents = max_contents
+        self.turns: Deque[Dict[str, Any]] = deque(maxlen=max_turns)
+
+    def apply(self, llm_request: LlmRequest, agent_name: str) -> Dict[str, Any]:
+        """Rewrites `llm_request.contents` in place and returns the turn's record."""
+        turn: Dict[str, Any] = {
+            "agent": agent_name,
+            "contents_before": len(llm_request.contents),
+            "estimated_tokens_before": estimate_tokens(llm_request),
+        }
+        llm_request.contents, turn["collapsed_contents"] = window_contents(
+            project_contents(llm_request.contents), self.max_contents
+        )
+        turn["contents_after"] = len(llm_request.contents)
+        turn["estimated_tokens_after"] = estimate_tokens(llm_request)
+        turn["prompt_tokens"] = None
+        self.turns.append(turn)
+        return turn
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """Per agent: turns, mean and max estimated prompt tokens before and after, and reported prompt tokens."""
+        by_agent: Dict[str, List[Dict[str, Any]]] = {}
+        for turn in self.turns:
+            by_agent.setdefault(turn["agent"], []).append(turn)
+        summary = {}
+        for agent_name, turns in by_agent.items():
+            before = [turn["estimated_tokens_before"] for turn in turns]
+            after = [turn["estimated_tokens_after"] for turn in turns]
+            reported = [turn["prompt_tokens"] for turn in turns if turn["prompt_tokens"] is not None]
+            summary[agent_name] = {
+                "turns": len(turns),
+                "estimated_tokens_before": {"mean": round(sum(before) / len(before), 1), "max": max(before)},
+                "estimated_tokens_after": {"mean": round(sum(after) / len(after), 1), "max": max(after)},
+                "collapsed_contents": sum(turn["collapsed_contents"] for turn in turns),
+                "prompt_tokens": {"mean": round(sum(reported) / len(reported), 1), "max": max(reported)} if reported else None,
+            }
+        return summary
@@ -0,0 +1,221 @@
+import hashlib
+import json
+import os
+import re
+import threading
+from typing import Optional, Dict, List, Any, AsyncGenerator, Literal, Union
+
+from google.adk.models import BaseLlm, LlmRequest, LlmResponse
+from google.adk.models.registry import LLMRegistry
+from pydantic import PrivateAttr
+
+CacheMode = Literal["record", "replay", "bypass"]
+
+# Values that differ between otherwise identical runs and must not be part of the cache key.
+_UUID_PATTERN = re.compile(r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}", re.IGNORECASE)
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+VOLATILE_KEYS = {
+    "id", "operationId", "operation_id", "timestamp",
+    "elapsed_seconds", "travel_seconds", "dig_seconds", "eta_seconds", "remaining_distance", "replans",
+}
+
+
+def _normalize(value: Any) -> Any:
+    """Drops volatile keys, replaces UUIDs and collapses whitespace, recursively."""
+    if isinstance(value, dict):
+        return {key: _normalize(item) for key, item in sorted(value.items()) if key not in VOLATILE_KEYS and item is not None}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(item) for item in value]
+    if isinstance(value, str):
+        return _WHITESPACE_PATTERN.sub(" ", _UUID_PATTERN.sub("<uuid>", value)).strip()
+    if isinstance(value, float):
+        return round(value, 3)
+    return value
+
+
+def cache_key(llm_request: LlmRequest, model_name: str, history_window: int) -> str:
+    """
+    Hash of the normalized system instruction, declared tool names and the last `history_window`
+    contents (including tool responses) of the request.
+    """
+    config = llm_request.config
+    instruction = config.system_instruction if config else None
+    if instruction is not None and not isinstance(instruction, str):
+        instruction = instruction.model_dump(mode="json", exclude_none=True)
+    tool_names = sorted(
+        declaration.name
+        for tool in ((config.tools if config else None) or [])
+        for declaration in (getattr(tool, "function_declarations", None) or [])
+    )
+    window = llm_request.contents[-history_window:] if history_window > 0 else llm_request.contents
+    material = {
+        "model": model_name,
+        "instruction": instruction,
+        "tools": tool_names,
+        "contents": [content.model_dump(mode="json", exclude_none=True) for content in window],
+    }
+    canonical = json.dumps(_normalize(material), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class ResponseStore:
+    """
+    On-disk store of model responses, one JSON file per cache key. Total size is bounded by
+    `max_bytes`; the least recently used entries (by file mtime, refreshed on every hit) are evicted first.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._sizes: Dict[str, int] = {}
+        for name in os.listdir(directory):
+            if name.endswith(".json"):
+                self._sizes[name[:-5]] = os.path.getsize(os.path.join(directory, name))
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(self._sizes.values())
+
+    def __len__(self) -> int:
+        return len(self._sizes)
+
+    def get(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        with self._lock:
+            if key not in self._sizes:
+                return None
+            path = self._path(key)
+            try:
+                with open(path, "r", encoding="utf-8") as entry_file:
+                    entry = json.load(entry_file)
+                os.utime(path)
+            except (OSError, ValueError):
+                self._sizes.pop(key, None)
+                return None
+            return entry["responses"]
+
+    def put(self, key: str, responses: List[Dict[str, Any]]) -> None:
+        data = json.dumps({"responses": responses}, separators=(",", ":"))
+        with self._lock:
+            path = self._path(key)
+            temp_path = f"{path}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as entry_file:
+                entry_file.write(data)
+            os.replace(temp_path, path)
+            self._sizes[key] = len(data.encode("utf-8"))
+            self._evict_if_needed()
+
+    def _evict_if_needed(self) -> None:
+        if self.total_bytes <= self.max_bytes:
+            return
+        by_age = sorted(self._sizes, key=lambda key: os.path.getmtime(self._path(key)) if os.path.exists(self._path(key)) else 0)
+        for key in by_age:
+            if self.total_bytes <= self.max_bytes or len(self._sizes) <= 1:
+                break
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+            self._sizes.pop(key, None)
+
+
+def _strip_function_call_ids(response: LlmResponse) -> Dict[str, Any]:
+    """Serializes a response without function call ids, so ADK assigns fresh ones on replay."""
+    data = response.model_dump(mode="json", exclude_none=True)
+    for part in (data.get("content") or {}).get("parts") or []:
+        if "function_call" in part:
+            part["function_call"].pop("id", None)
+    return data
+
+
+class CachingLlm(BaseLlm):
+    """
+    Caching layer around the model an `LlmAgent` calls.
+
+    * "record": serve cached responses; on a miss call the wrapped model and store its final responses.
+    * "replay": serve cached responses only; a miss returns a `CACHE_MISS` error response.
+    * "bypass": always call the wrapped model, without reading or writing the cache.
+
+    Hits skip model latency entirely, and replaying a recorded run makes it deterministic.
+    """
+
+    inner: BaseLlm
+    store: ResponseStore
+    mode: CacheMode = "record"
+    history_window: int = 12
+
+    _hits: int = PrivateAttr(default=0)
+    _misses: int = PrivateAttr(default=0)
+
+    @classmethod
+    def supported_models(cls) -> List[str]:
+        return []
+
+    @property
+    def hits(self) -> int:
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        return self._misses
+
+    async def generate_content_async(self, llm_request: LlmRequest, stream: bool = False) -> AsyncGenerator[LlmResponse, None]:
+        if self.mode == "bypass":
+            async for response in self.inner.generate_content_async(llm_request, stream=stream):
+                yield response
+            return
+
+        key = cache_key(llm_request, self.inner.model, self.history_window)
+        cached = self.store.get(key)
+        if cached is not None:
+            self._hits += 1
+            for data in cached:
+                yield LlmResponse.model_validate(data)
+            return
+
+        self._misses += 1
+        if self.mode == "replay":
+            yield LlmResponse(error_code="CACHE_MISS", error_message=f"No cached model response for key {key[:12]}.")
+            return
+
+        recorded: List[Dict[str, Any]] = []
+        failed = False
+        async for response in self.inner.generate_content_async(llm_request, stream=stream):
+            if response.error_code:
+                failed = True
+            elif not response.partial:
+                recorded.append(_strip_function_call_ids(response))
+            yield response
+        if recorded and not failed:
+            self.store.put(key, recorded)
+
+
+_stores: Dict[str, ResponseStore] = {}
+
+
+def _store_for(directory: str, max_bytes: int) -> ResponseStore:
+    """One store per directory, shared by every agent of the process."""
+    directory = os.path.abspath(directory)
+    if directory not in _stores:
+        _stores[directory] = ResponseStore(directory, max_bytes)
+    return _stores[directory]
+
+
+def cached_model(model: Union[str, BaseLlm], settings: Any) -> Union[str, BaseLlm]:
+    """
+    Wraps `model` in a CachingLlm according to `llm_cache_mode`; returns it unchanged in bypass mode.
+    """
+    if settings.llm_cache_mode == "bypass":
+        return model
+    inner = LLMRegistry.new_llm(model) if isinstance(model, str) else model
+    return CachingLlm(
+        model=f"cached:{inner.model}",
+        inner=inner,
+        store=_store_for(settings.llm_cache_dir, settings.llm_cache_max_bytes),
+        mode=settings.llm_cache_mode,
+        history_window=settings.llm_cache_history_window,
+    )
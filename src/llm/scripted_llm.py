@@ -0,0 +1,106 @@
+import json
+import re
+import uuid
+from typing import Optional, Dict, List, Any, Callable, AsyncGenerator
+
+from google.adk.models import BaseLlm, LlmRequest, LlmResponse
+from google.genai import types
+from pydantic import Field, PrivateAttr
+
+# ADK prepends this identity line to every agent's system instruction.
+_AGENT_NAME_PATTERN = re.compile(r'Your internal name is "([^"]+)"')
+
+# A policy maps the request an agent sends to the model onto the model's reply.
+ScriptPolicy = Callable[[LlmRequest], LlmResponse]
+
+
+def agent_name_for(llm_request: LlmRequest) -> Optional[str]:
+    """Returns the name of the agent that issued `llm_request`, parsed from its system instruction."""
+    instruction = llm_request.config.system_instruction if llm_request.config else None
+    if instruction is None:
+        return None
+    if not isinstance(instruction, str):
+        instruction = " ".join(part.text or "" for part in getattr(instruction, "parts", []) or [])
+    match = _AGENT_NAME_PATTERN.search(instruction)
+    return match.group(1) if match else None
+
+
+def text_response(text: str) -> LlmResponse:
+    return LlmResponse(content=types.Content(role="model", parts=[types.Part(text=text)]))
+
+
+def function_call_response(name: str, args: Dict[str, Any]) -> LlmResponse:
+    call = types.FunctionCall(id=f"scripted-{uuid.uuid4()}", name=name, args=args)
+    return LlmResponse(content=types.Content(role="model", parts=[types.Part(function_call=call)]))
+
+
+def last_function_response(llm_request: LlmRequest) -> Optional[types.FunctionResponse]:
+    """The function response in the last content of the request, if the last content carries one."""
+    if not llm_request.contents:
+        return None
+    for part in llm_request.contents[-1].parts or []:
+        if part.function_response:
+            return part.function_response
+    return None
+
+
+def first_user_text(llm_request: LlmRequest) -> str:
+    for content in llm_request.contents:
+        if content.role == "user":
+            for part in content.parts or []:
+                if part.text:
+                    return part.text
+    return ""
+
+
+def response_payload(function_response: types.FunctionResponse) -> Dict[str, Any]:
+    """
+    The function response as a dictionary. AgentTool wraps sub-agent replies as `{"result": text}`;
+    JSON replies are decoded so status checks work the same for tools and sub-agents.
+    """
+    payload = dict(function_response.response or {})
+    result = payload.get("result")
+    if isinstance(result, str):
+        try:
+            decoded = json.loads(result)
+        except ValueError:
+            return payload
+        if isinstance(decoded, dict):
+            return decoded
+    return payload
+
+
+class ScriptedLlm(BaseLlm):
+    """
+    Deterministic stand-in for the Gemini model, used by benchmarks and offline runs.
+
+    One instance can serve every agent of the tree: each request is routed to the policy
+    registered for the agent that issued it (parsed from ADK's identity instruction).
+    Calls are counted per agent, so benchmarks can report how many model round trips a run took.
+    """
+
+    model: str = "scripted"
+    policies: Dict[str, Any] = Field(default_factory=dict)
+
+    _calls: Dict[str, int] = PrivateAttr(default_factory=dict)
+
+    @classmethod
+    def supported_models(cls) -> List[str]:
+        return [r"scripted.*"]
+
+    @property
+    def call_counts(self) -> Dict[str, int]:
+        return dict(self._calls)
+
+    @property
+    def total_calls(self) -> int:
+        return sum(self._calls.values())
+
+    async def generate_content_async(self, llm_request: LlmRequest, stream: bool = False) -> AsyncGenerator[LlmResponse, None]:
+        agent_name = agent_name_for(llm_request) or "unknown"
+        self._calls[agent_name] = self._calls.get(agent_name, 0) + 1
+        policy: Optional[ScriptPolicy] = self.policies.get(agent_name)
+        if policy is None:
+            yield LlmResponse(error_code="NO_SCRIPT", error_message=f"No scripted policy for agent '{agent_name}'.")
+            return
+        yield policy(llm_request)
@@ -1,3 +1,5 @@
+from typing import Optional
+
 from pydantic import BaseModel
 
 class BlockLocation(BaseModel):
@@ -10,4 +12,14 @@ class ItemDetail(BaseModel):
     """Represents details of an item in an inventory."""
     name: str
     count: int
-    type: int
\ No newline at end of file
+    type: int
+
+class MinedBlockTiming(BaseModel):
+    """Represents the outcome and timings of one block in a batched collection."""
+    x: int
+    y: int
+    z: int
+    status: str
+    travel_seconds: float = 0.0
+    dig_seconds: float = 0.0
+    message: Optional[str] = None
@@ -1,8 +1,8 @@
-from typing import Optional, List
+from typing import Optional, List, Dict, Any
 
 from pydantic import BaseModel
 
-from .entities import BlockLocation, ItemDetail
+from .entities import BlockLocation, ItemDetail, MinedBlockTiming
 
 class BaseResponse(BaseModel):
     """Base response model for Mineflayer bridge tool actions."""
@@ -17,6 +17,18 @@ class NavigationResponse(BaseResponse):
     """Response model for navigation actions."""
     pass
 
+class NavigationProgressResponse(BaseResponse):
+    """Response model for the progress of an in-flight navigation."""
+    operation_id: Optional[str] = None
+    remaining_distance: Optional[float] = None
+    replans: Optional[int] = None
+    eta_seconds: Optional[float] = None
+    elapsed_seconds: Optional[float] = None
+
+class CancelOperationResponse(BaseResponse):
+    """Response model for cancelling an in-flight long-running operation."""
+    operation_id: Optional[str] = None
+
 class FindBlockResponse(BaseResponse):
     """Response model for finding a block."""
     location: Optional[BlockLocation] = None
@@ -25,6 +37,32 @@ class MineBlockResponse(BaseResponse):
     """Response model for mining a block."""
     collected_item: Optional[str] = None
 
+class FindBlocksResponse(BaseResponse):
+    """Response model for finding many blocks of one type."""
+    origin: Optional[BlockLocation] = None
+    locations: Optional[List[BlockLocation]] = None
+
+class BlockScanResponse(BaseResponse):
+    """Response model for a bulk scan of several block types: counts, nearest block per type and nearest clusters."""
+    counts: Optional[Dict[str, int]] = None
+    nearest: Optional[Dict[str, Optional[BlockLocation]]] = None
+    clusters: Optional[List[Dict[str, Any]]] = None
+
+class CollectBlocksResponse(BaseResponse):
+    """Response model for a batched "collect N of X" operation."""
+    operationId: Optional[str] = None
+    collected_item: Optional[str] = None
+    quantity_requested: Optional[int] = None
+    quantity_collected: Optional[int] = None
+    elapsed_seconds: Optional[float] = None
+    blocks: Optional[List[MinedBlockTiming]] = None
+    collected_by: Optional[Dict[str, int]] = None
+
+class ResourceSurveyResponse(BaseResponse):
+    """Response model for locating several block types and reading the inventory at once."""
+    locations: Optional[Dict[str, Optional[BlockLocation]]] = None
+    inventory: Optional[List[ItemDetail]] = None
+
 class InventoryResponse(BaseResponse):
     """Response model for fetching bot inventory."""
     inventory: Optional[List[ItemDetail]] = None
@@ -34,6 +72,16 @@ class CraftItemResponse(BaseResponse):
     crafted_item: Optional[str] = None
     quantity_crafted: Optional[int] = None
 
+class CraftChainResponse(BaseResponse):
+    """Response model for a crafting chain run as one operation: items crafted, or the step that failed."""
+    operationId: Optional[str] = None
+    steps: Optional[List[Dict[str, Any]]] = None
+    steps_completed: Optional[int] = None
+    failed_step: Optional[int] = None
+    crafted: Optional[Dict[str, int]] = None
+    placed_location: Optional[BlockLocation] = None
+    elapsed_seconds: Optional[float] = None
+
 class PlaceBlockResponse(BaseResponse):
     """Response model for placing a block."""
     placed_location: Optional[BlockLocation] = None
@@ -0,0 +1,67 @@
+from typing import Optional, List, Dict, Any, Literal
+
+from pydantic import BaseModel, Field
+
+class RecipeDetails(BaseModel):
+    """Represents a crafting recipe in the format stored in `session.state['known_recipes']`."""
+    ingredients: Dict[str, int]
+    quantity_produced: int = 1
+    shape: Optional[List[List[Optional[str]]]] = None
+    crafting_table_needed: bool = False
+
+class PlanStep(BaseModel):
+    """Represents a single gather/craft/place step of a compiled crafting plan."""
+    step_id: str
+    action: Literal["gather", "craft", "place"]
+    item_name: str
+    quantity: int
+    craft_count: Optional[int] = None
+    source_block: Optional[str] = None
+    crafting_table_needed: bool = False
+    depends_on: List[str] = Field(default_factory=list)
+
+    @property
+    def task(self) -> str:
+        """The delegation task string understood by the Gatherer and Crafter agents."""
+        if self.action == "gather":
+            return f"collect {self.quantity} {self.source_block or self.item_name}"
+        if self.action == "craft":
+            return f"craft {self.quantity} {self.item_name}"
+        return f"place {self.quantity} {self.item_name} at a safe location near you"
+
+class CraftingPlan(BaseModel):
+    """Represents a full plan for a goal: ordered steps plus the bill of materials."""
+    goal: str
+    target_item: str
+    target_quantity: int
+    steps: List[PlanStep] = Field(default_factory=list)
+    bill_of_materials: Dict[str, int] = Field(default_factory=dict)
+    used_from_inventory: Dict[str, int] = Field(default_factory=dict)
+
+class MacroInvocation(BaseModel):
+    """
+    One recorded tool call of a plan macro. Argument values may be bindings instead of literals:
+    `{"$param": "quantity"}` takes a field of the plan step being executed, and
+    `{"$result": [index, "location", "x"]}` takes a value from an earlier invocation's result in the same step.
+    """
+    tool_name: str
+    args: Dict[str, Any] = Field(default_factory=dict)
+
+class MacroStep(BaseModel):
+    """Represents the recorded tool calls that carried out one plan step."""
+    step_id: str
+    action: Literal["gather", "craft", "place"]
+    item_name: str
+    depends_on: List[str] = Field(default_factory=list)
+    invocations: List[MacroInvocation] = Field(default_factory=list)
+
+class PlanMacro(BaseModel):
+    """
+    Represents a successful coordinator run, replayable for any goal that compiles to a plan
+    with the same `signature` (e.g. "craft N wooden_pickaxe" from an empty inventory).
+    """
+    target_item: str
+    signature: str
+    recorded_goal: str
+    steps: List[MacroStep] = Field(default_factory=list)
+    replays: int = 0
@@ -0,0 +1,39 @@
+from typing import Optional, List, Dict, Any
+
+from src.models.mineflayer_bridge.responses import BaseResponse
+
+class CraftingPlanResponse(BaseResponse):
+    """Response model for compiling a goal into a crafting plan."""
+    goal: Optional[str] = None
+    steps: Optional[List[Dict[str, Any]]] = None
+    bill_of_materials: Optional[Dict[str, int]] = None
+
+class MacroExecutionResponse(BaseResponse):
+    """Response model for replaying a plan macro; status is "success", "deviated" or "error"."""
+    goal: Optional[str] = None
+    completed_steps: Optional[List[str]] = None
+    deviated_step: Optional[str] = None
+    step_results: Optional[Dict[str, List[Dict[str, Any]]]] = None
+
+class PlanExecutionResponse(BaseResponse):
+    """Response model for executing a plan as a dependency graph of concurrent steps."""
+    goal: Optional[str] = None
+    completed_steps: Optional[List[str]] = None
+    failed_step: Optional[str] = None
+    skipped_steps: Optional[List[str]] = None
+    step_seconds: Optional[Dict[str, float]] = None
+    step_bots: Optional[Dict[str, List[str]]] = None
+    step_results: Optional[Dict[str, Dict[str, Any]]] = None
+    elapsed_seconds: Optional[float] = None
+    placed_location: Optional[Dict[str, int]] = None
+
+class RecipeLookupResponse(BaseResponse):
+    """Response model for looking up the recipes of an item in the recipe index."""
+    item_name: Optional[str] = None
+    recipe: Optional[Dict[str, Any]] = None
+    alternative_recipes: Optional[List[Dict[str, Any]]] = None
+
+class RecipeUsesResponse(BaseResponse):
+    """Response model for finding the items crafted from an ingredient."""
+    ingredient: Optional[str] = None
+    used_in: Optional[List[str]] = None
@@ -0,0 +1,318 @@
+import math
+import re
+from typing import Optional, Dict, List, Any, Tuple
+
+from src.models.planning.entities import RecipeDetails, PlanStep, CraftingPlan
+from src.planning.recipe_index import RecipeIndex
+
+# Recipes for the wooden/stone tool tier, used when `known_recipes` has no entry for an item.
+DEFAULT_RECIPES: Dict[str, Dict[str, Any]] = {
+    "oak_planks": {
+        "ingredients": {"oak_log": 1},
+        "quantity_produced": 4,
+        "shape": [["oak_log"]],
+        "crafting_table_needed": False,
+    },
+    "stick": {
+        "ingredients": {"oak_planks": 2},
+        "quantity_produced": 4,
+        "shape": [["oak_planks"], ["oak_planks"]],
+        "crafting_table_needed": False,
+    },
+    "crafting_table": {
+        "ingredients": {"oak_planks": 4},
+        "quantity_produced": 1,
+        "shape": [["oak_planks", "oak_planks"], ["oak_planks", "oak_planks"]],
+        "crafting_table_needed": False,
+    },
+    "wooden_pickaxe": {
+        "ingredients": {"oak_planks": 3, "stick": 2},
+        "quantity_produced": 1,
+        "shape": [["oak_planks", "oak_planks", "oak_planks"], [None, "stick", None], [None, "stick", None]],
+        "crafting_table_needed": True,
+    },
+    "stone_pickaxe": {
+        "ingredients": {"cobblestone": 3, "stick": 2},
+        "quantity_produced": 1,
+        "shape": [["cobblestone", "cobblestone", "cobblestone"], [None, "stick", None], [None, "stick", None]],
+        "crafting_table_needed": True,
+    },
+    "furnace": {
+        "ingredients": {"cobblestone": 8},
+        "quantity_produced": 1,
+        "shape": [["cobblestone", "cobblestone", "cobblestone"], ["cobblestone", None, "cobblestone"], ["cobblestone", "cobblestone", "cobblestone"]],
+        "crafting_table_needed": True,
+    },
+}
+
+# Items that are obtained by mining a different block than their own name.
+GATHER_SOURCE_BLOCKS: Dict[str, str] = {
+    "cobblestone": "stone",
+}
+
+# Common aliases used in task strings and prompts, mapped to Minecraft item ids.
+ITEM_ALIASES: Dict[str, str] = {
+    "sticks": "stick",
+    "planks": "oak_planks",
+    "logs": "oak_log",
+}
+
+_GOAL_PATTERN = re.compile(r"^\s*(?:craft|make|get|collect|gather)?\s*(\d+)?\s*([a-z0-9_ ]+?)\s*$", re.IGNORECASE)
+
+
+class PlanningError(Exception):
+    """Raised when a goal cannot be compiled into a plan."""
+
+
+def normalize_item_name(item_name: str) -> str:
+    """
+    Converts a free-form item name (e.g. "Wooden Pickaxe", "sticks") to a Minecraft item id.
+    """
+    name = item_name.strip().lower().replace(" ", "_")
+    return ITEM_ALIASES.get(name, name)
+
+
+def parse_goal(goal: str) -> Tuple[str, int]:
+    """
+    Parses a goal like "craft 1 wooden_pickaxe" into an (item_name, quantity) tuple.
+    The verb and quantity are optional; the quantity defaults to 1.
+    """
+    match = _GOAL_PATTERN.match(goal or "")
+    if not match or not match.group(2):
+        raise PlanningError(f"Could not parse goal '{goal}'. Expected format like 'craft 1 wooden_pickaxe'.")
+    quantity = int(match.group(1)) if match.group(1) else 1
+    if quantity <= 0:
+        raise PlanningError(f"Goal quantity must be positive, got {quantity}.")
+    return normalize_item_name(match.group(2)), quantity
+
+
+def merge_recipes(known_recipes: Optional[Dict[str, Any]]) -> Dict[str, RecipeDetails]:
+    """
+    Merges `known_recipes` from session state over the built-in defaults.
+    Malformed entries in `known_recipes` are ignored so the defaults still apply.
+    """
+    merged: Dict[str, RecipeDetails] = {
+        name: RecipeDetails.model_validate(details) for name, details in DEFAULT_RECIPES.items()
+    }
+    for name, details in (known_recipes or {}).items():
+        try:
+            merged[normalize_item_name(name)] = RecipeDetails.model_validate(details)
+        except Exception:
+            continue
+    return merged
+
+
+def add_index_recipes(roots: List[str], recipes: Dict[str, RecipeDetails], recipe_index: RecipeIndex) -> None:
+    """
+    Adds recipes from `recipe_index` to `recipes` for the items reachable from `roots` that have
+    neither a memorized nor a built-in recipe. Items in GATHER_SOURCE_BLOCKS stay gathered, and so
+    do intermediate items whose only recipes take an ingredient crafted back from the item itself
+    (iron_ingot from iron_nugget, which is made from iron_ingot): those are mined or smelted, not crafted.
+    """
+    pending = list(roots)
+    seen: set = set()
+    while pending:
+        name = pending.pop()
+        if name in seen:
+            continue
+        seen.add(name)
+        if name not in recipes and name not in GATHER_SOURCE_BLOCKS:
+            crafted_from_item = set() if name in roots else set(recipe_index.uses(name))
+            recipe = next(
+                (variant for variant in recipe_index.variants(name)
+                 if not crafted_from_item.intersection(variant.ingredients)),
+                None,
+            )
+            if recipe is not None:
+                recipes[name] = recipe
+        if name in recipes:
+            pending.extend(recipes[name].ingredients)
+
+
+def _topological_order(roots: List[str], recipes: Dict[str, RecipeDetails]) -> List[str]:
+    """
+    Returns items reachable from `roots` ordered so that every product comes
+    before its ingredients. Raises PlanningError on recipe cycles.
+    """
+    postorder: List[str] = []
+    visiting: set = set()
+    visited: set = set()
+
+    def visit(name: str, path: List[str]) -> None:
+        if name in visited:
+            return
+        if name in visiting:
+            raise PlanningError(f"Recipe cycle detected: {' -> '.join(path + [name])}")
+        visiting.add(name)
+        recipe = recipes.get(name)
+        if recipe:
+            for ingredient in recipe.ingredients:
+                visit(ingredient, path + [name])
+        visiting.discard(name)
+        visited.add(name)
+        postorder.append(name)
+
+    for root in roots:
+        visit(root, [])
+    return list(reversed(postorder))
+
+
+def build_crafting_plan(
+    goal: str,
+    known_recipes: Optional[Dict[str, Any]] = None,
+    inventory: Optional[Dict[str, int]] = None,
+    placed_crafting_table_location: Optional[Dict[str, int]] = None,
+    recipe_index: Optional[RecipeIndex] = None,
+) -> CraftingPlan:
+    """
+    Compiles a goal into an ordered list of gather/craft/place steps.
+
+    Quantities are netted against `inventory`, intermediate crafts are batched to whole
+    recipe executions, and a crafting table is crafted and placed when a step needs one
+    and `placed_crafting_table_location` is not set. Items without a memorized or built-in
+    recipe are looked up in `recipe_index` when given.
+    """
+    target_item, target_quantity = parse_goal(goal)
+    recipes = merge_recipes(known_recipes)
+    if recipe_index is not None:
+        add_index_recipes([target_item, "crafting_table"], recipes, recipe_index)
+    if target_item not in recipes:
+        raise PlanningError(f"No recipe known for '{target_item}'.")
+
+    needs_table = False
+    netted = _net_demand([target_item], {target_item: target_quantity}, recipes, inventory)
+    craft_counts = netted[2]
+    if placed_crafting_table_location is None and any(recipes[name].crafting_table_needed for name in craft_counts):
+        # A table has to be crafted and placed first, so net its ingredients together with the goal's.
+        needs_table = True
+        netted = _net_demand(
+            [target_item, "crafting_table"], {target_item: target_quantity, "crafting_table": 1}, recipes, inventory
+        )
+    order, gather_quantities, craft_counts, bill_of_materials, used_from_inventory = netted
+
+    steps = _build_steps(order, recipes, craft_counts, gather_quantities, needs_table)
+    return CraftingPlan(
+        goal=goal,
+        target_item=target_item,
+        target_quantity=target_quantity,
+        steps=steps,
+        bill_of_materials=bill_of_materials,
+        used_from_inventory=used_from_inventory,
+    )
+
+
+def _net_demand(
+    roots: List[str],
+    demand: Dict[str, int],
+    recipes: Dict[str, RecipeDetails],
+    inventory: Optional[Dict[str, int]],
+) -> Tuple[List[str], Dict[str, int], Dict[str, int], Dict[str, int], Dict[str, int]]:
+    """
+    Propagates demand from `roots` down the recipe graph, netting each item against inventory.
+    Returns (order, gather_quantities, craft_counts, bill_of_materials, used_from_inventory).
+    """
+    order = _topological_order(roots, recipes)
+    available: Dict[str, int] = {normalize_item_name(k): int(v) for k, v in (inventory or {}).items() if v}
+    demand = dict(demand)
+    gather_quantities: Dict[str, int] = {}
+    craft_counts: Dict[str, int] = {}
+    bill_of_materials: Dict[str, int] = {}
+    used_from_inventory: Dict[str, int] = {}
+
+    for name in order:
+        required = demand.get(name, 0)
+        if required <= 0:
+            continue
+        from_inventory = min(available.get(name, 0), required)
+        if from_inventory:
+            available[name] -= from_inventory
+            used_from_inventory[name] = from_inventory
+        remaining = required - from_inventory
+
+        recipe = recipes.get(name)
+        if recipe is None:
+            bill_of_materials[name] = required
+            if remaining:
+                gather_quantities[name] = remaining
+            continue
+        if not remaining:
+            continue
+        crafts = math.ceil(remaining / recipe.quantity_produced)
+        craft_counts[name] = crafts
+        for ingredient, per_craft in recipe.ingredients.items():
+            demand[ingredient] = demand.get(ingredient, 0) + per_craft * crafts
+
+    return order, gather_quantities, craft_counts, bill_of_materials, used_from_inventory
+
+
+def _build_steps(
+    order: List[str],
+    recipes: Dict[str, RecipeDetails],
+    craft_counts: Dict[str, int],
+    gather_quantities: Dict[str, int],
+    needs_table: bool,
+) -> List[PlanStep]:
+    """
+    Converts netted quantities into steps with dependency edges, sorted so every
+    step comes after the steps it depends on (ingredients first).
+    """
+    producer_step: Dict[str, str] = {}
+    steps: List[PlanStep] = []
+
+    for name in reversed(order):
+        if name in gather_quantities:
+            step = PlanStep(
+                step_id=f"gather:{name}",
+                action="gather",
+                item_name=name,
+                quantity=gather_quantities[name],
+                source_block=GATHER_SOURCE_BLOCKS.get(name),
+            )
+        elif name in craft_counts:
+            recipe = recipes[name]
+            step = PlanStep(
+                step_id=f"craft:{name}",
+                action="craft",
+                item_name=name,
+                quantity=craft_counts[name] * recipe.quantity_produced,
+                craft_count=craft_counts[name],
+                crafting_table_needed=recipe.crafting_table_needed,
+                depends_on=[f"{'craft' if i in craft_counts else 'gather'}:{i}" for i in recipe.ingredients
+                            if i in craft_counts or i in gather_quantities],
+            )
+        else:
+            continue
+        steps.append(step)
+        producer_step[name] = step.step_id
+
+    if needs_table:
+        steps.append(PlanStep(
+            step_id="place:crafting_table",
+            action="place",
+            item_name="crafting_table",
+            quantity=1,
+            depends_on=[producer_step["crafting_table"]] if "crafting_table" in producer_step else [],
+        ))
+        for step in steps:
+            if step.action == "craft" and step.crafting_table_needed:
+                step.depends_on.append("place:crafting_table")
+
+    return sort_steps(steps)
+
+
+def sort_steps(steps: List[PlanStep]) -> List[PlanStep]:
+    """
+    Topologically sorts steps by their `depends_on` edges, keeping the given order among ready steps.
+    """
+    remaining = list(steps)
+    done: set = set()
+    known_ids = {step.step_id for step in steps}
+    ordered: List[PlanStep] = []
+    while remaining:
+        ready = next((s for s in remaining if all(d in done or d not in known_ids for d in s.depends_on)), None)
+        if ready is None:
+            raise PlanningError(f"Plan steps contain a dependency cycle: {[s.step_id for s in remaining]}")
+        remaining.remove(ready)
+        done.add(ready.step_id)
+        ordered.append(ready)
+    return ordered
@@ -0,0 +1,164 @@
+import asyncio
+import time
+from typing import Optional, Dict, List, Any, Awaitable, Callable, Sequence, Set, Tuple
+
+from src.fleet.scheduler import TaskScheduler
+from src.models.planning.entities import PlanStep
+from src.models.planning.responses import PlanExecutionResponse
+
+# Runs one plan step on the bots assigned to it, as (bot, share) pairs, and returns its final result.
+StepRunner = Callable[[PlanStep, List[Tuple[Any, PlanStep]]], Awaitable[Dict[str, Any]]]
+
+
+class DagExecutionError(Exception):
+    """Raised when the steps do not form a valid dependency graph."""
+
+
+def validate_dependencies(steps: Sequence[PlanStep]) -> None:
+    """
+    Checks that every dependency names a step of the plan and that the dependencies have no cycle.
+    Raises DagExecutionError otherwise.
+    """
+    by_id = {step.step_id: step for step in steps}
+    for step in steps:
+        unknown = [dependency for dependency in step.depends_on if dependency not in by_id]
+        if unknown:
+            raise DagExecutionError(f"Step '{step.step_id}' depends on unknown steps {unknown}.")
+
+    state: Dict[str, int] = {}
+
+    def visit(step_id: str, path: List[str]) -> None:
+        if state.get(step_id) == 2:
+            return
+        if state.get(step_id) == 1:
+            raise DagExecutionError(f"Dependency cycle: {' -> '.join(path + [step_id])}")
+        state[step_id] = 1
+        for dependency in by_id[step_id].depends_on:
+            visit(dependency, path + [step_id])
+        state[step_id] = 2
+
+    for step in steps:
+        visit(step.step_id, [])
+
+
+class DagExecutor:
+    """
+    Executes the steps of a plan as a dependency graph: every step whose dependencies have succeeded
+    is dispatched at once, and its dependents start the moment it finishes, so a plan takes
+    critical-path time rather than the sum of its steps.
+
+    Each bot runs one step at a time (the JS side rejects concurrent digs and crafts on one bot).
+    Craft and place steps run on `home_bot`, which receives everything the other bots gather;
+    gather steps are split by the scheduler across the idle bots (the home bot only when no other
+    bot is idle), shared fairly between the gather steps that are ready together. The first failing step stops further dispatching;
+    steps already running are allowed to finish.
+    """
+
+    def __init__(self, bots: Sequence[Any], scheduler: TaskScheduler, run_step: StepRunner, home_bot: Optional[Any] = None):
+        self.bots = list(bots)
+        self.scheduler = scheduler
+        self.run_step = run_step
+        self.home_bot = home_bot if home_bot is not None else (self.bots[0] if self.bots else None)
+        # Bots owned by a running step; tracked here rather than through `bot.busy`, which
+        # the step runners toggle themselves while a share is in progress.
+        self._claimed: Set[int] = set()
+
+    def _idle_bots(self) -> List[Any]:
+        return [bot for bot in self.bots if id(bot) not in self._claimed and not bot.busy]
+
+    def _allocate(self, step: PlanStep, ready_gathers: int) -> List[Tuple[Any, PlanStep]]:
+        idle = self._idle_bots()
+        if step.action != "gather":
+            if self.home_bot is None or self.home_bot not in idle:
+                return []
+            return [(self.home_bot, step)]
+        if len(idle) > 1 and self.home_bot in idle:
+            # Keep the home bot free for the crafts that follow as long as another bot can gather.
+            idle.remove(self.home_bot)
+        return self.scheduler.assign(step, idle, max_shares=max(1, len(idle) // max(1, ready_gathers)))
+
+    async def _run_one(self, step: PlanStep, assignments: List[Tuple[Any, PlanStep]]) -> Dict[str, Any]:
+        try:
+            return await self.run_step(step, assignments)
+        except Exception as e:
+            return {"status": "error", "message": f"Step raised: {e}"}
+
+    async def run(self, steps: Sequence[PlanStep], goal: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Runs `steps` to completion or first failure.
+        Returns a dictionary representation of PlanExecutionResponse.
+        """
+        started_at = time.monotonic()
+        try:
+            validate_dependencies(steps)
+        except DagExecutionError as e:
+            return PlanExecutionResponse(status="error", goal=goal, message=str(e)).model_dump(exclude_none=True)
+
+        waiting_on: Dict[str, Set[str]] = {step.step_id: set(step.depends_on) for step in steps}
+        dependents: Dict[str, List[PlanStep]] = {step.step_id: [] for step in steps}
+        for step in steps:
+            for dependency in step.depends_on:
+                dependents[dependency].append(step)
+        ready: List[PlanStep] = [step for step in steps if not step.depends_on]
+        running: Dict[asyncio.Task, Tuple[PlanStep, List[Any], float]] = {}
+        completed: List[str] = []
+        step_seconds: Dict[str, float] = {}
+        step_bots: Dict[str, List[str]] = {}
+        step_results: Dict[str, Dict[str, Any]] = {}
+        failed: Optional[PlanStep] = None
+
+        while True:
+            if failed is None:
+                # Craft and place steps wait for the home bot, so they are dispatched before gathers claim it.
+                for step in sorted(ready, key=lambda candidate: candidate.action == "gather"):
+                    ready_gathers = sum(1 for candidate in ready if candidate.action == "gather")
+                    assignments = self._allocate(step, ready_gathers)
+                    if not assignments:
+                        continue
+                    bots = [bot for bot, _ in assignments]
+                    self._claimed.update(id(bot) for bot in bots)
+                    ready.remove(step)
+                    step_bots[step.step_id] = [bot.name for bot in bots]
+                    task = asyncio.create_task(self._run_one(step, assignments))
+                    running[task] = (step, bots, time.monotonic())
+
+            if not running:
+                break
+
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                step, bots, step_started = running.pop(task)
+                self._claimed.difference_update(id(bot) for bot in bots)
+                result = task.result()
+                step_seconds[step.step_id] = round(time.monotonic() - step_started, 3)
+                step_results[step.step_id] = result
+                if result.get("status") != "success":
+                    failed = failed or step
+                    continue
+                completed.append(step.step_id)
+                for dependent in dependents[step.step_id]:
+                    waiting_on[dependent.step_id].discard(step.step_id)
+                    if not waiting_on[dependent.step_id]:
+                        ready.append(dependent)
+
+        elapsed = round(time.monotonic() - started_at, 3)
+        skipped = [step.step_id for step in steps if step.step_id not in step_results]
+        if failed is None and skipped:
+            # Nothing was running and nothing could be dispatched: no bot can take the remaining steps.
+            message = f"No bot available for steps {skipped}."
+        elif failed is not None:
+            message = f"Step '{failed.task}' failed: {step_results[failed.step_id].get('message')}"
+        else:
+            message = f"Executed {len(completed)} steps in {elapsed:.1f}s (sum of step times {sum(step_seconds.values()):.1f}s)."
+        return PlanExecutionResponse(
+            status="success" if failed is None and not skipped else "error",
+            goal=goal,
+            message=message,
+            completed_steps=completed,
+            failed_step=failed.step_id if failed is not None else None,
+            skipped_steps=skipped or None,
+            step_seconds=step_seconds,
+            step_bots=step_bots,
+            step_results=step_results,
+            elapsed_seconds=elapsed,
+        ).model_dump(exclude_none=True)
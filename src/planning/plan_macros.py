@@ -0,0 +1,157 @@
+import hashlib
+import json
+import os
+import threading
+from typing import Optional, Dict, List, Any, Iterator, Tuple
+
+from src.models.planning.entities import PlanStep, MacroInvocation, MacroStep, PlanMacro
+
+# Plan step fields a recorded argument can be bound to, tried in this order.
+STEP_PARAMETERS = ("quantity", "craft_count")
+
+
+class MacroBindingError(Exception):
+    """Raised when a recorded invocation cannot be bound to the step being executed."""
+
+
+def plan_signature(steps: List[PlanStep]) -> str:
+    """
+    Hash of the plan's structure (actions, items, dependencies) without quantities, so goals that only
+    differ in quantity share a macro while a plan shortened by the inventory does not.
+    """
+    material = [
+        [step.step_id, step.action, step.item_name, step.source_block, step.crafting_table_needed, sorted(step.depends_on)]
+        for step in steps
+    ]
+    return hashlib.sha256(json.dumps(material, separators=(",", ":")).encode("utf-8")).hexdigest()[:16]
+
+
+def _leaves(value: Any, path: Tuple[Any, ...] = ()) -> Iterator[Tuple[Tuple[Any, ...], Any]]:
+    if isinstance(value, dict):
+        for key, item in value.items():
+            yield from _leaves(item, path + (key,))
+    elif isinstance(value, (str, int, float)) and not isinstance(value, bool):
+        yield path, value
+
+
+def template_args(args: Dict[str, Any], step: PlanStep, prior_results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Replaces recorded argument values by bindings: quantities equal to a step parameter become
+    `$param` bindings, and values read from an earlier result of the same step (matched by value and by
+    the argument name ending in the result key, e.g. `ref_block_x` <- `location.x`) become `$result` bindings.
+    Everything else is kept as a literal.
+    """
+    used_paths: set = set()
+    templated: Dict[str, Any] = {}
+    for name, value in args.items():
+        templated[name] = value
+        if isinstance(value, bool) or not isinstance(value, (int, str)):
+            continue
+        parameter = next((field for field in STEP_PARAMETERS if field in name and getattr(step, field) == value), None)
+        if parameter is not None:
+            templated[name] = {"$param": parameter}
+            continue
+        for index in range(len(prior_results) - 1, -1, -1):
+            match = next(
+                (path for path, leaf in _leaves(prior_results[index])
+                 if leaf == value and name.endswith(str(path[-1])) and (index, path) not in used_paths),
+                None,
+            )
+            if match is not None:
+                used_paths.add((index, match))
+                templated[name] = {"$result": [index, *match]}
+                break
+    return templated
+
+
+def bind_args(args: Dict[str, Any], step: PlanStep, prior_results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Resolves the bindings of a recorded invocation against the step being executed and the results
+    of the step's earlier invocations. Raises MacroBindingError if a binding cannot be resolved.
+    """
+    bound: Dict[str, Any] = {}
+    for name, value in args.items():
+        if isinstance(value, dict) and "$param" in value:
+            resolved = getattr(step, value["$param"], None)
+            if resolved is None:
+                raise MacroBindingError(f"Step '{step.step_id}' has no value for parameter '{value['$param']}'.")
+            bound[name] = resolved
+        elif isinstance(value, dict) and "$result" in value:
+            index, *path = value["$result"]
+            if index >= len(prior_results):
+                raise MacroBindingError(f"Argument '{name}' refers to missing result {index} of step '{step.step_id}'.")
+            resolved = prior_results[index]
+            for key in path:
+                if not isinstance(resolved, dict) or key not in resolved:
+                    raise MacroBindingError(f"Result {index} of step '{step.step_id}' has no '{'.'.join(map(str, path))}'.")
+                resolved = resolved[key]
+            bound[name] = resolved
+        else:
+            bound[name] = value
+    return bound
+
+
+def build_macro(
+    goal: str,
+    target_item: str,
+    plan_steps: List[PlanStep],
+    recorded_calls: Dict[str, List[Tuple[str, Dict[str, Any], Dict[str, Any]]]],
+) -> PlanMacro:
+    """
+    Builds a macro from the plan of a successful run and the (tool name, args, result) calls
+    recorded for each of its steps.
+    """
+    steps: List[MacroStep] = []
+    for plan_step in plan_steps:
+        results: List[Dict[str, Any]] = []
+        invocations: List[MacroInvocation] = []
+        for tool_name, args, result in recorded_calls.get(plan_step.step_id, []):
+            invocations.append(MacroInvocation(tool_name=tool_name, args=template_args(args, plan_step, results)))
+            results.append(result)
+        steps.append(MacroStep(
+            step_id=plan_step.step_id,
+            action=plan_step.action,
+            item_name=plan_step.item_name,
+            depends_on=plan_step.depends_on,
+            invocations=invocations,
+        ))
+    return PlanMacro(target_item=target_item, signature=plan_signature(plan_steps), recorded_goal=goal, steps=steps)
+
+
+class MacroStore:
+    """On-disk store of plan macros, one JSON file per (target item, plan signature)."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._lock = threading.Lock()
+
+    def _path(self, target_item: str, signature: str) -> str:
+        return os.path.join(self.directory, f"{target_item}-{signature}.json")
+
+    def get(self, target_item: str, signature: str) -> Optional[PlanMacro]:
+        path = self._path(target_item, signature)
+        with self._lock:
+            try:
+                with open(path, "r", encoding="utf-8") as macro_file:
+                    return PlanMacro.model_validate_json(macro_file.read())
+            except FileNotFoundError:
+                return None
+            except (OSError, ValueError):
+                # A corrupt macro is treated as missing; the next successful run records it again.
+                return None
+
+    def put(self, macro: PlanMacro) -> None:
+        path = self._path(macro.target_item, macro.signature)
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            temp_path = f"{path}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as macro_file:
+                macro_file.write(macro.model_dump_json(indent=2))
+            os.replace(temp_path, path)
+
+    def delete(self, target_item: str, signature: str) -> None:
+        with self._lock:
+            try:
+                os.remove(self._path(target_item, signature))
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,160 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+from typing import Optional, Dict, List, Any, Iterable
+
+from src.models.planning.entities import RecipeDetails
+
+MAGIC = b"MCRIDX01"
+# magic, slot count, entry count, metadata length
+_HEADER = struct.Struct("<8sIII")
+# key hash, data offset, value length, key length
+_SLOT = struct.Struct("<QQII")
+RECIPE_PREFIX = "r:"
+USES_PREFIX = "u:"
+
+
+class RecipeIndexError(Exception):
+    """Raised when a recipe index file is missing, truncated or of an unknown format."""
+
+
+def _hash(key: bytes) -> int:
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "little")
+
+
+def crafting_table_needed(shape: Optional[List[List[Optional[str]]]], ingredient_count: int) -> bool:
+    """A recipe needs a crafting table if it does not fit the 2x2 inventory grid."""
+    if shape:
+        return len(shape) > 2 or any(len(row) > 2 for row in shape)
+    return ingredient_count > 4
+
+
+def write_recipe_index(path: str, recipes: Dict[str, List[Dict[str, Any]]], metadata: Optional[Dict[str, Any]] = None) -> int:
+    """
+    Writes `recipes` (item -> recipe variants in RecipeDetails form, preferred first) to an index file:
+    an open-addressing hash table of fixed-size slots followed by the compact JSON values, so a lookup
+    reads one slot (plus probes) and one value straight from the memory map.
+    A reverse index ("which items use X") is stored in the same table. Returns the number of entries.
+    """
+    uses: Dict[str, set] = {}
+    for item, variants in recipes.items():
+        for variant in variants:
+            for ingredient in variant["ingredients"]:
+                uses.setdefault(ingredient, set()).add(item)
+
+    entries = [(RECIPE_PREFIX + item, variants) for item, variants in sorted(recipes.items())]
+    entries += [(USES_PREFIX + ingredient, sorted(items)) for ingredient, items in sorted(uses.items())]
+    slot_count = max(8, 1 << (len(entries) * 2 - 1).bit_length())  # load factor <= 0.5
+
+    meta_bytes = json.dumps(metadata or {}, separators=(",", ":")).encode("utf-8")
+    data_start = _HEADER.size + len(meta_bytes) + slot_count * _SLOT.size
+    slots = [None] * slot_count
+    data = bytearray()
+    for key, value in entries:
+        key_bytes = key.encode("utf-8")
+        value_bytes = json.dumps(value, separators=(",", ":")).encode("utf-8")
+        key_hash = _hash(key_bytes)
+        slot = key_hash % slot_count
+        while slots[slot] is not None:
+            slot = (slot + 1) % slot_count
+        slots[slot] = (key_hash, data_start + len(data), len(value_bytes), len(key_bytes))
+        data += key_bytes + value_bytes
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "wb") as index_file:
+        index_file.write(_HEADER.pack(MAGIC, slot_count, len(entries), len(meta_bytes)))
+        index_file.write(meta_bytes)
+        for entry in slots:
+            index_file.write(_SLOT.pack(*(entry or (0, 0, 0, 0))))
+        index_file.write(data)
+    os.replace(temp_path, path)
+    return len(entries)
+
+
+def group_recipe_records(records: Iterable[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Groups exported recipe records (`{item, ingredients, quantity_produced, shape, crafting_table_needed}`)
+    into recipe variants per item, keeping the export order and dropping duplicate variants.
+    """
+    recipes: Dict[str, List[Dict[str, Any]]] = {}
+    for record in records:
+        variant = RecipeDetails(
+            ingredients=record["ingredients"],
+            quantity_produced=record.get("quantity_produced", 1),
+            shape=record.get("shape"),
+            crafting_table_needed=record.get(
+                "crafting_table_needed", crafting_table_needed(record.get("shape"), sum(record["ingredients"].values()))
+            ),
+        ).model_dump(exclude_none=True)
+        variants = recipes.setdefault(record["item"], [])
+        if variant not in variants:
+            variants.append(variant)
+    return recipes
+
+
+class RecipeIndex:
+    """
+    Read-only, memory-mapped recipe index written by `write_recipe_index`. Lookups hash the item name,
+    probe the slot table and decode one JSON value, so they take constant time and every process
+    mapping the same file shares its pages.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        try:
+            with open(path, "rb") as index_file:
+                self._map = mmap.mmap(index_file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:
+            raise RecipeIndexError(f"Cannot open recipe index {path}: {e}")
+        if len(self._map) < _HEADER.size:
+            raise RecipeIndexError(f"Recipe index {path} is truncated.")
+        magic, self._slot_count, self.entry_count, meta_length = _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise RecipeIndexError(f"{path} is not a recipe index.")
+        self.metadata: Dict[str, Any] = json.loads(self._map[_HEADER.size:_HEADER.size + meta_length])
+        self._slots_start = _HEADER.size + meta_length
+
+    @property
+    def version(self) -> Optional[str]:
+        return self.metadata.get("minecraft_version")
+
+    def _lookup(self, key: str) -> Optional[Any]:
+        key_bytes = key.encode("utf-8")
+        key_hash = _hash(key_bytes)
+        slot = key_hash % self._slot_count
+        for _ in range(self._slot_count):
+            entry_hash, offset, value_length, key_length = _SLOT.unpack_from(self._map, self._slots_start + slot * _SLOT.size)
+            if key_length == 0:
+                return None
+            if entry_hash == key_hash and self._map[offset:offset + key_length] == key_bytes:
+                return json.loads(self._map[offset + key_length:offset + key_length + value_length])
+            slot = (slot + 1) % self._slot_count
+        return None
+
+    def variants(self, item_name: str) -> List[RecipeDetails]:
+        """All recipes producing `item_name`, preferred first."""
+        return [RecipeDetails.model_validate(variant) for variant in self._lookup(RECIPE_PREFIX + item_name) or []]
+
+    def get(self, item_name: str) -> Optional[RecipeDetails]:
+        """The preferred recipe producing `item_name`, or None if it cannot be crafted."""
+        variants = self._lookup(RECIPE_PREFIX + item_name)
+        return RecipeDetails.model_validate(variants[0]) if variants else None
+
+    def __contains__(self, item_name: str) -> bool:
+        return self._lookup(RECIPE_PREFIX + item_name) is not None
+
+    def uses(self, ingredient: str) -> List[str]:
+        """Items with at least one recipe that takes `ingredient`."""
+        return self._lookup(USES_PREFIX + ingredient) or []
+
+    def close(self) -> None:
+        self._map.close()
+
+    def __enter__(self) -> "RecipeIndex":
+        return self
+
+    def __exit__(self, *_exc) -> None:
+        self.close()
@@ -0,0 +1,88 @@
+import json
+import os
+import socketserver
+import threading
+from typing import Any, Callable, Dict, List, Set
+
+
+class SimulatedBatchServer:
+    """
+    The simulator's counterpart of `startBatchServer` in mineflayer_interface.js: JSON-lines
+    frames over a Unix socket, with the same frame format. The calls of a request frame run in
+    order on the connection's thread and are answered by one reply frame; every event of the
+    interface's emitter is pushed to all connections.
+    """
+
+    def __init__(self, functions: Dict[str, Callable[..., Any]], socket_path: str):
+        self.functions = functions
+        self.socket_path = socket_path
+        self._clients: Set[socketserver.StreamRequestHandler] = set()
+        self._clients_lock = threading.Lock()
+        server = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def setup(self) -> None:
+                super().setup()
+                self.write_lock = threading.Lock()
+                with server._clients_lock:
+                    server._clients.add(self)
+
+            def handle(self) -> None:
+                for line in self.rfile:
+                    if not line.strip():
+                        continue
+                    try:
+                        frame = json.loads(line)
+                    except ValueError:
+                        continue
+                    reply = {"id": frame.get("id"), "results": server.run_calls(frame.get("calls") or [])}
+                    self.send(json.dumps(reply, separators=(",", ":")))
+
+            def send(self, line: str) -> None:
+                with self.write_lock:
+                    try:
+                        self.wfile.write(line.encode("utf-8") + b"\n")
+                        self.wfile.flush()
+                    except OSError:
+                        pass
+
+            def finish(self) -> None:
+                with server._clients_lock:
+                    server._clients.discard(self)
+                super().finish()
+
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        self._server = socketserver.ThreadingUnixStreamServer(socket_path, Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name="sim-batch-server", daemon=True)
+        self._thread.start()
+
+    def run_calls(self, calls: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        results = []
+        for call in calls:
+            function = self.functions.get(call.get("fn"))
+            if function is None:
+                results.append({"error": f"Unknown function: {call.get('fn')}"})
+                continue
+            try:
+                results.append({"ok": function(*(call.get("args") or []))})
+            except Exception as e:
+                results.append({"error": f"{call.get('fn')} failed: {e}"})
+        return results
+
+    def push_event(self, event_name: str, payload: str) -> None:
+        """Pushes an emitter event (payload already JSON) to every connection."""
+        with self._clients_lock:
+            clients = list(self._clients)
+        if not clients:
+            return
+        frame = f'{{"event":{json.dumps(event_name)},"payload":{payload}}}'
+        for client in clients:
+            client.send(frame)
+
+    def close(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
@@ -0,0 +1,1046 @@
+import base64
+import json
+import math
+import random
+import sys
+import threading
+import time
+from array import array
+from typing import Optional, Dict, List, Any, Callable, Iterable, Set, Tuple
+
+from src.planning.crafting_planner import DEFAULT_RECIPES
+from src.planning.recipe_index import RecipeIndex, RecipeIndexError
+from src.simulation.batch_server import SimulatedBatchServer
+
+Point = Tuple[int, int, int]
+
+# Mirrors the constants of mineflayer_interface.js and the Mineflayer inventory layout.
+NAVIGATION_PROGRESS_INTERVAL_S = 1.0
+OVERALL_NAVIGATION_TIMEOUT_S = 120.0
+ROUTE_START_QUANTUM = 4
+ROUTE_CACHE_MAX_ROUTES = 256
+ROUTE_TIMEOUT_FACTOR = 3
+ROUTE_TIMEOUT_SLACK_S = 5.0
+ROUTE_MIN_TIMEOUT_S = 10.0
+TRAVEL_TIME_SMOOTHING = 0.3
+INVENTORY_START_SLOT = 9
+INVENTORY_END_SLOT = 45
+MAX_STACK_SIZE = 64
+UNSTACKABLE_SUFFIXES = ("_pickaxe", "_axe", "_shovel", "_sword", "_hoe")
+REACH_DISTANCE = 6.0
+# Interface functions callable over the batch transport, as in mineflayer_interface.js.
+BATCH_FUNCTIONS = (
+    "initializeBot", "goToXYZ", "goToNear", "cancelNavigation", "cancelOperation", "findBlock", "findBlocks",
+    "findBlocksMulti", "setTrackedBlockTypes", "setChunkSnapshots", "resyncWorldState", "mineBlock", "getInventory", "craftItem",
+    "craftChain", "placeBlock", "deliverItems",
+)
+CRAFTING_TABLE_SEARCH_DISTANCE = 64
+CRAFTING_TABLE_REACH_DISTANCE = 4.5
+PLACE_ON_GROUND_DISTANCE = 4
+# Vertical extent of the simulated world, as reported by a 1.18+ overworld in bot.game.
+WORLD_MIN_Y = -64
+WORLD_HEIGHT = 384
+MAX_REMEMBERED_CANCELLATIONS = 1000
+
+# Item dropped by a block, where it differs from the block name. None means no drop.
+BLOCK_DROPS: Dict[str, Optional[str]] = {
+    "stone": "cobblestone",
+    "grass_block": "dirt",
+    "coal_ore": "coal",
+    "oak_leaves": None,
+}
+# Blocks that only drop an item when mined with one of these tools.
+HARVEST_TOOLS: Dict[str, Set[str]] = {
+    "stone": {"wooden_pickaxe", "stone_pickaxe", "iron_pickaxe", "diamond_pickaxe"},
+    "cobblestone": {"wooden_pickaxe", "stone_pickaxe", "iron_pickaxe", "diamond_pickaxe"},
+    "coal_ore": {"wooden_pickaxe", "stone_pickaxe", "iron_pickaxe", "diamond_pickaxe"},
+    "iron_ore": {"stone_pickaxe", "iron_pickaxe", "diamond_pickaxe"},
+}
+# Dig time multiplier per block relative to `dig_seconds`.
+DIG_HARDNESS: Dict[str, float] = {
+    "oak_log": 1.0,
+    "birch_log": 1.0,
+    "spruce_log": 1.0,
+    "dirt": 0.3,
+    "grass_block": 0.35,
+    "oak_leaves": 0.1,
+    "stone": 1.5,
+    "coal_ore": 2.0,
+    "iron_ore": 2.0,
+    "crafting_table": 1.25,
+}
+
+
+class SimulatedEventEmitter:
+    """
+    Minimal stand-in for the Node EventEmitter exported as `taskEvents`.
+    Handlers are called as `handler(emitter, payload)`, like JSPyBridge event handlers.
+    Forwarders get every event as `forwarder(event_name, payload)` (the batch server's push).
+    """
+
+    def __init__(self):
+        self._handlers: Dict[str, List[Callable[..., None]]] = {}
+        self._forwarders: List[Callable[[str, str], None]] = []
+        self._lock = threading.Lock()
+
+    def add_forwarder(self, forwarder: Callable[[str, str], None]) -> None:
+        with self._lock:
+            self._forwarders.append(forwarder)
+
+    def on(self, event_name: str, handler: Callable[..., None]) -> None:
+        with self._lock:
+            self._handlers.setdefault(event_name, []).append(handler)
+
+    def emit(self, event_name: str, payload: str) -> None:
+        with self._lock:
+            handlers = list(self._handlers.get(event_name, []))
+            forwarders = list(self._forwarders)
+        for forwarder in forwarders:
+            forwarder(event_name, payload)
+        for handler in handlers:
+            handler(self, payload)
+
+
+class VoxelWorld:
+    """
+    Sparse voxel world shared by all simulated bots: a map of (x, y, z) to block name,
+    plus a per-name position index for block searches. Missing positions are air.
+    """
+
+    def __init__(self, blocks: Iterable[Tuple[str, int, int, int]] = (), spawn: Point = (0, 64, 0)):
+        self.spawn = spawn
+        self._blocks: Dict[Point, str] = {}
+        self._by_name: Dict[str, Set[Point]] = {}
+        self.lock = threading.RLock()
+        for name, x, y, z in blocks:
+            self.set_block((x, y, z), name)
+
+    @classmethod
+    def generate(cls, seed: int = 0, radius: int = 48, tree_count: int = 40, stone_patches: int = 12, ground_y: int = 63) -> "VoxelWorld":
+        """
+        Flat grass world with oak trees and exposed stone patches. Only the top layers are
+        materialized, since the bots never dig deeper than the surface.
+        """
+        rng = random.Random(seed)
+        world = cls(spawn=(0, ground_y + 1, 0))
+        for x in range(-radius, radius + 1):
+            for z in range(-radius, radius + 1):
+                world.set_block((x, ground_y, z), "grass_block")
+                world.set_block((x, ground_y - 1, z), "dirt")
+                world.set_block((x, ground_y - 2, z), "stone")
+        for _ in range(stone_patches):
+            cx, cz = rng.randint(-radius + 2, radius - 2), rng.randint(-radius + 2, radius - 2)
+            for dx in range(-1, 2):
+                for dz in range(-1, 2):
+                    world.set_block((cx + dx, ground_y, cz + dz), "stone")
+                    if rng.random() < 0.15:
+                        world.set_block((cx + dx, ground_y - 1, cz + dz), "coal_ore")
+        for _ in range(tree_count):
+            tx, tz = rng.randint(-radius + 2, radius - 2), rng.randint(-radius + 2, radius - 2)
+            if (tx, tz) == (0, 0) or world.block_at((tx, ground_y + 1, tz)) is not None:
+                continue
+            height = rng.randint(4, 6)
+            for dy in range(1, height + 1):
+                world.set_block((tx, ground_y + dy, tz), "oak_log")
+            for dx in range(-1, 2):
+                for dz in range(-1, 2):
+                    if (dx, dz) != (0, 0):
+                        world.set_block((tx + dx, ground_y + height, tz + dz), "oak_leaves")
+        return world
+
+    @classmethod
+    def from_file(cls, path: str) -> "VoxelWorld":
+        """
+        Loads a world from JSON: `{"spawn": [x, y, z], "blocks": [[name, x, y, z], ...]}`.
+        """
+        with open(path, "r", encoding="utf-8") as world_file:
+            data = json.load(world_file)
+        return cls(blocks=[tuple(block) for block in data.get("blocks", [])], spawn=tuple(data.get("spawn", (0, 64, 0))))
+
+    def block_at(self, point: Point) -> Optional[str]:
+        return self._blocks.get(point)
+
+    def set_block(self, point: Point, name: Optional[str]) -> Optional[str]:
+        """Sets (or clears, with None) the block at `point`. Returns the previous block name."""
+        with self.lock:
+            previous = self._blocks.pop(point, None)
+            if previous is not None:
+                self._by_name[previous].discard(point)
+            if name is not None:
+                self._blocks[point] = name
+                self._by_name.setdefault(name, set()).add(point)
+            return previous
+
+    def find(self, name: str, origin: Tuple[float, float, float], max_distance: float, count: int) -> List[Point]:
+        """Up to `count` blocks named `name` within `max_distance` of `origin`, nearest first."""
+        limit_sq = max_distance * max_distance
+        with self.lock:
+            candidates = list(self._by_name.get(name, ()))
+        found = []
+        for point in candidates:
+            dist_sq = (point[0] - origin[0]) ** 2 + (point[1] - origin[1]) ** 2 + (point[2] - origin[2]) ** 2
+            if dist_sq <= limit_sq:
+                found.append((dist_sq, point))
+        found.sort()
+        return [point for _, point in found[:count]]
+
+    def chunk_blocks(self, names: Set[str]) -> Dict[Tuple[int, int], List[List[Any]]]:
+        """Blocks of the given names grouped by chunk column, in the `mineflayerChunkBlocks` format."""
+        chunks: Dict[Tuple[int, int], List[List[Any]]] = {}
+        with self.lock:
+            for name in names:
+                for x, y, z in self._by_name.get(name, ()):
+                    chunks.setdefault((x >> 4, z >> 4), []).append([name, x, y, z])
+        return chunks
+
+    def chunk_columns(self) -> Dict[Tuple[int, int], List[Tuple[str, Point]]]:
+        """Every block grouped by chunk column; the simulator's loaded chunks are the ones with blocks."""
+        columns: Dict[Tuple[int, int], List[Tuple[str, Point]]] = {}
+        with self.lock:
+            for point, name in self._blocks.items():
+                columns.setdefault((point[0] >> 4, point[2] >> 4), []).append((name, point))
+        return columns
+
+
+class _Navigation:
+    def __init__(
+        self,
+        operation_id: str,
+        target: Tuple[float, float, float],
+        start: Tuple[float, float, float],
+        duration_s: float,
+        goal: Optional[Point] = None,
+        route_key: str = "",
+        route_cached: bool = False,
+    ):
+        self.operation_id = operation_id
+        self.target = target
+        self.start = start
+        self.goal = goal
+        self.route_key = route_key
+        self.route_cached = route_cached
+        self.duration_s = duration_s
+        self.started_at = time.monotonic()
+        self.finished = False
+        self.timers: List[threading.Timer] = []
+
+
+class SimulatedMineflayerInterface:
+    """
+    Pure-Python stand-in for `mineflayer_interface.js`, selected with `mineflayer_backend="simulated"`.
+
+    Exposes the same functions with the same return values: long-running tasks return a
+    "pending" response and later emit `mineflayerTaskComplete` on `taskEvents` from a timer
+    thread, just like JS events arrive on the JSPyBridge event thread. World, position and
+    inventory events are emitted in the same format as well, so the block index and the
+    inventory mirror work unchanged. Travel, dig, craft and place latencies are simulated and
+    scaled by `time_scale` (0 completes everything immediately).
+    """
+
+    def __init__(
+        self,
+        world: VoxelWorld,
+        walk_speed: float = 4.3,
+        dig_seconds: float = 0.5,
+        craft_seconds: float = 0.25,
+        place_seconds: float = 0.25,
+        time_scale: float = 1.0,
+        players: Optional[Dict[str, "SimulatedMineflayerInterface"]] = None,
+        recipe_index: Optional[RecipeIndex] = None,
+    ):
+        self.world = world
+        self.recipe_index = recipe_index
+        self.walk_speed = walk_speed
+        self.dig_seconds = dig_seconds
+        self.craft_seconds = craft_seconds
+        self.place_seconds = place_seconds
+        self.time_scale = time_scale
+        self.taskEvents = SimulatedEventEmitter()
+        self.call_count = 0
+        self._players = players if players is not None else {}
+        self._lock = threading.RLock()
+        self._username: Optional[str] = None
+        self._position: Optional[List[float]] = None
+        self._slots: Dict[int, Tuple[str, int]] = {}
+        self._tracked: Set[str] = set()
+        self._chunk_snapshots = False
+        self._navigation: Optional[_Navigation] = None
+        # Route cache of mineflayer_interface.js: cells each cached route passes through, by route key,
+        # the keys by cell for invalidation, and smoothed travel times per key.
+        self._routes: Dict[str, Set[Point]] = {}
+        self._routes_by_cell: Dict[Point, Set[str]] = {}
+        self._travel_times: Dict[str, Dict[str, float]] = {}
+        self._digging = False
+        # Cancellable operations by operationId, as (kind, cancel), and cancelled ids whose late completion is dropped.
+        self._operations: Dict[str, Tuple[str, Callable[[], None]]] = {}
+        self._cancelled_operations: Dict[str, None] = {}
+        self._batch_server: Optional[SimulatedBatchServer] = None
+
+    # ----- Interface management -----
+
+    def createInterface(self) -> "SimulatedMineflayerInterface":
+        """Creates another bot in the same world, like `createInterface()` in JS."""
+        return SimulatedMineflayerInterface(
+            self.world, self.walk_speed, self.dig_seconds, self.craft_seconds, self.place_seconds, self.time_scale, self._players,
+            self.recipe_index,
+        )
+
+    def _emit(self, event_name: str, payload: Dict[str, Any]) -> None:
+        self.taskEvents.emit(event_name, json.dumps(payload))
+
+    def _complete(self, result: Dict[str, Any]) -> None:
+        with self._lock:
+            operation_id = result.get("operationId")
+            if operation_id in self._operations:
+                del self._operations[operation_id]
+            elif operation_id in self._cancelled_operations:
+                del self._cancelled_operations[operation_id]
+                return
+        self._emit("mineflayerTaskComplete", result)
+
+    def _track(self, operation_id: str, kind: str, cancel: Callable[[], None]) -> None:
+        with self._lock:
+            self._operations[operation_id] = (kind, cancel)
+
+    def startBatchServer(self, socketPath: str) -> Dict[str, Any]:
+        """Serves the batch transport on a Unix socket, like `startBatchServer` in JS."""
+        self.call_count += 1
+        if self._batch_server is not None:
+            return {"status": "already_running", "message": "Batch server already listening."}
+        functions = {name: getattr(self, name) for name in BATCH_FUNCTIONS}
+        try:
+            self._batch_server = SimulatedBatchServer(functions, socketPath)
+        except OSError as e:
+            return {"status": "error", "message": f"Batch server failed: {e}"}
+        self.taskEvents.add_forwarder(self._batch_server.push_event)
+        return {"status": "success", "message": f"Batch server listening on {socketPath}."}
+
+    def cancelOperation(self, operationId: str) -> Dict[str, Any]:
+        self.call_count += 1
+        with self._lock:
+            operation = self._operations.pop(operationId, None)
+            if operation is None:
+                return {"status": "error", "operationId": operationId, "message": f"Operation {operationId} is not active."}
+            self._cancelled_operations[operationId] = None
+            if len(self._cancelled_operations) > MAX_REMEMBERED_CANCELLATIONS:
+                self._cancelled_operations.pop(next(iter(self._cancelled_operations)))
+        kind, cancel = operation
+        cancel()
+        self._emit("mineflayerTaskComplete", {"operationId": operationId, "status": "cancelled", "message": f"{kind} cancelled."})
+        return {"status": "success", "operationId": operationId, "message": f"{kind} {operationId} cancelled."}
+
+    def _error(self, operation_id: str, message: str) -> Dict[str, Any]:
+        result = {"operationId": operation_id, "status": "error", "message": message}
+        self._complete(result)
+        return result
+
+    def _later(self, delay_s: float, callback: Callable[[], None]) -> threading.Timer:
+        timer = threading.Timer(max(0.0, delay_s * self.time_scale), callback)
+        timer.daemon = True
+        timer.start()
+        return timer
+
+    def _ready(self) -> bool:
+        return self._username is not None
+
+    # ----- Lifecycle and world tracking -----
+
+    def initializeBot(self, options: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        self.call_count += 1
+        options = options or {}
+        if self._ready():
+            return {"status": "already_initialized", "username": self._username}
+        if not options.get("username"):
+            return {"status": "error", "message": "No username given."}
+
+        spawn = options.get("initial_teleport_coords") or self.world.spawn
+        self._username = options["username"]
+        self._position = [float(spawn[0]), float(spawn[1]), float(spawn[2])]
+        self._tracked = set(options.get("tracked_block_types") or [])
+        self._players[self._username] = self
+        self._emit_all_chunks()
+        self._emit_position()
+        self._emit("mineflayerInventorySnapshot", {"slots": self._slot_payloads()})
+        return {"status": "success", "username": self._username, "message": "Simulated bot initialized and spawned."}
+
+    def setTrackedBlockTypes(self, block_type_names: List[str]) -> Dict[str, Any]:
+        self.call_count += 1
+        if not self._ready():
+            return {"status": "error", "message": "Bot not initialized or registry not available."}
+        self._tracked = set(block_type_names)
+        chunk_count = self._emit_all_chunks()
+        return {"status": "success", "message": f"Tracking {len(self._tracked)} block types; rescanned {chunk_count} loaded chunks."}
+
+    def _emit_all_chunks(self) -> int:
+        chunks = self.world.chunk_blocks(self._tracked)
+        for (chunk_x, chunk_z), blocks in chunks.items():
+            self._emit("mineflayerChunkBlocks", {"chunkX": chunk_x, "chunkZ": chunk_z, "blocks": blocks})
+        return len(chunks)
+
+    def setChunkSnapshots(self, enabled: bool) -> Dict[str, Any]:
+        self.call_count += 1
+        if not self._ready():
+            return {"status": "error", "message": "Bot not initialized or registry not available."}
+        self._chunk_snapshots = bool(enabled)
+        if not self._chunk_snapshots:
+            return {"status": "success", "message": "Chunk snapshots disabled."}
+        columns = self.world.chunk_columns()
+        for (chunk_x, chunk_z), blocks in columns.items():
+            self._emit_chunk_snapshot(chunk_x, chunk_z, blocks)
+        return {"status": "success", "message": f"Chunk snapshots enabled; sent {len(columns)} loaded chunks."}
+
+    def resyncWorldState(self, block_type_names: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Re-sends position, inventory, tracked blocks and (if enabled) chunk snapshots, like `resyncWorldState` in JS."""
+        self.call_count += 1
+        if not self._ready():
+            return {"status": "error", "message": "Bot not initialized or registry not available."}
+        if block_type_names is not None:
+            self._tracked = set(block_type_names)
+        self._emit_position()
+        self._emit("mineflayerInventorySnapshot", {"slots": self._slot_payloads()})
+        chunk_count = self._emit_all_chunks()
+        if self._chunk_snapshots:
+            for (chunk_x, chunk_z), blocks in self.world.chunk_columns().items():
+                self._emit_chunk_snapshot(chunk_x, chunk_z, blocks)
+        return {"status": "success", "message": f"Resent position, inventory and {chunk_count} loaded chunks."}
+
+    def _emit_chunk_snapshot(self, chunk_x: int, chunk_z: int, blocks: List[Tuple[str, Point]]) -> None:
+        """Emits a column in the `mineflayerChunkSnapshot` format: palette indices in (y, z, x) order."""
+        palette = ["air"]
+        palette_index = {"air": 0}
+        indices = array("H", bytes(2 * WORLD_HEIGHT * 256))
+        for name, (x, y, z) in blocks:
+            if not WORLD_MIN_Y <= y < WORLD_MIN_Y + WORLD_HEIGHT:
+                continue
+            if name not in palette_index:
+                palette_index[name] = len(palette)
+                palette.append(name)
+            indices[((y - WORLD_MIN_Y) * 16 + (z & 15)) * 16 + (x & 15)] = palette_index[name]
+        if sys.byteorder == "big":
+            indices.byteswap()
+        self._emit("mineflayerChunkSnapshot", {
+            "chunkX": chunk_x, "chunkZ": chunk_z, "minY": WORLD_MIN_Y, "height": WORLD_HEIGHT,
+            "palette": palette, "data": base64.b64encode(indices.tobytes()).decode("ascii"),
+        })
+
+    def _emit_position(self) -> None:
+        x, y, z = self._position
+        self._emit("mineflayerBotPosition", {"x": x, "y": y, "z": z})
+
+    def _emit_block_update(self, point: Point, old_name: Optional[str], new_name: Optional[str]) -> None:
+        for player in list(self._players.values()):
+            player._invalidate_routes_at(point)
+            if player._chunk_snapshots:
+                player._emit("mineflayerChunkBlockChange", {"x": point[0], "y": point[1], "z": point[2], "name": new_name or "air"})
+        old_tracked = old_name if old_name in self._tracked else None
+        new_tracked = new_name if new_name in self._tracked else None
+        if old_tracked is None and new_tracked is None:
+            return
+        # Every bot sees the update, like every Mineflayer client does.
+        for player in list(self._players.values()):
+            player._emit("mineflayerBlockUpdate", {
+                "x": point[0], "y": point[1], "z": point[2],
+                "old_name": old_name if old_name in player._tracked else None,
+                "new_name": new_name if new_name in player._tracked else None,
+            })
+
+    # ----- Navigation -----
+
+    def goToXYZ(self, x: int, y: int, z: int, operationId: str) -> Dict[str, Any]:
+        self.call_count += 1
+        if not self._ready():
+            return self._error(operationId, "Bot not initialized or pathfinder not loaded.")
+        return self._start_navigation(x, y, z, 0, operationId, f"block:{x},{y},{z}")
+
+    def goToNear(self, x: int, y: int, z: int, range_: int, operationId: str) -> Dict[str, Any]:
+        self.call_count += 1
+        if not self._ready():
+            return self._error(operationId, "Bot not initialized or pathfinder not loaded.")
+        return self._start_navigation(x, y, z, range_, operationId, f"near:{x},{y},{z},{range_}")
+
+    # ----- Route cache -----
+
+    @staticmethod
+    def _route_key(start: Tuple[float, float, float], goal_key: str) -> str:
+        quantized = ",".join(str(math.floor(value / ROUTE_START_QUANTUM)) for value in start)
+        return f"{quantized}>{goal_key}"
+
+    def _forget_route(self, key: str) -> None:
+        for cell in self._routes.pop(key, ()):
+            keys = self._routes_by_cell.get(cell)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._routes_by_cell[cell]
+
+    def _remember_route(self, key: str, start: Tuple[float, float, float], target: Tuple[float, float, float]) -> None:
+        """Caches the straight walk from `start` to `target`: the cells the bot passed, plus floor and head room."""
+        self._forget_route(key)
+        if len(self._routes) >= ROUTE_CACHE_MAX_ROUTES:
+            self._forget_route(next(iter(self._routes)))
+        steps = max(1, math.ceil(math.dist(start, target)))
+        cells: Set[Point] = set()
+        for step in range(steps + 1):
+            x, y, z = (math.floor(s + (t - s) * step / steps) for s, t in zip(start, target))
+            cells.update((x, y + dy, z) for dy in (-1, 0, 1))
+        self._routes[key] = cells
+        for cell in cells:
+            self._routes_by_cell.setdefault(cell, set()).add(key)
+
+    def _invalidate_routes_at(self, point: Point) -> None:
+        with self._lock:
+            for key in list(self._routes_by_cell.get(point, ())):
+                self._forget_route(key)
+
+    def _record_travel_time(self, key: str, elapsed_s: float) -> None:
+        stats = self._travel_times.get(key)
+        if stats is None:
+            self._travel_times[key] = {"trips": 1, "mean_s": elapsed_s, "max_s": elapsed_s}
+            return
+        stats["trips"] += 1
+        stats["mean_s"] += TRAVEL_TIME_SMOOTHING * (elapsed_s - stats["mean_s"])
+        stats["max_s"] = max(stats["max_s"], elapsed_s)
+
+    def _navigation_timeout_s(self, key: str) -> float:
+        """Timeout of a trip in simulated seconds: the default for unknown routes, else from observed travel times."""
+        stats = self._travel_times.get(key)
+        if stats is None:
+            return OVERALL_NAVIGATION_TIMEOUT_S
+        expected = max(stats["mean_s"] * ROUTE_TIMEOUT_FACTOR, stats["max_s"] * 1.5) + ROUTE_TIMEOUT_SLACK_S
+        return min(OVERALL_NAVIGATION_TIMEOUT_S, max(ROUTE_MIN_TIMEOUT_S, expected))
+
+    def _start_navigation(self, x: int, y: int, z: int, range_: float, operation_id: str, goal_key: str) -> Dict[str, Any]:
+        with self._lock:
+            if self._navigation is not None:
+                self._finish_navigation(self._navigation, {
+                    "operationId": self._navigation.operation_id,
+                    "status": "error",
+                    "preempted": True,
+                    "message": f"Navigation preempted by a newer goal (operationId {operation_id}).",
+                })
+            start = tuple(self._position)
+            distance = math.dist(start, (x, y, z))
+            travel = max(0.0, distance - range_)
+            if range_ > 0 and distance > 0:
+                ratio = travel / distance
+                target = tuple(start[i] + (coord - start[i]) * ratio for i, coord in enumerate((x, y, z)))
+            else:
+                target = (float(x), float(y), float(z))
+            duration = travel / self.walk_speed
+            route_key = self._route_key(start, goal_key)
+            route_cached = route_key in self._routes
+            timeout_s = self._navigation_timeout_s(route_key)
+            navigation = _Navigation(operation_id, target, start, duration, (x, y, z), route_key, route_cached)
+            self._navigation = navigation
+            self._track(operation_id, "Navigation", lambda: self._finish_navigation(navigation, {
+                "operationId": operation_id, "status": "cancelled", "message": "Navigation cancelled.",
+            }))
+
+            if duration > timeout_s:
+                navigation.timers.append(self._later(timeout_s, lambda: self._finish_navigation(navigation, {
+                    "operationId": operation_id, "status": "error",
+                    "message": f"Overall navigation timed out for goal {x},{y},{z} after {timeout_s:g}s",
+                })))
+            else:
+                navigation.timers.append(self._later(duration, lambda: self._finish_navigation(navigation, {
+                    "operationId": operation_id, "status": "success", "message": f"Reached goal: {x}, {y}, {z}",
+                }, arrived=True)))
+            ticks = int(min(duration, timeout_s) // NAVIGATION_PROGRESS_INTERVAL_S)
+            for tick in range(1, ticks + 1):
+                navigation.timers.append(self._later(tick * NAVIGATION_PROGRESS_INTERVAL_S, lambda: self._emit_navigation_progress(navigation)))
+        route_note = ", following a cached route" if route_cached else ""
+        return {"status": "pending", "operationId": operation_id, "message": f"Navigation to ({x},{y},{z}) initiated, {distance:.1f} blocks away{route_note}."}
+
+    def _navigation_fraction(self, navigation: _Navigation) -> float:
+        if navigation.duration_s <= 0 or self.time_scale <= 0:
+            return 1.0
+        return min(1.0, (time.monotonic() - navigation.started_at) / (navigation.duration_s * self.time_scale))
+
+    def _emit_navigation_progress(self, navigation: _Navigation) -> None:
+        with self._lock:
+            if navigation.finished:
+                return
+            fraction = self._navigation_fraction(navigation)
+            self._position = [s + (t - s) * fraction for s, t in zip(navigation.start, navigation.target)]
+            remaining = math.dist(self._position, navigation.target)
+            elapsed = time.monotonic() - navigation.started_at
+        self._emit_position()
+        self._emit("mineflayerTaskProgress", {
+            "operationId": navigation.operation_id,
+            "remaining_distance": round(remaining, 2),
+            "replans": 0,
+            "eta_seconds": round(remaining / self.walk_speed, 1),
+            "elapsed_seconds": round(elapsed, 1),
+        })
+
+    def _finish_navigation(self, navigation: _Navigation, result: Dict[str, Any], arrived: bool = False) -> None:
+        with self._lock:
+            if navigation.finished:
+                return
+            navigation.finished = True
+            for timer in navigation.timers:
+                timer.cancel()
+            fraction = 1.0 if arrived else self._navigation_fraction(navigation)
+            self._position = [s + (t - s) * fraction for s, t in zip(navigation.start, navigation.target)]
+            if self._navigation is navigation:
+                self._navigation = None
+            elapsed = time.monotonic() - navigation.started_at
+            if result.get("status") == "success":
+                self._record_travel_time(navigation.route_key, navigation.duration_s)
+                if not navigation.route_cached:
+                    self._remember_route(navigation.route_key, navigation.start, navigation.target)
+            elif navigation.route_cached and result.get("status") == "error" and not result.get("preempted"):
+                self._forget_route(navigation.route_key)
+        self._emit_position()
+        self._complete({
+            **result, "replans": 0, "elapsed_seconds": elapsed, "route_cached": navigation.route_cached,
+            "start": dict(zip("xyz", navigation.start)), "goal": dict(zip("xyz", navigation.goal)),
+        })
+
+    def cancelNavigation(self, operationId: Optional[str] = None) -> Dict[str, Any]:
+        self.call_count += 1
+        navigation = self._navigation
+        if navigation is None or (operationId and navigation.operation_id != operationId):
+            return {"status": "error", "message": f"Navigation {operationId} is not active." if operationId else "No active navigation."}
+        self._finish_navigation(navigation, {"operationId": navigation.operation_id, "status": "cancelled", "message": "Navigation cancelled."})
+        return {"status": "success", "operationId": navigation.operation_id, "message": f"Navigation {navigation.operation_id} cancelled."}
+
+    # ----- Block search -----
+
+    def findBlock(self, blockTypeName: str, maxDistance: float = 64, count: int = 1) -> Dict[str, Any]:
+        self.call_count += 1
+        if not self._ready():
+            return {"status": "error", "message": "Bot not initialized or registry not available."}
+        found = self.world.find(blockTypeName, self._position, maxDistance, 1)
+        if found:
+            x, y, z = found[0]
+            return {"status": "success", "location": {"x": x, "y": y, "z": z}}
+        return {"status": "error", "message": f"{blockTypeName} not found within {maxDistance} blocks."}
+
+    def findBlocks(self, blockTypeName: str, maxDistance: float = 64, count: int = 16) -> Dict[str, Any]:
+        self.call_count += 1
+        if not self._ready():
+            return {"status": "error", "message": "Bot not initialized or registry not available."}
+        found = self.world.find(blockTypeName, self._position, maxDistance, count)
+        origin = [math.floor(c) for c in self._position]
+        result = {
+            "status": "success" if found else "error",
+            "origin": {"x": origin[0], "y": origin[1], "z": origin[2]},
+            "locations": [{"x": x, "y": y, "z": z} for x, y, z in found],
+        }
+        if not found:
+            result["message"] = f"{blockTypeName} not found within {maxDistance} blocks."
+        return result
+
+    def findBlocksMulti(self, blockTypeNames: List[str], maxDistance: float = 64, countPerType: int = 256) -> Dict[str, Any]:
+        """One scan for several block types, as flat [typeIndex, x, y, z, ...] rows like the JS interface."""
+        self.call_count += 1
+        if not self._ready():
+            return {"status": "error", "message": "Bot not initialized or registry not available."}
+        types = list(dict.fromkeys(blockTypeNames))
+        blocks: List[int] = []
+        for type_index, name in enumerate(types):
+            for x, y, z in self.world.find(name, self._position, maxDistance, countPerType):
+                blocks.extend((type_index, x, y, z))
+        origin = [math.floor(c) for c in self._position]
+        return {
+            "status": "success" if types else "error",
+            "origin": {"x": origin[0], "y": origin[1], "z": origin[2]},
+            "types": types,
+            "blocks": blocks,
+        }
+
+    # ----- Mining -----
+
+    def mineBlock(self, blockTypeName: str, x: int, y: int, z: int, operationId: str) -> Dict[str, Any]:
+        self.call_count += 1
+        if not self._ready():
+            return self._error(operationId, "Bot not initialized.")
+        point = (int(x), int(y), int(z))
+        with self._lock:
+            if self._digging:
+                return self._error(operationId, "Bot is already digging. Cannot start new dig operation.")
+            name = self.world.block_at(point)
+            if name is None:
+                return self._error(operationId, f"No block found at {x},{y},{z}.")
+            if name != blockTypeName:
+                return self._error(operationId, f"Block at {x},{y},{z} is {name}, not {blockTypeName}.")
+            if math.dist(self._position, (x + 0.5, y + 0.5, z + 0.5)) > REACH_DISTANCE:
+                return self._error(operationId, f"Cannot dig {blockTypeName} at {x},{y},{z}. Might need a better tool or allow break time.")
+            self._digging = True
+
+        def finish() -> None:
+            with self._lock:
+                self._digging = False
+                if self.world.block_at(point) != name:
+                    result = {"operationId": operationId, "status": "error", "message": f"Mining failed: block at {x},{y},{z} changed."}
+                else:
+                    self.world.set_block(point, None)
+                    drop = self._drop_for(name)
+                    if drop:
+                        self._add_item(drop, 1)
+                    result = {"operationId": operationId, "status": "success", "collected_item": name, "message": f"Successfully mined {name}"}
+            if result["status"] == "success":
+                self._emit_block_update(point, name, None)
+            self._complete(result)
+
+        timers: List[threading.Timer] = []
+
+        def cancel() -> None:
+            for timer in timers:
+                timer.cancel()
+            with self._lock:
+                self._digging = False
+
+        self._track(operationId, "Mining", cancel)
+        timers.append(self._later(self.dig_seconds * DIG_HARDNESS.get(name, 1.0), finish))
+        return {"status": "pending", "operationId": operationId, "message": f"Mining of {blockTypeName} at ({x},{y},{z}) initiated."}
+
+    def _drop_for(self, block_name: str) -> Optional[str]:
+        tools = HARVEST_TOOLS.get(block_name)
+        if tools and not any(self._count(tool) for tool in tools):
+            return None
+        return BLOCK_DROPS.get(block_name, block_name)
+
+    # ----- Inventory -----
+
+    def _slot_payloads(self) -> List[Dict[str, Any]]:
+        return [{"slot": slot, "name": name, "count": count, "type": _item_type(name)} for slot, (name, count) in sorted(self._slots.items())]
+
+    def _set_slot(self, slot: int, name: Optional[str], count: int) -> None:
+        if name is None or count <= 0:
+            self._slots.pop(slot, None)
+            self._emit("mineflayerInventorySlot", {"slot": slot, "name": None, "count": 0, "type": -1})
+        else:
+            self._slots[slot] = (name, count)
+            self._emit("mineflayerInventorySlot", {"slot": slot, "name": name, "count": count, "type": _item_type(name)})
+
+    def _count(self, name: str) -> int:
+        return sum(count for item, count in self._slots.values() if item == name)
+
+    def _add_item(self, name: str, count: int) -> int:
+        """Adds up to `count` items, filling existing stacks first. Returns how many fit."""
+        stack_size = 1 if name.endswith(UNSTACKABLE_SUFFIXES) else MAX_STACK_SIZE
+        remaining = count
+        for slot in range(INVENTORY_START_SLOT, INVENTORY_END_SLOT):
+            if remaining <= 0:
+                break
+            item = self._slots.get(slot)
+            if item is not None and item[0] == name and item[1] < stack_size:
+                added = min(remaining, stack_size - item[1])
+                self._set_slot(slot, name, item[1] + added)
+                remaining -= added
+        for slot in range(INVENTORY_START_SLOT, INVENTORY_END_SLOT):
+            if remaining <= 0:
+                break
+            if slot not in self._slots:
+                added = min(remaining, stack_size)
+                self._set_slot(slot, name, added)
+                remaining -= added
+        return count - remaining
+
+    def _remove_item(self, name: str, count: int) -> None:
+        remaining = count
+        for slot in sorted(self._slots, reverse=True):
+            if remaining <= 0:
+                break
+            item_name, item_count = self._slots[slot]
+            if item_name != name:
+                continue
+            taken = min(remaining, item_count)
+            self._set_slot(slot, name, item_count - taken)
+            remaining -= taken
+
+    def getInventory(self) -> Dict[str, Any]:
+        self.call_count += 1
+        if not self._ready():
+            return {"status": "error", "message": "Bot not initialized or inventory not available."}
+        totals: Dict[str, int] = {}
+        for name, count in self._slots.values():
+            totals[name] = totals.get(name, 0) + count
+        return {"status": "success", "inventory": [{"name": name, "count": count, "type": _item_type(name)} for name, count in totals.items()]}
+
+    def give(self, item_name: str, count: int) -> int:
+        """Test and benchmark helper: puts items straight into the bot's inventory."""
+        with self._lock:
+            return self._add_item(item_name, count)
+
+    # ----- Crafting and placing -----
+
+    def craftItem(
+        self,
+        itemName: str,
+        quantity: int,
+        recipeShape: Optional[List[List[Optional[str]]]],
+        ingredients: Optional[Dict[str, int]],
+        craftingTableNeeded: bool,
+        operationId: str,
+    ) -> Dict[str, Any]:
+        """
+        Crafts `quantity` items (rounded up to whole crafts), using the default recipe for the item,
+        then the recipe index (like the real bot, which knows every recipe of its version) or,
+        for unknown items, the given ingredients per craft with a yield of one.
+        """
+        self.call_count += 1
+        if not self._ready():
+            return self._error(operationId, "Bot not initialized or bot.registry not available.")
+        recipe = self._recipe_for(itemName, ingredients)
+        if recipe is None:
+            return self._error(operationId, f"Unknown item: {itemName}")
+        per_craft, produced, needs_table = recipe
+        needs_table = needs_table or bool(craftingTableNeeded)
+        crafts = max(1, math.ceil(quantity / produced))
+
+        with self._lock:
+            if needs_table and not self.world.find("crafting_table", self._position, CRAFTING_TABLE_SEARCH_DISTANCE, 1):
+                return self._error(operationId, "Crafting table not found nearby.")
+            missing = {name: per * crafts - self._count(name) for name, per in per_craft.items() if self._count(name) < per * crafts}
+            if missing:
+                return self._error(operationId, f"No recipe found for {itemName} in inventory. Missing: {missing}")
+
+        def finish() -> None:
+            with self._lock:
+                if any(self._count(name) < per * crafts for name, per in per_craft.items()):
+                    result = {"operationId": operationId, "status": "error", "message": "Crafting failed: ingredients were used up."}
+                else:
+                    for name, per in per_craft.items():
+                        self._remove_item(name, per * crafts)
+                    self._add_item(itemName, crafts * produced)
+                    result = {"operationId": operationId, "status": "success", "crafted_item": itemName, "quantity_crafted": crafts * produced}
+            self._complete(result)
+
+        # A craft in progress cannot be interrupted; cancelling only drops its completion.
+        self._track(operationId, "Crafting", lambda: None)
+        self._later(self.craft_seconds * crafts, finish)
+        return {"status": "pending", "operationId": operationId, "message": f"Crafting of {quantity} {itemName}(s) initiated."}
+
+    def _recipe_for(self, item_name: str, ingredients: Optional[Dict[str, int]] = None) -> Optional[Tuple[Dict[str, int], int, bool]]:
+        """
+        (ingredients per craft, items per craft, crafting table needed) of the default recipe for the
+        item, else the recipe index's, else the given ingredients with a yield of one. None if unknown.
+        """
+        recipe = DEFAULT_RECIPES.get(item_name)
+        if recipe is None and self.recipe_index is not None:
+            indexed = self.recipe_index.get(item_name)
+            recipe = indexed.model_dump() if indexed else None
+        if recipe is None:
+            return (dict(ingredients), 1, False) if ingredients else None
+        return dict(recipe["ingredients"]), recipe["quantity_produced"], recipe["crafting_table_needed"]
+
+    def _ground_spot(self) -> Optional[Point]:
+        """The free position nearest the bot on top of a block, other than where the bot stands."""
+        feet = (math.floor(self._position[0]), math.floor(self._position[1]), math.floor(self._position[2]))
+        spots = [
+            (feet[0] + dx, feet[1] + dy, feet[2] + dz)
+            for dx in range(-PLACE_ON_GROUND_DISTANCE, PLACE_ON_GROUND_DISTANCE + 1)
+            for dy in range(-PLACE_ON_GROUND_DISTANCE, PLACE_ON_GROUND_DISTANCE + 1)
+            for dz in range(-PLACE_ON_GROUND_DISTANCE, PLACE_ON_GROUND_DISTANCE + 1)
+            if (dx, dz) != (0, 0)
+        ]
+        spots.sort(key=lambda spot: math.dist(spot, feet))
+        for spot in spots:
+            if self.world.block_at(spot) is None and self.world.block_at((spot[0], spot[1] - 1, spot[2])) is not None:
+                return spot
+        return None
+
+    def craftChain(self, steps: List[Dict[str, Any]], operationId: str) -> Dict[str, Any]:
+        """
+        Runs ordered craft and place steps back to back as one operation, like `craftChain` in JS:
+        quantities count items, a "place" step puts a crafting table down unless one is within reach,
+        and one completion reports the items crafted or the step that failed.
+        """
+        self.call_count += 1
+        if not self._ready():
+            return self._error(operationId, "Bot not initialized or bot.registry not available.")
+        if not steps:
+            return self._error(operationId, "No crafting steps given.")
+        cancelled = threading.Event()
+        started_at = time.monotonic()
+        recipes: Dict[str, Tuple[Dict[str, int], int, bool]] = {}
+        crafted: Dict[str, int] = {}
+        placed: Dict[str, Any] = {}
+
+        def complete(status: str, message: str, steps_completed: int, **extra: Any) -> None:
+            self._complete({
+                "operationId": operationId, "status": status, "message": message, "steps_completed": steps_completed,
+                "crafted": dict(crafted), "placed_location": placed.get("location"),
+                "elapsed_seconds": round(time.monotonic() - started_at, 3), **extra,
+            })
+
+        def fail(index: int, message: str) -> None:
+            step = steps[index]
+            complete("error", f"Step {index + 1} ({step.get('action') or 'craft'} {step.get('item')}) failed: {message}", index, failed_step=index)
+
+        def run(index: int) -> None:
+            if cancelled.is_set():
+                return
+            if index == len(steps):
+                summary = ", ".join(f"{count} {name}" for name, count in crafted.items()) or "nothing"
+                complete("success", f"Crafted {summary}.", len(steps))
+                return
+            step = steps[index]
+            item_name = step.get("item")
+            if step.get("action") == "place":
+                with self._lock:
+                    table_in_reach = bool(self.world.find("crafting_table", self._position, CRAFTING_TABLE_REACH_DISTANCE, 1))
+                    in_inventory = self._count(item_name) > 0
+                    spot = self._ground_spot()
+                if table_in_reach:
+                    return run(index + 1)
+                if not in_inventory:
+                    return fail(index, f"Item {item_name} not in inventory.")
+                if spot is None:
+                    return fail(index, f"No free ground within {PLACE_ON_GROUND_DISTANCE} blocks to place {item_name} on.")
+
+                def place() -> None:
+                    with self._lock:
+                        placeable = self._count(item_name) > 0 and self.world.block_at(spot) is None
+                        if placeable:
+                            self._remove_item(item_name, 1)
+                            self.world.set_block(spot, item_name)
+                    if not placeable:
+                        return fail(index, f"Placing {item_name} failed: no {item_name} left or the spot is occupied.")
+                    self._emit_block_update(spot, None, item_name)
+                    placed["location"] = {"x": spot[0], "y": spot[1], "z": spot[2]}
+                    run(index + 1)
+
+                self._later(self.place_seconds, place)
+                return
+
+            recipe = recipes.get(item_name) or self._recipe_for(item_name)
+            if recipe is None:
+                return fail(index, f"Unknown item: {item_name}")
+            recipes[item_name] = recipe
+            per_craft, produced, needs_table = recipe
+            crafts = max(1, math.ceil(int(step.get("quantity") or 1) / produced))
+            with self._lock:
+                table_found = bool(self.world.find("crafting_table", self._position, CRAFTING_TABLE_SEARCH_DISTANCE, 1))
+                missing = {name: per * crafts - self._count(name) for name, per in per_craft.items() if self._count(name) < per * crafts}
+            if (needs_table or step.get("crafting_table_needed")) and not table_found:
+                return fail(index, "Crafting table not found nearby.")
+            if missing:
+                return fail(index, f"No recipe found for {item_name} with the current inventory. Missing: {missing}")
+
+            def craft() -> None:
+                with self._lock:
+                    used_up = any(self._count(name) < per * crafts for name, per in per_craft.items())
+                    if not used_up:
+                        for name, per in per_craft.items():
+                            self._remove_item(name, per * crafts)
+                        self._add_item(item_name, crafts * produced)
+                if used_up:
+                    return fail(index, "Crafting failed: ingredients were used up.")
+                crafted[item_name] = crafted.get(item_name, 0) + crafts * produced
+                run(index + 1)
+
+            self._later(self.craft_seconds * crafts, craft)
+
+        # A craft in progress cannot be interrupted; cancelling stops the chain before its next step.
+        self._track(operationId, "Crafting chain", cancelled.set)
+        self._later(0.0, lambda: run(0))
+        return {"status": "pending", "operationId": operationId, "message": f"Crafting chain of {len(steps)} steps initiated."}
+
+    def placeBlock(
+        self,
+        itemName: str,
+        x: int, y: int, z: int,
+        refBlockX: int, refBlockY: int, refBlockZ: int,
+        faceVectorX: int, faceVectorY: int, faceVectorZ: int,
+        operationId: str,
+    ) -> Dict[str, Any]:
+        self.call_count += 1
+        if not self._ready():
+            return self._error(operationId, "Bot not initialized or bot.registry not available.")
+        with self._lock:
+            if self._count(itemName) <= 0:
+                return self._error(operationId, f"Item {itemName} not in inventory.")
+            reference = (int(refBlockX), int(refBlockY), int(refBlockZ))
+            if self.world.block_at(reference) is None:
+                return self._error(operationId, "Reference block not found.")
+        target = (reference[0] + int(faceVectorX), reference[1] + int(faceVectorY), reference[2] + int(faceVectorZ))
+
+        def finish() -> None:
+            with self._lock:
+                if self.world.block_at(target) is not None:
+                    result = {"operationId": operationId, "status": "error", "message": "Placing block failed: target position is occupied."}
+                elif self._count(itemName) <= 0:
+                    result = {"operationId": operationId, "status": "error", "message": f"Placing block failed: no {itemName} left."}
+                else:
+                    self._remove_item(itemName, 1)
+                    self.world.set_block(target, itemName)
+                    result = {
+                        "operationId": operationId,
+                        "status": "success",
+                        "message": f"Placed {itemName}.",
+                        "placed_location": {"x": target[0], "y": target[1], "z": target[2]},
+                    }
+            if result["status"] == "success":
+                self._emit_block_update(target, None, itemName)
+            self._complete(result)
+
+        self._track(operationId, "Placing", lambda: None)
+        self._later(self.place_seconds, finish)
+        return {"status": "pending", "operationId": operationId, "message": f"Placing of {itemName} initiated."}
+
+    def deliverItems(self, targetUsername: str, itemName: str, count: int, operationId: str) -> Dict[str, Any]:
+        self.call_count += 1
+        if not self._ready():
+            return self._error(operationId, "Bot not initialized or pathfinder not loaded.")
+        target = self._players.get(targetUsername)
+        if target is None or not target._ready():
+            return self._error(operationId, f"Player {targetUsername} is not in view.")
+        with self._lock:
+            to_deliver = min(count, self._count(itemName))
+        if to_deliver == 0:
+            return self._error(operationId, f"No {itemName} in inventory.")
+        travel = max(0.0, math.dist(self._position, target._position) - 2) / self.walk_speed
+
+        def finish() -> None:
+            with self._lock:
+                delivered = min(to_deliver, self._count(itemName))
+                self._remove_item(itemName, delivered)
+                self._position = list(target._position)
+            with target._lock:
+                target._add_item(itemName, delivered)
+            self._emit_position()
+            self._complete({
+                "operationId": operationId,
+                "status": "success",
+                "delivered_item": itemName,
+                "quantity_delivered": delivered,
+                "message": f"Delivered {delivered} {itemName} to {targetUsername}.",
+            })
+
+        timers: List[threading.Timer] = []
+        self._track(operationId, "Delivery", lambda: [timer.cancel() for timer in timers])
+        timers.append(self._later(travel, finish))
+        return {"status": "pending", "operationId": operationId, "message": f"Delivery of {to_deliver} {itemName} to {targetUsername} initiated."}
+
+
+def _item_type(name: str) -> int:
+    """Stable numeric id standing in for the registry id of an item."""
+    return sum(ord(char) for char in name) % 1000
+
+
+def create_simulated_interface(settings: Any) -> SimulatedMineflayerInterface:
+    """
+    Builds the simulated backend from `Settings`: the world is loaded from `sim_world_file`
+    if set, otherwise generated from `sim_world_seed`. Recipes come from the recipe index if it has been built.
+    """
+    try:
+        recipe_index = RecipeIndex(settings.resolved_recipe_index_path)
+    except RecipeIndexError:
+        recipe_index = None
+    if settings.sim_world_file:
+        world = VoxelWorld.from_file(settings.sim_world_file)
+    else:
+        world = VoxelWorld.generate(seed=settings.sim_world_seed, radius=settings.sim_world_radius, tree_count=settings.sim_tree_count)
+    return SimulatedMineflayerInterface(
+        world,
+        walk_speed=settings.sim_walk_speed,
+        dig_seconds=settings.sim_dig_seconds,
+        craft_seconds=settings.sim_craft_seconds,
+        place_seconds=settings.sim_place_seconds,
+        time_scale=settings.sim_time_scale,
+        recipe_index=recipe_index,
+    )
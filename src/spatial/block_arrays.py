@@ -0,0 +1,189 @@
+from typing import Optional, Dict, List, Any, Sequence, Tuple
+
+import numpy as np
+
+Point = Tuple[int, int, int]
+
+# One row per matched block: index into the match set's `types`, then the block position.
+BLOCK_DTYPE = np.dtype([("type", np.uint16), ("x", np.int32), ("y", np.int32), ("z", np.int32)])
+
+# Half of the 26 neighbouring cell offsets; linking each cell forward covers every adjacent pair once.
+_FORWARD_NEIGHBOURS = [
+    (dx, dy, dz)
+    for dx in (-1, 0, 1) for dy in (-1, 0, 1) for dz in (-1, 0, 1)
+    if (dx, dy, dz) > (0, 0, 0)
+]
+
+
+class BlockMatches:
+    """
+    Blocks of several types found by one bulk query, as a structured array of (type, x, y, z)
+    rows plus the list of type names the `type` column indexes into.
+    Distance ordering, k-nearest selection and clustering are vectorized over all rows, so
+    choosing among hundreds of candidates is array math rather than one query per block.
+    """
+
+    def __init__(self, types: Sequence[str], blocks: Optional[np.ndarray] = None, origin: Optional[Sequence[float]] = None):
+        self.types = list(types)
+        self.blocks = blocks if blocks is not None else np.zeros(0, dtype=BLOCK_DTYPE)
+        self.origin = tuple(origin) if origin is not None else None
+
+    @classmethod
+    def from_flat(cls, types: Sequence[str], flat: Sequence[int], origin: Optional[Sequence[float]] = None) -> "BlockMatches":
+        """Builds the matches from the flat [type, x, y, z, ...] rows returned by `findBlocksMulti`."""
+        rows = np.asarray(flat, dtype=np.int64).reshape(-1, 4)
+        blocks = np.zeros(len(rows), dtype=BLOCK_DTYPE)
+        for column, name in enumerate(BLOCK_DTYPE.names):
+            blocks[name] = rows[:, column]
+        return cls(types, blocks, origin)
+
+    @classmethod
+    def from_points(cls, points_by_type: Dict[str, Sequence[Point]], origin: Optional[Sequence[float]] = None) -> "BlockMatches":
+        types = list(points_by_type)
+        flat = [value for type_index, name in enumerate(types) for point in points_by_type[name] for value in (type_index, *point)]
+        return cls.from_flat(types, flat, origin)
+
+    @classmethod
+    def concat(cls, matches: Sequence["BlockMatches"], origin: Optional[Sequence[float]] = None) -> "BlockMatches":
+        """Merges match sets, remapping their type indices onto one list of types."""
+        types: List[str] = []
+        parts = []
+        for match in matches:
+            types.extend(name for name in match.types if name not in types)
+            part = match.blocks.copy()
+            if len(part):
+                remap = np.array([types.index(name) for name in match.types], dtype=np.uint16)
+                part["type"] = remap[part["type"]]
+            parts.append(part)
+        blocks = np.concatenate(parts) if parts else np.zeros(0, dtype=BLOCK_DTYPE)
+        return cls(types, blocks, origin if origin is not None else next((m.origin for m in matches if m.origin), None))
+
+    def __len__(self) -> int:
+        return len(self.blocks)
+
+    def positions(self) -> np.ndarray:
+        """(N, 3) float array of block positions."""
+        return np.stack([self.blocks["x"], self.blocks["y"], self.blocks["z"]], axis=1).astype(np.float64)
+
+    def type_names(self) -> np.ndarray:
+        return np.asarray(self.types, dtype=object)[self.blocks["type"]] if len(self) else np.zeros(0, dtype=object)
+
+    def subset(self, selection: Any) -> "BlockMatches":
+        return BlockMatches(self.types, self.blocks[selection], self.origin)
+
+    def of_type(self, block_type: str) -> "BlockMatches":
+        if block_type not in self.types:
+            return BlockMatches(self.types, self.blocks[:0], self.origin)
+        return self.subset(self.blocks["type"] == self.types.index(block_type))
+
+    def counts(self) -> Dict[str, int]:
+        per_type = np.bincount(self.blocks["type"], minlength=len(self.types)) if len(self) else np.zeros(len(self.types), dtype=int)
+        return {name: int(count) for name, count in zip(self.types, per_type)}
+
+    def _origin(self, origin: Optional[Sequence[float]]) -> np.ndarray:
+        origin = origin if origin is not None else self.origin
+        if origin is None:
+            raise ValueError("An origin is required for distance queries.")
+        return np.asarray(origin, dtype=np.float64)
+
+    def distances(self, origin: Optional[Sequence[float]] = None) -> np.ndarray:
+        """Euclidean distance of every block from `origin` (default: the query origin)."""
+        return np.linalg.norm(self.positions() - self._origin(origin), axis=1)
+
+    def sorted_by_distance(self, origin: Optional[Sequence[float]] = None) -> "BlockMatches":
+        return self.subset(np.argsort(self.distances(origin), kind="stable"))
+
+    def k_nearest(self, count: int, origin: Optional[Sequence[float]] = None, block_type: Optional[str] = None) -> "BlockMatches":
+        """The `count` blocks nearest to `origin` (of `block_type` if given), nearest first."""
+        matches = self.of_type(block_type) if block_type is not None else self
+        if count <= 0 or not len(matches):
+            return matches.subset(slice(0, 0))
+        distances = matches.distances(origin)
+        if count < len(matches):
+            nearest = np.argpartition(distances, count - 1)[:count]
+        else:
+            nearest = np.arange(len(matches))
+        return matches.subset(nearest[np.argsort(distances[nearest], kind="stable")])
+
+    def cluster_labels(self, link_distance: float = 4.0) -> np.ndarray:
+        """
+        Labels blocks by cluster: positions are bucketed into cubes of `link_distance` and
+        touching cubes (including diagonals) form one cluster, e.g. the logs of one tree or one
+        ore vein. Labels are 0..K-1, ordered by first occurrence of the cluster's cube.
+        """
+        if not len(self):
+            return np.zeros(0, dtype=np.int64)
+        cells = np.floor_divide(self.positions(), link_distance).astype(np.int64)
+        unique_cells, cell_of_block = np.unique(cells, axis=0, return_inverse=True)
+        cell_index = {cell: index for index, cell in enumerate(map(tuple, unique_cells.tolist()))}
+        parent = list(range(len(unique_cells)))
+
+        def root(index: int) -> int:
+            while parent[index] != index:
+                parent[index] = parent[parent[index]]
+                index = parent[index]
+            return index
+
+        for index, (cx, cy, cz) in enumerate(unique_cells.tolist()):
+            for dx, dy, dz in _FORWARD_NEIGHBOURS:
+                neighbour = cell_index.get((cx + dx, cy + dy, cz + dz))
+                if neighbour is not None:
+                    a, b = root(index), root(neighbour)
+                    if a != b:
+                        parent[b] = a
+        roots = np.array([root(index) for index in range(len(unique_cells))])
+        _, cluster_of_cell = np.unique(roots, return_inverse=True)
+        return cluster_of_cell[np.ravel(cell_of_block)]
+
+    def clusters(self, link_distance: float = 4.0, origin: Optional[Sequence[float]] = None) -> List[Dict[str, Any]]:
+        """
+        Summarizes the clusters of `cluster_labels`, nearest first: block count per type, the
+        centroid, the nearest block and its distance from `origin`.
+        """
+        if not len(self):
+            return []
+        labels = self.cluster_labels(link_distance)
+        cluster_count = int(labels.max()) + 1
+        sizes = np.bincount(labels, minlength=cluster_count)
+        positions = self.positions()
+        centroids = np.stack([np.bincount(labels, weights=positions[:, axis], minlength=cluster_count) for axis in range(3)], axis=1)
+        centroids /= sizes[:, None]
+        distances = self.distances(origin)
+        # Nearest block per cluster: sort by (label, distance) and take the first row of each label.
+        order = np.lexsort((distances, labels))
+        first_rows = order[np.searchsorted(labels[order], np.arange(cluster_count))]
+        type_counts = np.zeros((cluster_count, len(self.types)), dtype=np.int64)
+        np.add.at(type_counts, (labels, self.blocks["type"]), 1)
+
+        summaries = []
+        for cluster in np.argsort(distances[first_rows], kind="stable"):
+            nearest = self.blocks[first_rows[cluster]]
+            summaries.append({
+                "size": int(sizes[cluster]),
+                "counts": {self.types[t]: int(n) for t, n in enumerate(type_counts[cluster]) if n},
+                "centroid": {axis: round(float(value), 1) for axis, value in zip("xyz", centroids[cluster])},
+                "nearest": {"x": int(nearest["x"]), "y": int(nearest["y"]), "z": int(nearest["z"])},
+                "distance": round(float(distances[first_rows[cluster]]), 1),
+            })
+        return summaries
+
+    def tour(self, origin: Optional[Sequence[float]] = None) -> List[Point]:
+        """
+        Orders the blocks as a greedy nearest-neighbour tour from `origin`: each next block is the
+        closest remaining one to the previous block, with the distances computed over all remaining blocks at once.
+        """
+        positions = self.positions()
+        remaining = np.ones(len(positions), dtype=bool)
+        current = self._origin(origin)
+        tour: List[Point] = []
+        for _ in range(len(positions)):
+            distances = np.einsum("ij,ij->i", positions - current, positions - current)
+            distances[~remaining] = np.inf
+            index = int(np.argmin(distances))
+            remaining[index] = False
+            current = positions[index]
+            tour.append((int(self.blocks["x"][index]), int(self.blocks["y"][index]), int(self.blocks["z"][index])))
+        return tour
+
+    def to_points(self) -> List[Point]:
+        return [(int(x), int(y), int(z)) for x, y, z in zip(self.blocks["x"], self.blocks["y"], self.blocks["z"])]
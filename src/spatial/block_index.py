@@ -0,0 +1,154 @@
+import heapq
+import math
+from collections import OrderedDict
+from typing import Optional, Dict, List, Set, Tuple, Iterable, Sequence
+
+Point = Tuple[int, int, int]
+ChunkKey = Tuple[int, int]
+
+CHUNK_SIZE = 16
+
+
+def chunk_key_for(x: float, z: float) -> ChunkKey:
+    """Returns the (chunk_x, chunk_z) key of the chunk column containing world position x, z."""
+    return int(math.floor(x)) >> 4, int(math.floor(z)) >> 4
+
+
+def squared_distance(a: Sequence[float], b: Sequence[float]) -> float:
+    """Returns the squared Euclidean distance between two 3D points."""
+    return (a[0] - b[0]) ** 2 + (a[1] - b[1]) ** 2 + (a[2] - b[2]) ** 2
+
+
+def _chunk_lower_bound_sq(origin: Sequence[float], key: ChunkKey) -> float:
+    """Squared horizontal distance from `origin` to the nearest point of a chunk column."""
+    min_x, min_z = key[0] * CHUNK_SIZE, key[1] * CHUNK_SIZE
+    dx = max(min_x - origin[0], 0.0, origin[0] - (min_x + CHUNK_SIZE - 1))
+    dz = max(min_z - origin[2], 0.0, origin[2] - (min_z + CHUNK_SIZE - 1))
+    return dx * dx + dz * dz
+
+
+class BlockIndex:
+    """
+    In-memory spatial index of known resource blocks, bucketed by chunk column.
+
+    Fed from chunk load and block update events, so nearest-block queries are answered
+    in Python without a JS round trip. Chunks are kept in LRU order and, when more than
+    `max_chunks` are known, the least recently used chunk outside `keep_radius_chunks`
+    of the last query origin is evicted first.
+    """
+
+    def __init__(self, max_chunks: int = 1024, keep_radius_chunks: int = 8):
+        self.max_chunks = max_chunks
+        self.keep_radius_chunks = keep_radius_chunks
+        self._chunks: "OrderedDict[ChunkKey, Dict[str, Set[Point]]]" = OrderedDict()
+        self._type_chunks: Dict[str, Set[ChunkKey]] = {}
+        self._last_origin_chunk: Optional[ChunkKey] = None
+
+    def __len__(self) -> int:
+        return sum(len(points) for blocks in self._chunks.values() for points in blocks.values())
+
+    @property
+    def chunk_count(self) -> int:
+        return len(self._chunks)
+
+    def has_chunk(self, chunk_x: int, chunk_z: int) -> bool:
+        return (chunk_x, chunk_z) in self._chunks
+
+    def replace_chunk(self, chunk_x: int, chunk_z: int, blocks: Iterable[Tuple[str, int, int, int]]) -> None:
+        """
+        Replaces everything known about a chunk column with `blocks` as (block_name, x, y, z) tuples.
+        """
+        key = (chunk_x, chunk_z)
+        self.drop_chunk(chunk_x, chunk_z)
+        bucket: Dict[str, Set[Point]] = {}
+        for name, x, y, z in blocks:
+            bucket.setdefault(name, set()).add((x, y, z))
+        self._chunks[key] = bucket
+        for name in bucket:
+            self._type_chunks.setdefault(name, set()).add(key)
+        self._evict_if_needed()
+
+    def drop_chunk(self, chunk_x: int, chunk_z: int) -> None:
+        key = (chunk_x, chunk_z)
+        bucket = self._chunks.pop(key, None)
+        if not bucket:
+            return
+        for name in bucket:
+            chunks = self._type_chunks.get(name)
+            if chunks is not None:
+                chunks.discard(key)
+                if not chunks:
+                    del self._type_chunks[name]
+
+    def update_block(self, x: int, y: int, z: int, old_name: Optional[str], new_name: Optional[str]) -> None:
+        """
+        Applies a block change. Blocks of untracked types can be passed as None.
+        Updates for chunks that were never loaded into the index are ignored.
+        """
+        key = chunk_key_for(x, z)
+        bucket = self._chunks.get(key)
+        if bucket is None:
+            return
+        point = (x, y, z)
+        if old_name and old_name in bucket:
+            bucket[old_name].discard(point)
+            if not bucket[old_name]:
+                del bucket[old_name]
+                chunks = self._type_chunks.get(old_name)
+                if chunks is not None:
+                    chunks.discard(key)
+                    if not chunks:
+                        del self._type_chunks[old_name]
+        if new_name:
+            bucket.setdefault(new_name, set()).add(point)
+            self._type_chunks.setdefault(new_name, set()).add(key)
+        self._chunks.move_to_end(key)
+
+    def nearest(self, block_type: str, origin: Sequence[float], max_distance: Optional[float] = None) -> Optional[Point]:
+        """
+        Returns the known block of `block_type` closest to `origin`, or None.
+        """
+        found = self.k_nearest(block_type, origin, 1, max_distance)
+        return found[0] if found else None
+
+    def k_nearest(self, block_type: str, origin: Sequence[float], count: int, max_distance: Optional[float] = None) -> List[Point]:
+        """
+        Returns up to `count` known blocks of `block_type` ordered by distance from `origin`.
+        Chunks are visited in order of their distance lower bound and the scan stops as soon as
+        no remaining chunk can hold a closer block.
+        """
+        self._last_origin_chunk = chunk_key_for(origin[0], origin[2])
+        chunk_keys = self._type_chunks.get(block_type)
+        if not chunk_keys or count <= 0:
+            return []
+
+        limit_sq = max_distance * max_distance if max_distance is not None else math.inf
+        ordered_chunks = [(_chunk_lower_bound_sq(origin, key), key) for key in chunk_keys]
+        heapq.heapify(ordered_chunks)
+        best: List[Tuple[float, Point]] = []
+        while ordered_chunks:
+            bound_sq, key = heapq.heappop(ordered_chunks)
+            if bound_sq > limit_sq or (len(best) >= count and bound_sq > best[-1][0]):
+                break
+            self._chunks.move_to_end(key)
+            for point in self._chunks[key].get(block_type, ()):
+                dist_sq = squared_distance(origin, point)
+                if dist_sq <= limit_sq:
+                    best.append((dist_sq, point))
+            best.sort()
+            del best[count:]
+        return [point for _, point in best]
+
+    def count(self, block_type: str) -> int:
+        return sum(len(self._chunks[key].get(block_type, ())) for key in self._type_chunks.get(block_type, ()))
+
+    def _evict_if_needed(self) -> None:
+        while len(self._chunks) > self.max_chunks:
+            victim = next(iter(self._chunks))
+            if self._last_origin_chunk is not None:
+                origin_x, origin_z = self._last_origin_chunk
+                for key in self._chunks:
+                    if max(abs(key[0] - origin_x), abs(key[1] - origin_z)) > self.keep_radius_chunks:
+                        victim = key
+                        break
+            self.drop_chunk(*victim)
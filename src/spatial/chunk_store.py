@@ -0,0 +1,347 @@
+import base64
+import json
+import os
+from typing import Optional, Dict, List, Any, Sequence, Tuple
+
+import numpy as np
+
+from src.spatial.block_arrays import BlockMatches
+
+CHUNK_SIZE = 16
+# Global block id of air; every store's palette starts with it.
+AIR = 0
+# Fill value of region copies where no chunk is loaded.
+UNLOADED = 0xFFFF
+BLOCK_ID_DTYPE = np.dtype("<u2")
+# Slots the block file is created with; it doubles whenever it fills up.
+INITIAL_SLOTS = 64
+INDEX_FILE = "index.json"
+BLOCKS_FILE = "blocks.u16"
+
+
+class ChunkStoreError(Exception):
+    """Raised when a chunk store is missing, inconsistent, or a snapshot does not fit it."""
+
+
+def decode_snapshot(payload: Dict[str, Any]) -> Tuple[List[str], np.ndarray]:
+    """
+    Decodes a `mineflayerChunkSnapshot` payload into its palette and its (height, 16, 16) array of
+    palette indices, in (y, z, x) order.
+    """
+    local = np.frombuffer(base64.b64decode(payload["data"]), dtype=BLOCK_ID_DTYPE)
+    height = int(payload["height"])
+    if local.size != height * CHUNK_SIZE * CHUNK_SIZE:
+        raise ChunkStoreError(f"Snapshot of chunk ({payload['chunkX']}, {payload['chunkZ']}) has {local.size} blocks, expected {height * 256}.")
+    return list(payload["palette"]), local.reshape(height, CHUNK_SIZE, CHUNK_SIZE)
+
+
+class ChunkStore:
+    """
+    Block ids of whole chunk columns in a memory-mapped file, so the world the bot has seen can be
+    sliced as NumPy arrays without asking the bot.
+
+    `blocks.u16` holds one (height, 16, 16) uint16 slot per chunk, in (y, z, x) order, with ids
+    into one palette of block names shared by all chunks (id 0 is air). `index.json` holds the
+    palette, the vertical extent and the slot of every chunk. Snapshots overwrite a chunk's slot
+    and block changes a single cell, both in place in the shared mapping, so a read-only store
+    opened by another process sees them after `refresh()`.
+    """
+
+    def __init__(self, directory: str, readonly: bool = False):
+        self.directory = directory
+        self.readonly = readonly
+        self.min_y: Optional[int] = None
+        self.height: Optional[int] = None
+        self.palette: List[str] = ["air"]
+        self._palette_ids: Dict[str, int] = {"air": AIR}
+        self._slots: Dict[Tuple[int, int], int] = {}
+        self._blocks: Optional[np.memmap] = None
+        self._index_mtime: Optional[float] = None
+        self._blocks_size = 0
+        if readonly:
+            if not os.path.exists(self._path(INDEX_FILE)):
+                raise ChunkStoreError(f"No chunk store in {directory}.")
+        else:
+            os.makedirs(directory, exist_ok=True)
+        if os.path.exists(self._path(INDEX_FILE)):
+            self._load_index()
+            self._map()
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _load_index(self) -> None:
+        path = self._path(INDEX_FILE)
+        try:
+            with open(path, "r", encoding="utf-8") as index_file:
+                index = json.load(index_file)
+        except (OSError, ValueError) as e:
+            raise ChunkStoreError(f"Unreadable chunk store index {path}: {e}") from e
+        self._index_mtime = os.path.getmtime(path)
+        self.min_y, self.height = index.get("min_y"), index.get("height")
+        self.palette = index.get("palette") or ["air"]
+        self._palette_ids = {name: block_id for block_id, name in enumerate(self.palette)}
+        self._slots = {tuple(map(int, key.split(","))): slot for key, slot in index.get("chunks", {}).items()}
+
+    def _save_index(self) -> None:
+        index = {
+            "min_y": self.min_y,
+            "height": self.height,
+            "palette": self.palette,
+            "chunks": {f"{chunk_x},{chunk_z}": slot for (chunk_x, chunk_z), slot in self._slots.items()},
+        }
+        temp_path = self._path(INDEX_FILE + ".tmp")
+        with open(temp_path, "w", encoding="utf-8") as index_file:
+            json.dump(index, index_file, separators=(",", ":"))
+        os.replace(temp_path, self._path(INDEX_FILE))
+
+    @property
+    def _slot_bytes(self) -> int:
+        return self.height * CHUNK_SIZE * CHUNK_SIZE * BLOCK_ID_DTYPE.itemsize
+
+    def _map(self) -> None:
+        """(Re)maps the block file at its current size. Views of the previous mapping stay valid."""
+        path = self._path(BLOCKS_FILE)
+        if self.height is None or not os.path.exists(path):
+            self._blocks, self._blocks_size = None, 0
+            return
+        self._blocks_size = os.path.getsize(path)
+        capacity = self._blocks_size // self._slot_bytes
+        if capacity == 0:
+            self._blocks = None
+            return
+        self._blocks = np.memmap(
+            path, dtype=BLOCK_ID_DTYPE, mode="r" if self.readonly else "r+",
+            shape=(capacity, self.height, CHUNK_SIZE, CHUNK_SIZE),
+        )
+
+    def _ensure_capacity(self, slot_count: int) -> None:
+        capacity = len(self._blocks) if self._blocks is not None else 0
+        if slot_count <= capacity:
+            return
+        while capacity < slot_count:
+            capacity = max(INITIAL_SLOTS, capacity * 2)
+        if self._blocks is not None:
+            self._blocks.flush()
+        with open(self._path(BLOCKS_FILE), "ab") as blocks_file:
+            blocks_file.truncate(capacity * self._slot_bytes)
+        self._map()
+
+    def _reset(self, min_y: int, height: int) -> None:
+        """Drops every chunk and starts over with a new vertical extent (another dimension or world)."""
+        self._blocks = None
+        self.min_y, self.height = min_y, height
+        self._slots.clear()
+        # Replaced rather than truncated, so readers mapping the old file never touch unbacked pages.
+        temp_path = self._path(BLOCKS_FILE + ".tmp")
+        with open(temp_path, "wb"):
+            pass
+        os.replace(temp_path, self._path(BLOCKS_FILE))
+        self._map()
+
+    def _palette_id(self, name: str) -> int:
+        block_id = self._palette_ids.get(name)
+        if block_id is None:
+            if len(self.palette) >= UNLOADED:
+                raise ChunkStoreError("Chunk store palette is full.")
+            block_id = len(self.palette)
+            self.palette.append(name)
+            self._palette_ids[name] = block_id
+        return block_id
+
+    def _check_writable(self) -> None:
+        if self.readonly:
+            raise ChunkStoreError("Chunk store was opened read-only.")
+
+    # ----- Writing -----
+
+    def write_chunk(self, chunk_x: int, chunk_z: int, min_y: int, palette: Sequence[str], local_ids: np.ndarray) -> None:
+        """
+        Stores a chunk column given as a (height, 16, 16) array of indices into `palette`.
+        A column with another vertical extent than the stored ones resets the store.
+        """
+        self._check_writable()
+        height = local_ids.shape[0]
+        if (self.min_y, self.height) != (min_y, height):
+            self._reset(min_y, height)
+        palette_size = len(self.palette)
+        remap = np.array([self._palette_id(name) for name in palette], dtype=BLOCK_ID_DTYPE)
+        slot = self._slots.get((chunk_x, chunk_z))
+        new_chunk = slot is None
+        if new_chunk:
+            slot = len(self._slots)
+            self._ensure_capacity(slot + 1)
+            self._slots[(chunk_x, chunk_z)] = slot
+        self._blocks[slot] = remap[local_ids]
+        if new_chunk or len(self.palette) != palette_size:
+            self._save_index()
+
+    def write_snapshot(self, payload: Dict[str, Any]) -> None:
+        """Stores a chunk from a `mineflayerChunkSnapshot` event payload."""
+        palette, local_ids = decode_snapshot(payload)
+        self.write_chunk(int(payload["chunkX"]), int(payload["chunkZ"]), int(payload["minY"]), palette, local_ids)
+
+    def set_block(self, x: int, y: int, z: int, name: Optional[str]) -> bool:
+        """Updates one block (None is air). Returns False if its chunk is not stored."""
+        self._check_writable()
+        location = self._locate(x, y, z)
+        if location is None:
+            return False
+        palette_size = len(self.palette)
+        self._blocks[location] = self._palette_id(name or "air")
+        if len(self.palette) != palette_size:
+            self._save_index()
+        return True
+
+    def flush(self) -> None:
+        if self._blocks is not None and not self.readonly:
+            self._blocks.flush()
+
+    # ----- Reading -----
+
+    def refresh(self) -> bool:
+        """Picks up chunks and palette entries added by the writing process. Returns True if anything changed."""
+        path = self._path(INDEX_FILE)
+        if not os.path.exists(path) or os.path.getmtime(path) == self._index_mtime:
+            return False
+        height = self.height
+        self._load_index()
+        blocks_path = self._path(BLOCKS_FILE)
+        if self.height != height or (os.path.exists(blocks_path) and os.path.getsize(blocks_path) != self._blocks_size):
+            self._map()
+        return True
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, chunk: Tuple[int, int]) -> bool:
+        return tuple(chunk) in self._slots
+
+    def chunks(self) -> List[Tuple[int, int]]:
+        return list(self._slots)
+
+    def _locate(self, x: int, y: int, z: int) -> Optional[Tuple[int, int, int, int]]:
+        slot = self._slots.get((x >> 4, z >> 4))
+        if slot is None or not self.min_y <= y < self.min_y + self.height:
+            return None
+        return slot, y - self.min_y, z & 15, x & 15
+
+    def chunk(self, chunk_x: int, chunk_z: int) -> Optional[np.ndarray]:
+        """The (height, 16, 16) block ids of a chunk, in (y, z, x) order, as a view of the mapping; None if not stored."""
+        slot = self._slots.get((chunk_x, chunk_z))
+        return self._blocks[slot] if slot is not None else None
+
+    def block_at(self, x: int, y: int, z: int) -> Optional[str]:
+        """Name of the block at a position; None if its chunk is not stored."""
+        location = self._locate(x, y, z)
+        if location is None:
+            return None
+        block_id = int(self._blocks[location])
+        if block_id >= len(self.palette):
+            # Written by another process after our last refresh.
+            self.refresh()
+        return self.palette[block_id] if block_id < len(self.palette) else None
+
+    def region(self, x0: int, y0: int, z0: int, x1: int, y1: int, z1: int) -> np.ndarray:
+        """
+        Block ids of the box [x0, x1) x [y0, y1) x [z0, z1), in (y, z, x) order. A box within one
+        stored chunk and the stored height range is a view of the mapping (no copy); any other box
+        is copied together from its chunks, with UNLOADED where nothing is stored.
+        """
+        if self.height is None:
+            return np.full((max(0, y1 - y0), max(0, z1 - z0), max(0, x1 - x0)), UNLOADED, dtype=BLOCK_ID_DTYPE)
+        lo_y, hi_y = y0 - self.min_y, y1 - self.min_y
+        chunk_x, chunk_z = x0 >> 4, z0 >> 4
+        slot = self._slots.get((chunk_x, chunk_z))
+        if slot is not None and (x1 - 1) >> 4 == chunk_x and (z1 - 1) >> 4 == chunk_z and 0 <= lo_y and hi_y <= self.height:
+            return self._blocks[slot, lo_y:hi_y, z0 & 15:((z1 - 1) & 15) + 1, x0 & 15:((x1 - 1) & 15) + 1]
+
+        region = np.full((max(0, y1 - y0), max(0, z1 - z0), max(0, x1 - x0)), UNLOADED, dtype=BLOCK_ID_DTYPE)
+        src_y0, src_y1 = max(lo_y, 0), min(hi_y, self.height)
+        if src_y0 >= src_y1:
+            return region
+        for cz in range(z0 >> 4, ((z1 - 1) >> 4) + 1):
+            for cx in range(x0 >> 4, ((x1 - 1) >> 4) + 1):
+                slot = self._slots.get((cx, cz))
+                if slot is None:
+                    continue
+                bx0, bx1 = max(x0, cx * CHUNK_SIZE), min(x1, (cx + 1) * CHUNK_SIZE)
+                bz0, bz1 = max(z0, cz * CHUNK_SIZE), min(z1, (cz + 1) * CHUNK_SIZE)
+                region[src_y0 - lo_y:src_y1 - lo_y, bz0 - z0:bz1 - z0, bx0 - x0:bx1 - x0] = \
+                    self._blocks[slot, src_y0:src_y1, bz0 & 15:((bz1 - 1) & 15) + 1, bx0 & 15:((bx1 - 1) & 15) + 1]
+        return region
+
+    def ids(self, names: Sequence[str]) -> np.ndarray:
+        """Palette ids of the given block names; names never seen are left out."""
+        return np.array([self._palette_ids[name] for name in names if name in self._palette_ids], dtype=BLOCK_ID_DTYPE)
+
+    def names(self, ids: np.ndarray) -> np.ndarray:
+        """Block names of an array of ids (e.g. a region), with None for UNLOADED."""
+        lookup = np.array(self.palette + [None], dtype=object)
+        return lookup[np.minimum(ids, len(self.palette))]
+
+    def heightmap(self, chunk_x: int, chunk_z: int, passable: Sequence[str] = ("air", "cave_air", "void_air")) -> Optional[np.ndarray]:
+        """
+        (16, 16) y of the highest non-passable block per column of a chunk, in (z, x) order, or
+        min_y - 1 for empty columns; None if the chunk is not stored. Standing spots for placement
+        and path heuristics are one above.
+        """
+        blocks = self.chunk(chunk_x, chunk_z)
+        if blocks is None:
+            return None
+        solid = ~np.isin(blocks, self.ids(passable))
+        top_down = solid[::-1]
+        highest = self.height - 1 - np.argmax(top_down, axis=0)
+        return np.where(top_down.any(axis=0), highest + self.min_y, self.min_y - 1)
+
+    def find_blocks(
+        self,
+        block_types: Sequence[str],
+        origin: Sequence[float],
+        radius: float,
+        count_per_type: Optional[int] = None,
+    ) -> BlockMatches:
+        """
+        All stored blocks of `block_types` within `radius` of `origin` (at most `count_per_type`
+        nearest per type), found by vectorized comparison over the chunks the sphere touches.
+        """
+        block_types = list(dict.fromkeys(block_types))
+        # Palette id -> index into block_types, or -1 for ids that are not searched for.
+        type_of_id = np.full(len(self.palette), -1, dtype=np.int64)
+        for type_index, name in enumerate(block_types):
+            if name in self._palette_ids:
+                type_of_id[self._palette_ids[name]] = type_index
+        ox, oy, oz = (float(value) for value in origin)
+        parts = []
+        if self.height is not None and (type_of_id >= 0).any():
+            lo_y = max(0, int(np.floor(oy - radius)) - self.min_y)
+            hi_y = min(self.height, int(np.floor(oy + radius)) + 1 - self.min_y)
+            for (chunk_x, chunk_z), slot in self._slots.items():
+                dx = max(chunk_x * CHUNK_SIZE - ox, 0, ox - (chunk_x + 1) * CHUNK_SIZE)
+                dz = max(chunk_z * CHUNK_SIZE - oz, 0, oz - (chunk_z + 1) * CHUNK_SIZE)
+                if dx * dx + dz * dz > radius * radius or lo_y >= hi_y:
+                    continue
+                blocks = self._blocks[slot, lo_y:hi_y]
+                types = type_of_id[np.minimum(blocks, len(type_of_id) - 1)]
+                types[blocks >= len(type_of_id)] = -1
+                ys, zs, xs = np.nonzero(types >= 0)
+                if not len(ys):
+                    continue
+                world = np.stack([xs + chunk_x * CHUNK_SIZE, ys + lo_y + self.min_y, zs + chunk_z * CHUNK_SIZE], axis=1)
+                within = np.einsum("ij,ij->i", world - (ox, oy, oz), world - (ox, oy, oz)) <= radius * radius
+                parts.append(np.column_stack([types[ys, zs, xs][within], world[within]]).ravel())
+        flat = np.concatenate(parts) if parts else np.zeros(0, dtype=np.int64)
+        matches = BlockMatches.from_flat(block_types, flat, (ox, oy, oz))
+        if count_per_type is not None:
+            matches = BlockMatches.concat([matches.k_nearest(count_per_type, block_type=name) for name in block_types], (ox, oy, oz))
+        return matches
+
+    def close(self) -> None:
+        self.flush()
+        self._blocks = None
+
+    def __enter__(self) -> "ChunkStore":
+        return self
+
+    def __exit__(self, *_exc) -> None:
+        self.close()
@@ -0,0 +1,112 @@
+import math
+from typing import Optional, Dict, Any, Sequence, Tuple
+
+# Walking speed assumed before any trip was observed, as DEFAULT_WALK_SPEED_BLOCKS_PER_S in JS.
+DEFAULT_WALK_SPEED = 4.3
+# Starts and goals within the same cube of this size share travel statistics (ROUTE_START_QUANTUM in JS).
+ROUTE_QUANTUM = 4
+# Shorter or quicker trips say little about walking speed (approach range, standing next to the goal).
+MIN_SPEED_SAMPLE_DISTANCE = 2.0
+MIN_SPEED_SAMPLE_SECONDS = 0.1
+
+RouteKey = Tuple[int, int, int, int, int, int]
+
+
+class TravelTimeModel:
+    """
+    Travel times learned from navigation completions, which report their start, goal and elapsed
+    seconds. Per route (start and goal quantized to ROUTE_QUANTUM blocks) it keeps a smoothed trip
+    time; across all routes a smoothed walking speed. Estimates prefer the route's own observations
+    and fall back to distance over speed, so operation timeouts and scheduling costs follow what
+    the bots actually achieve rather than fixed constants.
+    """
+
+    def __init__(self, default_speed: float = DEFAULT_WALK_SPEED, smoothing: float = 0.3, max_routes: int = 4096):
+        self.smoothing = smoothing
+        self.max_routes = max_routes
+        self._speed = default_speed
+        self._speed_samples = 0
+        self._routes: Dict[RouteKey, Dict[str, float]] = {}
+
+    @staticmethod
+    def route_key(start: Sequence[float], goal: Sequence[float]) -> RouteKey:
+        return tuple(math.floor(value / ROUTE_QUANTUM) for value in (*start[:3], *goal[:3]))
+
+    @property
+    def speed(self) -> float:
+        """Smoothed walking speed in blocks per second."""
+        return self._speed
+
+    def record(self, start: Sequence[float], goal: Sequence[float], seconds: float, reached: bool = True) -> None:
+        key = self.route_key(start, goal)
+        stats = self._routes.pop(key, None) or {"trips": 0, "failures": 0, "mean_s": 0.0, "max_s": 0.0}
+        # Re-inserted, so the least recently travelled route is evicted first.
+        self._routes[key] = stats
+        if len(self._routes) > self.max_routes:
+            del self._routes[next(iter(self._routes))]
+        if not reached:
+            stats["failures"] += 1
+            return
+        stats["mean_s"] = seconds if stats["trips"] == 0 else stats["mean_s"] + self.smoothing * (seconds - stats["mean_s"])
+        stats["max_s"] = max(stats["max_s"], seconds)
+        stats["trips"] += 1
+        distance = math.dist(start[:3], goal[:3])
+        if distance >= MIN_SPEED_SAMPLE_DISTANCE and seconds >= MIN_SPEED_SAMPLE_SECONDS:
+            observed = distance / seconds
+            self._speed = observed if self._speed_samples == 0 else self._speed + self.smoothing * (observed - self._speed)
+            self._speed_samples += 1
+
+    def record_completion(self, result: Dict[str, Any]) -> bool:
+        """
+        Records a `mineflayerTaskComplete` payload of a navigation (one carrying `start` and `goal`).
+        Cancelled and preempted trips say nothing about travel time and are skipped. Returns True if recorded.
+        """
+        start, goal, elapsed = result.get("start"), result.get("goal"), result.get("elapsed_seconds")
+        if not start or not goal or elapsed is None or result.get("status") == "cancelled" or result.get("preempted"):
+            return False
+        self.record(
+            (start["x"], start["y"], start["z"]), (goal["x"], goal["y"], goal["z"]), float(elapsed),
+            reached=result.get("status") == "success",
+        )
+        return True
+
+    def route_stats(self, start: Sequence[float], goal: Sequence[float]) -> Optional[Dict[str, float]]:
+        stats = self._routes.get(self.route_key(start, goal))
+        return dict(stats) if stats else None
+
+    def estimate_seconds(self, start: Sequence[float], goal: Sequence[float]) -> float:
+        """Expected trip time: the route's smoothed time if it was travelled, else distance over speed."""
+        stats = self._routes.get(self.route_key(start, goal))
+        if stats and stats["trips"]:
+            return stats["mean_s"]
+        return math.dist(start[:3], goal[:3]) / self._speed
+
+    def timeout_s(
+        self,
+        start: Optional[Sequence[float]],
+        goal: Sequence[float],
+        minimum_s: float = 10.0,
+        maximum_s: float = 120.0,
+        factor: float = 3.0,
+        slack_s: float = 5.0,
+    ) -> float:
+        """
+        How long to wait for a trip before treating the bot as stuck. A route that was travelled
+        before gets `factor` times its smoothed time (or 1.5 times its slowest trip, if longer)
+        plus `slack_s`, within [minimum_s, maximum_s]; as in JS, a new route may need a long path
+        search first and gets `maximum_s`.
+        """
+        stats = self._routes.get(self.route_key(start, goal)) if start is not None else None
+        if not stats or not stats["trips"]:
+            return maximum_s
+        expected = max(stats["mean_s"] * factor, stats["max_s"] * 1.5) + slack_s
+        return min(maximum_s, max(minimum_s, expected))
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "speed": round(self._speed, 2),
+            "speed_samples": self._speed_samples,
+            "routes": len(self._routes),
+            "trips": sum(int(stats["trips"]) for stats in self._routes.values()),
+            "failures": sum(int(stats["failures"]) for stats in self._routes.values()),
+        }
@@ -0,0 +1,90 @@
+from typing import Optional, Dict, List, Any, Iterable, Tuple
+
+# Session state holds one key per item, e.g. "inventory:oak_log", as ADK state deltas replace whole keys.
+INVENTORY_KEY_PREFIX = "inventory:"
+
+
+class InventoryMirror:
+    """
+    Python-side mirror of the bot inventory, maintained incrementally from slot update events.
+
+    Keeps per-slot contents plus per-item totals, so `count()` is O(1) and reading the
+    inventory never crosses the bridge. `delta_against()` compares the totals with the
+    inventory from session state, so only changed items are written back.
+    """
+
+    def __init__(self):
+        self._slots: Dict[int, Tuple[str, int, int]] = {}
+        self._totals: Dict[str, int] = {}
+        self.synced = False
+
+    def load_snapshot(self, slots: Iterable[Dict[str, Any]]) -> None:
+        """
+        Replaces the mirror with a full snapshot of `{slot, name, count, type}` entries.
+        """
+        self._slots = {}
+        self._totals = {}
+        for entry in slots:
+            self._set_slot(entry["slot"], entry.get("name"), entry.get("count", 0), entry.get("type", -1))
+        self.synced = True
+
+    def apply_slot_update(self, slot: int, name: Optional[str], count: int, item_type: int = -1) -> None:
+        """
+        Applies one slot change; `name` is None (or count 0) when the slot was emptied.
+        """
+        self._set_slot(slot, name, count, item_type)
+
+    def _set_slot(self, slot: int, name: Optional[str], count: int, item_type: int) -> None:
+        old = self._slots.pop(slot, None)
+        if old is not None:
+            old_name, old_count, _ = old
+            remaining = self._totals.get(old_name, 0) - old_count
+            if remaining > 0:
+                self._totals[old_name] = remaining
+            else:
+                self._totals.pop(old_name, None)
+        if name and count > 0:
+            self._slots[slot] = (name, count, item_type)
+            self._totals[name] = self._totals.get(name, 0) + count
+
+    def count(self, item_name: str) -> int:
+        return self._totals.get(item_name, 0)
+
+    def totals(self) -> Dict[str, int]:
+        return dict(self._totals)
+
+    def items(self) -> List[Dict[str, Any]]:
+        """
+        Returns the inventory in the same shape as the JS `getInventory()` items: `{name, count, type}` per stack.
+        """
+        return [{"name": name, "count": count, "type": item_type}
+                for _, (name, count, item_type) in sorted(self._slots.items())]
+
+    def delta_against(self, inventory: Optional[Dict[str, int]]) -> Dict[str, int]:
+        """
+        Returns `{item_name: new_total}` for every item whose total differs from `inventory`
+        (0 for items that are gone).
+        """
+        inventory = inventory or {}
+        names = set(inventory) | set(self._totals)
+        return {name: self._totals.get(name, 0) for name in names if inventory.get(name, 0) != self._totals.get(name, 0)}
+
+
+def inventory_state_delta(delta: Dict[str, int]) -> Dict[str, int]:
+    """
+    Turns a delta from `delta_against()` into session state keys, one `inventory:<item>` key per
+    changed item (0 once the item is gone), so a state delta never repeats unchanged items.
+    """
+    return {INVENTORY_KEY_PREFIX + name: count for name, count in delta.items()}
+
+
+def inventory_from_state(state: Any) -> Dict[str, int]:
+    """
+    Returns the inventory held in a session or tool context state as `{item_name: count}`.
+    """
+    values = state.to_dict() if hasattr(state, "to_dict") else state
+    return {
+        key[len(INVENTORY_KEY_PREFIX):]: count
+        for key, count in values.items()
+        if key.startswith(INVENTORY_KEY_PREFIX) and count
+    }
@@ -0,0 +1,150 @@
+import asyncio
+import inspect
+import time
+from typing import Optional, Dict, List, Any, Awaitable, Callable
+
+# Stops the work of an operation; may be a plain function or a coroutine function.
+CancelHook = Callable[[], Any]
+
+
+class PendingOperation:
+    """A long-running operation the ADK runner is waiting on, with its owner and deadline."""
+
+    def __init__(
+        self,
+        operation_id: str,
+        function_call_id: str,
+        tool_name: str,
+        bot_name: str,
+        started_at: float,
+        deadline: Optional[float],
+        cancel: Optional[CancelHook],
+    ):
+        self.operation_id = operation_id
+        self.function_call_id = function_call_id
+        self.tool_name = tool_name
+        self.bot_name = bot_name
+        self.started_at = started_at
+        self.deadline = deadline
+        self.cancel = cancel
+        # Set once the operation was cancelled or timed out; its late result is dropped.
+        self.closed = False
+
+    def age(self, now: Optional[float] = None) -> float:
+        return (now if now is not None else time.monotonic()) - self.started_at
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "operation_id": self.operation_id,
+            "tool_name": self.tool_name,
+            "bot_name": self.bot_name,
+            "age_seconds": round(self.age(), 3),
+        }
+
+
+class OperationRegistry:
+    """
+    Table of in-flight long-running operations, keyed by operationId.
+
+    Every entry has a deadline; `start_sweeper` periodically hands expired entries to a callback
+    (which turns them into error completions), so an operation whose completion never arrives
+    neither stays in memory nor keeps the runner waiting. The cancel hook stored with an entry
+    stops its work on the JS side or in Python.
+    """
+
+    def __init__(self, default_timeout_s: Optional[float] = None):
+        self.default_timeout_s = default_timeout_s
+        self._operations: Dict[str, PendingOperation] = {}
+        self._sweeper: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._operations)
+
+    def __contains__(self, operation_id: str) -> bool:
+        return operation_id in self._operations
+
+    def register(
+        self,
+        operation_id: str,
+        function_call_id: str,
+        tool_name: str,
+        bot_name: str,
+        timeout_s: Optional[float] = None,
+        cancel: Optional[CancelHook] = None,
+    ) -> PendingOperation:
+        """
+        Records an operation; it expires `timeout_s` (or the registry default) seconds from now,
+        or never if neither is set.
+        """
+        started_at = time.monotonic()
+        timeout_s = timeout_s if timeout_s is not None else self.default_timeout_s
+        operation = PendingOperation(
+            operation_id, function_call_id, tool_name, bot_name, started_at,
+            started_at + timeout_s if timeout_s is not None else None, cancel,
+        )
+        self._operations[operation_id] = operation
+        return operation
+
+    def get(self, operation_id: str) -> Optional[PendingOperation]:
+        return self._operations.get(operation_id)
+
+    def pop(self, operation_id: str) -> Optional[PendingOperation]:
+        return self._operations.pop(operation_id, None)
+
+    def operations(self) -> List[PendingOperation]:
+        return list(self._operations.values())
+
+    def expired(self, now: Optional[float] = None) -> List[PendingOperation]:
+        """Open operations whose deadline has passed."""
+        now = now if now is not None else time.monotonic()
+        return [
+            operation for operation in self._operations.values()
+            if not operation.closed and operation.deadline is not None and operation.deadline <= now
+        ]
+
+    def in_flight_counts(self) -> Dict[str, Any]:
+        """Number of open operations in total, per owning bot and per tool."""
+        by_bot: Dict[str, int] = {}
+        by_tool: Dict[str, int] = {}
+        total = 0
+        for operation in self._operations.values():
+            if operation.closed:
+                continue
+            total += 1
+            by_bot[operation.bot_name] = by_bot.get(operation.bot_name, 0) + 1
+            by_tool[operation.tool_name] = by_tool.get(operation.tool_name, 0) + 1
+        return {"total": total, "by_bot": by_bot, "by_tool": by_tool}
+
+    async def run_cancel_hook(self, operation: PendingOperation) -> None:
+        """Runs the cancel hook of `operation`, if it has one."""
+        if operation.cancel is None:
+            return
+        result = operation.cancel()
+        if inspect.isawaitable(result):
+            await result
+
+    def start_sweeper(self, interval_s: float, on_expired: Callable[[PendingOperation], Awaitable[None]]) -> None:
+        """
+        Checks for expired operations every `interval_s` seconds on the running loop and awaits
+        `on_expired` for each one. Does nothing if the sweeper is already running.
+        """
+        if self._sweeper is not None and not self._sweeper.done():
+            return
+
+        async def sweep() -> None:
+            while True:
+                await asyncio.sleep(interval_s)
+                for operation in self.expired():
+                    await on_expired(operation)
+
+        self._sweeper = asyncio.create_task(sweep())
+
+    async def stop_sweeper(self) -> None:
+        if self._sweeper is None:
+            return
+        self._sweeper.cancel()
+        try:
+            await self._sweeper
+        except asyncio.CancelledError:
+            pass
+        self._sweeper = None
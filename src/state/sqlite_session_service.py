@@ -0,0 +1,223 @@
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Optional, Dict, List, Any, Tuple
+
+from google.adk.events import Event
+from google.adk.sessions import BaseSessionService, Session
+from google.adk.sessions.base_session_service import GetSessionConfig, ListSessionsResponse
+from google.adk.sessions.state import State
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    session_id TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (app_name, user_id, session_id)
+);
+-- One row per state key. App-scoped keys use user_id = '' and session_id = '', user-scoped keys session_id = ''.
+CREATE TABLE IF NOT EXISTS state_entries (
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    session_id TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (app_name, user_id, session_id, key)
+);
+CREATE TABLE IF NOT EXISTS events (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    session_id TEXT NOT NULL,
+    event_id TEXT NOT NULL,
+    timestamp REAL NOT NULL,
+    event_json TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS events_by_session ON events (app_name, user_id, session_id, seq);
+"""
+
+
+def _scope(app_name: str, user_id: str, session_id: str, key: str) -> Tuple[str, str, str, str]:
+    """Storage row of a state key: app: and user: keys are shared across sessions, as in ADK."""
+    if key.startswith(State.APP_PREFIX):
+        return app_name, "", "", key[len(State.APP_PREFIX):]
+    if key.startswith(State.USER_PREFIX):
+        return app_name, user_id, "", key[len(State.USER_PREFIX):]
+    return app_name, user_id, session_id, key
+
+
+class SqliteSessionService(BaseSessionService):
+    """
+    Session service persisting sessions, state and event history in a local SQLite file, so a
+    restarted process resumes with the same state (known recipes, placed blocks, memory).
+
+    State is stored one row per key: appending an event upserts only the keys of its state delta
+    instead of rewriting the whole state, and the event itself is appended to the history.
+    Queries run on a worker thread, one at a time, so the event loop never blocks on disk I/O.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(SCHEMA)
+
+    async def _run(self, function, *args):
+        def locked():
+            with self._lock:
+                return function(*args)
+        return await asyncio.to_thread(locked)
+
+    def _write_state(self, app_name: str, user_id: str, session_id: str, delta: Dict[str, Any], now: float) -> None:
+        rows = [(*_scope(app_name, user_id, session_id, key), json.dumps(value, default=str), now)
+                for key, value in delta.items() if not key.startswith(State.TEMP_PREFIX)]
+        self._connection.executemany(
+            "INSERT INTO state_entries (app_name, user_id, session_id, key, value, updated_at) VALUES (?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (app_name, user_id, session_id, key) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at",
+            rows,
+        )
+
+    def _read_state(self, app_name: str, user_id: str, session_id: str) -> Dict[str, Any]:
+        state: Dict[str, Any] = {}
+        cursor = self._connection.execute(
+            "SELECT user_id, session_id, key, value FROM state_entries "
+            "WHERE app_name = ? AND ((user_id = '' AND session_id = '') OR (user_id = ? AND session_id IN ('', ?)))",
+            (app_name, user_id, session_id),
+        )
+        for row_user, row_session, key, value in cursor:
+            prefix = State.APP_PREFIX if not row_user else State.USER_PREFIX if not row_session else ""
+            state[prefix + key] = json.loads(value)
+        return state
+
+    def _create(self, app_name: str, user_id: str, session_id: str, state: Dict[str, Any]) -> Session:
+        now = time.time()
+        self._connection.execute("BEGIN")
+        try:
+            self._connection.execute(
+                "INSERT INTO sessions (app_name, user_id, session_id, created_at, updated_at) VALUES (?, ?, ?, ?, ?)",
+                (app_name, user_id, session_id, now, now),
+            )
+            self._write_state(app_name, user_id, session_id, state, now)
+            self._connection.execute("COMMIT")
+        except BaseException:
+            self._connection.execute("ROLLBACK")
+            raise
+        return Session(
+            id=session_id, app_name=app_name, user_id=user_id,
+            state=self._read_state(app_name, user_id, session_id), events=[], last_update_time=now,
+        )
+
+    async def create_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        state: Optional[Dict[str, Any]] = None,
+        session_id: Optional[str] = None,
+    ) -> Session:
+        """Creates a session. Raises ValueError if a session with `session_id` already exists."""
+        session_id = (session_id or "").strip() or str(uuid.uuid4())
+        try:
+            return await self._run(self._create, app_name, user_id, session_id, state or {})
+        except sqlite3.IntegrityError:
+            raise ValueError(f"Session {session_id} already exists for {app_name}/{user_id}.")
+
+    def _get(self, app_name: str, user_id: str, session_id: str, config: Optional[GetSessionConfig]) -> Optional[Session]:
+        row = self._connection.execute(
+            "SELECT updated_at FROM sessions WHERE app_name = ? AND user_id = ? AND session_id = ?",
+            (app_name, user_id, session_id),
+        ).fetchone()
+        if row is None:
+            return None
+        query = "SELECT event_json FROM events WHERE app_name = ? AND user_id = ? AND session_id = ?"
+        parameters: List[Any] = [app_name, user_id, session_id]
+        after = getattr(config, "after_timestamp", None) if config else None
+        if after:
+            query += " AND timestamp >= ?"
+            parameters.append(after)
+        recent = getattr(config, "num_recent_events", None) if config else None
+        if recent is not None:
+            query = f"SELECT event_json FROM ({query.replace('SELECT event_json', 'SELECT seq, event_json')} ORDER BY seq DESC LIMIT ?) ORDER BY seq"
+            parameters.append(recent)
+        else:
+            query += " ORDER BY seq"
+        events = [Event.model_validate_json(event_json) for (event_json,) in self._connection.execute(query, parameters)]
+        return Session(
+            id=session_id, app_name=app_name, user_id=user_id,
+            state=self._read_state(app_name, user_id, session_id), events=events, last_update_time=row[0],
+        )
+
+    async def get_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        config: Optional[GetSessionConfig] = None,
+    ) -> Optional[Session]:
+        return await self._run(self._get, app_name, user_id, session_id, config)
+
+    def _list(self, app_name: str, user_id: Optional[str]) -> List[Session]:
+        query = "SELECT user_id, session_id, updated_at FROM sessions WHERE app_name = ?"
+        parameters: List[Any] = [app_name]
+        if user_id is not None:
+            query += " AND user_id = ?"
+            parameters.append(user_id)
+        query += " ORDER BY updated_at"
+        return [
+            Session(id=row_session, app_name=app_name, user_id=row_user, state={}, events=[], last_update_time=updated_at)
+            for row_user, row_session, updated_at in self._connection.execute(query, parameters)
+        ]
+
+    async def list_sessions(self, *, app_name: str, user_id: Optional[str] = None) -> ListSessionsResponse:
+        return ListSessionsResponse(sessions=await self._run(self._list, app_name, user_id))
+
+    def _delete(self, app_name: str, user_id: str, session_id: str) -> None:
+        self._connection.execute("BEGIN")
+        for table in ("sessions", "state_entries", "events"):
+            self._connection.execute(
+                f"DELETE FROM {table} WHERE app_name = ? AND user_id = ? AND session_id = ?", (app_name, user_id, session_id)
+            )
+        self._connection.execute("COMMIT")
+
+    async def delete_session(self, *, app_name: str, user_id: str, session_id: str) -> None:
+        await self._run(self._delete, app_name, user_id, session_id)
+
+    def _append(self, session: Session, event: Event) -> None:
+        now = event.timestamp or time.time()
+        self._connection.execute("BEGIN")
+        try:
+            self._connection.execute(
+                "INSERT INTO events (app_name, user_id, session_id, event_id, timestamp, event_json) VALUES (?, ?, ?, ?, ?, ?)",
+                (session.app_name, session.user_id, session.id, event.id, now, event.model_dump_json(exclude_none=True)),
+            )
+            if event.actions and event.actions.state_delta:
+                self._write_state(session.app_name, session.user_id, session.id, event.actions.state_delta, now)
+            self._connection.execute(
+                "UPDATE sessions SET updated_at = ? WHERE app_name = ? AND user_id = ? AND session_id = ?",
+                (now, session.app_name, session.user_id, session.id),
+            )
+            self._connection.execute("COMMIT")
+        except BaseException:
+            self._connection.execute("ROLLBACK")
+            raise
+
+    async def append_event(self, session: Session, event: Event) -> Event:
+        if event.partial:
+            return event
+        event = await super().append_event(session, event)
+        await self._run(self._append, session, event)
+        session.last_update_time = event.timestamp
+        return event
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
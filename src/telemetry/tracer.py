@@ -0,0 +1,194 @@
+import bisect
+import time
+from typing import Optional, Dict, List, Any, Tuple
+
+# Upper bounds (seconds) of the latency histogram buckets; the last bucket is unbounded.
+DEFAULT_BUCKETS_S = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+# Points a long-running operation passes through, in order, and the phase ending at each point.
+# For JS tasks "pending" and "completed" are the JS pending response and completion event.
+OPERATION_POINTS = ("tool_call", "pending", "completed", "dequeued", "fed_back")
+OPERATION_PHASES = {
+    "pending": "initiate",      # tool call until the task was accepted (bridge IPC for JS tasks)
+    "completed": "execute",     # the task itself: pathfinding, digging, crafting
+    "dequeued": "queue_wait",   # result waiting in the results queue
+    "fed_back": "feedback",     # runner turn processing the result
+}
+
+
+class Histogram:
+    """Latency histogram with fixed buckets, plus count, sum, min and max."""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS_S):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def quantile(self, fraction: float) -> Optional[float]:
+        """Upper bound of the bucket holding the `fraction` quantile (the max for the last bucket)."""
+        if not self.count:
+            return None
+        rank = fraction * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank and bucket_count:
+                return min(self.buckets[index], self.max) if index < len(self.buckets) else self.max
+        return self.max
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum": round(self.total, 6),
+            "min": round(self.min, 6) if self.min is not None else None,
+            "max": round(self.max, 6) if self.max is not None else None,
+            "p50": self.quantile(0.5),
+            "p90": self.quantile(0.9),
+            "p99": self.quantile(0.99),
+            "buckets": {f"le_{bound:g}": count for bound, count in zip(self.buckets, self.counts)} | {"le_inf": self.counts[-1]},
+        }
+
+
+class Span:
+    """One timed interval, e.g. an agent turn, a model call or a tool call, nested under `parent`."""
+
+    def __init__(self, name: str, category: str, parent: Optional["Span"], start: float, attributes: Dict[str, Any]):
+        self.name = name
+        self.category = category
+        self.parent = parent
+        self.start = start
+        self.end: Optional[float] = None
+        self.attributes = attributes
+
+    @property
+    def duration(self) -> Optional[float]:
+        return None if self.end is None else self.end - self.start
+
+    def stack(self) -> List[str]:
+        frames: List[str] = []
+        span: Optional[Span] = self
+        while span is not None:
+            frames.append(f"{span.category}:{span.name}")
+            span = span.parent
+        return frames[::-1]
+
+
+class Tracer:
+    """
+    Collects spans and per-operation lifecycle points, and aggregates both into latency histograms
+    keyed by "category.name". Finished spans are kept (up to `max_spans`) for the flame summary.
+
+    An operation is followed through OPERATION_POINTS by its operationId; the time between two
+    consecutive points is observed as "operation.<phase>" and "operation.<tool>.<phase>".
+    """
+
+    def __init__(self, enabled: bool = True, max_spans: int = 20000, max_operations: int = 10000):
+        self.enabled = enabled
+        self.max_spans = max_spans
+        self.max_operations = max_operations
+        self.histograms: Dict[str, Histogram] = {}
+        self.spans: List[Span] = []
+        self.dropped_spans = 0
+        self._operations: Dict[str, Dict[str, Any]] = {}
+        self.started_at = time.monotonic()
+
+    def reset(self) -> None:
+        self.histograms = {}
+        self.spans = []
+        self.dropped_spans = 0
+        self._operations = {}
+        self.started_at = time.monotonic()
+
+    def observe(self, key: str, seconds: float) -> None:
+        if not self.enabled:
+            return
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = Histogram()
+        histogram.observe(seconds)
+
+    def start_span(self, name: str, category: str, parent: Optional[Span] = None, start: Optional[float] = None, **attributes) -> Span:
+        return Span(name, category, parent, start if start is not None else time.monotonic(), attributes)
+
+    def end_span(self, span: Span, end: Optional[float] = None, **attributes) -> None:
+        if span.end is not None or not self.enabled:
+            return
+        span.end = end if end is not None else time.monotonic()
+        span.attributes.update(attributes)
+        self.observe(f"{span.category}.{span.name}", span.duration)
+        self._keep(span)
+
+    def _keep(self, span: Span) -> None:
+        if len(self.spans) < self.max_spans:
+            self.spans.append(span)
+        else:
+            self.dropped_spans += 1
+
+    def operation_point(self, operation_id: str, point: str, at: Optional[float] = None, final: bool = False, **attributes) -> None:
+        """
+        Records that operation `operation_id` reached `point` (one of OPERATION_POINTS). `final` ends
+        tracking of the operation, e.g. at "completed" for operations whose result is not fed to the runner.
+        """
+        if not self.enabled:
+            return
+        at = at if at is not None else time.monotonic()
+        operation = self._operations.get(operation_id)
+        if operation is None:
+            if len(self._operations) >= self.max_operations:
+                self._operations.pop(next(iter(self._operations)))
+            operation = self._operations[operation_id] = {"points": {}, "attributes": {}}
+        operation["attributes"].update(attributes)
+        operation["points"][point] = at
+
+        index = OPERATION_POINTS.index(point)
+        previous = next((name for name in reversed(OPERATION_POINTS[:index]) if name in operation["points"]), None)
+        if previous is not None:
+            elapsed = max(0.0, at - operation["points"][previous])
+            phase = OPERATION_PHASES[point]
+            tool = operation["attributes"].get("tool", "unknown")
+            self.observe(f"operation.{phase}", elapsed)
+            self.observe(f"operation.{tool}.{phase}", elapsed)
+            # Operations outlive the agent turn that started them, so they form their own flame roots.
+            span = Span(phase, "operation", Span(tool, "operation", None, at, {}), operation["points"][previous], {"operation_id": operation_id})
+            span.end = at
+            self._keep(span)
+        if final or point == OPERATION_POINTS[-1]:
+            self._operations.pop(operation_id, None)
+
+    def in_flight_operations(self) -> int:
+        return len(self._operations)
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "uptime_seconds": round(time.monotonic() - self.started_at, 3),
+            "spans_recorded": len(self.spans),
+            "spans_dropped": self.dropped_spans,
+            "operations_in_flight": len(self._operations),
+            "histograms": {key: histogram.to_dict() for key, histogram in sorted(self.histograms.items())},
+        }
+
+    def folded_stacks(self) -> List[str]:
+        """
+        Flame graph summary in the folded format (`frame;frame;frame <milliseconds>`), with the
+        self time of each span so nested spans are not counted twice.
+        """
+        child_time: Dict[int, float] = {}
+        for span in self.spans:
+            if span.parent is not None and span.duration is not None:
+                child_time[id(span.parent)] = child_time.get(id(span.parent), 0.0) + span.duration
+        totals: Dict[str, float] = {}
+        for span in self.spans:
+            self_time = max(0.0, span.duration - child_time.get(id(span), 0.0))
+            key = ";".join(span.stack())
+            totals[key] = totals.get(key, 0.0) + self_time
+        return [f"{stack} {round(seconds * 1000)}" for stack, seconds in sorted(totals.items()) if seconds > 0]
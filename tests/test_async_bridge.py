@@ -0,0 +1,133 @@
+import asyncio
+import json
+
+from tools.async_bridge import AsyncMineflayerBridge, TASK_COMPLETE_EVENT
+
+
+class FakeEmitter:
+    def __init__(self):
+        self.handlers = {}
+
+    def on(self, event_name, handler):
+        self.handlers.setdefault(event_name, []).append(handler)
+
+    def emit(self, event_name, payload):
+        for handler in self.handlers.get(event_name, []):
+            handler(None, json.dumps(payload))
+
+
+class FakeInterface:
+    """Stands in for mineflayer_interface.js; functions run on the bridge worker threads, like JSPyBridge calls."""
+
+    def __init__(self):
+        self.taskEvents = FakeEmitter()
+        self.cancelled = []
+
+    def complete(self, operation_id, status="success", **extra):
+        self.taskEvents.emit(TASK_COMPLETE_EVENT, {"operationId": operation_id, "status": status, **extra})
+
+    def instantTask(self, operation_id):
+        # Completes before the initial response reaches Python.
+        self.complete(operation_id, message="done early")
+        return {"status": "pending", "operationId": operation_id}
+
+    def failingTask(self, operation_id):
+        self.complete(operation_id, status="error", message="cannot start")
+        return {"status": "error", "operationId": operation_id, "message": "cannot start"}
+
+    def slowTask(self, operation_id):
+        return {"status": "pending", "operationId": operation_id}
+
+    def cancelOperation(self, operation_id):
+        self.cancelled.append(operation_id)
+        self.complete(operation_id, status="cancelled")
+        return {"status": "success", "operationId": operation_id}
+
+
+def _run(scenario):
+    async def main():
+        interface = FakeInterface()
+        results_queue = asyncio.Queue()
+        bridge = AsyncMineflayerBridge(interface, asyncio.get_running_loop(), results_queue)
+        bridge.subscribe()
+        try:
+            return await scenario(bridge, interface, results_queue)
+        finally:
+            bridge.shutdown()
+
+    return asyncio.run(main())
+
+
+async def _settle():
+    for _ in range(5):
+        await asyncio.sleep(0.01)
+
+
+def test_run_operation_returns_a_completion_emitted_before_the_initial_response():
+    async def scenario(bridge, interface, results_queue):
+        result = await bridge.run_operation("instantTask", wait_timeout_s=1)
+        await _settle()
+        return result, results_queue.qsize(), bridge.in_flight_operations()
+
+    result, queued, in_flight = _run(scenario)
+
+    assert result["status"] == "success"
+    assert result["message"] == "done early"
+    assert queued == 0
+    assert in_flight == 0
+
+
+def test_early_completion_is_fed_to_the_results_queue_once():
+    async def scenario(bridge, interface, results_queue):
+        operation_id, initial, future = await bridge.start_operation("instantTask")
+        await _settle()
+        return operation_id, initial, future, [results_queue.get_nowait() for _ in range(results_queue.qsize())]
+
+    operation_id, initial, future, queued = _run(scenario)
+
+    assert initial["status"] == "pending"
+    assert future.done() and future.result()["operationId"] == operation_id
+    assert [result["operationId"] for result in queued] == [operation_id]
+
+
+def test_initiation_failure_is_returned_and_not_fed():
+    async def scenario(bridge, interface, results_queue):
+        result = await bridge.start_operation("failingTask")
+        await _settle()
+        return result, results_queue.qsize()
+
+    (_, initial, _), queued = _run(scenario)
+
+    assert initial["status"] == "error"
+    assert queued == 0
+
+
+def test_completion_after_cancel_is_dropped():
+    async def scenario(bridge, interface, results_queue):
+        operation_id, _, future = await bridge.start_operation("slowTask")
+        response = await bridge.cancel_operation(operation_id)
+        await _settle()
+        return operation_id, response, future, results_queue.qsize(), interface.cancelled, bridge.in_flight_operations()
+
+    operation_id, response, future, queued, cancelled, in_flight = _run(scenario)
+
+    assert response["status"] == "success"
+    assert cancelled == [operation_id]
+    assert future.cancelled()
+    assert queued == 0
+    assert in_flight == 0
+
+
+def test_run_operation_timeout_cancels_the_js_task():
+    async def scenario(bridge, interface, results_queue):
+        result = await bridge.run_operation("slowTask", wait_timeout_s=0.05)
+        await _settle()
+        return result, interface.cancelled, results_queue.qsize(), bridge.in_flight_operations()
+
+    result, cancelled, queued, in_flight = _run(scenario)
+
+    assert result["status"] == "error"
+    assert "did not complete within 0.05s" in result["message"]
+    assert cancelled == [result["operationId"]]
+    assert queued == 0
+    assert in_flight == 0
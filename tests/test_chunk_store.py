@@ -0,0 +1,128 @@
+import base64
+
+import numpy as np
+import pytest
+
+from src.spatial import chunk_store
+from src.spatial.chunk_store import ChunkStore, ChunkStoreError, UNLOADED
+
+MIN_Y = -8
+HEIGHT = 16
+PALETTE = ["air", "stone", "oak_log"]
+
+
+def _snapshot(chunk_x, chunk_z, logs=(), min_y=MIN_Y, height=HEIGHT):
+    """A `mineflayerChunkSnapshot` payload: stone below y=0, air above, oak_log at the given world positions."""
+    local = np.zeros((height, 16, 16), dtype="<u2")
+    local[:max(0, -min_y)] = PALETTE.index("stone")
+    for x, y, z in logs:
+        local[y - min_y, z - chunk_z * 16, x - chunk_x * 16] = PALETTE.index("oak_log")
+    return {
+        "chunkX": chunk_x, "chunkZ": chunk_z, "minY": min_y, "height": height,
+        "palette": PALETTE, "data": base64.b64encode(local.tobytes()).decode("ascii"),
+    }
+
+
+@pytest.fixture
+def store(tmp_path):
+    with ChunkStore(str(tmp_path / "chunks")) as chunks:
+        chunks.write_snapshot(_snapshot(0, 0, logs=[(15, 2, 5)]))
+        chunks.write_snapshot(_snapshot(1, 0, logs=[(16, 2, 5), (20, 2, 5)]))
+        yield chunks
+
+
+def test_block_at_reads_snapshots_back(store):
+    assert len(store) == 2
+    assert store.block_at(15, 2, 5) == "oak_log"
+    assert store.block_at(16, 2, 5) == "oak_log"
+    assert store.block_at(3, -1, 3) == "stone"
+    assert store.block_at(3, 0, 3) == "air"
+    assert store.block_at(3, MIN_Y + HEIGHT, 3) is None
+    assert store.block_at(40, 0, 0) is None
+
+
+def test_set_block_updates_one_cell(store):
+    assert store.set_block(3, 0, 3, "crafting_table")
+    assert store.block_at(3, 0, 3) == "crafting_table"
+    assert store.set_block(3, 0, 3, None)
+    assert store.block_at(3, 0, 3) == "air"
+    assert not store.set_block(100, 0, 100, "stone")
+
+
+def test_region_within_one_chunk_is_a_view(store):
+    region = store.region(12, 0, 4, 16, 4, 8)
+
+    assert region.shape == (4, 4, 4)
+    assert np.shares_memory(region, store.chunk(0, 0))
+    assert store.names(region)[2, 1, 3] == "oak_log"
+
+
+def test_region_across_chunks_is_a_copy_with_unloaded_cells(store):
+    region = store.region(14, 2, 5, 18, 3, 6)
+
+    assert not np.shares_memory(region, store.chunk(0, 0))
+    assert list(store.names(region)[0, 0]) == ["air", "oak_log", "oak_log", "air"]
+
+    partly_unloaded = store.region(30, 2, 5, 34, 3, 6)
+    assert list(partly_unloaded[0, 0, 2:]) == [UNLOADED, UNLOADED]
+    assert list(store.names(partly_unloaded)[0, 0]) == ["air", "air", None, None]
+
+
+def test_find_blocks_across_a_chunk_boundary(store):
+    matches = store.find_blocks(["oak_log"], (15.5, 2, 5), radius=2)
+
+    assert sorted(matches.to_points()) == [(15, 2, 5), (16, 2, 5)]
+
+
+def test_find_blocks_prunes_by_radius(store):
+    store.write_snapshot(_snapshot(10, 10, logs=[(165, 2, 165)]))
+
+    assert sorted(store.find_blocks(["oak_log"], (15.2, 2, 5), radius=8).to_points()) == [(15, 2, 5), (16, 2, 5), (20, 2, 5)]
+    assert store.find_blocks(["oak_log"], (15.2, 2, 5), radius=8, count_per_type=1).to_points() == [(15, 2, 5)]
+    assert sorted(store.find_blocks(["oak_log"], (18, 2, 5), radius=2).to_points()) == [(16, 2, 5), (20, 2, 5)]
+    assert len(store.find_blocks(["oak_log", "diamond_ore"], (15.5, 2, 8), radius=2)) == 0
+
+
+def test_slots_grow_past_the_initial_capacity(tmp_path, monkeypatch):
+    monkeypatch.setattr(chunk_store, "INITIAL_SLOTS", 2)
+    with ChunkStore(str(tmp_path / "chunks")) as store:
+        for chunk_x in range(5):
+            store.write_snapshot(_snapshot(chunk_x, 0, logs=[(chunk_x * 16 + 1, 1, 1)]))
+
+        assert len(store) == 5
+        assert all(store.block_at(chunk_x * 16 + 1, 1, 1) == "oak_log" for chunk_x in range(5))
+        assert store.chunk(4, 0).shape == (HEIGHT, 16, 16)
+
+
+def test_new_vertical_extent_resets_the_store(store):
+    store.write_snapshot(_snapshot(5, 5, logs=[(81, 1, 81)], min_y=0, height=32))
+
+    assert store.chunks() == [(5, 5)]
+    assert (store.min_y, store.height) == (0, 32)
+    assert store.block_at(15, 2, 5) is None
+    assert store.block_at(81, 1, 81) == "oak_log"
+
+
+def test_readonly_store_refreshes_from_the_writer(tmp_path):
+    directory = str(tmp_path / "chunks")
+    with ChunkStore(directory) as writer:
+        writer.write_snapshot(_snapshot(0, 0, logs=[(1, 1, 1)]))
+        reader = ChunkStore(directory, readonly=True)
+        assert reader.block_at(1, 1, 1) == "oak_log"
+        assert not reader.refresh()
+
+        writer.write_snapshot(_snapshot(3, 0))
+        writer.set_block(50, 1, 1, "iron_ore")
+        writer.flush()
+
+        assert reader.refresh()
+        assert (3, 0) in reader
+        assert reader.block_at(50, 1, 1) == "iron_ore"
+        with pytest.raises(ChunkStoreError):
+            reader.set_block(1, 1, 1, "air")
+        reader.close()
+
+
+def test_readonly_store_needs_an_index(tmp_path):
+    with pytest.raises(ChunkStoreError):
+        ChunkStore(str(tmp_path / "missing"), readonly=True)
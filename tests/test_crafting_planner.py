@@ -0,0 +1,60 @@
+import pytest
+
+from src.planning.crafting_planner import build_crafting_plan, parse_goal, PlanningError
+
+
+def _summary(plan):
+    return [(step.step_id, step.quantity, sorted(step.depends_on)) for step in plan.steps]
+
+
+def test_wooden_pickaxe_from_empty_inventory():
+    plan = build_crafting_plan("craft 1 wooden_pickaxe", known_recipes={}, inventory={})
+
+    assert _summary(plan) == [
+        ("gather:oak_log", 3, []),
+        ("craft:oak_planks", 12, ["gather:oak_log"]),
+        ("craft:stick", 4, ["craft:oak_planks"]),
+        ("craft:crafting_table", 1, ["craft:oak_planks"]),
+        ("place:crafting_table", 1, ["craft:crafting_table"]),
+        ("craft:wooden_pickaxe", 1, ["craft:oak_planks", "craft:stick", "place:crafting_table"]),
+    ]
+    assert plan.steps[-1].crafting_table_needed
+    assert plan.bill_of_materials == {"oak_log": 3}
+
+
+def test_placed_crafting_table_is_not_crafted_again():
+    plan = build_crafting_plan(
+        "craft 1 wooden_pickaxe", known_recipes={}, inventory={}, placed_crafting_table_location={"x": 1, "y": 64, "z": 3}
+    )
+
+    assert [step.step_id for step in plan.steps] == ["gather:oak_log", "craft:oak_planks", "craft:stick", "craft:wooden_pickaxe"]
+    assert plan.steps[0].quantity == 2
+
+
+def test_inventory_is_netted_against_demand():
+    plan = build_crafting_plan(
+        "craft 1 wooden_pickaxe", known_recipes={}, inventory={"oak_planks": 3, "stick": 2, "crafting_table": 1}
+    )
+
+    assert _summary(plan) == [
+        ("place:crafting_table", 1, []),
+        ("craft:wooden_pickaxe", 1, ["place:crafting_table"]),
+    ]
+
+
+def test_goal_already_in_inventory_needs_no_steps():
+    plan = build_crafting_plan("craft 1 wooden_pickaxe", known_recipes={}, inventory={"wooden_pickaxe": 1})
+
+    assert plan.steps == []
+
+
+def test_parse_goal_resolves_aliases_and_default_quantity():
+    assert parse_goal("craft 2 sticks") == ("stick", 2)
+    assert parse_goal("wooden pickaxe") == ("wooden_pickaxe", 1)
+
+
+def test_unknown_item_and_unparsable_goal_raise():
+    with pytest.raises(PlanningError):
+        build_crafting_plan("craft 1 diamond_sword", known_recipes={}, inventory={})
+    with pytest.raises(PlanningError):
+        parse_goal("!!")
@@ -0,0 +1,108 @@
+import asyncio
+
+from src.fleet.scheduler import TaskScheduler
+from src.models.planning.entities import PlanStep
+from src.planning.crafting_planner import build_crafting_plan
+from src.planning.dag_executor import DagExecutor
+from src.state.inventory_mirror import InventoryMirror
+
+
+class FakeBot:
+    def __init__(self, name):
+        self.name = name
+        self.busy = False
+        self.position = None
+        self.inventory_mirror = InventoryMirror()
+        self.block_index = None
+
+
+def _pickaxe_steps():
+    return build_crafting_plan("craft 1 wooden_pickaxe", known_recipes={}, inventory={}).steps
+
+
+def _run(steps, run_step, bots=None):
+    bots = bots or [FakeBot("bot")]
+    executor = DagExecutor(bots, TaskScheduler(), run_step, home_bot=bots[0])
+    return asyncio.run(executor.run(steps, goal="craft 1 wooden_pickaxe"))
+
+
+def test_all_steps_run_in_dependency_order():
+    started = []
+
+    async def run_step(step, assignments):
+        started.append(step.step_id)
+        return {"status": "success"}
+
+    result = _run(_pickaxe_steps(), run_step)
+
+    assert result["status"] == "success"
+    assert result["completed_steps"] == started
+    assert started[0] == "gather:oak_log"
+    assert started.index("place:crafting_table") < started.index("craft:wooden_pickaxe")
+    assert started[-1] == "craft:wooden_pickaxe"
+
+
+def test_failed_step_stops_its_dependents():
+    started = []
+
+    async def run_step(step, assignments):
+        started.append(step.step_id)
+        if step.step_id == "craft:stick":
+            return {"status": "error", "message": "No recipe found."}
+        return {"status": "success"}
+
+    result = _run(_pickaxe_steps(), run_step)
+
+    assert result["status"] == "error"
+    assert result["failed_step"] == "craft:stick"
+    assert "No recipe found." in result["message"]
+    assert result["completed_steps"] == ["gather:oak_log", "craft:oak_planks"]
+    assert "craft:wooden_pickaxe" not in started
+    assert set(result["skipped_steps"]) == {"craft:crafting_table", "place:crafting_table", "craft:wooden_pickaxe"}
+
+
+def test_raising_step_is_reported_as_failure():
+    async def run_step(step, assignments):
+        raise RuntimeError("bridge closed")
+
+    result = _run(_pickaxe_steps(), run_step)
+
+    assert result["status"] == "error"
+    assert result["failed_step"] == "gather:oak_log"
+    assert "bridge closed" in result["message"]
+    assert result["completed_steps"] == []
+
+
+def test_running_steps_finish_after_a_failure():
+    steps = [
+        PlanStep(step_id="gather:oak_log", action="gather", item_name="oak_log", quantity=1),
+        PlanStep(step_id="gather:cobblestone", action="gather", item_name="cobblestone", source_block="stone", quantity=1),
+        PlanStep(step_id="craft:oak_planks", action="craft", item_name="oak_planks", quantity=4, depends_on=["gather:oak_log"]),
+    ]
+
+    async def run_step(step, assignments):
+        if step.step_id == "gather:cobblestone":
+            return {"status": "error", "message": "No stone nearby."}
+        await asyncio.sleep(0.05)
+        return {"status": "success"}
+
+    result = _run(steps, run_step, bots=[FakeBot("home"), FakeBot("helper1"), FakeBot("helper2")])
+
+    assert result["failed_step"] == "gather:cobblestone"
+    assert result["completed_steps"] == ["gather:oak_log"]
+    assert result["skipped_steps"] == ["craft:oak_planks"]
+
+
+def test_invalid_dependencies_run_nothing():
+    steps = [
+        PlanStep(step_id="a", action="craft", item_name="stick", quantity=4, depends_on=["b"]),
+        PlanStep(step_id="b", action="craft", item_name="oak_planks", quantity=4, depends_on=["a"]),
+    ]
+
+    async def run_step(step, assignments):
+        raise AssertionError("no step may run")
+
+    result = _run(steps, run_step)
+
+    assert result["status"] == "error"
+    assert "cycle" in result["message"]
@@ -0,0 +1,47 @@
+import asyncio
+
+import pytest
+
+from config import settings
+
+GOAL = "craft 1 wooden_pickaxe"
+
+
+@pytest.fixture
+def simulated_backend(monkeypatch):
+    from tools.tracing import tracer
+
+    monkeypatch.setattr(settings, "mineflayer_backend", "simulated")
+    monkeypatch.setattr(settings, "sim_time_scale", 0.0)
+    monkeypatch.setattr(settings, "session_backend", "memory")
+    monkeypatch.setattr(settings, "bridge_transport", "jspybridge")
+    monkeypatch.setattr(settings, "llm_cache_mode", "bypass")
+    monkeypatch.setattr(settings, "bot_daemon_socket", None)
+    monkeypatch.setattr(tracer, "enabled", False)
+
+
+def test_repeat_goal_on_a_reused_bot_needs_new_items(simulated_backend):
+    from benchmarks.scripted_agents import build_scripted_llm
+    from job_server import JobServer
+
+    async def scenario():
+        server = JobServer(model=build_scripted_llm(GOAL), max_concurrent=1)
+        await server.start()
+        try:
+            first = server.submit(GOAL)
+            await first.task
+            second = server.submit(GOAL)
+            await second.task
+        finally:
+            await server.close()
+        return first, second
+
+    first, second = asyncio.run(scenario())
+
+    assert first.bot_name == second.bot_name
+    assert first.status == "succeeded"
+    # The bot still holds the first job's pickaxe, so the second plan is empty and nothing is crafted.
+    result = [event for event in second.events if event["type"] == "result"][-1]
+    assert result["inventory"]["wooden_pickaxe"] == 1
+    assert result["gained"] == 0
+    assert second.status == "failed"
@@ -0,0 +1,65 @@
+import pytest
+
+from src.planning.recipe_index import RecipeIndex, RecipeIndexError, group_recipe_records, write_recipe_index
+
+RECORDS = [
+    {"item": "oak_planks", "ingredients": {"oak_log": 1}, "quantity_produced": 4, "shape": [["oak_log"]]},
+    {"item": "stick", "ingredients": {"oak_planks": 2}, "quantity_produced": 4, "shape": [["oak_planks"], ["oak_planks"]]},
+    {"item": "stick", "ingredients": {"bamboo": 2}, "quantity_produced": 1, "shape": [["bamboo"], ["bamboo"]]},
+    {"item": "stick", "ingredients": {"oak_planks": 2}, "quantity_produced": 4, "shape": [["oak_planks"], ["oak_planks"]]},
+    {
+        "item": "wooden_pickaxe",
+        "ingredients": {"oak_planks": 3, "stick": 2},
+        "shape": [["oak_planks", "oak_planks", "oak_planks"], [None, "stick", None], [None, "stick", None]],
+    },
+]
+
+
+@pytest.fixture
+def index_path(tmp_path):
+    path = str(tmp_path / "recipes.idx")
+    write_recipe_index(path, group_recipe_records(RECORDS), metadata={"minecraft_version": "1.20.4"})
+    return path
+
+
+def test_group_recipe_records_keeps_order_and_drops_duplicates():
+    recipes = group_recipe_records(RECORDS)
+
+    assert [variant["ingredients"] for variant in recipes["stick"]] == [{"oak_planks": 2}, {"bamboo": 2}]
+    assert recipes["wooden_pickaxe"][0]["quantity_produced"] == 1
+    assert recipes["wooden_pickaxe"][0]["crafting_table_needed"] is True
+    assert recipes["oak_planks"][0]["crafting_table_needed"] is False
+
+
+def test_round_trip(index_path):
+    with RecipeIndex(index_path) as index:
+        assert index.version == "1.20.4"
+        stick = index.get("stick")
+        assert stick.ingredients == {"oak_planks": 2}
+        assert stick.quantity_produced == 4
+        assert [variant.ingredients for variant in index.variants("stick")] == [{"oak_planks": 2}, {"bamboo": 2}]
+        assert index.get("wooden_pickaxe").crafting_table_needed
+        assert "oak_planks" in index
+        assert "oak_log" not in index
+        assert index.get("diamond") is None
+        assert index.variants("diamond") == []
+
+
+def test_reverse_index(index_path):
+    with RecipeIndex(index_path) as index:
+        assert index.uses("oak_planks") == ["stick", "wooden_pickaxe"]
+        assert index.uses("bamboo") == ["stick"]
+        assert index.uses("diamond") == []
+
+
+def test_invalid_files_raise(tmp_path):
+    with pytest.raises(RecipeIndexError):
+        RecipeIndex(str(tmp_path / "missing.idx"))
+    not_an_index = tmp_path / "other.idx"
+    not_an_index.write_bytes(b"NOTANIDX" + bytes(32))
+    with pytest.raises(RecipeIndexError):
+        RecipeIndex(str(not_an_index))
+    truncated = tmp_path / "truncated.idx"
+    truncated.write_bytes(b"MCRIDX")
+    with pytest.raises(RecipeIndexError):
+        RecipeIndex(str(truncated))
@@ -0,0 +1,57 @@
+import asyncio
+
+from google.adk.events import Event, EventActions
+from google.adk.sessions import InMemorySessionService
+
+from main import _maybe_await
+from src.state.sqlite_session_service import SqliteSessionService
+
+APP = "minecraft_agent"
+INITIAL_STATE = {"app:recipes_known": 3, "user:home": [0, 64, 0], "temp:scratch": "initial", "goal": "craft 1 stick"}
+DELTA = {"app:recipes_known": 4, "user:deaths": 1, "temp:scratch": "delta", "inventory:oak_log": 2}
+
+
+async def _exercise(service):
+    """Creates sessions for two users, appends a scoped state delta to one and returns every session's state."""
+    first = await _maybe_await(service.create_session(app_name=APP, user_id="alice", session_id="s1", state=INITIAL_STATE))
+    await _maybe_await(service.append_event(first, Event(author="system", actions=EventActions(state_delta=DELTA))))
+    await _maybe_await(service.create_session(app_name=APP, user_id="alice", session_id="s2"))
+    await _maybe_await(service.create_session(app_name=APP, user_id="bob", session_id="s3"))
+    states = {}
+    for user_id, session_id in (("alice", "s1"), ("alice", "s2"), ("bob", "s3")):
+        session = await _maybe_await(service.get_session(app_name=APP, user_id=user_id, session_id=session_id))
+        states[session_id] = dict(session.state)
+    return states
+
+
+def test_state_scoping_matches_in_memory_service(tmp_path):
+    service = SqliteSessionService(str(tmp_path / "sessions.db"))
+    try:
+        states = asyncio.run(_exercise(service))
+    finally:
+        service.close()
+
+    assert states == asyncio.run(_exercise(InMemorySessionService()))
+    assert states["s1"] == {"app:recipes_known": 4, "user:home": [0, 64, 0], "user:deaths": 1, "goal": "craft 1 stick", "inventory:oak_log": 2}
+    assert states["s2"] == {"app:recipes_known": 4, "user:home": [0, 64, 0], "user:deaths": 1}
+    assert states["s3"] == {"app:recipes_known": 4}
+
+
+def test_state_and_events_survive_a_reopen(tmp_path):
+    db_path = str(tmp_path / "sessions.db")
+    service = SqliteSessionService(db_path)
+    try:
+        before = asyncio.run(_exercise(service))
+    finally:
+        service.close()
+
+    reopened = SqliteSessionService(db_path)
+    try:
+        session = asyncio.run(_maybe_await(reopened.get_session(app_name=APP, user_id="alice", session_id="s1")))
+        listed = asyncio.run(_maybe_await(reopened.list_sessions(app_name=APP, user_id="alice")))
+    finally:
+        reopened.close()
+
+    assert dict(session.state) == before["s1"]
+    assert [event.actions.state_delta for event in session.events] == [{key: value for key, value in DELTA.items() if not key.startswith("temp:")}]
+    assert sorted(listed_session.id for listed_session in listed.sessions) == ["s1", "s2"]
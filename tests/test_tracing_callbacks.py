@@ -0,0 +1,42 @@
+import asyncio
+from types import SimpleNamespace
+
+from google.adk.agents import LlmAgent
+from google.adk.tools.agent_tool import AgentTool
+
+from agents.callbacks import TracingCallbacks
+from src.telemetry.tracer import Tracer
+
+
+def _context(invocation_id, agent_name, function_call_id=None):
+    return SimpleNamespace(invocation_id=invocation_id, agent_name=agent_name, function_call_id=function_call_id)
+
+
+def test_concurrent_delegations_to_one_sub_agent_keep_their_parents():
+    callbacks = TracingCallbacks(Tracer(enabled=True))
+    gatherer_tool = AgentTool(agent=LlmAgent(name="GathererAgent", model="gemini-2.0-flash"))
+    first_delegated = asyncio.Event()
+
+    async def session(job, wait_for_other):
+        coordinator = _context(f"{job}-root", "CoordinatorAgent", f"{job}-call")
+        callbacks.before_agent(coordinator)
+        callbacks.before_tool(gatherer_tool, {"request": "collect 3 oak_log"}, coordinator)
+        if wait_for_other:
+            await first_delegated.wait()
+        else:
+            first_delegated.set()
+            await asyncio.sleep(0)
+        sub_agent = _context(f"{job}-sub", "GathererAgent")
+        callbacks.before_agent(sub_agent)
+        agent_span = callbacks._agent_spans[(f"{job}-sub", "GathererAgent")]
+        tool_span = callbacks._tool_spans[f"{job}-call"]
+        callbacks.after_agent(sub_agent)
+        callbacks.after_tool(gatherer_tool, {}, coordinator, {"status": "success"})
+        callbacks.after_agent(coordinator)
+        return agent_span, tool_span
+
+    async def run_both():
+        return await asyncio.gather(session("a", wait_for_other=True), session("b", wait_for_other=False))
+
+    for agent_span, tool_span in asyncio.run(run_both()):
+        assert agent_span.parent is tool_span
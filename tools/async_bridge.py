@@ -0,0 +1,411 @@
+import asyncio
+import json
+import os
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, List, Any, Callable, Tuple, AsyncIterator
+
+from config import settings
+from logging_config import logger
+from tools.batch_transport import BatchTransport
+from tools.tracing import tracer
+
+TASK_COMPLETE_EVENT = "mineflayerTaskComplete"
+TASK_PROGRESS_EVENT = "mineflayerTaskProgress"
+
+
+def _is_js_proxy(value: Any) -> bool:
+    """
+    True for JSPyBridge proxies. Checked by module name, so the `javascript` package
+    (which starts Node on import) is never imported when the simulated backend is used.
+    """
+    return type(value).__module__.startswith("javascript")
+
+
+def _get_data_from_proxy(proxy: Any) -> Dict[str, Any]:
+    """
+    Helper to convert a JavaScript Proxy object to a Python dictionary.
+    It calls `proxy.valueOf()`, which might block if the proxy represents a Promise,
+    so it must only be called from a bridge worker thread, never on the event loop.
+    If `valueOf()` returns a string, it's parsed as JSON.
+    If not a Proxy, it's returned as is if a dict, else an error dict is returned.
+    """
+    if _is_js_proxy(proxy):
+        try:
+            value = proxy.valueOf()
+            if isinstance(value, str):
+                return json.loads(value)
+            return value
+        except Exception as e_proxy:
+            logger.error(f"Failed to get value from Proxy object: {e_proxy}")
+            return {"status": "error", "message": "Failed to extract data from JS Proxy"}
+    return proxy if isinstance(proxy, dict) else {"status": "error", "message": f"Unexpected type '{type(proxy)}' received, not Proxy or dict."}
+
+
+def _decode_event_payload(payload: Any) -> Dict[str, Any]:
+    """
+    Decodes an event payload emitted by mineflayer_interface.js.
+    Payloads are emitted as JSON strings, so decoding never calls back into JS.
+    """
+    if isinstance(payload, str):
+        return json.loads(payload)
+    if isinstance(payload, dict):
+        return payload
+    raise ValueError(f"Unexpected event payload type '{type(payload)}'")
+
+
+class AsyncMineflayerBridge:
+    """
+    Awaitable layer over the JSPyBridge Mineflayer interface.
+
+    Blocking JSPyBridge calls run on a dedicated worker pool, so the asyncio event loop
+    keeps serving the ADK runner and the results processor while JS Promises settle.
+    Each long-running operation is tracked as an `asyncio.Future` keyed by operationId,
+    which is resolved from the `mineflayerTaskComplete` events emitted by JS. Those events
+    arrive on the JSPyBridge event thread and are marshalled onto the loop thread-safely.
+
+    With `enable_batch_transport`, calls and events move to a BatchTransport socket instead:
+    calls are sent in batched frames and events are pushed on the same connection.
+    `attach_batch_transport` uses a batch server started elsewhere (a bot daemon), without a JS interface.
+    """
+
+    def __init__(
+        self,
+        js_interface: Any,
+        loop: asyncio.AbstractEventLoop,
+        results_queue: Optional[asyncio.Queue] = None,
+        max_workers: int = settings.bridge_max_workers,
+    ):
+        self._js = js_interface
+        self._loop = loop
+        self._results_queue = results_queue
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="mineflayer-bridge")
+        self._futures: Dict[str, asyncio.Future] = {}
+        self._feed_results_queue: set = set()
+        self._starting: set = set()
+        self._early_results: Dict[str, Dict[str, Any]] = {}
+        self._progress: Dict[str, Dict[str, Any]] = {}
+        self._progress_watchers: Dict[str, List[asyncio.Queue]] = {}
+        self._event_listeners: Dict[str, List[Callable[[Dict[str, Any]], None]]] = {}
+        self._subscribed_events: set = set()
+        # Operations cancelled from Python, whose late JS completion is expected and dropped.
+        self._cancelled: set = set()
+        self._transport: Optional[BatchTransport] = None
+        self._socket_path: Optional[str] = None
+        # Only a batch server started by this bridge has its socket file removed on shutdown.
+        self._owns_socket = False
+        # Counters for benchmarks: JSPyBridge calls made, and completion latency of long-running tasks per JS function.
+        self._direct_round_trips = 0
+        self.operation_latencies: Dict[str, List[float]] = {}
+        self._operation_started: Dict[str, Tuple[str, float]] = {}
+
+    @property
+    def js_interface(self) -> Any:
+        return self._js
+
+    @property
+    def round_trips(self) -> int:
+        """JS round trips so far: one per JSPyBridge call, one per frame on the batch transport."""
+        return self._direct_round_trips + (self._transport.frames_sent if self._transport is not None else 0)
+
+    @property
+    def batched(self) -> bool:
+        return self._transport is not None
+
+    async def enable_batch_transport(self, socket_path: str) -> None:
+        """
+        Starts the interface's batch server on `socket_path` and sends all further calls and
+        events over it. Must be called before subscribing to events, so no event is delivered
+        on both channels. Raises ConnectionError if the server cannot be started or reached.
+        """
+        if self._subscribed_events:
+            raise RuntimeError("Enable the batch transport before subscribing to JS events.")
+        result = await self.call("startBatchServer", socket_path, timeout_s=settings.bridge_call_timeout_s)
+        if result.get("status") not in ("success", "already_running"):
+            raise ConnectionError(f"Could not start the batch server: {result.get('message')}")
+        await self.attach_batch_transport(socket_path)
+        self._owns_socket = True
+
+    async def attach_batch_transport(self, socket_path: str) -> None:
+        """
+        Sends all further calls and events over a batch server that is already listening on
+        `socket_path`, e.g. the one of a bot daemon; the bridge then needs no JS interface.
+        Raises OSError if nothing listens there.
+        """
+        if self._subscribed_events:
+            raise RuntimeError("Enable the batch transport before subscribing to JS events.")
+        transport = BatchTransport(self._dispatch_event)
+        await transport.connect(socket_path)
+        self._transport = transport
+        self._socket_path = socket_path
+
+    def subscribe(self) -> None:
+        """
+        Subscribes to task completion and progress events from the JS interface.
+        """
+        self.add_event_listener(TASK_COMPLETE_EVENT, self._on_task_complete)
+        self.add_event_listener(TASK_PROGRESS_EVENT, self._on_task_progress)
+
+    def add_event_listener(self, event_name: str, callback: Callable[[Dict[str, Any]], None]) -> None:
+        """
+        Registers `callback` for a JS event on `taskEvents`. Callbacks always run on the event loop thread
+        with the decoded payload dictionary.
+        """
+        self._event_listeners.setdefault(event_name, []).append(callback)
+        if event_name in self._subscribed_events:
+            return
+        self._subscribed_events.add(event_name)
+        if self._transport is not None:
+            # The batch server pushes every event on the socket; they are dispatched on the loop thread already.
+            logger.info(f"Subscribed to JS event '{event_name}' over the batch transport.")
+            return
+
+        def _handler(_this, payload, *_args):
+            # Runs on the JSPyBridge event thread (or a simulator timer thread): hand the payload over to the loop.
+            self._loop.call_soon_threadsafe(self._dispatch_event, event_name, payload)
+
+        emitter = self._js.taskEvents
+        if _is_js_proxy(emitter):
+            from javascript import On
+            On(emitter, event_name)(_handler)
+        else:
+            emitter.on(event_name, _handler)
+
+        logger.info(f"Subscribed to JS event '{event_name}'.")
+
+    def _dispatch_event(self, event_name: str, payload: Any) -> None:
+        try:
+            data = _decode_event_payload(payload)
+        except Exception as e:
+            logger.error(f"Could not decode payload for JS event '{event_name}': {e}")
+            return
+        for callback in list(self._event_listeners.get(event_name, [])):
+            try:
+                callback(data)
+            except Exception as e:
+                logger.error(f"Error in listener for JS event '{event_name}': {e}", exc_info=True)
+
+    def _on_task_complete(self, result: Dict[str, Any]) -> None:
+        operation_id = result.get("operationId")
+        if not operation_id:
+            logger.error(f"JS task completion missing operationId: {result}")
+            return
+
+        if operation_id in self._cancelled:
+            self._cancelled.discard(operation_id)
+            return
+
+        future = self._futures.pop(operation_id, None)
+        if future is not None and not future.done():
+            future.set_result(result)
+        # Operations awaited in Python (not fed to the runner) end here.
+        tracer.operation_point(operation_id, "completed", final=operation_id not in self._feed_results_queue)
+        started = self._operation_started.pop(operation_id, None)
+        if started is not None:
+            self.operation_latencies.setdefault(started[0], []).append(time.monotonic() - started[1])
+        self._progress.pop(operation_id, None)
+        for watcher in self._progress_watchers.pop(operation_id, []):
+            watcher.put_nowait(None)
+
+        if operation_id in self._starting:
+            # Completed before the initial response came back; start_operation decides whether to feed it.
+            self._early_results[operation_id] = result
+        elif operation_id in self._feed_results_queue:
+            self._feed_results_queue.discard(operation_id)
+            if self._results_queue is not None:
+                self._results_queue.put_nowait(result)
+        elif future is None:
+            logger.warning(f"Received completion for unknown operationId {operation_id}: {result}")
+
+    def _on_task_progress(self, progress: Dict[str, Any]) -> None:
+        operation_id = progress.get("operationId")
+        if not operation_id or operation_id not in self._futures:
+            return
+        self._progress[operation_id] = progress
+        for watcher in self._progress_watchers.get(operation_id, []):
+            watcher.put_nowait(progress)
+
+    def latest_progress(self, operation_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Returns the most recent progress event of an in-flight operation, without a JS round trip.
+        """
+        return self._progress.get(operation_id)
+
+    async def progress_updates(self, operation_id: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Streams progress events of an in-flight operation until it completes.
+        """
+        if operation_id not in self._futures:
+            return
+        watcher: asyncio.Queue = asyncio.Queue()
+        self._progress_watchers.setdefault(operation_id, []).append(watcher)
+        try:
+            while True:
+                progress = await watcher.get()
+                if progress is None:
+                    return
+                yield progress
+        finally:
+            watchers = self._progress_watchers.get(operation_id)
+            if watchers and watcher in watchers:
+                watchers.remove(watcher)
+
+    def register_operation(self, operation_id: Optional[str] = None, feed_results_queue: bool = True) -> Tuple[str, asyncio.Future]:
+        """
+        Creates the future for an operation before it is started, so an early completion is never lost.
+        If `feed_results_queue` is set, the completion is also put on the results queue for the ADK runner.
+        """
+        operation_id = operation_id or str(uuid.uuid4())
+        future = self._loop.create_future()
+        self._futures[operation_id] = future
+        if feed_results_queue:
+            self._feed_results_queue.add(operation_id)
+        return operation_id, future
+
+    def discard_operation(self, operation_id: str) -> None:
+        future = self._futures.pop(operation_id, None)
+        if future is not None and not future.done():
+            future.cancel()
+        self._feed_results_queue.discard(operation_id)
+        self._early_results.pop(operation_id, None)
+        self._operation_started.pop(operation_id, None)
+        self._progress.pop(operation_id, None)
+        for watcher in self._progress_watchers.pop(operation_id, []):
+            watcher.put_nowait(None)
+
+    async def cancel_operation(self, operation_id: str) -> Dict[str, Any]:
+        """
+        Stops an operation on the JS side and forgets it locally; its "cancelled" completion is dropped.
+        Returns the JS response (status "error" if JS no longer knows the operation).
+        """
+        self.discard_operation(operation_id)
+        self._cancelled.add(operation_id)
+        try:
+            result = await self.call("cancelOperation", operation_id, timeout_s=settings.bridge_call_timeout_s)
+        except Exception as e:
+            self._cancelled.discard(operation_id)
+            return {"status": "error", "operationId": operation_id, "message": f"cancelOperation failed: {e}"}
+        if result.get("status") != "success":
+            # Already finished in JS: no completion will follow.
+            self._cancelled.discard(operation_id)
+        return result
+
+    def _cancel_in_background(self, operation_id: str) -> None:
+        task = self._loop.create_task(self.cancel_operation(operation_id))
+        task.add_done_callback(lambda done: done.cancelled() or done.exception())
+
+    def _call_blocking(self, js_function_name: str, args: Tuple[Any, ...], timeout_s: Optional[float]) -> Dict[str, Any]:
+        js_function = getattr(self._js, js_function_name)
+        if timeout_s is not None and _is_js_proxy(js_function):
+            result_proxy = js_function(*args, timeout=timeout_s)
+        else:
+            result_proxy = js_function(*args)
+        return _get_data_from_proxy(result_proxy)
+
+    async def call(self, js_function_name: str, *args, timeout_s: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Calls a JS interface function on the bridge worker pool and awaits its (settled) result.
+        On the batch transport, calls made in the same loop iteration share one frame.
+        """
+        if self._transport is not None:
+            return await asyncio.wait_for(self._transport.call(js_function_name, args), timeout=timeout_s)
+        self._direct_round_trips += 1
+        return await self._loop.run_in_executor(
+            self._executor, self._call_blocking, js_function_name, args, timeout_s
+        )
+
+    async def call_many(self, calls: List[Tuple[str, Tuple[Any, ...]]], timeout_s: Optional[float] = None) -> List[Any]:
+        """
+        Calls several JS functions, e.g. a few `findBlock` queries and `getInventory`, and returns
+        their results in order; a call that raised is returned as its exception. On the batch
+        transport this is one round trip, otherwise the calls run concurrently on the worker pool.
+        """
+        if self._transport is not None:
+            return await self._transport.call_many(calls, timeout_s=timeout_s)
+        return await asyncio.gather(
+            *(self.call(name, *args, timeout_s=timeout_s) for name, args in calls), return_exceptions=True
+        )
+
+    async def start_operation(
+        self,
+        js_function_name: str,
+        *args,
+        operation_id: Optional[str] = None,
+        feed_results_queue: bool = True,
+        timeout_s: Optional[float] = None,
+    ) -> Tuple[str, Dict[str, Any], Optional[asyncio.Future]]:
+        """
+        Starts a long-running JS task. The operationId is appended as the last JS argument.
+        Returns (operation_id, initial_response, future); the future is None if the task
+        could not be initiated (the initial response is then the error).
+        """
+        operation_id, future = self.register_operation(operation_id, feed_results_queue)
+        self._operation_started[operation_id] = (js_function_name, time.monotonic())
+        self._starting.add(operation_id)
+        try:
+            initial_response = await self.call(js_function_name, *args, operation_id, timeout_s=timeout_s)
+        except Exception:
+            self.discard_operation(operation_id)
+            raise
+        finally:
+            self._starting.discard(operation_id)
+        early_result = self._early_results.pop(operation_id, None)
+
+        tracer.operation_point(operation_id, "pending", tool=js_function_name)
+
+        if not isinstance(initial_response, dict) or initial_response.get("status") != "pending":
+            # JS reports initiation failures both as the return value and as a completion event;
+            # the return value is authoritative, so the early completion is not fed to the runner.
+            self._feed_results_queue.discard(operation_id)
+            if future.done():
+                return operation_id, initial_response, future
+            self.discard_operation(operation_id)
+            return operation_id, initial_response, None
+
+        if early_result is not None and operation_id in self._feed_results_queue:
+            self._feed_results_queue.discard(operation_id)
+            if self._results_queue is not None:
+                self._results_queue.put_nowait(early_result)
+        return operation_id, initial_response, future
+
+    async def run_operation(
+        self,
+        js_function_name: str,
+        *args,
+        wait_timeout_s: Optional[float] = None,
+        timeout_s: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """
+        Starts a long-running JS task and awaits its completion without blocking the event loop.
+        """
+        operation_id, initial_response, future = await self.start_operation(
+            js_function_name, *args, feed_results_queue=False, timeout_s=timeout_s
+        )
+        if future is None:
+            return initial_response
+        try:
+            return await asyncio.wait_for(future, timeout=wait_timeout_s)
+        except asyncio.TimeoutError:
+            # Stop the JS work too, so a timed-out dig or navigation does not keep the bot busy.
+            self._cancel_in_background(operation_id)
+            return {"operationId": operation_id, "status": "error", "message": f"{js_function_name} did not complete within {wait_timeout_s}s."}
+        except asyncio.CancelledError:
+            self._cancel_in_background(operation_id)
+            raise
+
+    def in_flight_operations(self) -> int:
+        return len(self._futures)
+
+    def shutdown(self) -> None:
+        for operation_id in list(self._futures):
+            self.discard_operation(operation_id)
+        if self._transport is not None:
+            self._transport.close()
+            # The socket path of a server started here is unique to this Python process, so its file is removed here.
+            if self._owns_socket:
+                try:
+                    os.unlink(self._socket_path)
+                except OSError:
+                    pass
+        self._executor.shutdown(wait=False, cancel_futures=True)
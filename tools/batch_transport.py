@@ -0,0 +1,149 @@
+import asyncio
+import json
+import os
+import tempfile
+from typing import Optional, Dict, List, Any, Callable, Tuple
+
+from logging_config import logger
+
+# Frames are single JSON lines; a batch of results (e.g. a chunk scan) can be large.
+MAX_FRAME_BYTES = 64 * 1024 * 1024
+
+
+class BatchCallError(Exception):
+    """Raised for a call in a batch that threw on the JS side, like a failed JSPyBridge call."""
+
+
+def batch_socket_path(bot_name: str, directory: Optional[str] = None) -> str:
+    """Socket path of a bot's batch server, unique per Python process."""
+    return os.path.join(directory or tempfile.gettempdir(), f"mcgg-{os.getpid()}-{bot_name}.sock")
+
+
+class BatchTransport:
+    """
+    Client of the batch server started by `startBatchServer` in mineflayer_interface.js (or the
+    simulator): JSON-lines frames over one persistent local socket.
+
+    A request frame `{"id", "calls": [{"fn", "args"}, ...]}` runs the calls in order and is
+    answered by one `{"id", "results": [{"ok": value} | {"error": message}, ...]}` frame. Calls
+    made in the same event loop iteration (e.g. the parallel tool calls of one model turn) are
+    coalesced into a single frame, and `call_many` sends an explicit batch. Task completions and
+    other `taskEvents` are pushed on the same connection as `{"event", "payload"}` frames and
+    handed to `on_event` on the loop thread.
+    """
+
+    def __init__(self, on_event: Callable[[str, Any], None]):
+        self._on_event = on_event
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._read_task: Optional[asyncio.Task] = None
+        self._next_frame_id = 0
+        self._queued: List[Tuple[str, Tuple[Any, ...], asyncio.Future]] = []
+        self._flush_scheduled = False
+        self._in_flight: Dict[int, List[asyncio.Future]] = {}
+        # Counters for benchmarks: frames sent (round trips) and the calls they carried.
+        self.frames_sent = 0
+        self.calls_sent = 0
+
+    @property
+    def connected(self) -> bool:
+        return self._writer is not None and not self._writer.is_closing()
+
+    async def connect(self, socket_path: str) -> None:
+        self._reader, self._writer = await asyncio.open_unix_connection(socket_path, limit=MAX_FRAME_BYTES)
+        self._read_task = asyncio.create_task(self._read_frames())
+        logger.info(f"Batch transport connected to {socket_path}")
+
+    def call(self, js_function_name: str, args: Tuple[Any, ...]) -> asyncio.Future:
+        """Queues a call for the next frame and returns the future of its result."""
+        if not self.connected:
+            raise ConnectionError("Batch transport is not connected.")
+        future = asyncio.get_running_loop().create_future()
+        self._queued.append((js_function_name, args, future))
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            asyncio.get_running_loop().call_soon(self._flush)
+        return future
+
+    async def call_many(self, calls: List[Tuple[str, Tuple[Any, ...]]], timeout_s: Optional[float] = None) -> List[Any]:
+        """
+        Runs `calls` (function name, args) in one frame, in order, and returns their results.
+        A call that threw is returned as its BatchCallError rather than raised, so one failure
+        does not hide the other results.
+        """
+        futures = [self.call(name, args) for name, args in calls]
+        return await asyncio.wait_for(asyncio.gather(*futures, return_exceptions=True), timeout=timeout_s)
+
+    def _flush(self) -> None:
+        self._flush_scheduled = False
+        queued, self._queued = self._queued, []
+        queued = [(name, args, future) for name, args, future in queued if not future.done()]
+        if not queued:
+            return
+        if not self.connected:
+            for _, _, future in queued:
+                future.set_exception(ConnectionError("Batch transport is not connected."))
+            return
+        self._next_frame_id += 1
+        frame_id = self._next_frame_id
+        frame = {"id": frame_id, "calls": [{"fn": name, "args": list(args)} for name, args, _ in queued]}
+        self._in_flight[frame_id] = [future for _, _, future in queued]
+        self.frames_sent += 1
+        self.calls_sent += len(queued)
+        self._writer.write(json.dumps(frame, separators=(",", ":"), default=str).encode("utf-8") + b"\n")
+
+    async def _read_frames(self) -> None:
+        error: Exception = ConnectionError("Batch transport connection closed.")
+        try:
+            while True:
+                line = await self._reader.readline()
+                if not line:
+                    break
+                try:
+                    frame = json.loads(line)
+                except ValueError as e:
+                    logger.error(f"Dropping malformed batch frame: {e}")
+                    continue
+                if "event" in frame:
+                    self._on_event(frame["event"], frame.get("payload"))
+                else:
+                    self._resolve(frame)
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError) as e:
+            logger.error(f"Batch transport read failed: {e}")
+            error = ConnectionError(f"Batch transport read failed: {e}")
+        finally:
+            for futures in self._in_flight.values():
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(error)
+            self._in_flight.clear()
+
+    def _resolve(self, frame: Dict[str, Any]) -> None:
+        futures = self._in_flight.pop(frame.get("id"), None)
+        if futures is None:
+            logger.warning(f"Received batch reply for unknown frame {frame.get('id')}")
+            return
+        results = frame.get("results") or []
+        for index, future in enumerate(futures):
+            if future.done():
+                continue
+            result = results[index] if index < len(results) else {"error": "Missing result in batch reply."}
+            if "error" in result:
+                future.set_exception(BatchCallError(result["error"]))
+            else:
+                future.set_result(result.get("ok"))
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        if self._read_task is not None:
+            self._read_task.cancel()
+            self._read_task = None
+
+
+__all__ = [
+    "BatchCallError",
+    "BatchTransport",
+    "batch_socket_path",
+]
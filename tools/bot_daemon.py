@@ -0,0 +1,89 @@
+"""
+Long-lived bot daemon: loads the Mineflayer interface (or the simulator), logs the bot in once and
+serves it on a local batch socket, so runs attach to the logged-in bot and its world state in
+milliseconds instead of paying for Node start-up, login, spawn and minecraft-data every time:
+
+    python -m tools.bot_daemon                        # settings.bot_daemon_socket, else DEFAULT_DAEMON_SOCKET
+    python -m tools.bot_daemon --socket /tmp/mcgg-bot.sock
+
+Runs attach when BOT_DAEMON_SOCKET points at the socket (see `initialize_mineflayer_bridge`) and
+start their own bot if nothing listens there. The daemon imports neither google.adk nor the agents.
+
+Attaching only saves the bot side. Each run still imports google.adk, the agents and numpy itself,
+which a separate process cannot keep warm; the job server (job_server.py) keeps one process alive
+for many goals when that cost matters.
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+from typing import Optional, Dict, Any
+
+from config import settings
+from logging_config import logger
+from tools.async_bridge import AsyncMineflayerBridge
+
+MINEFLAYER_INTERFACE_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "mineflayer_scripts", "mineflayer_interface.js"
+)
+DEFAULT_DAEMON_SOCKET = os.path.join(tempfile.gettempdir(), "mcgg-bot-daemon.sock")
+
+
+def bot_options(username: Optional[str] = None) -> Dict[str, Any]:
+    """`initializeBot` options from settings, for `username` (default: the configured bot username)."""
+    return {
+        "host": settings.minecraft_host,
+        "port": settings.minecraft_port,
+        "username": username or settings.minecraft_bot_username,
+        "auth": settings.minecraft_auth,
+        "version": settings.minecraft_version,
+        "initial_teleport_coords": settings.initial_teleport_coords,
+        "tracked_block_types": settings.tracked_block_types
+    }
+
+
+async def load_interface() -> Any:
+    """
+    Loads the configured backend: the simulator, or mineflayer_interface.js through JSPyBridge.
+    Both are imported on first use here, as importing JSPyBridge already starts Node.
+    """
+    if settings.mineflayer_backend == "simulated":
+        from src.simulation.mineflayer_sim import create_simulated_interface
+        return create_simulated_interface(settings)
+    from javascript import require
+    return await asyncio.to_thread(require, MINEFLAYER_INTERFACE_PATH)
+
+
+async def run_daemon(socket_path: str) -> None:
+    """Logs the bot in and serves it on `socket_path` until cancelled."""
+    interface = await load_interface()
+    bridge = AsyncMineflayerBridge(interface, asyncio.get_running_loop())
+    try:
+        result = await bridge.call("initializeBot", bot_options())
+        if result.get("status") not in ("success", "already_initialized"):
+            raise RuntimeError(f"Bot initialization failed: {result.get('message')}")
+        server = await bridge.call("startBatchServer", socket_path, timeout_s=settings.bridge_call_timeout_s)
+        if server.get("status") not in ("success", "already_running"):
+            raise RuntimeError(f"Could not start the batch server: {server.get('message')}")
+        logger.info(f"Bot daemon serving {result.get('username')} ({settings.mineflayer_backend} backend) on {socket_path}")
+        await asyncio.Event().wait()
+    finally:
+        bridge.shutdown()
+        try:
+            os.unlink(socket_path)
+        except OSError:
+            pass
+        if settings.mineflayer_backend == "javascript":
+            from javascript import terminate
+            terminate()
+        logger.info("Bot daemon stopped.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Keep a logged-in bot running and serve it to later runs on a local socket.")
+    parser.add_argument("--socket", default=settings.bot_daemon_socket or DEFAULT_DAEMON_SOCKET, help="Unix socket to serve on.")
+    args = parser.parse_args()
+    try:
+        asyncio.run(run_daemon(args.socket))
+    except KeyboardInterrupt:
+        logger.info("Bot daemon interrupted by user.")
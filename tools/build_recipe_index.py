@@ -0,0 +1,72 @@
+"""
+Builds the on-disk recipe index for a Minecraft version from minecraft-data:
+
+    python -m tools.build_recipe_index                    # settings.minecraft_version
+    python -m tools.build_recipe_index --version 1.20.4 --output cache/recipes/recipes-1.20.4.idx
+    python -m tools.build_recipe_index --from-jsonl recipes.jsonl
+
+The recipes are exported by mineflayer_scripts/export_recipes.js (needs `npm install` in
+mineflayer_scripts), or read from a JSON-lines file in the same format.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from typing import Dict, List, Any
+
+from config import settings
+from src.planning.recipe_index import RecipeIndex, group_recipe_records, write_recipe_index
+
+EXPORT_SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "mineflayer_scripts", "export_recipes.js")
+
+
+def export_recipe_records(version: str) -> List[Dict[str, Any]]:
+    """Runs the minecraft-data export for `version` and returns its recipe records."""
+    result = subprocess.run(
+        ["node", EXPORT_SCRIPT, version], cwd=os.path.dirname(EXPORT_SCRIPT), capture_output=True, text=True, check=False
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Recipe export for Minecraft {version} failed: {result.stderr.strip()}")
+    return [json.loads(line) for line in result.stdout.splitlines() if line.strip()]
+
+
+def build_recipe_index(version: str, output_path: str, records: List[Dict[str, Any]]) -> Dict[str, Any]:
+    recipes = group_recipe_records(records)
+    entries = write_recipe_index(output_path, recipes, metadata={"minecraft_version": version, "items": len(recipes)})
+    return {"path": output_path, "minecraft_version": version, "items": len(recipes), "entries": entries}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Build the memory-mapped recipe index for a Minecraft version.")
+    parser.add_argument("--version", default=settings.minecraft_version, help="Minecraft version to export (default: settings).")
+    parser.add_argument("--output", default=None, help="Index file to write (default: the configured recipe index path).")
+    parser.add_argument("--from-jsonl", default=None, help="Read exported recipe records from this file instead of running node.")
+    args = parser.parse_args()
+
+    output_path = args.output or (
+        settings.resolved_recipe_index_path if args.version == settings.minecraft_version
+        else os.path.join(os.path.dirname(settings.resolved_recipe_index_path), f"recipes-{args.version}.idx")
+    )
+    try:
+        if args.from_jsonl:
+            with open(args.from_jsonl, "r", encoding="utf-8") as records_file:
+                records = [json.loads(line) for line in records_file if line.strip()]
+        else:
+            records = export_recipe_records(args.version)
+    except (OSError, RuntimeError, ValueError) as e:
+        print(f"Could not export recipes: {e}", file=sys.stderr)
+        return 1
+
+    summary = build_recipe_index(args.version, output_path, records)
+    with RecipeIndex(output_path) as index:
+        missing = [record["item"] for record in records if record["item"] not in index]
+    if missing:
+        print(f"Index {output_path} is missing recipes for {sorted(set(missing))}", file=sys.stderr)
+        return 1
+    print(json.dumps(summary, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,245 @@
+import time
+import uuid
+import asyncio
+from typing import Optional, Dict, List, Any, Set, Tuple
+
+import numpy as np
+from google.adk.tools import ToolContext, LongRunningFunctionTool
+
+from config import settings
+from src.models.mineflayer_bridge.entities import MinedBlockTiming
+from src.models.mineflayer_bridge.responses import CollectBlocksResponse
+from src.models.planning.entities import PlanStep
+from src.planning.crafting_planner import GATHER_SOURCE_BLOCKS
+from tools import mineflayer_bridge_tools
+from tools.async_bridge import AsyncMineflayerBridge
+from tools.fleet import BotFleet, BotHandle, get_fleet
+from tools.tracing import tracer
+
+from logging_config import logger
+
+COLLECT_SEARCH_RADIUS = 64
+# Blocks within this range can be dug without standing next to them.
+COLLECT_APPROACH_RANGE = 3
+# Extra candidates fetched per round, so unreachable blocks do not end the round early.
+COLLECT_CANDIDATE_SLACK = 8
+COLLECT_MAX_CANDIDATES = 256
+COLLECT_MAX_ROUNDS = 3
+COLLECT_STEP_TIMEOUT_S = 180
+# Item dropped by a mined block, where it differs from the block name.
+DROPPED_ITEMS: Dict[str, str] = {block: item for item, block in GATHER_SOURCE_BLOCKS.items()}
+
+# Keeps references to running collection tasks so they are not garbage collected.
+_background_tasks: Set[asyncio.Task] = set()
+
+
+async def collect_blocks(
+    bridge: AsyncMineflayerBridge,
+    block_type: str,
+    quantity: int,
+    operation_id: Optional[str] = None,
+    search_radius: int = COLLECT_SEARCH_RADIUS,
+    claimed_blocks: Optional[Set[Tuple[int, int, int]]] = None,
+) -> Dict[str, Any]:
+    """
+    Collects `quantity` blocks of `block_type` in one operation.
+
+    Candidates are fetched in bulk with `find_blocks_multi`, ordered as a nearest-neighbour tour
+    from the bot's position and mined back to back (approach with `goToNear`, then `mineBlock`).
+    If a round runs out of candidates, the search is repeated from the new position.
+    Bots collecting concurrently share `claimed_blocks`, so no two of them walk to the same block.
+    Returns a dictionary representation of CollectBlocksResponse with per-block timings.
+    """
+    operation_id = operation_id or str(uuid.uuid4())
+    started_at = time.monotonic()
+    timings: List[MinedBlockTiming] = []
+    attempted: Set[Tuple[int, int, int]] = claimed_blocks if claimed_blocks is not None else set()
+    collected = 0
+
+    for round_index in range(COLLECT_MAX_ROUNDS):
+        missing = quantity - collected
+        if missing <= 0:
+            break
+        candidate_count = min(COLLECT_MAX_CANDIDATES, missing + COLLECT_CANDIDATE_SLACK)
+        found = await mineflayer_bridge_tools.find_blocks_multi([block_type], search_radius, candidate_count, bridge=bridge)
+        candidates = found.subset(np.array([point not in attempted for point in found.to_points()], dtype=bool))
+        if not len(candidates):
+            logger.info(f"collect_blocks({block_type}) round {round_index}: no more candidates within {search_radius} blocks")
+            break
+
+        tour = candidates.tour()
+        logger.info(f"collect_blocks({block_type}) round {round_index}: {len(tour)} candidates, {missing} still needed")
+
+        # Where the bot starts each approach from: the scan origin, then the block mined last.
+        position = found.origin
+        for x, y, z in tour:
+            if collected >= quantity:
+                break
+            if (x, y, z) in attempted:
+                continue
+            attempted.add((x, y, z))
+            timing = await _collect_one(bridge, block_type, x, y, z, position)
+            timings.append(timing)
+            position = (x, y, z)
+            if timing.status == "success":
+                collected += 1
+
+    elapsed = time.monotonic() - started_at
+    status = "success" if collected >= quantity else "error"
+    message = (
+        f"Collected {collected}/{quantity} {block_type} in {elapsed:.1f}s "
+        f"({sum(1 for t in timings if t.status != 'success')} failed attempts)."
+    )
+    logger.info(f"collect_blocks operationId {operation_id}: {message}")
+    return CollectBlocksResponse(
+        status=status,
+        message=message,
+        operationId=operation_id,
+        collected_item=block_type,
+        quantity_requested=quantity,
+        quantity_collected=collected,
+        elapsed_seconds=round(elapsed, 3),
+        blocks=timings,
+    ).model_dump(exclude_none=True)
+
+
+async def _collect_one(
+    bridge: AsyncMineflayerBridge, block_type: str, x: int, y: int, z: int, start: Optional[Tuple[float, float, float]] = None
+) -> MinedBlockTiming:
+    """
+    Walks into digging range of one block and mines it, timing both phases.
+    The approach is given up early if it takes far longer than the trip from `start` usually does.
+    """
+    travel_started = time.monotonic()
+    travel_timeout_s = mineflayer_bridge_tools.travel_times.timeout_s(start, (x, y, z), maximum_s=COLLECT_STEP_TIMEOUT_S)
+    navigation = await bridge.run_operation("goToNear", x, y, z, COLLECT_APPROACH_RANGE, wait_timeout_s=travel_timeout_s)
+    travel_seconds = round(time.monotonic() - travel_started, 3)
+    if navigation.get("status") != "success":
+        return MinedBlockTiming(x=x, y=y, z=z, status="error", travel_seconds=travel_seconds,
+                                message=navigation.get("message"))
+
+    dig_started = time.monotonic()
+    mined = await bridge.run_operation("mineBlock", block_type, x, y, z, wait_timeout_s=COLLECT_STEP_TIMEOUT_S)
+    return MinedBlockTiming(
+        x=x, y=y, z=z,
+        status=mined.get("status", "error"),
+        travel_seconds=travel_seconds,
+        dig_seconds=round(time.monotonic() - dig_started, 3),
+        message=mined.get("message"),
+    )
+
+
+async def collect_blocks_with_fleet(
+    bot_fleet: BotFleet,
+    block_type: str,
+    quantity: int,
+    operation_id: Optional[str] = None,
+    assignments: Optional[List[Tuple[BotHandle, PlanStep]]] = None,
+) -> Dict[str, Any]:
+    """
+    Splits a collection across the idle bots of the fleet and runs the shares concurrently.
+    Helper bots then deliver what they collected to the primary bot, which does the crafting.
+    `assignments` overrides the scheduler's split, as (bot, share) pairs.
+    Returns a dictionary representation of CollectBlocksResponse with per-bot counts.
+    """
+    operation_id = operation_id or str(uuid.uuid4())
+    started_at = time.monotonic()
+    if assignments is None:
+        step = PlanStep(step_id=operation_id, action="gather", item_name=block_type, quantity=quantity, source_block=block_type)
+        assignments = bot_fleet.scheduler.assign(step, bot_fleet.bots)
+    if not assignments:
+        return CollectBlocksResponse(status="error", message="No idle bot available.", operationId=operation_id).model_dump(exclude_none=True)
+
+    claimed: Set[Tuple[int, int, int]] = set()
+    drop_item = DROPPED_ITEMS.get(block_type, block_type)
+
+    async def run_share(bot: BotHandle, share: PlanStep) -> Tuple[BotHandle, Dict[str, Any]]:
+        bot.busy = True
+        try:
+            result = await collect_blocks(bot.bridge, block_type, share.quantity, claimed_blocks=claimed)
+            if bot is not bot_fleet.primary and result.get("quantity_collected", 0) > 0:
+                delivery = await bot.bridge.run_operation(
+                    "deliverItems", bot_fleet.primary.username, drop_item, result["quantity_collected"],
+                    wait_timeout_s=COLLECT_STEP_TIMEOUT_S,
+                )
+                if delivery.get("status") != "success":
+                    logger.warning(f"{bot.name} could not deliver {drop_item}: {delivery.get('message')}")
+                    result["quantity_collected"] = 0
+            return bot, result
+        finally:
+            bot.busy = False
+
+    logger.info(f"collect_blocks({block_type}) split across fleet: {[(bot.name, share.quantity) for bot, share in assignments]}")
+    results = await asyncio.gather(*(run_share(bot, share) for bot, share in assignments))
+
+    collected_by = {bot.name: result.get("quantity_collected", 0) for bot, result in results}
+    collected = sum(collected_by.values())
+    timings = [MinedBlockTiming.model_validate(timing) for _, result in results for timing in result.get("blocks", [])]
+    elapsed = time.monotonic() - started_at
+    message = f"Collected {collected}/{quantity} {block_type} in {elapsed:.1f}s with {len(results)} bot(s)."
+    logger.info(f"collect_blocks operationId {operation_id}: {message}")
+    return CollectBlocksResponse(
+        status="success" if collected >= quantity else "error",
+        message=message,
+        operationId=operation_id,
+        collected_item=block_type,
+        quantity_requested=quantity,
+        quantity_collected=collected,
+        elapsed_seconds=round(elapsed, 3),
+        blocks=timings,
+        collected_by=collected_by,
+    ).model_dump(exclude_none=True)
+
+
+async def collect_blocks_via_js_long_running(block_type: str, quantity: int, tool_context: ToolContext) -> dict:
+    """
+    Initiates collecting `quantity` blocks of `block_type` (e.g. "oak_log") as a single operation:
+    finds many candidates at once, mines them in nearest-neighbour order and reports one aggregated result.
+    Returns an initial "pending" response with an operation ID.
+    """
+    bridge = mineflayer_bridge_tools.get_mineflayer_bridge()
+    results_queue = mineflayer_bridge_tools.current_results_queue()
+    bot_fleet = get_fleet()
+    if quantity <= 0:
+        return CollectBlocksResponse(status="error", message="Quantity must be positive.").model_dump(exclude_none=True)
+
+    operation_id = str(uuid.uuid4())
+    operation = mineflayer_bridge_tools.operation_registry.register(
+        operation_id, tool_context.function_call_id, "collectBlocks",
+        "fleet" if len(bot_fleet) > 1 else mineflayer_bridge_tools.current_bot_name(),
+        timeout_s=settings.pending_operations_timeout_s,
+    )
+    tracer.operation_point(operation_id, "tool_call", tool="collectBlocks")
+
+    async def run() -> None:
+        try:
+            if len(bot_fleet) > 1:
+                result = await collect_blocks_with_fleet(bot_fleet, block_type, quantity, operation_id=operation_id)
+            else:
+                result = await collect_blocks(bridge, block_type, quantity, operation_id=operation_id)
+        except Exception as e:
+            logger.error(f"collect_blocks failed for operationId {operation_id}: {e}", exc_info=True)
+            result = {"operationId": operation_id, "status": "error", "message": f"Collection failed: {e}"}
+        tracer.operation_point(operation_id, "completed")
+        if results_queue is not None:
+            await results_queue.put(result)
+
+    task = asyncio.create_task(run())
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    # Cancelling the task cancels the awaited mining operations, which stop their JS digs.
+    operation.cancel = task.cancel
+    tracer.operation_point(operation_id, "pending")
+
+    logger.info(f"Collection of {quantity} {block_type} initiated with operationId {operation_id}")
+    return {"status": "pending", "operationId": operation_id, "message": f"Collection of {quantity} {block_type} initiated."}
+
+collect_blocks_tool = LongRunningFunctionTool(
+    func=collect_blocks_via_js_long_running
+)
+
+__all__ = [
+    "collect_blocks",
+    "collect_blocks_with_fleet",
+    "collect_blocks_tool",
+]
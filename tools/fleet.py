@@ -0,0 +1,194 @@
+import asyncio
+from contextvars import ContextVar
+from typing import Optional, List
+
+from config import settings
+from src.fleet.scheduler import TaskScheduler
+from src.models.mineflayer_bridge.responses import BotInitializationResponse
+from src.spatial.block_index import BlockIndex
+from src.state.inventory_mirror import InventoryMirror
+from tools import mineflayer_bridge_tools
+from tools.async_bridge import AsyncMineflayerBridge
+from tools.bot_daemon import bot_options
+
+from logging_config import logger
+
+
+class BotHandle:
+    """
+    One bot of the fleet: its own bridge (and thus its own operation table), block index,
+    inventory mirror and last reported position. `results_queue` receives the completions of the
+    operations its tools start for the ADK runner, when the bot is driven by its own session.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        username: str,
+        bridge: AsyncMineflayerBridge,
+        block_index: BlockIndex,
+        inventory_mirror: InventoryMirror,
+        results_queue: Optional[asyncio.Queue] = None,
+    ):
+        self.name = name
+        self.username = username
+        self.bridge = bridge
+        self.block_index = block_index
+        self.inventory_mirror = inventory_mirror
+        self.results_queue = results_queue
+        self.position: Optional[tuple[float, float, float]] = None
+        self.busy = False
+
+    def _set_position(self, position: tuple[float, float, float]) -> None:
+        self.position = position
+
+    @property
+    def in_flight_operations(self) -> int:
+        return self.bridge.in_flight_operations()
+
+
+class BotFleet:
+    """
+    Spawns and tracks N bots. Bot 0 is the primary bot driven by the agents' tools
+    (the module-level bridge in `mineflayer_bridge_tools`); helper bots are separate
+    instances created with `createInterface()` in the same Node process.
+    """
+
+    def __init__(self):
+        self.bots: List[BotHandle] = []
+        self.scheduler = TaskScheduler(
+            min_gather_share=settings.fleet_min_gather_share, travel_times=mineflayer_bridge_tools.travel_times
+        )
+
+    def __len__(self) -> int:
+        return len(self.bots)
+
+    @property
+    def primary(self) -> BotHandle:
+        assert self.bots, "Fleet not initialized. Call initialize_fleet first."
+        return self.bots[0]
+
+    @property
+    def helpers(self) -> List[BotHandle]:
+        return self.bots[1:]
+
+    def get(self, name: str) -> Optional[BotHandle]:
+        return next((bot for bot in self.bots if bot.name == name), None)
+
+    def idle_bots(self) -> List[BotHandle]:
+        return [bot for bot in self.bots if not bot.busy]
+
+    def adopt_primary(self) -> BotHandle:
+        """
+        Wraps the already initialized primary bot as bot 0 of the fleet.
+        """
+        bridge = mineflayer_bridge_tools.get_mineflayer_bridge()
+        primary = BotHandle(
+            name=mineflayer_bridge_tools.PRIMARY_BOT_NAME,
+            username=settings.minecraft_bot_username,
+            bridge=bridge,
+            block_index=mineflayer_bridge_tools.block_index,
+            inventory_mirror=mineflayer_bridge_tools.inventory_mirror,
+            results_queue=mineflayer_bridge_tools._operation_results_queue,
+        )
+        primary.position = mineflayer_bridge_tools.bot_position
+        bridge.add_event_listener("mineflayerBotPosition", lambda data: primary._set_position((data["x"], data["y"], data["z"])))
+        self.bots = [primary]
+        return primary
+
+    async def spawn_helper(self, index: int) -> Optional[BotHandle]:
+        """
+        Creates, subscribes and logs in helper bot `index`. Returns None if the bot could not join.
+        """
+        return await spawn_bot(f"bot-{index}", f"{settings.minecraft_bot_username}_{index}")
+
+    def shutdown(self) -> None:
+        # The primary bridge is owned by mineflayer_bridge_tools and shut down there.
+        for bot in self.helpers:
+            bot.bridge.shutdown()
+
+
+async def spawn_bot(name: str, username: str, results_queue: Optional[asyncio.Queue] = None) -> Optional[BotHandle]:
+    """
+    Creates, subscribes and logs in a bot as another instance of the primary bot's JS interface.
+    Completions of operations started for the ADK runner go to `results_queue`.
+    Returns None if the bot could not join.
+    """
+    if mineflayer_bridge_tools.mineflayer_js_interface is None:
+        # Attached to a bot daemon: there is no local JS interface to create the bot from.
+        logger.error(f"Cannot spawn bot {name} while attached to the bot daemon on {mineflayer_bridge_tools.attached_daemon_socket}.")
+        return None
+    interface = await asyncio.to_thread(mineflayer_bridge_tools.mineflayer_js_interface.createInterface)
+    bridge = AsyncMineflayerBridge(interface, asyncio.get_running_loop(), results_queue)
+    await mineflayer_bridge_tools.enable_batch_transport(bridge, name)
+    bridge.subscribe()
+    handle = BotHandle(
+        name=name,
+        username=username,
+        bridge=bridge,
+        block_index=BlockIndex(
+            max_chunks=settings.block_index_max_chunks,
+            keep_radius_chunks=settings.block_index_keep_radius_chunks,
+        ),
+        inventory_mirror=InventoryMirror(),
+        results_queue=results_queue,
+    )
+    mineflayer_bridge_tools.attach_world_listeners(bridge, handle.block_index, handle.inventory_mirror, handle._set_position)
+
+    try:
+        result = BotInitializationResponse.model_validate(await bridge.call("initializeBot", bot_options(handle.username)))
+    except Exception as e:
+        logger.error(f"Error initializing fleet bot {handle.name}: {e}")
+        bridge.shutdown()
+        return None
+    if result.status not in ["success", "already_initialized"]:
+        logger.error(f"Fleet bot {handle.name} failed to initialize: {result.message}")
+        bridge.shutdown()
+        return None
+    logger.info(f"Fleet bot {handle.name} joined as '{handle.username}'.")
+    return handle
+
+
+# The fleet driven by the agents' tools; holds only the primary bot unless `fleet_size` > 1.
+fleet = BotFleet()
+# Fleet of the current task, if it drives its own bots (a job of the job server); see `use_fleet`.
+_active_fleet: ContextVar[Optional[BotFleet]] = ContextVar("active_fleet", default=None)
+
+
+def get_fleet() -> BotFleet:
+    """Returns the fleet the current task's tools act on, by default the process-wide `fleet`."""
+    active = _active_fleet.get()
+    return active if active is not None else fleet
+
+
+def use_fleet(bot_fleet: BotFleet) -> None:
+    """
+    Makes the tools of the current task, and of the tasks it starts, act on `bot_fleet`, with its
+    primary bot as the bot of the single-bot tools (see `mineflayer_bridge_tools.use_bot`).
+    """
+    _active_fleet.set(bot_fleet)
+    mineflayer_bridge_tools.use_bot(bot_fleet.primary)
+
+
+async def initialize_fleet(fleet_size: int = settings.fleet_size) -> BotFleet:
+    """
+    Adopts the initialized primary bot and spawns `fleet_size - 1` helper bots concurrently.
+    Helpers that fail to join are skipped, so the fleet may end up smaller than requested.
+    """
+    fleet.adopt_primary()
+    if fleet_size > 1:
+        helpers = await asyncio.gather(*(fleet.spawn_helper(index) for index in range(1, fleet_size)))
+        fleet.bots.extend(helper for helper in helpers if helper is not None)
+    logger.info(f"Fleet initialized with {len(fleet)} bot(s): {[bot.username for bot in fleet.bots]}")
+    return fleet
+
+
+__all__ = [
+    "BotHandle",
+    "BotFleet",
+    "fleet",
+    "get_fleet",
+    "use_fleet",
+    "spawn_bot",
+    "initialize_fleet",
+]
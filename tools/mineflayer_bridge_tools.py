@@ -1,8 +1,8 @@
+import time
 import uuid
 import asyncio
-from javascript import require
-from javascript.proxy import Proxy
-from typing import Optional, Dict, List, Any
+from contextvars import ContextVar
+from typing import Optional, Dict, List, Any, Callable
 from pydantic import ValidationError as PydanticValidationError
 
 from config import settings
@@ -11,88 +11,349 @@ from src.models.mineflayer_bridge.responses import (
     FindBlockResponse,
     InventoryResponse,
     MemorizeRecipeResponse,
+    NavigationResponse,
+    CancelOperationResponse,
+    NavigationProgressResponse,
+    ResourceSurveyResponse,
+    BlockScanResponse,
+    CraftChainResponse,
 )
+from src.planning.crafting_planner import PlanningError, build_crafting_plan, normalize_item_name
+from src.spatial.block_arrays import BlockMatches
+from src.spatial.block_index import BlockIndex
+from src.spatial.chunk_store import ChunkStore, ChunkStoreError
+from src.spatial.travel_times import TravelTimeModel
+from src.state.inventory_mirror import InventoryMirror, inventory_from_state, inventory_state_delta
+from src.state.operation_registry import OperationRegistry, PendingOperation
+from tools.async_bridge import AsyncMineflayerBridge, TASK_COMPLETE_EVENT, TASK_PROGRESS_EVENT
+from tools.batch_transport import batch_socket_path
+from tools.bot_daemon import bot_options, load_interface
+from tools.recipe_tools import get_recipe_index
+from tools.tracing import tracer
 
 from google.adk.tools import ToolContext, FunctionTool, LongRunningFunctionTool
 
 from logging_config import logger
 
-# Global variable to hold the JavaScript module interface
+# Global variable to hold the JavaScript module interface; None when attached to a bot daemon
 mineflayer_js_interface: Optional[Any] = None
-
-# Maps operationId to a tuple of (ADK function_call_id, original_tool_name)
-_pending_operations: Dict[str, tuple[str, str]] = {}
+# Awaitable bridge over the JavaScript module interface, or over the bot daemon's socket
+mineflayer_bridge: Optional[AsyncMineflayerBridge] = None
+# Socket of the bot daemon the primary bridge is attached to, if any
+attached_daemon_socket: Optional[str] = None
+
+# Spatial index of tracked resource blocks, fed by chunk load and block update events
+block_index = BlockIndex(
+    max_chunks=settings.block_index_max_chunks,
+    keep_radius_chunks=settings.block_index_keep_radius_chunks,
+)
+# Memory-mapped block ids of every chunk the primary bot has loaded, if settings.chunk_store_enabled
+chunk_store: Optional[ChunkStore] = None
+# Inventory mirror, fed by inventory snapshot and slot update events
+inventory_mirror = InventoryMirror()
+# Travel times observed by every bot's navigations, for operation timeouts and scheduling costs
+travel_times = TravelTimeModel()
+# Last bot position reported by JS, as (x, y, z)
+bot_position: Optional[tuple[float, float, float]] = None
+
+# Same search radius as the JS findBlock default
+FIND_BLOCK_MAX_DISTANCE = 64
+# Same crafting table search distance as JS craftItem and craftChain
+CRAFTING_TABLE_SEARCH_DISTANCE = 64
+# Matches per block type returned by a bulk query, and clusters summarized for the agent per scan
+BULK_QUERY_MAX_PER_TYPE = 512
+SCAN_MAX_CLUSTERS = 8
+
+# Name of the bot driven through the module-level bridge (bot 0 of the fleet)
+PRIMARY_BOT_NAME = "bot-0"
+
+# Long-running operations the ADK runner waits on, with their owning bot, tool name and deadline
+operation_registry = OperationRegistry(default_timeout_s=settings.operation_timeout_s)
 # Queue for JS task results
 _operation_results_queue: Optional[asyncio.Queue] = None
+# Results queue of each bot other than the primary, for the synthetic results of closed operations
+_results_queues: Dict[str, asyncio.Queue] = {}
+
+# Bot the tools of the current task act on (a fleet BotHandle); unset means the primary bot.
+# Set per job by the job server, so concurrent sessions each drive their own bot.
+_active_bot: ContextVar[Optional[Any]] = ContextVar("active_bot", default=None)
 
-def _get_data_from_proxy(proxy: Optional[Proxy]) -> Dict[str, Any]:
+def use_bot(bot: Optional[Any]) -> None:
     """
-    Helper to convert a JavaScript Proxy object to a Python dictionary.
-    It calls `proxy.valueOf()`, which might block if the proxy represents a Promise.
-    If `valueOf()` returns a string, it's parsed as JSON.
-    If not a Proxy, it's returned as is if a dict, else an error dict is returned.
+    Makes the tools of the current task, and of the tasks it starts, act on `bot` (a fleet BotHandle):
+    its bridge, block index, inventory mirror, position and results queue. None restores the primary bot.
     """
-    if isinstance(proxy, Proxy):
+    _active_bot.set(bot)
+    if bot is not None and bot.results_queue is not None:
+        _results_queues[bot.name] = bot.results_queue
+
+def current_bot_name() -> str:
+    bot = _active_bot.get()
+    return bot.name if bot is not None else PRIMARY_BOT_NAME
+
+def current_block_index() -> BlockIndex:
+    bot = _active_bot.get()
+    return bot.block_index if bot is not None else block_index
+
+def current_inventory_mirror() -> InventoryMirror:
+    bot = _active_bot.get()
+    return bot.inventory_mirror if bot is not None else inventory_mirror
+
+def current_bot_position() -> Optional[tuple[float, float, float]]:
+    bot = _active_bot.get()
+    return bot.position if bot is not None else bot_position
+
+def current_chunk_store() -> Optional[ChunkStore]:
+    """The chunk store holds the primary bot's chunks only."""
+    bot = _active_bot.get()
+    return chunk_store if bot is None or bot.name == PRIMARY_BOT_NAME else None
+
+def current_results_queue() -> Optional[asyncio.Queue]:
+    bot = _active_bot.get()
+    return bot.results_queue if bot is not None and bot.results_queue is not None else _operation_results_queue
+
+def attach_world_listeners(
+    bridge: AsyncMineflayerBridge,
+    index: BlockIndex,
+    mirror: InventoryMirror,
+    on_position: Callable[[tuple[float, float, float]], None],
+    store: Optional[ChunkStore] = None,
+) -> None:
+    """
+    Keeps a block index, an inventory mirror and the bot position in sync with the world events of one bot,
+    and `store` (if given) with its chunk snapshots and block changes. Its navigation times go to `travel_times`.
+    """
+    def on_chunk_blocks(data: Dict[str, Any]) -> None:
+        index.replace_chunk(data["chunkX"], data["chunkZ"], data.get("blocks", []))
+
+    def on_block_update(data: Dict[str, Any]) -> None:
+        index.update_block(data["x"], data["y"], data["z"], data.get("old_name"), data.get("new_name"))
+
+    def on_bot_position(data: Dict[str, Any]) -> None:
+        on_position((data["x"], data["y"], data["z"]))
+
+    def on_inventory_snapshot(data: Dict[str, Any]) -> None:
+        mirror.load_snapshot(data.get("slots", []))
+
+    def on_inventory_slot(data: Dict[str, Any]) -> None:
+        mirror.apply_slot_update(data["slot"], data.get("name"), data.get("count", 0), data.get("type", -1))
+
+    def on_chunk_snapshot(data: Dict[str, Any]) -> None:
         try:
-            value = proxy.valueOf()
-            if isinstance(value, str):
-                import json
-                return json.loads(value)
-            return value
-        except Exception as e_proxy:
-            logger.error(f"Failed to get value from Proxy object: {e_proxy}")
-            return {"status": "error", "message": "Failed to extract data from JS Proxy"}
-    return proxy if isinstance(proxy, dict) else {"status": "error", "message": f"Unexpected type '{type(proxy)}' received, not Proxy or dict."}
+            store.write_snapshot(data)
+        except ChunkStoreError as e:
+            logger.warning(f"Dropping chunk snapshot: {e}")
+
+    def on_chunk_block_change(data: Dict[str, Any]) -> None:
+        store.set_block(data["x"], data["y"], data["z"], data.get("name"))
+
+    bridge.add_event_listener("mineflayerChunkBlocks", on_chunk_blocks)
+    bridge.add_event_listener(TASK_COMPLETE_EVENT, travel_times.record_completion)
+    if store is not None:
+        bridge.add_event_listener("mineflayerChunkSnapshot", on_chunk_snapshot)
+        bridge.add_event_listener("mineflayerChunkBlockChange", on_chunk_block_change)
+    bridge.add_event_listener("mineflayerBlockUpdate", on_block_update)
+    bridge.add_event_listener("mineflayerBotPosition", on_bot_position)
+    bridge.add_event_listener("mineflayerInventorySnapshot", on_inventory_snapshot)
+    bridge.add_event_listener("mineflayerInventorySlot", on_inventory_slot)
+
+def _set_bot_position(position: tuple[float, float, float]) -> None:
+    global bot_position
+    bot_position = position
+
+def sync_inventory_state(state: Any) -> Dict[str, int]:
+    """
+    Writes the items whose counts changed into their `inventory:<item>` keys of `state` (a session
+    or tool context state), so the state delta holds only those items.
+    Returns the applied delta, which is empty when the state is already up to date.
+    """
+    mirror = current_inventory_mirror()
+    if not mirror.synced:
+        return {}
+    delta = mirror.delta_against(inventory_from_state(state))
+    for key, count in inventory_state_delta(delta).items():
+        state[key] = count
+    return delta
+
+async def cancel_operation(operation_id: str, reason: str, status: str = "cancelled") -> bool:
+    """
+    Stops an in-flight operation through its cancel hook and completes it with a synthetic
+    `status` result on the results queue, so the runner is not left waiting for it.
+    A completion arriving later for the operation is dropped.
+    Returns False if the operation is not in flight.
+    """
+    operation = operation_registry.get(operation_id)
+    if operation is None or operation.closed:
+        return False
+    operation.closed = True
+    logger.warning(f"Closing {operation.tool_name} operation {operation_id} of {operation.bot_name} ({status}): {reason}")
+    try:
+        await operation_registry.run_cancel_hook(operation)
+    except Exception as e:
+        logger.error(f"Cancel hook of operation {operation_id} failed: {e}", exc_info=True)
+    results_queue = _results_queues.get(operation.bot_name, _operation_results_queue)
+    if results_queue is not None:
+        await results_queue.put({"operationId": operation_id, "status": status, "message": reason})
+    else:
+        operation_registry.pop(operation_id)
+    return True
+
+async def _expire_operation(operation: PendingOperation) -> None:
+    timeout_s = (operation.deadline or operation.started_at) - operation.started_at
+    await cancel_operation(
+        operation.operation_id, f"{operation.tool_name} timed out after {timeout_s:.0f}s without a result.", status="error"
+    )
+
+async def enable_batch_transport(bridge: AsyncMineflayerBridge, bot_name: str) -> bool:
+    """
+    Switches `bridge` to the batch transport if `settings.bridge_transport` is "batch".
+    Falls back to per-call JSPyBridge calls if the batch server cannot be started.
+    """
+    if settings.bridge_transport != "batch":
+        return False
+    socket_path = batch_socket_path(bot_name, settings.bridge_socket_dir)
+    try:
+        await bridge.enable_batch_transport(socket_path)
+    except Exception as e:
+        logger.warning(f"Batch transport unavailable for {bot_name}, using JSPyBridge calls: {e}")
+        return False
+    logger.info(f"Bridge of {bot_name} uses the batch transport on {socket_path}.")
+    return True
+
+def open_chunk_store() -> Optional[ChunkStore]:
+    """Opens the chunk store in `settings.chunk_store_dir` if `settings.chunk_store_enabled`; None otherwise or on failure."""
+    if not settings.chunk_store_enabled:
+        return None
+    try:
+        store = ChunkStore(settings.chunk_store_dir)
+    except (ChunkStoreError, OSError) as e:
+        logger.warning(f"Chunk store unavailable, continuing without it: {e}")
+        return None
+    logger.info(f"Chunk store in {settings.chunk_store_dir} ({len(store)} chunks stored).")
+    return store
+
+async def enable_chunk_snapshots(bridge: AsyncMineflayerBridge) -> None:
+    """Asks the bot to send snapshots of its loaded chunks, and of every chunk it loads later."""
+    try:
+        result = await bridge.call("setChunkSnapshots", True, timeout_s=settings.bridge_call_timeout_s)
+        logger.info(f"setChunkSnapshots: {result.get('message')}")
+    except Exception as e:
+        logger.warning(f"Could not enable chunk snapshots: {e}")
 
+def get_mineflayer_bridge() -> AsyncMineflayerBridge:
+    """
+    Returns the bridge of the current task's bot (see `use_bot`), by default the initialized primary bridge.
+    Raises AssertionError if `initialize_mineflayer_bridge` was not called.
+    """
+    bot = _active_bot.get()
+    if bot is not None:
+        return bot.bridge
+    assert mineflayer_bridge is not None, "Mineflayer JS interface not initialized. Call initialize_mineflayer_bridge first."
+    return mineflayer_bridge
+
+
+def _validated_init_response(data: Any) -> dict:
+    """Validates and logs an `initializeBot` result."""
+    validated_result = BotInitializationResponse.model_validate(data)
+    logger.info(f"Mineflayer initializeBot processed: {validated_result}")
+    if validated_result.status in ["success", "already_initialized"]:
+        logger.info("Mineflayer bot initialization successful or already done.")
+    else:
+        logger.error(f"Mineflayer bot initialization failed: {validated_result.message}")
+    return validated_result.model_dump(exclude_none=True)
+
+def _connect_primary_bridge(bridge: AsyncMineflayerBridge) -> None:
+    """Subscribes the primary bridge to task and world events and makes it the module's bridge."""
+    global mineflayer_bridge, chunk_store
+    bridge.subscribe()
+    bridge.add_event_listener(
+        TASK_PROGRESS_EVENT, lambda progress: logger.debug(f"JS task progress: {progress}")
+    )
+    chunk_store = open_chunk_store()
+    attach_world_listeners(bridge, block_index, inventory_mirror, _set_bot_position, chunk_store)
+    mineflayer_bridge = bridge
+
+async def attach_to_bot_daemon(socket_path: str, operation_results_queue: asyncio.Queue) -> Optional[dict]:
+    """
+    Attaches the primary bridge to the bot daemon serving on `socket_path` (see tools/bot_daemon.py),
+    then has it resend the position, inventory and tracked blocks of its loaded chunks, so the block
+    index, inventory mirror and chunk store start from the daemon's world state.
+    Returns a dictionary representation of BotInitializationResponse, or None if no daemon listens there.
+    """
+    global attached_daemon_socket
+    started = time.perf_counter()
+    bridge = AsyncMineflayerBridge(None, asyncio.get_running_loop(), operation_results_queue)
+    try:
+        await asyncio.wait_for(bridge.attach_batch_transport(socket_path), timeout=settings.bridge_call_timeout_s)
+    except (OSError, asyncio.TimeoutError) as e:
+        logger.warning(f"No bot daemon on {socket_path}, starting the bot in this process: {e}")
+        bridge.shutdown()
+        return None
+    _connect_primary_bridge(bridge)
+    attached_daemon_socket = socket_path
+    try:
+        response = _validated_init_response(
+            await bridge.call("initializeBot", bot_options(), timeout_s=settings.bridge_call_timeout_s)
+        )
+        if response["status"] in ["success", "already_initialized"]:
+            resync = await bridge.call("resyncWorldState", settings.tracked_block_types, timeout_s=settings.bridge_call_timeout_s)
+            logger.info(f"resyncWorldState: {resync.get('message')}")
+            if chunk_store is not None:
+                await enable_chunk_snapshots(bridge)
+        logger.info(f"Attached to the bot daemon on {socket_path} in {(time.perf_counter() - started) * 1000:.0f} ms.")
+        return response
+    except PydanticValidationError as ve:
+        logger.error(f"Pydantic validation error for initializeBot response: {ve}")
+        return BotInitializationResponse(status="error", message=f"Invalid response structure from the bot daemon: {ve}").model_dump(exclude_none=True)
+    except Exception as e:
+        logger.error(f"Error attaching to the bot daemon on {socket_path}: {e}")
+        return BotInitializationResponse(status="error", message=f"Error attaching to the bot daemon: {e}").model_dump(exclude_none=True)
 
 async def initialize_mineflayer_bridge(operation_results_queue: asyncio.Queue) -> dict:
     """
     Initializes the JSPyBridge connection to the Mineflayer JavaScript interface
     and initializes the Mineflayer bot. This should be called once.
+    With `settings.bot_daemon_socket`, the bot daemon's logged-in bot is used instead if one is running.
     Sets up an event listener for task completions from JavaScript.
     Returns a dictionary representation of BotInitializationResponse.
     """
     global mineflayer_js_interface, _operation_results_queue
     _operation_results_queue = operation_results_queue
+    operation_registry.start_sweeper(settings.operation_sweep_interval_s, _expire_operation)
     logger.info("Attempting to initialize Mineflayer bridge...")
 
-    if mineflayer_js_interface:
+    if mineflayer_bridge is not None:
         logger.info("Mineflayer JS interface already initialized.")
         try:
-            status_proxy = mineflayer_js_interface.initializeBot({})
-            status_data = _get_data_from_proxy(status_proxy)
+            status_data = await get_mineflayer_bridge().call("initializeBot", {})
             return BotInitializationResponse.model_validate(status_data).model_dump(exclude_none=True)
         except Exception as e:
             logger.warning(f"Could not get status from already initialized bot: {e}")
             return BotInitializationResponse(status="already_initialized_confirmed_by_python", username="unknown_but_initialized").model_dump(exclude_none=True)
 
+    if settings.bot_daemon_socket:
+        response = await attach_to_bot_daemon(settings.bot_daemon_socket, operation_results_queue)
+        if response is not None:
+            return response
+
     try:
-        mineflayer_js_interface = require('../mineflayer_scripts/mineflayer_interface.js')
-        logger.info("Successfully loaded mineflayer_interface.js via javascript.require.")
+        mineflayer_js_interface = await load_interface()
+        bridge = AsyncMineflayerBridge(mineflayer_js_interface, asyncio.get_running_loop(), operation_results_queue)
+        await enable_batch_transport(bridge, PRIMARY_BOT_NAME)
+        _connect_primary_bridge(bridge)
+        logger.info(f"Successfully loaded the Mineflayer interface ({settings.mineflayer_backend} backend).")
     except Exception as e:
         logger.error(f"Failed to load mineflayer_interface.js: {e}")
         return BotInitializationResponse(status="error", message=f"JSPyBridge could not load JS interface: {e}").model_dump(exclude_none=True)
 
-    bot_options = {
-        "host": settings.minecraft_host,
-        "port": settings.minecraft_port,
-        "username": settings.minecraft_bot_username,
-        "auth": settings.minecraft_auth,
-        "version": settings.minecraft_version,
-        "initial_teleport_coords": settings.initial_teleport_coords
-    }
-    logger.info(f"Initializing Mineflayer bot with options: {bot_options}")
+    options = bot_options()
+    logger.info(f"Initializing Mineflayer bot with options: {options}")
 
     try:
-        result_proxy = mineflayer_js_interface.initializeBot(bot_options)
-        data_for_validation = _get_data_from_proxy(result_proxy)
-        validated_result = BotInitializationResponse.model_validate(data_for_validation)
-        logger.info(f"Mineflayer initializeBot processed: {validated_result}")
-        if validated_result.status in ["success", "already_initialized"]:
-            logger.info("Mineflayer bot initialization successful or already done.")
-        else:
-            logger.error(f"Mineflayer bot initialization failed: {validated_result.message}")
-        return validated_result.model_dump(exclude_none=True)
+        response = _validated_init_response(await mineflayer_bridge.call("initializeBot", options))
+        if response["status"] in ["success", "already_initialized"] and chunk_store is not None:
+            await enable_chunk_snapshots(mineflayer_bridge)
+        return response
     except PydanticValidationError as ve:
         logger.error(f"Pydantic validation error for initializeBot response: {ve}")
         return BotInitializationResponse(status="error", message=f"Invalid response structure from JS: {ve}").model_dump(exclude_none=True)
@@ -100,124 +361,315 @@ async def initialize_mineflayer_bridge(operation_results_queue: asyncio.Queue) -
         logger.error(f"Error calling initializeBot on JS interface: {e}")
         return BotInitializationResponse(status="error", message=f"Error during JS initializeBot call: {e}").model_dump(exclude_none=True)
 
-def _execute_long_running_js_task(js_function_name: str, tool_context: ToolContext, *args) -> dict:
+async def _execute_long_running_js_task(
+    js_function_name: str, tool_context: ToolContext, *args, timeout_s: Optional[float] = None
+) -> dict:
     """
     Helper to initiate a long-running JS task and return a pending response.
+    The completion is delivered to the results queue by the bridge; without one, the operation
+    expires after `timeout_s` (default: `settings.operation_timeout_s`).
     """
-    assert mineflayer_js_interface is not None, "Mineflayer JS interface not initialized."
-    
+    bridge = get_mineflayer_bridge()
+
     operation_id = str(uuid.uuid4())
-    _pending_operations[operation_id] = (tool_context.function_call_id, js_function_name)
-    
+    operation_registry.register(
+        operation_id, tool_context.function_call_id, js_function_name, current_bot_name(),
+        timeout_s=timeout_s, cancel=lambda: bridge.cancel_operation(operation_id),
+    )
+    tracer.operation_point(operation_id, "tool_call", tool=js_function_name)
+
     logger.info(f"Calling JS {js_function_name} with operationId {operation_id} and args: {args}")
-    
-    js_function = getattr(mineflayer_js_interface, js_function_name)
-    js_args = list(args)
-    js_args.append(operation_id)
-    result_proxy = js_function(*js_args)
-    
-    pending_response_data = _get_data_from_proxy(result_proxy)
-    
-    if not isinstance(pending_response_data, dict) or pending_response_data.get("status") != "pending":
+
+    try:
+        _, pending_response_data, future = await bridge.start_operation(
+            js_function_name, *args, operation_id=operation_id, timeout_s=settings.bridge_call_timeout_s
+        )
+    except Exception as e:
+        logger.error(f"Error calling JS {js_function_name} (opId: {operation_id}): {e}", exc_info=True)
+        operation_registry.pop(operation_id)
+        return {"status": "error", "message": f"Failed to initiate {js_function_name}: {e}"}
+
+    if future is None or pending_response_data.get("status") != "pending":
         logger.error(f"JS function {js_function_name} did not return a 'pending' status. Response: {pending_response_data}")
-        _pending_operations.pop(operation_id, None)
+        operation_registry.pop(operation_id)
         return {"status": "error", "message": f"Failed to initiate {js_function_name} correctly. JS response: {pending_response_data}"}
 
     logger.info(f"JS task {js_function_name} (opId: {operation_id}) initiated, ADK callId: {tool_context.function_call_id}. Pending response: {pending_response_data}")
     return pending_response_data
 
-def move_to_xyz_via_js_synchronous(x: int, y: int, z: int, tool_context: ToolContext) -> dict:
+async def move_to_xyz_via_js_long_running(x: int, y: int, z: int, tool_context: ToolContext) -> dict:
     """
-    Navigates the Mineflayer bot to X, Y, Z coordinates and waits for completion.
-    Returns the final success/error dictionary.
+    Initiates navigating the Mineflayer bot to X, Y, Z coordinates.
+    Returns an initial "pending" response with an operation ID; the final result arrives later.
+    A newer navigation goal preempts the active one, which then completes with an error.
     """
-    assert mineflayer_js_interface is not None, "Mineflayer JS interface not initialized."
-    assert _operation_results_queue is not None, "Operation results queue not initialized."
+    timeout_s = travel_times.timeout_s(current_bot_position(), (x, y, z), maximum_s=settings.operation_timeout_s)
+    return await _execute_long_running_js_task("goToXYZ", tool_context, x, y, z, timeout_s=timeout_s)
 
-    operation_id = str(uuid.uuid4())
-    _pending_operations[operation_id] = (tool_context.function_call_id, "goToXYZ_sync")
+move_to_xyz_tool = LongRunningFunctionTool(
+    func=move_to_xyz_via_js_long_running
+)
 
-    logger.info(f"Calling JS goToXYZ (synchronous wrapper) with operationId {operation_id} and args: ({x}, {y}, {z})")
+def get_navigation_progress(operation_id: str, tool_context: ToolContext) -> dict:
+    """
+    Returns the latest progress (remaining distance, replans, ETA) of an in-flight navigation.
+    Served from the progress events streamed by JS, so it does not cross the bridge.
+    Returns a dictionary representation of NavigationProgressResponse.
+    """
+    progress = get_mineflayer_bridge().latest_progress(operation_id)
+    if progress is None:
+        return NavigationProgressResponse(
+            status="unknown",
+            operation_id=operation_id,
+            message="No progress reported yet, or the navigation already finished.",
+        ).model_dump(exclude_none=True)
+    return NavigationProgressResponse(
+        status="in_progress",
+        operation_id=operation_id,
+        remaining_distance=progress.get("remaining_distance"),
+        replans=progress.get("replans"),
+        eta_seconds=progress.get("eta_seconds"),
+        elapsed_seconds=progress.get("elapsed_seconds"),
+    ).model_dump(exclude_none=True)
+
+get_navigation_progress_tool = FunctionTool(
+    func=get_navigation_progress
+)
 
+async def cancel_navigation_via_js(tool_context: ToolContext) -> dict:
+    """
+    Cancels the bot's active navigation, if any. The cancelled navigation completes with status "cancelled".
+    Returns a dictionary representation of NavigationResponse.
+    """
+    logger.info("Calling JS cancelNavigation()")
     try:
-        js_function = getattr(mineflayer_js_interface, "goToXYZ")
-        # Set timeout for the python-javascript bridge call, allowing JS to manage its own longer timeouts.
-        python_to_js_call_timeout_ms = 600000
-        logger.info(f"Calling JS goToXYZ with Python-to-JS bridge timeout: {python_to_js_call_timeout_ms}ms")
-        promise_proxy = js_function(x, y, z, operation_id, timeout=python_to_js_call_timeout_ms)
-
-        logger.info(f"Awaiting JS goToXYZ promise for operationId {operation_id}...")
-        result_data = _get_data_from_proxy(promise_proxy)
-        logger.info(f"JS goToXYZ promise for operationId {operation_id} resolved. Result: {result_data}")
-
-        _pending_operations.pop(operation_id, None)
-        
-        if not isinstance(result_data, dict) or "status" not in result_data:
-            logger.error(f"goToXYZ (sync) for opId {operation_id} returned malformed data: {result_data}")
-            error_response = {"status": "error", "message": f"goToXYZ (sync) returned malformed data: {result_data}"}
-            if "operationId" in result_data: # if JS included it in a non-promise error
-                error_response["operationId"] = result_data["operationId"]
-            elif operation_id:
-                error_response["operationId"] = operation_id
-            return error_response
-        
-        return result_data
-
+        result = await get_mineflayer_bridge().call("cancelNavigation", None, timeout_s=settings.bridge_call_timeout_s)
+        return NavigationResponse.model_validate(result).model_dump(exclude_none=True)
     except Exception as e:
-        logger.error(f"Error in move_to_xyz_via_js_synchronous (opId: {operation_id}): {e}", exc_info=True)
-        _pending_operations.pop(operation_id, None)
-        return {"status": "error", "message": f"Python wrapper error for goToXYZ (sync): {str(e)}", "operationId": operation_id}
+        logger.error(f"Error in cancel_navigation_via_js: {e}")
+        return NavigationResponse(status="error", message=str(e)).model_dump(exclude_none=True)
 
-move_to_xyz_tool = FunctionTool(
-    func=move_to_xyz_via_js_synchronous
+cancel_navigation_tool = FunctionTool(
+    func=cancel_navigation_via_js
 )
 
-def find_nearest_block_via_js(block_type: str, tool_context: ToolContext) -> dict:
+async def cancel_operation_via_js(operation_id: str, tool_context: ToolContext) -> dict:
+    """
+    Cancels an in-flight long-running operation (navigation, mining, crafting, collection...) by its operation ID.
+    The operation completes with status "cancelled"; a craft or placement already under way still finishes in the world.
+    Returns a dictionary representation of CancelOperationResponse.
+    """
+    if await cancel_operation(operation_id, "Cancelled on request."):
+        return CancelOperationResponse(status="success", operation_id=operation_id, message="Operation cancelled.").model_dump(exclude_none=True)
+    return CancelOperationResponse(
+        status="error", operation_id=operation_id, message="No operation with this ID is in flight."
+    ).model_dump(exclude_none=True)
+
+cancel_operation_tool = FunctionTool(
+    func=cancel_operation_via_js
+)
+
+async def find_nearest_block(block_type: str) -> dict:
     """
     Finds the nearest block of the specified type near the Mineflayer bot.
+    Tracked block types are answered from the local spatial index; others cross the bridge.
     Returns a dictionary representation of FindBlockResponse.
-    This is a synchronous, quick operation.
     """
-    assert mineflayer_js_interface is not None, "Mineflayer JS interface not initialized. Call initialize_mineflayer_tool first."
-    logger.info(f"Calling JS findBlock('{block_type}')")
     try:
-        result_proxy = mineflayer_js_interface.findBlock(block_type)
-        data_for_validation = _get_data_from_proxy(result_proxy)
-        validated_result = FindBlockResponse.model_validate(data_for_validation)
+        location = None
+        position = current_bot_position()
+        if position is not None and block_type in settings.tracked_block_types:
+            location = current_block_index().nearest(block_type, position, max_distance=FIND_BLOCK_MAX_DISTANCE)
+
+        if location is not None:
+            logger.info(f"findBlock('{block_type}') answered from block index: {location}")
+            validated_result = FindBlockResponse(
+                status="success", location={"x": location[0], "y": location[1], "z": location[2]}
+            )
+        else:
+            logger.info(f"Calling JS findBlock('{block_type}')")
+            data_for_validation = await get_mineflayer_bridge().call("findBlock", block_type, timeout_s=settings.bridge_call_timeout_s)
+            validated_result = FindBlockResponse.model_validate(data_for_validation)
         return validated_result.model_dump(exclude_none=True)
     except PydanticValidationError as ve:
         logger.error(f"Pydantic validation error for findBlock response: {ve}")
         return FindBlockResponse(status="error", message=f"Invalid response structure from JS: {ve}").model_dump(exclude_none=True)
     except Exception as e:
-        logger.error(f"Error in find_nearest_block_via_js: {e}")
+        logger.error(f"Error in find_nearest_block: {e}")
         return FindBlockResponse(status="error", message=str(e)).model_dump(exclude_none=True)
 
+async def find_nearest_block_via_js(block_type: str, tool_context: ToolContext) -> dict:
+    """
+    Finds the nearest block of the specified type near the Mineflayer bot.
+    Returns a dictionary representation of FindBlockResponse.
+    Tracked block types are answered from the local spatial index; others cross the bridge.
+    """
+    result = await find_nearest_block(block_type)
+    if result.get("status") == "success" and result.get("location") is not None:
+        _remember_resource_location(tool_context, block_type, result["location"])
+    return result
+
+def _remember_resource_location(tool_context: ToolContext, block_type: str, location: Dict[str, int]) -> None:
+    """
+    Records the last known location of a resource in `session.state['resource_locations_memory']`.
+    """
+    memory = dict(tool_context.state.get("resource_locations_memory") or {})
+    memory[block_type] = location
+    tool_context.state["resource_locations_memory"] = memory
+
 find_nearest_block_tool = FunctionTool(
     func=find_nearest_block_via_js
 )
 
-def mine_target_block_via_js_long_running(block_type: str, x: int, y: int, z: int, tool_context: ToolContext) -> dict:
+async def survey_resources(block_types: List[str], tool_context: ToolContext) -> dict:
+    """
+    Finds the nearest block of each of `block_types` and reads the inventory in one step.
+    Tracked block types and a synced inventory are answered locally; everything else is sent
+    to the bot as a single batch of calls. Locations of block types that were not found are null.
+    Returns a dictionary representation of ResourceSurveyResponse.
+    """
+    try:
+        locations: Dict[str, Optional[Dict[str, int]]] = {}
+        calls = []
+        position, index, mirror = current_bot_position(), current_block_index(), current_inventory_mirror()
+        for block_type in dict.fromkeys(block_types):
+            location = None
+            if position is not None and block_type in settings.tracked_block_types:
+                location = index.nearest(block_type, position, max_distance=FIND_BLOCK_MAX_DISTANCE)
+            if location is not None:
+                locations[block_type] = {"x": location[0], "y": location[1], "z": location[2]}
+            else:
+                calls.append(("findBlock", (block_type,)))
+        if not mirror.synced:
+            calls.append(("getInventory", ()))
+
+        results = await get_mineflayer_bridge().call_many(calls, timeout_s=settings.bridge_call_timeout_s) if calls else []
+        inventory = mirror.items() if mirror.synced else None
+        for (js_function_name, js_args), result in zip(calls, results):
+            if isinstance(result, Exception) or not isinstance(result, dict):
+                logger.warning(f"{js_function_name}{js_args} failed in survey: {result}")
+                if js_function_name == "findBlock":
+                    locations[js_args[0]] = None
+                continue
+            if js_function_name == "findBlock":
+                locations[js_args[0]] = result.get("location") if result.get("status") == "success" else None
+            else:
+                inventory = InventoryResponse.model_validate(result).inventory
+
+        sync_inventory_state(tool_context.state)
+        for block_type, location in locations.items():
+            if location is not None:
+                _remember_resource_location(tool_context, block_type, location)
+        return ResourceSurveyResponse(status="success", locations=locations, inventory=inventory).model_dump(exclude_none=True)
+    except PydanticValidationError as ve:
+        logger.error(f"Pydantic validation error in survey_resources: {ve}")
+        return ResourceSurveyResponse(status="error", message=f"Invalid response structure from JS: {ve}").model_dump(exclude_none=True)
+    except Exception as e:
+        logger.error(f"Error in survey_resources: {e}")
+        return ResourceSurveyResponse(status="error", message=str(e)).model_dump(exclude_none=True)
+
+survey_resources_tool = FunctionTool(
+    func=survey_resources
+)
+
+async def find_blocks_multi(
+    block_types: List[str],
+    radius: float = FIND_BLOCK_MAX_DISTANCE,
+    count_per_type: int = BULK_QUERY_MAX_PER_TYPE,
+    bridge: Optional[AsyncMineflayerBridge] = None,
+    local_index: Optional[BlockIndex] = None,
+    origin: Optional[tuple[float, float, float]] = None,
+    store: Optional[ChunkStore] = None,
+) -> BlockMatches:
+    """
+    Finds all blocks of `block_types` within `radius` as one BlockMatches array.
+    Types tracked in `local_index` are read from it when `origin` is known, and the other types from
+    the chunk snapshots in `store` if one is given; the rest are found by a single `findBlocksMulti`
+    scan on the bot (default: the current task's bridge).
+    Raises RuntimeError if the bot reports an error for the scan.
+    """
+    bridge = bridge or get_mineflayer_bridge()
+    block_types = list(dict.fromkeys(block_types))
+    local_types = [t for t in block_types if local_index is not None and origin is not None and t in settings.tracked_block_types]
+    stored_types = [t for t in block_types if store is not None and len(store) and origin is not None and t not in local_types]
+    remote_types = [t for t in block_types if t not in local_types and t not in stored_types]
+    parts = []
+    if local_types:
+        parts.append(BlockMatches.from_points(
+            {t: local_index.k_nearest(t, origin, count_per_type, max_distance=radius) for t in local_types}, origin
+        ))
+    if stored_types:
+        parts.append(store.find_blocks(stored_types, origin, radius, count_per_type))
+    if remote_types:
+        result = await bridge.call("findBlocksMulti", remote_types, radius, count_per_type, timeout_s=settings.bridge_call_timeout_s)
+        if result.get("status") != "success":
+            raise RuntimeError(result.get("message") or f"findBlocksMulti({remote_types}) failed.")
+        scan_origin = result.get("origin")
+        parts.append(BlockMatches.from_flat(
+            result["types"], result["blocks"], (scan_origin["x"], scan_origin["y"], scan_origin["z"]) if scan_origin else origin
+        ))
+    matches = BlockMatches.concat(parts, origin)
+    matches.types.extend(t for t in block_types if t not in matches.types)
+    return matches
+
+async def scan_blocks(block_types: List[str], radius: int, tool_context: ToolContext) -> dict:
+    """
+    Scans for all blocks of `block_types` (e.g. ["oak_log", "birch_log"]) within `radius` blocks
+    in one query. Returns the count and nearest location per type, and the nearest clusters
+    (e.g. trees or ore veins) with their size, centroid and nearest block, to pick where to harvest.
+    Returns a dictionary representation of BlockScanResponse.
+    """
+    try:
+        matches = await find_blocks_multi(
+            block_types, radius, local_index=current_block_index(), origin=current_bot_position(), store=current_chunk_store()
+        )
+        nearest = {}
+        for block_type in matches.types:
+            closest = matches.k_nearest(1, block_type=block_type).to_points() if matches.origin else []
+            nearest[block_type] = {"x": closest[0][0], "y": closest[0][1], "z": closest[0][2]} if closest else None
+            if closest:
+                _remember_resource_location(tool_context, block_type, nearest[block_type])
+        clusters = matches.clusters()[:SCAN_MAX_CLUSTERS] if matches.origin else []
+        return BlockScanResponse(
+            status="success" if len(matches) else "error",
+            message=None if len(matches) else f"None of {block_types} found within {radius} blocks.",
+            counts=matches.counts(),
+            nearest=nearest,
+            clusters=clusters,
+        ).model_dump(exclude_none=True)
+    except Exception as e:
+        logger.error(f"Error in scan_blocks: {e}")
+        return BlockScanResponse(status="error", message=str(e)).model_dump(exclude_none=True)
+
+scan_blocks_tool = FunctionTool(
+    func=scan_blocks
+)
+
+async def mine_target_block_via_js_long_running(block_type: str, x: int, y: int, z: int, tool_context: ToolContext) -> dict:
     """
     Initiates mining a specific block at given coordinates.
     Returns an initial "pending" response with an operation ID.
     """
-    return _execute_long_running_js_task("mineBlock", tool_context, block_type, x, y, z)
+    return await _execute_long_running_js_task("mineBlock", tool_context, block_type, x, y, z)
 
 mine_target_block_tool = LongRunningFunctionTool(
     func=mine_target_block_via_js_long_running
 )
 
-def view_bot_inventory_via_js(tool_context: ToolContext) -> dict:
+async def view_bot_inventory_via_js(tool_context: ToolContext) -> dict:
     """
     Retrieves the current inventory of the Mineflayer bot.
     Returns a dictionary representation of InventoryResponse.
-    This is a synchronous, quick operation.
+    Served from the event-driven inventory mirror once it is synced; falls back to JS otherwise.
     """
-    assert mineflayer_js_interface is not None, "Mineflayer JS interface not initialized. Call initialize_mineflayer_tool first."
-    logger.info("Calling JS getInventory()")
     try:
-        result_proxy = mineflayer_js_interface.getInventory()
-        data_for_validation = _get_data_from_proxy(result_proxy)
+        mirror = current_inventory_mirror()
+        if mirror.synced:
+            sync_inventory_state(tool_context.state)
+            return InventoryResponse(status="success", inventory=mirror.items()).model_dump(exclude_none=True)
+
+        logger.info("Calling JS getInventory()")
+        data_for_validation = await get_mineflayer_bridge().call("getInventory", timeout_s=settings.bridge_call_timeout_s)
         validated_result = InventoryResponse.model_validate(data_for_validation)
         return validated_result.model_dump(exclude_none=True)
     except PydanticValidationError as ve:
@@ -231,7 +683,7 @@ view_bot_inventory_tool = FunctionTool(
     func=view_bot_inventory_via_js
 )
 
-def craft_target_item_via_js_long_running(
+async def craft_target_item_via_js_long_running(
     item_name: str,
     quantity: int,
     recipe_shape: Optional[List[List[Optional[str]]]],
@@ -243,13 +695,92 @@ def craft_target_item_via_js_long_running(
     Initiates crafting a specified item.
     Returns an initial "pending" response with an operation ID.
     """
-    return _execute_long_running_js_task("craftItem", tool_context, item_name, quantity, recipe_shape, ingredients, crafting_table_needed)
+    return await _execute_long_running_js_task("craftItem", tool_context, item_name, quantity, recipe_shape, ingredients, crafting_table_needed)
 
 craft_target_item_tool = LongRunningFunctionTool(
     func=craft_target_item_via_js_long_running
 )
 
-def place_item_block_via_js_long_running(
+def _positive_quantity(quantity: Any, what: str) -> int:
+    if isinstance(quantity, bool) or not isinstance(quantity, (int, float)) or quantity != int(quantity) or quantity <= 0:
+        raise PlanningError(f"{what}: quantity must be a positive whole number, got {quantity!r}.")
+    return int(quantity)
+
+def compile_craft_chain(
+    target_item: Optional[str], quantity: Optional[int], steps: Optional[List[Dict[str, Any]]], state: Any
+) -> List[Dict[str, Any]]:
+    """
+    The `craftChain` steps for `steps` (crafts given in order) or else for crafting `quantity` `target_item`:
+    the intermediate crafts and, if one is needed and none is known nearby, crafting and placing a table,
+    planned from the inventory in `state`. Raises PlanningError if materials have to be gathered first,
+    or if a step has no item name or a quantity that is not a positive whole number.
+    """
+    if steps:
+        chain = []
+        for index, step in enumerate(steps, start=1):
+            item_name = normalize_item_name(str(step.get("item_name") or step.get("item") or ""))
+            if not item_name:
+                raise PlanningError(f"Step {index} has no item_name.")
+            chain.append({
+                "item": item_name,
+                "quantity": _positive_quantity(step.get("quantity", 1), f"Step {index} ({item_name})"),
+                "action": "place" if step.get("action") == "place" else "craft",
+                "crafting_table_needed": bool(step.get("crafting_table_needed", False)),
+            })
+        return chain
+    if not target_item:
+        raise PlanningError("Give either a target_item or the steps to craft.")
+    quantity = _positive_quantity(1 if quantity is None else quantity, target_item)
+    table_location = state.get("placed_crafting_table_location")
+    origin = current_bot_position()
+    if table_location is None and origin is not None:
+        nearby = current_block_index().k_nearest("crafting_table", origin, 1, max_distance=CRAFTING_TABLE_SEARCH_DISTANCE)
+        table_location = {"x": nearby[0][0], "y": nearby[0][1], "z": nearby[0][2]} if nearby else None
+    plan = build_crafting_plan(
+        f"craft {quantity} {target_item}",
+        known_recipes=state.get("known_recipes") or {},
+        inventory=inventory_from_state(state),
+        placed_crafting_table_location=table_location,
+        recipe_index=get_recipe_index(),
+    )
+    to_gather = {step.source_block or step.item_name: step.quantity for step in plan.steps if step.action == "gather"}
+    if to_gather:
+        raise PlanningError(f"Not enough materials to craft {quantity} {target_item}; gather first: {to_gather}")
+    return [
+        {"item": step.item_name, "quantity": step.quantity, "action": step.action, "crafting_table_needed": step.crafting_table_needed}
+        for step in plan.steps
+    ]
+
+async def craft_chain_via_js_long_running(
+    target_item: Optional[str],
+    quantity: Optional[int],
+    steps: Optional[List[Dict[str, Any]]],
+    tool_context: ToolContext
+) -> dict:
+    """
+    Initiates crafting several items back to back as one operation, e.g. planks, sticks, a crafting table
+    and a pickaxe. Either give `target_item` and `quantity` (e.g. "wooden_pickaxe", 1) and the intermediate
+    crafts are planned from the current inventory, including placing a crafting table if one is needed,
+    or give `steps` as an ordered list of {"item_name", "quantity", "crafting_table_needed"} crafts.
+    Returns an initial "pending" response with an operation ID; the final result lists the items crafted,
+    or the step that failed. Fails at once, listing what to gather, if materials are missing.
+    """
+    sync_inventory_state(tool_context.state)
+    try:
+        chain = compile_craft_chain(target_item, quantity, steps, tool_context.state)
+    except PlanningError as e:
+        return CraftChainResponse(status="error", message=str(e)).model_dump(exclude_none=True)
+    if not chain:
+        return CraftChainResponse(
+            status="success", steps=[], crafted={}, message="Nothing to craft, the inventory already holds the target."
+        ).model_dump(exclude_none=True)
+    return await _execute_long_running_js_task("craftChain", tool_context, chain)
+
+craft_chain_tool = LongRunningFunctionTool(
+    func=craft_chain_via_js_long_running
+)
+
+async def place_item_block_via_js_long_running(
     item_name: str,
     ref_block_x: int,
     ref_block_y: int,
@@ -267,7 +798,7 @@ def place_item_block_via_js_long_running(
     which are not used if ref_block and face_vector are provided for relative placement.
     We pass 0,0,0 as placeholders for these unused absolute coordinates.
     """
-    return _execute_long_running_js_task("placeBlock", tool_context,
+    return await _execute_long_running_js_task("placeBlock", tool_context,
                                          item_name, 0, 0, 0,
                                          ref_block_x, ref_block_y, ref_block_z,
                                          face_vector_x, face_vector_y, face_vector_z)
@@ -322,11 +853,29 @@ memorize_recipe_tool = FunctionTool(
 
 __all__ = [
     "initialize_mineflayer_bridge",
+    "attach_to_bot_daemon",
+    "get_mineflayer_bridge",
+    "use_bot",
+    "current_bot_name",
+    "current_inventory_mirror",
+    "current_results_queue",
     "move_to_xyz_tool",
+    "get_navigation_progress_tool",
+    "cancel_navigation_tool",
+    "cancel_operation",
+    "cancel_operation_tool",
+    "find_nearest_block",
     "find_nearest_block_tool",
+    "survey_resources_tool",
+    "find_blocks_multi",
+    "open_chunk_store",
+    "enable_chunk_snapshots",
+    "scan_blocks_tool",
     "mine_target_block_tool",
     "view_bot_inventory_tool",
     "craft_target_item_tool",
+    "compile_craft_chain",
+    "craft_chain_tool",
     "place_item_block_tool",
     "memorize_recipe_tool",
     "memorize_recipe"
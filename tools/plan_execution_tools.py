@@ -0,0 +1,136 @@
+import asyncio
+import uuid
+from typing import Dict, List, Any, Set, Tuple
+
+from google.adk.tools import ToolContext, LongRunningFunctionTool
+
+from config import settings
+from src.models.planning.entities import PlanStep
+from src.models.planning.responses import PlanExecutionResponse
+from src.planning.crafting_planner import build_crafting_plan, PlanningError
+from src.planning.dag_executor import DagExecutor
+from src.state.inventory_mirror import inventory_from_state
+from tools import mineflayer_bridge_tools
+from tools.collection_tools import collect_blocks_with_fleet
+from tools.fleet import BotHandle, get_fleet
+from tools.recipe_tools import get_recipe_index
+from tools.tracing import tracer
+
+from logging_config import logger
+
+PLAN_STEP_TIMEOUT_S = 300
+PLACE_STEP_ID = "place:crafting_table"
+
+# Keeps references to running plan executions so they are not garbage collected.
+_background_tasks: Set[asyncio.Task] = set()
+
+
+async def _place_on_ground(bot: BotHandle, item_name: str) -> Dict[str, Any]:
+    """
+    Places `item_name` as a one-step `craftChain`, whose place-on-ground helper picks free ground
+    that is not under the bot and skips placing when a crafting table is already within reach.
+    """
+    return await bot.bridge.run_operation(
+        "craftChain", [{"item": item_name, "quantity": 1, "action": "place"}],
+        wait_timeout_s=PLAN_STEP_TIMEOUT_S, timeout_s=settings.bridge_call_timeout_s,
+    )
+
+
+async def run_plan_step(step: PlanStep, assignments: List[Tuple[BotHandle, PlanStep]]) -> Dict[str, Any]:
+    """
+    Carries out one plan step directly against the bridge, on the bots the executor assigned to it,
+    and returns its final result. Gathered items end up with the fleet's primary bot.
+    """
+    if step.action == "gather":
+        return await collect_blocks_with_fleet(
+            get_fleet(), step.source_block or step.item_name, step.quantity, operation_id=step.step_id, assignments=assignments
+        )
+    bot = assignments[0][0]
+    if step.action == "craft":
+        return await bot.bridge.run_operation(
+            "craftItem", step.item_name, step.quantity, None, None, step.crafting_table_needed,
+            wait_timeout_s=PLAN_STEP_TIMEOUT_S, timeout_s=settings.bridge_call_timeout_s,
+        )
+    return await _place_on_ground(bot, step.item_name)
+
+
+async def execute_plan_steps(steps: List[PlanStep], goal: str) -> Dict[str, Any]:
+    """
+    Runs `steps` as a dependency graph across the fleet, every ready step at once.
+    A crafting table placed by the plan is reported as `placed_location`.
+    Returns a dictionary representation of PlanExecutionResponse.
+    """
+    bot_fleet = get_fleet()
+    if not bot_fleet.bots:
+        bot_fleet.adopt_primary()
+    executor = DagExecutor(bot_fleet.bots, bot_fleet.scheduler, run_plan_step, home_bot=bot_fleet.primary)
+    result = await executor.run(steps, goal=goal)
+    placed_location = result.get("step_results", {}).get(PLACE_STEP_ID, {}).get("placed_location")
+    if placed_location:
+        result["placed_location"] = placed_location
+    logger.info(f"Plan execution for '{goal}' finished with {result['status']}: {result.get('message')}")
+    return result
+
+
+async def execute_crafting_plan(goal: str, tool_context: ToolContext) -> dict:
+    """
+    Initiates executing the whole plan for `goal` (e.g. "craft 1 wooden_pickaxe"), compiled from the
+    current inventory. Independent steps run at the same time (e.g. gathering logs and stone), and
+    each step starts as soon as the steps it depends on have finished.
+    Returns an initial "pending" response with an operation ID; the final result lists the
+    completed steps, or the step that failed.
+    """
+    mineflayer_bridge_tools.sync_inventory_state(tool_context.state)
+    try:
+        plan = build_crafting_plan(
+            goal,
+            known_recipes=tool_context.state.get("known_recipes") or {},
+            inventory=inventory_from_state(tool_context.state),
+            placed_crafting_table_location=tool_context.state.get("placed_crafting_table_location"),
+            recipe_index=get_recipe_index(),
+        )
+    except PlanningError as e:
+        return PlanExecutionResponse(status="error", goal=goal, message=str(e)).model_dump(exclude_none=True)
+    if not plan.steps:
+        return PlanExecutionResponse(
+            status="success", goal=goal, completed_steps=[], message="Nothing to do, the goal is already satisfied by the inventory."
+        ).model_dump(exclude_none=True)
+
+    results_queue = mineflayer_bridge_tools.current_results_queue()
+    bot_fleet = get_fleet()
+    operation_id = str(uuid.uuid4())
+    operation = mineflayer_bridge_tools.operation_registry.register(
+        operation_id, tool_context.function_call_id, "execute_crafting_plan",
+        "fleet" if len(bot_fleet) > 1 else mineflayer_bridge_tools.current_bot_name(), timeout_s=settings.pending_operations_timeout_s,
+    )
+    tracer.operation_point(operation_id, "tool_call", tool="execute_crafting_plan")
+
+    async def run() -> None:
+        try:
+            result = await execute_plan_steps(plan.steps, goal)
+        except Exception as e:
+            logger.error(f"Plan execution failed for operationId {operation_id}: {e}", exc_info=True)
+            result = {"status": "error", "message": f"Plan execution failed: {e}"}
+        result["operationId"] = operation_id
+        tracer.operation_point(operation_id, "completed")
+        if results_queue is not None:
+            await results_queue.put(result)
+
+    task = asyncio.create_task(run())
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    operation.cancel = task.cancel
+    tracer.operation_point(operation_id, "pending")
+
+    logger.info(f"Execution of {len(plan.steps)} plan steps for '{goal}' initiated with operationId {operation_id}")
+    return {"status": "pending", "operationId": operation_id, "message": f"Execution of {len(plan.steps)} plan steps for '{goal}' initiated."}
+
+execute_crafting_plan_tool = LongRunningFunctionTool(
+    func=execute_crafting_plan
+)
+
+__all__ = [
+    "run_plan_step",
+    "execute_plan_steps",
+    "execute_crafting_plan_tool",
+]
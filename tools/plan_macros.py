@@ -0,0 +1,259 @@
+from typing import Optional, Dict, List, Any, Callable, Awaitable, Tuple
+
+from google.adk.tools.agent_tool import AgentTool
+
+from agents.callbacks import chain_callback
+from config import settings
+from src.models.planning.entities import PlanStep, PlanMacro, CraftingPlan
+from src.models.planning.responses import MacroExecutionResponse
+from src.planning.crafting_planner import build_crafting_plan, parse_goal, PlanningError
+from src.planning.plan_macros import MacroStore, MacroBindingError, bind_args, build_macro, plan_signature
+from src.state.inventory_mirror import inventory_from_state, inventory_state_delta
+from tools import mineflayer_bridge_tools
+from tools.collection_tools import collect_blocks, collect_blocks_with_fleet
+from tools.fleet import get_fleet
+from tools.plan_execution_tools import execute_plan_steps
+from tools.recipe_tools import get_recipe_index
+
+from logging_config import logger
+
+MACRO_INVOCATION_TIMEOUT_S = 300
+# Invocation recorded for steps carried out by `execute_crafting_plan` rather than by sub-agent tool calls.
+PLAN_STEP_ACTION = "run_plan_step"
+
+MacroAction = Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]
+
+
+async def _collect(args: Dict[str, Any]) -> Dict[str, Any]:
+    bot_fleet = get_fleet()
+    if len(bot_fleet) > 1:
+        return await collect_blocks_with_fleet(bot_fleet, args["block_type"], args["quantity"])
+    return await collect_blocks(mineflayer_bridge_tools.get_mineflayer_bridge(), args["block_type"], args["quantity"])
+
+
+async def _run_plan_step(args: Dict[str, Any]) -> Dict[str, Any]:
+    step = PlanStep.model_validate({**args, "depends_on": []})
+    return await execute_plan_steps([step], f"{step.action} {step.quantity} {step.item_name}")
+
+
+async def _run_js_operation(js_function_name: str, *js_args) -> Dict[str, Any]:
+    return await mineflayer_bridge_tools.get_mineflayer_bridge().run_operation(
+        js_function_name, *js_args, wait_timeout_s=MACRO_INVOCATION_TIMEOUT_S, timeout_s=settings.bridge_call_timeout_s
+    )
+
+
+async def _craft_chain(args: Dict[str, Any]) -> Dict[str, Any]:
+    """Replays a crafting chain, re-planned from the bot's current inventory."""
+    try:
+        chain = mineflayer_bridge_tools.compile_craft_chain(
+            args.get("target_item"), args.get("quantity"), args.get("steps"),
+            inventory_state_delta(mineflayer_bridge_tools.current_inventory_mirror().totals()),
+        )
+    except PlanningError as e:
+        return {"status": "error", "message": str(e)}
+    if not chain:
+        return {"status": "success", "message": "Nothing to craft, the inventory already holds the target."}
+    return await _run_js_operation("craftChain", chain)
+
+
+# Agent tools whose calls are recorded into macros, keyed by tool name, with the direct bridge call that
+# replays them and awaits the final result. Read-only and state-only tools are not recorded.
+MACRO_ACTIONS: Dict[str, MacroAction] = {
+    PLAN_STEP_ACTION: _run_plan_step,
+    "collect_blocks_via_js_long_running": _collect,
+    "find_nearest_block_via_js": lambda args: mineflayer_bridge_tools.find_nearest_block(args["block_type"]),
+    "move_to_xyz_via_js_long_running": lambda args: _run_js_operation("goToXYZ", args["x"], args["y"], args["z"]),
+    "mine_target_block_via_js_long_running": lambda args: _run_js_operation(
+        "mineBlock", args["block_type"], args["x"], args["y"], args["z"]
+    ),
+    "craft_target_item_via_js_long_running": lambda args: _run_js_operation(
+        "craftItem", args["item_name"], args["quantity"], args.get("recipe_shape"), args.get("ingredients"),
+        args.get("crafting_table_needed", False),
+    ),
+    "craft_chain_via_js_long_running": _craft_chain,
+    "place_item_block_via_js_long_running": lambda args: _run_js_operation(
+        "placeBlock", args["item_name"], 0, 0, 0,
+        args["ref_block_x"], args["ref_block_y"], args["ref_block_z"],
+        args["face_vector_x"], args["face_vector_y"], args["face_vector_z"],
+    ),
+}
+
+
+class MacroRecorder:
+    """
+    Records a coordinator run through tool callbacks: the plan compiled by `plan_crafting_goal`,
+    which plan step each delegation to a sub-agent carries out, and the world-changing tool calls
+    the sub-agents make for it. A successful run is turned into a PlanMacro with `build`.
+    """
+
+    def __init__(self):
+        self.goal: Optional[str] = None
+        self.target_item: Optional[str] = None
+        self.plan_steps: List[PlanStep] = []
+        self.calls: Dict[str, List[Tuple[str, Dict[str, Any], Dict[str, Any]]]] = {}
+        self.executed_by_plan_executor = False
+        self._current_step: Optional[str] = None
+
+    def attach(self, agent) -> None:
+        agent.before_tool_callback = chain_callback(agent.before_tool_callback, self.before_tool)
+        agent.after_tool_callback = chain_callback(agent.after_tool_callback, self.after_tool)
+        for tool in agent.tools:
+            if isinstance(tool, AgentTool):
+                self.attach(tool.agent)
+
+    def _step_for_request(self, request: str) -> Optional[PlanStep]:
+        request = request.lower()
+        for step in self.plan_steps:
+            if step.task in request:
+                return step
+        verbs = {"gather": "collect", "craft": "craft", "place": "place"}
+        for step in self.plan_steps:
+            if verbs[step.action] in request and (step.source_block or step.item_name) in request:
+                return step
+        return None
+
+    def before_tool(self, tool, args, tool_context) -> Optional[Dict]:
+        if isinstance(tool, AgentTool):
+            step = self._step_for_request(str(args.get("request", "")))
+            self._current_step = step.step_id if step else None
+            if step is not None:
+                # A re-delegated step is recorded from scratch; only its last attempt is replayed.
+                self.calls[step.step_id] = []
+        return None
+
+    def after_tool(self, tool, args, tool_context, tool_response) -> Optional[Dict]:
+        response = tool_response if isinstance(tool_response, dict) else {}
+        if tool.name == "plan_crafting_goal" and response.get("status") == "success":
+            self.goal = response.get("goal")
+            self.plan_steps = [PlanStep.model_validate(step) for step in response.get("steps") or []]
+            self.target_item = parse_goal(self.goal)[0] if self.goal else None
+            self.calls = {}
+            self.executed_by_plan_executor = False
+            self._current_step = None
+        elif tool.name == "execute_crafting_plan" and response.get("status") in ("pending", "success"):
+            self.executed_by_plan_executor = True
+        elif tool.name in MACRO_ACTIONS and self._current_step is not None and response.get("status") != "error":
+            self.calls.setdefault(self._current_step, []).append((tool.name, dict(args), response))
+        return None
+
+    def build(self) -> Optional[PlanMacro]:
+        """The recorded run as a macro, or None if a plan step has no recorded tool call."""
+        if not self.goal or not self.plan_steps or not self.target_item:
+            return None
+        if self.executed_by_plan_executor:
+            for step in self.plan_steps:
+                if not self.calls.get(step.step_id):
+                    step_args = step.model_dump(exclude_none=True, exclude={"depends_on"})
+                    self.calls[step.step_id] = [(PLAN_STEP_ACTION, step_args, {})]
+        missing = [step.step_id for step in self.plan_steps if not self.calls.get(step.step_id)]
+        if missing:
+            logger.info(f"Not recording a macro for '{self.goal}': no tool calls recorded for steps {missing}")
+            return None
+        return build_macro(self.goal, self.target_item, self.plan_steps, self.calls)
+
+
+def compile_goal_for_macro(goal: str, state: Dict[str, Any]) -> Optional[CraftingPlan]:
+    """Compiles `goal` against the current session state and inventory, as `plan_crafting_goal` would."""
+    try:
+        return build_crafting_plan(
+            goal,
+            known_recipes=state.get("known_recipes") or {},
+            inventory=inventory_from_state(state),
+            placed_crafting_table_location=state.get("placed_crafting_table_location"),
+            recipe_index=get_recipe_index(),
+        )
+    except PlanningError as e:
+        logger.info(f"Goal '{goal}' cannot be compiled for macro replay: {e}")
+        return None
+
+
+async def execute_macro(macro: PlanMacro, plan: CraftingPlan) -> Dict[str, Any]:
+    """
+    Replays `macro` for `plan` directly against the bridge, step by step in plan order
+    (macros recorded from `execute_crafting_plan` go through the DAG executor instead).
+    Recorded quantities are bound to the new plan's quantities. Execution stops at the first
+    invocation that fails or does not report success, and the response says at which step
+    ("deviated"), so the caller can hand the rest of the goal back to the agents.
+    Returns a dictionary representation of MacroExecutionResponse.
+    """
+    if all(invocation.tool_name == PLAN_STEP_ACTION for step in macro.steps for invocation in step.invocations):
+        # Recorded from an `execute_crafting_plan` run: replay the same way, with independent steps in parallel.
+        result = await execute_plan_steps(plan.steps, plan.goal)
+        return MacroExecutionResponse(
+            status="success" if result["status"] == "success" else "deviated",
+            goal=plan.goal,
+            completed_steps=result.get("completed_steps", []),
+            deviated_step=result.get("failed_step"),
+            message=result.get("message"),
+        ).model_dump(exclude_none=True)
+
+    macro_steps = {step.step_id: step for step in macro.steps}
+    completed: List[str] = []
+    step_results: Dict[str, List[Dict[str, Any]]] = {}
+
+    for plan_step in plan.steps:
+        macro_step = macro_steps.get(plan_step.step_id)
+        if macro_step is None:
+            return MacroExecutionResponse(
+                status="deviated", goal=plan.goal, completed_steps=completed, deviated_step=plan_step.step_id,
+                message=f"Macro has no step '{plan_step.step_id}'.", step_results=step_results,
+            ).model_dump(exclude_none=True)
+
+        results: List[Dict[str, Any]] = []
+        step_results[plan_step.step_id] = results
+        for invocation in macro_step.invocations:
+            try:
+                args = bind_args(invocation.args, plan_step, results)
+                logger.info(f"Macro step '{plan_step.step_id}': {invocation.tool_name}({args})")
+                result = await MACRO_ACTIONS[invocation.tool_name](args)
+            except (MacroBindingError, KeyError) as e:
+                result = {"status": "error", "message": f"Cannot replay {invocation.tool_name}: {e}"}
+            except Exception as e:
+                logger.error(f"Macro step '{plan_step.step_id}' failed in {invocation.tool_name}: {e}", exc_info=True)
+                result = {"status": "error", "message": str(e)}
+            results.append(result)
+
+            if result.get("status") != "success":
+                logger.warning(f"Macro for '{plan.goal}' deviated at step '{plan_step.step_id}': {result.get('message')}")
+                return MacroExecutionResponse(
+                    status="deviated", goal=plan.goal, completed_steps=completed, deviated_step=plan_step.step_id,
+                    message=f"Step '{plan_step.task}' did not succeed: {result.get('message')}", step_results=step_results,
+                ).model_dump(exclude_none=True)
+        completed.append(plan_step.step_id)
+
+    return MacroExecutionResponse(
+        status="success", goal=plan.goal, completed_steps=completed,
+        message=f"Completed '{plan.goal}' by replaying a recorded plan ({len(completed)} steps).",
+        step_results=step_results,
+    ).model_dump(exclude_none=True)
+
+
+async def replay_plan_macro(goal: str, state: Dict[str, Any], store: MacroStore) -> Optional[Dict[str, Any]]:
+    """
+    Replays the stored macro matching the plan of `goal` in the current state, if there is one.
+    Returns the MacroExecutionResponse dictionary, or None when no macro applies.
+    """
+    plan = compile_goal_for_macro(goal, state)
+    if plan is None or not plan.steps:
+        return None
+    macro = store.get(plan.target_item, plan_signature(plan.steps))
+    if macro is None:
+        logger.info(f"No plan macro recorded for '{goal}' (signature {plan_signature(plan.steps)}).")
+        return None
+
+    logger.info(f"Replaying plan macro recorded for '{macro.recorded_goal}' for goal '{goal}'.")
+    result = await execute_macro(macro, plan)
+    if result["status"] == "success":
+        macro.replays += 1
+        store.put(macro)
+    return result
+
+
+__all__ = [
+    "MACRO_ACTIONS",
+    "PLAN_STEP_ACTION",
+    "MacroRecorder",
+    "compile_goal_for_macro",
+    "execute_macro",
+    "replay_plan_macro",
+]
@@ -0,0 +1,55 @@
+from typing import Dict, Any
+
+from google.adk.tools import ToolContext, FunctionTool
+
+from src.models.planning.responses import CraftingPlanResponse
+from src.planning.crafting_planner import build_crafting_plan, PlanningError
+from src.state.inventory_mirror import inventory_from_state
+from tools.recipe_tools import get_recipe_index
+
+from logging_config import logger
+
+def plan_crafting_goal(goal: str, tool_context: ToolContext) -> Dict[str, Any]:
+    """
+    Compiles a high-level goal (e.g. "craft 1 wooden_pickaxe") into an ordered list of
+    gather/craft/place steps, using `known_recipes`, the inventory and
+    `placed_crafting_table_location` from the session state.
+    The steps are stored in `session.state['coordinator_plan_steps']`.
+    Returns a dictionary representation of CraftingPlanResponse.
+    """
+    logger.info(f"Compiling crafting plan for goal '{goal}'")
+    try:
+        plan = build_crafting_plan(
+            goal,
+            known_recipes=tool_context.state.get("known_recipes") or {},
+            inventory=inventory_from_state(tool_context.state),
+            placed_crafting_table_location=tool_context.state.get("placed_crafting_table_location"),
+            recipe_index=get_recipe_index(),
+        )
+    except PlanningError as e:
+        logger.warning(f"Could not compile plan for goal '{goal}': {e}")
+        return CraftingPlanResponse(status="error", message=str(e), goal=goal).model_dump(exclude_none=True)
+    except Exception as e:
+        logger.error(f"Error compiling plan for goal '{goal}': {e}", exc_info=True)
+        return CraftingPlanResponse(status="error", message=f"Planner error: {e}", goal=goal).model_dump(exclude_none=True)
+
+    steps = [{**step.model_dump(exclude_none=True), "task": step.task} for step in plan.steps]
+    tool_context.state["coordinator_plan_steps"] = steps
+    tool_context.state["current_plan_step_index"] = 0
+    logger.info(f"Compiled plan for '{goal}' with {len(steps)} steps: {[step['task'] for step in steps]}")
+    return CraftingPlanResponse(
+        status="success",
+        goal=goal,
+        steps=steps,
+        bill_of_materials=plan.bill_of_materials,
+        message="Nothing to do, the goal is already satisfied by the inventory." if not steps else None,
+    ).model_dump(exclude_none=True)
+
+plan_crafting_goal_tool = FunctionTool(
+    func=plan_crafting_goal
+)
+
+__all__ = [
+    "plan_crafting_goal_tool",
+    "plan_crafting_goal"
+]
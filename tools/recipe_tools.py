@@ -0,0 +1,92 @@
+import os
+from typing import Optional, Dict, Any
+
+from google.adk.tools import ToolContext, FunctionTool
+
+from config import settings
+from src.models.planning.responses import RecipeLookupResponse, RecipeUsesResponse
+from src.planning.crafting_planner import merge_recipes, normalize_item_name
+from src.planning.recipe_index import RecipeIndex, RecipeIndexError
+
+from logging_config import logger
+
+# Process-wide recipe index, memory-mapped on first use; None if no index was built for the configured version
+_recipe_index: Optional[RecipeIndex] = None
+_recipe_index_checked = False
+
+
+def get_recipe_index() -> Optional[RecipeIndex]:
+    """
+    Returns the recipe index of `settings.minecraft_version`, opening it on first use.
+    Returns None (and planning uses the built-in recipes only) if it has not been built.
+    """
+    global _recipe_index, _recipe_index_checked
+    if _recipe_index_checked:
+        return _recipe_index
+    _recipe_index_checked = True
+    path = settings.resolved_recipe_index_path
+    if not os.path.exists(path):
+        logger.info(f"No recipe index at {path}; run `python -m tools.build_recipe_index` to build one.")
+        return None
+    try:
+        _recipe_index = RecipeIndex(path)
+    except RecipeIndexError as e:
+        logger.warning(f"Ignoring recipe index: {e}")
+        return None
+    if _recipe_index.version != settings.minecraft_version:
+        logger.warning(f"Recipe index {path} is for Minecraft {_recipe_index.version}, not {settings.minecraft_version}.")
+    logger.info(f"Loaded recipe index {path} ({_recipe_index.metadata.get('items')} craftable items).")
+    return _recipe_index
+
+
+def lookup_recipe(item_name: str, tool_context: ToolContext) -> Dict[str, Any]:
+    """
+    Looks up the recipe for `item_name` in the memorized recipes and the recipe index of the
+    server's Minecraft version. Returns the preferred recipe (`ingredients`, `quantity_produced`,
+    `shape`, `crafting_table_needed`) plus any alternative recipes from the index.
+    Returns a dictionary representation of RecipeLookupResponse.
+    """
+    name = normalize_item_name(item_name)
+    index = get_recipe_index()
+    alternatives = [variant.model_dump(exclude_none=True) for variant in index.variants(name)] if index else []
+    known = merge_recipes(tool_context.state.get("known_recipes") or {}).get(name)
+    recipe = known.model_dump(exclude_none=True) if known else alternatives[0] if alternatives else None
+    if recipe is None:
+        return RecipeLookupResponse(
+            status="not_found", item_name=name, message=f"No recipe for '{name}'; it has to be gathered or smelted."
+        ).model_dump(exclude_none=True)
+    alternatives = [variant for variant in alternatives if variant != recipe]
+    return RecipeLookupResponse(
+        status="success", item_name=name, recipe=recipe, alternative_recipes=alternatives or None
+    ).model_dump(exclude_none=True)
+
+lookup_recipe_tool = FunctionTool(
+    func=lookup_recipe
+)
+
+
+def find_recipes_using(ingredient: str, tool_context: ToolContext) -> Dict[str, Any]:
+    """
+    Lists the items that can be crafted with `ingredient`, from the recipe index.
+    Returns a dictionary representation of RecipeUsesResponse.
+    """
+    name = normalize_item_name(ingredient)
+    index = get_recipe_index()
+    if index is None:
+        used_in = sorted(item for item, recipe in merge_recipes(tool_context.state.get("known_recipes") or {}).items()
+                         if name in recipe.ingredients)
+    else:
+        used_in = index.uses(name)
+    return RecipeUsesResponse(status="success", ingredient=name, used_in=used_in).model_dump(exclude_none=True)
+
+find_recipes_using_tool = FunctionTool(
+    func=find_recipes_using
+)
+
+__all__ = [
+    "get_recipe_index",
+    "lookup_recipe",
+    "lookup_recipe_tool",
+    "find_recipes_using",
+    "find_recipes_using_tool",
+]
@@ -0,0 +1,92 @@
+import asyncio
+import json
+import os
+import time
+from typing import Optional, Dict, Any
+
+from config import settings
+from src.telemetry.tracer import Tracer
+
+from logging_config import logger
+
+# Process-wide tracer, fed by the agent callbacks, the bridge and the results processor
+tracer = Tracer(enabled=settings.tracing_enabled)
+
+_metrics_server: Optional[asyncio.AbstractServer] = None
+
+
+def write_run_report(directory: str = settings.metrics_dir, summary: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, str]]:
+    """
+    Writes the aggregated histograms (JSON) and the flame summary (folded stacks, e.g. for
+    flamegraph.pl or speedscope) of the current run into `directory`.
+    Returns the paths written, or None if tracing is disabled.
+    """
+    if not tracer.enabled:
+        return None
+    os.makedirs(directory, exist_ok=True)
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    metrics_path = os.path.join(directory, f"metrics-{stamp}.json")
+    flame_path = os.path.join(directory, f"flame-{stamp}.folded")
+    with open(metrics_path, "w", encoding="utf-8") as metrics_file:
+        json.dump({**tracer.metrics(), "run": summary or {}}, metrics_file, indent=2, default=str)
+    with open(flame_path, "w", encoding="utf-8") as flame_file:
+        flame_file.write("\n".join(tracer.folded_stacks()) + "\n")
+    logger.info(f"Run metrics written to {metrics_path}, flame summary to {flame_path}")
+    return {"metrics": metrics_path, "flame": flame_path}
+
+
+async def _serve_metrics(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    try:
+        request_line = (await reader.readline()).decode("latin-1").split()
+        while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+            pass
+        path = request_line[1] if len(request_line) > 1 else "/"
+        if path == "/metrics":
+            body, status = json.dumps(tracer.metrics()).encode("utf-8"), "200 OK"
+            content_type = "application/json"
+        elif path == "/flame":
+            body, status = ("\n".join(tracer.folded_stacks()) + "\n").encode("utf-8"), "200 OK"
+            content_type = "text/plain"
+        else:
+            body, status, content_type = b"Not found\n", "404 Not Found", "text/plain"
+        writer.write(
+            f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\nContent-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode("latin-1")
+            + body
+        )
+        await writer.drain()
+    except Exception as e:
+        logger.warning(f"Error serving metrics request: {e}")
+    finally:
+        writer.close()
+
+
+async def start_metrics_server(port: Optional[int] = settings.metrics_port, host: str = "127.0.0.1") -> None:
+    """
+    Serves the live histograms on http://host:port/metrics and the flame summary on /flame.
+    Does nothing if `port` is not set or the server is already running.
+    """
+    global _metrics_server
+    if port is None or _metrics_server is not None or not tracer.enabled:
+        return
+    try:
+        _metrics_server = await asyncio.start_server(_serve_metrics, host, port)
+        logger.info(f"Metrics endpoint listening on http://{host}:{port}/metrics")
+    except OSError as e:
+        logger.warning(f"Could not start metrics endpoint on port {port}: {e}")
+
+
+async def stop_metrics_server() -> None:
+    global _metrics_server
+    if _metrics_server is None:
+        return
+    _metrics_server.close()
+    await _metrics_server.wait_closed()
+    _metrics_server = None
+
+
+__all__ = [
+    "tracer",
+    "write_run_report",
+    "start_metrics_server",
+    "stop_metrics_server",
+]